@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+
+"""
+📨 Agent Bus - asyncio message bus between the coordinator and its worker agents
+Typed messages from multi-agent/agent-communication-system.md, bounded per-agent mailboxes with backpressure, request/reply correlation and an optional Unix-socket transport
+"""
+
+import asyncio
+import contextvars
+import itertools
+import json
+import threading
+import uuid
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Awaitable, Callable
+
+from workflow_logging import get_logger
+
+COORDINATOR_ID = "coordination_system"
+
+# Messages a mailbox holds before senders wait (backpressure)
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_REQUEST_TIMEOUT = 30.0
+
+# Lines a remote connection buffers before it stops reading its socket
+REMOTE_INBOX_SIZE = 16
+MAX_LINE_BYTES = 16 * 1024 * 1024
+
+PRIORITY_ORDER = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+
+@dataclass(frozen=True)
+class MessageType:
+    """Schema of one message type: payload fields it must carry and whether the sender awaits a reply"""
+    name: str
+    category: str
+    required_fields: tuple
+    response_expected: bool
+    priority: str = "medium"
+    timeout_seconds: Optional[float] = None
+
+MESSAGE_TYPES: Dict[str, MessageType] = {message_type.name: message_type for message_type in (
+    MessageType("agent_registration", "agent_lifecycle", ("agent_id", "agent_type", "capabilities", "project_id"),
+                True, "high"),
+    MessageType("agent_heartbeat", "agent_lifecycle", ("agent_id", "status", "current_task", "resource_usage"),
+                False, "low"),
+    MessageType("agent_shutdown", "agent_lifecycle", ("agent_id", "reason", "task_handoff_plan"), True, "high"),
+    MessageType("task_assignment", "task_coordination", ("agent_id", "task_id", "title", "dependencies"),
+                True, "high"),
+    MessageType("task_claim", "task_coordination", ("agent_id", "task_id", "estimated_duration", "dependencies"),
+                True, "medium", 30.0),
+    MessageType("task_progress_update", "task_coordination", ("agent_id", "task_id", "progress_percentage", "blockers"),
+                False, "medium"),
+    MessageType("task_completion", "task_coordination", ("agent_id", "task_id", "completion_artifacts",
+                                                         "integration_points"), True, "high"),
+    MessageType("task_handoff", "task_coordination", ("from_agent", "to_agent", "task_id", "handoff_notes"),
+                True, "high"),
+    MessageType("dependency_request", "task_coordination", ("requesting_agent", "target_agent", "required_interface",
+                                                            "deadline"), True, "medium"),
+    MessageType("quality_gate_request", "quality_coordination", ("agent_id", "artifact_location", "validation_type",
+                                                                 "success_criteria"), True, "medium", 600.0),
+    MessageType("quality_gate_result", "quality_coordination", ("validator_agent", "artifact_id", "validation_result",
+                                                                "recommendations"), False, "high"),
+    MessageType("performance_alert", "quality_coordination", ("monitoring_agent", "metric_type", "current_value",
+                                                              "budget_limit"), True, "critical"),
+    MessageType("interface_ready", "integration_coordination", ("provider_agent", "interface_specification",
+                                                                "documentation_url", "test_endpoints"), False, "medium"),
+    MessageType("integration_test_request", "integration_coordination", ("requesting_agent", "integration_partners",
+                                                                         "test_scenarios", "success_criteria"),
+                True, "medium", 900.0),
+    MessageType("integration_conflict", "integration_coordination", ("reporting_agent", "conflict_type",
+                                                                     "conflicting_agents", "impact_assessment"),
+                True, "high"),
+    # Plain acknowledgement or error reply to any request
+    MessageType("response", "reply", (), False, "high")
+)}
+
+@dataclass
+class AgentMessage:
+    """One message on the bus; replies carry the request's message_id as correlation_id"""
+    message_type: str
+    from_agent: str
+    to_agent: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    message_id: str = field(default_factory=lambda: f"msg-{uuid.uuid4().hex[:12]}")
+    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    priority: Optional[str] = None
+    response_required: Optional[bool] = None
+    correlation_id: Optional[str] = None
+
+    def __post_init__(self):
+        schema = MESSAGE_TYPES.get(self.message_type)
+        if schema:
+            self.priority = self.priority or schema.priority
+            if self.response_required is None:
+                self.response_required = schema.response_expected
+
+    def validate(self):
+        """Raise ValueError for an unknown type, priority or missing payload field"""
+        schema = MESSAGE_TYPES.get(self.message_type)
+        if schema is None:
+            raise ValueError(f"Unknown message type: {self.message_type}")
+        if self.priority not in PRIORITY_ORDER:
+            raise ValueError(f"Unknown message priority: {self.priority}")
+        missing = [name for name in schema.required_fields if name not in self.payload]
+        if missing:
+            raise ValueError(f"{self.message_type} message is missing {', '.join(missing)}")
+
+    def reply(self, payload: Optional[Dict[str, Any]] = None, message_type: str = "response") -> "AgentMessage":
+        return AgentMessage(message_type, self.to_agent, self.from_agent, payload or {}, correlation_id=self.message_id)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AgentMessage":
+        return cls(**{name: data[name] for name in cls.__dataclass_fields__ if name in data})
+
+@dataclass
+class MailboxStats:
+    """Traffic through one agent's mailbox"""
+    delivered: int = 0
+    received: int = 0
+    blocked: int = 0   # Sends that had to wait for room
+    dropped: int = 0   # Sends that gave up (timeout or try_send on a full mailbox)
+    max_depth: int = 0
+
+class MessageBus:
+    """Per-agent bounded priority mailboxes on one event loop
+
+    A full mailbox makes send() wait, so a slow agent slows its senders instead of growing memory.
+    Replies (messages with a correlation_id) go straight to the waiting request().
+    """
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._mailboxes: Dict[str, asyncio.PriorityQueue] = {}
+        self._stats: Dict[str, MailboxStats] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._sequence = itertools.count()
+
+    def register(self, agent_id: str):
+        if agent_id not in self._mailboxes:
+            self._mailboxes[agent_id] = asyncio.PriorityQueue(self.queue_size)
+            self._stats[agent_id] = MailboxStats()
+
+    def unregister(self, agent_id: str):
+        self._mailboxes.pop(agent_id, None)
+
+    @property
+    def agents(self) -> List[str]:
+        return list(self._mailboxes)
+
+    def _mailbox(self, message: AgentMessage) -> asyncio.PriorityQueue:
+        message.validate()
+        mailbox = self._mailboxes.get(message.to_agent)
+        if mailbox is None:
+            raise ValueError(f"No agent '{message.to_agent}' on the bus")
+        return mailbox
+
+    def _resolve(self, message: AgentMessage) -> bool:
+        future = self._pending.get(message.correlation_id) if message.correlation_id else None
+        if future is None or future.done():
+            return False
+        future.set_result(message)
+        return True
+
+    def _delivered(self, message: AgentMessage, mailbox: asyncio.PriorityQueue):
+        stats = self._stats[message.to_agent]
+        stats.delivered += 1
+        stats.max_depth = max(stats.max_depth, mailbox.qsize())
+
+    async def send(self, message: AgentMessage, timeout: Optional[float] = None):
+        """Deliver message, waiting while the recipient's mailbox is full (RuntimeError after timeout)"""
+        if self._resolve(message):
+            return
+        mailbox = self._mailbox(message)
+        item = (PRIORITY_ORDER[message.priority], next(self._sequence), message)
+        if mailbox.full():
+            self._stats[message.to_agent].blocked += 1
+        try:
+            await asyncio.wait_for(mailbox.put(item), timeout)
+        except asyncio.TimeoutError:
+            self._stats[message.to_agent].dropped += 1
+            raise RuntimeError(f"Mailbox of {message.to_agent} stayed full for {timeout}s")
+        self._delivered(message, mailbox)
+
+    def try_send(self, message: AgentMessage) -> bool:
+        """Deliver without waiting; False (and counted as dropped) when the mailbox is full"""
+        if self._resolve(message):
+            return True
+        mailbox = self._mailbox(message)
+        try:
+            mailbox.put_nowait((PRIORITY_ORDER[message.priority], next(self._sequence), message))
+        except asyncio.QueueFull:
+            self._stats[message.to_agent].dropped += 1
+            return False
+        self._delivered(message, mailbox)
+        return True
+
+    async def broadcast(self, message: AgentMessage, recipients: List[str], timeout: Optional[float] = None):
+        """One copy per recipient, each with its own message_id"""
+        for recipient in recipients:
+            copy = AgentMessage.from_dict({**message.to_dict(), "to_agent": recipient})
+            copy.message_id = f"msg-{uuid.uuid4().hex[:12]}"
+            await self.send(copy, timeout)
+
+    async def request(self, message: AgentMessage, timeout: Optional[float] = None) -> AgentMessage:
+        """Send and wait for the reply correlated to it"""
+        schema = MESSAGE_TYPES.get(message.message_type)
+        timeout = timeout or (schema.timeout_seconds if schema else None) or DEFAULT_REQUEST_TIMEOUT
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message.message_id] = future
+        try:
+            await self.send(message, timeout)
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"No reply to {message.message_type} from {message.to_agent} within {timeout}s")
+        finally:
+            self._pending.pop(message.message_id, None)
+
+    async def receive(self, agent_id: str, timeout: Optional[float] = None) -> AgentMessage:
+        """Next message for agent_id, most urgent first (RuntimeError after timeout)"""
+        mailbox = self._mailboxes.get(agent_id)
+        if mailbox is None:
+            raise ValueError(f"No agent '{agent_id}' on the bus")
+        try:
+            _, _, message = await asyncio.wait_for(mailbox.get(), timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"No message for {agent_id} within {timeout}s")
+        self._stats[agent_id].received += 1
+        return message
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {agent_id: {**asdict(stats), "depth": self._mailboxes[agent_id].qsize() if agent_id in self._mailboxes else 0}
+                for agent_id, stats in self._stats.items()}
+
+class LocalEndpoint:
+    """An agent's view of an in-process bus"""
+
+    def __init__(self, bus: MessageBus, agent_id: str):
+        self.bus = bus
+        self.agent_id = agent_id
+        bus.register(agent_id)
+
+    async def send(self, message: AgentMessage, timeout: Optional[float] = None):
+        await self.bus.send(message, timeout)
+
+    async def request(self, message: AgentMessage, timeout: Optional[float] = None) -> AgentMessage:
+        return await self.bus.request(message, timeout)
+
+    async def receive(self, timeout: Optional[float] = None) -> AgentMessage:
+        return await self.bus.receive(self.agent_id, timeout)
+
+async def _write_message(writer: asyncio.StreamWriter, message: AgentMessage):
+    writer.write(json.dumps(message.to_dict(), default=str).encode() + b"\n")
+    await writer.drain()
+
+async def serve_unix(bus: MessageBus, socket_path: Path) -> asyncio.AbstractServer:
+    """Let agents in other processes join the bus over a Unix socket (newline-delimited JSON)
+
+    A connection's first message must be its agent_registration. Incoming lines are read one at a
+    time and only after the previous one was delivered, and outgoing messages wait for the socket to
+    drain, so backpressure reaches across processes in both directions.
+    """
+    logger = get_logger('agent_bus')
+
+    async def forward(agent_id: str, writer: asyncio.StreamWriter):
+        while True:
+            await _write_message(writer, await bus.receive(agent_id))
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        agent_id, forwarder = None, None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = AgentMessage.from_dict(json.loads(line))
+                if agent_id is None:
+                    if message.message_type != "agent_registration":
+                        raise ValueError("First message on a bus connection must be agent_registration")
+                    agent_id = message.from_agent
+                    bus.register(agent_id)
+                    forwarder = asyncio.create_task(forward(agent_id, writer))
+                    logger.info(f"🔌 {agent_id} joined the bus")
+                await bus.send(message)
+        except (ValueError, RuntimeError, ConnectionError) as e:
+            logger.warning(f"Bus connection {agent_id or 'unregistered'} closed: {e}")
+        finally:
+            if forwarder:
+                forwarder.cancel()
+            if agent_id:
+                bus.unregister(agent_id)
+            writer.close()
+
+    socket_path = Path(socket_path)
+    if socket_path.exists():
+        socket_path.unlink()
+    return await asyncio.start_unix_server(handle, path=str(socket_path), limit=MAX_LINE_BYTES)
+
+class RemoteEndpoint:
+    """An agent in another process, attached to a bus through serve_unix"""
+
+    def __init__(self, agent_id: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.agent_id = agent_id
+        self._reader = reader
+        self._writer = writer
+        self._inbox: asyncio.Queue = asyncio.Queue(REMOTE_INBOX_SIZE)
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._reading = asyncio.create_task(self._read())
+
+    @classmethod
+    async def connect(cls, socket_path: Path, registration: AgentMessage,
+                      timeout: Optional[float] = None) -> "RemoteEndpoint":
+        """Connect and register; the coordinator's reply confirms the agent joined"""
+        reader, writer = await asyncio.open_unix_connection(str(socket_path), limit=MAX_LINE_BYTES)
+        endpoint = cls(registration.from_agent, reader, writer)
+        reply = await endpoint.request(registration, timeout)
+        if not reply.payload.get("accepted", False):
+            await endpoint.close()
+            raise RuntimeError(f"Registration of {registration.from_agent} refused: {reply.payload.get('reason')}")
+        return endpoint
+
+    async def _read(self):
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                await self._inbox.put(None)
+                return
+            message = AgentMessage.from_dict(json.loads(line))
+            future = self._pending.get(message.correlation_id) if message.correlation_id else None
+            if future is not None and not future.done():
+                future.set_result(message)
+            else:
+                # A full inbox stops reading, which stops the server forwarding (backpressure)
+                await self._inbox.put(message)
+
+    async def send(self, message: AgentMessage, timeout: Optional[float] = None):
+        message.validate()
+        await asyncio.wait_for(_write_message(self._writer, message), timeout)
+
+    async def request(self, message: AgentMessage, timeout: Optional[float] = None) -> AgentMessage:
+        schema = MESSAGE_TYPES.get(message.message_type)
+        timeout = timeout or (schema.timeout_seconds if schema else None) or DEFAULT_REQUEST_TIMEOUT
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message.message_id] = future
+        try:
+            await self.send(message, timeout)
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"No reply to {message.message_type} from {message.to_agent} within {timeout}s")
+        finally:
+            self._pending.pop(message.message_id, None)
+
+    async def receive(self, timeout: Optional[float] = None) -> AgentMessage:
+        try:
+            message = await asyncio.wait_for(self._inbox.get(), timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"No message for {self.agent_id} within {timeout}s")
+        if message is None:
+            raise ConnectionError("Bus connection closed")
+        return message
+
+    async def close(self):
+        self._reading.cancel()
+        self._writer.close()
+
+async def serve_assignments(endpoint, handler: Callable[[AgentMessage], Awaitable[str]]):
+    """Agent loop: answer each task_assignment with task_completion (or an error response) until shutdown"""
+    logger = get_logger('agent_bus')
+    while True:
+        try:
+            message = await endpoint.receive()
+        except ConnectionError:
+            return
+        if message.message_type == "agent_shutdown":
+            if message.response_required:
+                await endpoint.send(message.reply({"acknowledged": True}))
+            return
+        if message.message_type != "task_assignment":
+            logger.debug(f"{endpoint.agent_id} ignoring {message.message_type}")
+            continue
+
+        try:
+            content = await handler(message)
+            reply = message.reply({
+                "agent_id": endpoint.agent_id,
+                "task_id": message.payload["task_id"],
+                "completion_artifacts": {"content": content},
+                "integration_points": []
+            }, "task_completion")
+        except Exception as e:
+            reply = message.reply({"agent_id": endpoint.agent_id, "task_id": message.payload["task_id"],
+                                   "error": str(e)})
+        await endpoint.send(reply)
+
+class BusThread:
+    """A MessageBus on its own event loop thread, for the thread-based coordinator and executor"""
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="agent-bus", daemon=True)
+        self._thread.start()
+        self.bus = MessageBus(queue_size)
+        self.bus.register(COORDINATOR_ID)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._agent_tasks: List[asyncio.Task] = []
+
+    def call(self, coroutine, timeout: Optional[float] = None):
+        """Run a coroutine on the bus loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    def send(self, message: AgentMessage, timeout: Optional[float] = None):
+        self.call(self.bus.send(message, timeout))
+
+    def request(self, message: AgentMessage, timeout: Optional[float] = None) -> AgentMessage:
+        return self.call(self.bus.request(message, timeout))
+
+    def receive(self, agent_id: str = COORDINATOR_ID, timeout: Optional[float] = None) -> AgentMessage:
+        return self.call(self.bus.receive(agent_id, timeout))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        async def snapshot():
+            return self.bus.stats()
+        return self.call(snapshot())
+
+    def start_agent(self, agent_id: str, handler: Callable[[AgentMessage], str]):
+        """Serve an in-process agent; its blocking handler runs in the loop's worker threads
+
+        The agent's task inherits the caller's context (log fields, active trace span); each call
+        carries a copy of it into the worker thread.
+        """
+        async def start():
+            endpoint = LocalEndpoint(self.bus, agent_id)
+
+            async def run(message: AgentMessage) -> str:
+                context = contextvars.copy_context()
+                return await self.loop.run_in_executor(None, context.run, handler, message)
+
+            self._agent_tasks.append(asyncio.create_task(serve_assignments(endpoint, run)))
+        self.call(start())
+
+    def serve_unix(self, socket_path: Path):
+        async def start():
+            self._server = await serve_unix(self.bus, socket_path)
+        self.call(start())
+
+    def wait_for_registrations(self, expected: int, timeout: float) -> List[AgentMessage]:
+        """Accept agent_registration messages until expected agents joined or timeout passed"""
+        async def collect():
+            registrations = []
+            deadline = self.loop.time() + timeout
+            while len(registrations) < expected:
+                remaining = deadline - self.loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    message = await self.bus.receive(COORDINATOR_ID, remaining)
+                except RuntimeError:
+                    break
+                if message.message_type == "agent_registration":
+                    registrations.append(message)
+                    await self.bus.send(message.reply({"accepted": True}))
+            return registrations
+        return self.call(collect())
+
+    def close(self):
+        async def stop():
+            for agent_id in self.bus.agents:
+                if agent_id != COORDINATOR_ID:
+                    self.bus.try_send(AgentMessage("agent_shutdown", COORDINATOR_ID, agent_id, {
+                        "agent_id": agent_id, "reason": "coordination_finished", "task_handoff_plan": None
+                    }, response_required=False))
+            if self._agent_tasks:
+                await asyncio.wait(self._agent_tasks, timeout=5)
+            # Give remote agents' forwarders a moment to pass the shutdown on
+            for _ in range(20):
+                if all(self.bus.stats()[agent_id]["depth"] == 0 for agent_id in self.bus.agents
+                       if agent_id != COORDINATOR_ID):
+                    break
+                await asyncio.sleep(0.05)
+            if self._server:
+                self._server.close()
+                await self._server.wait_closed()
+        try:
+            self.call(stop(), timeout=10)
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=5)
@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+
+"""
+🤝 Agent Coordinator - Runs the tasks of a tasks.md on a pool of concurrent worker agents
+Implements the coordination state, weighted task assignment, blocked-task tracking and conflict rules of multi-agent/agent-communication-system.md
+"""
+
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Callable
+
+from task_graph import TaskGraph, find_cycle
+from workflow_logging import get_logger
+import workflow_metrics as metrics
+import workflow_progress as progress
+
+# Task assignment algorithm (agent-communication-system.md → task_assignment_algorithm.priority_factors)
+ASSIGNMENT_WEIGHTS = {
+    "task_priority": 0.4,
+    "agent_capability_match": 0.3,
+    "dependency_readiness": 0.2,
+    "agent_availability": 0.1
+}
+PRIORITY_SCORES = {"critical": 100, "high": 75, "medium": 50, "low": 25}
+CAPABILITY_SCORES = {"perfect_match": 100, "good_match": 75, "partial_match": 50, "poor_match": 25}
+READINESS_SCORES = {"all_dependencies_ready": 100, "some_ready": 50, "none_ready": 0}
+AVAILABILITY_SCORES = {"fully_available": 100, "partially_available": 50, "busy": 0}
+
+# Words in a task's title, context or subtasks that call for an agent cluster's specialization
+CAPABILITY_KEYWORDS = {
+    "backend": ("api", "endpoint", "database", "schema", "migration", "model", "service", "server", "auth",
+                "authentication", "queue", "webhook", "orm", "sql"),
+    "frontend": ("ui", "component", "page", "form", "screen", "layout", "view", "css", "style", "react", "vue",
+                 "client", "dashboard", "navigation"),
+    "quality": ("test", "tests", "testing", "e2e", "coverage", "qa", "accessibility", "benchmark", "load",
+                "validation"),
+    "infrastructure": ("deploy", "deployment", "docker", "ci", "cd", "pipeline", "infrastructure", "monitoring",
+                       "hosting", "environment", "terraform")
+}
+LOW_PRIORITY_KEYWORDS = ("optional", "nice to have", "nice-to-have", "polish", "stretch", "later")
+
+DEFAULT_AGENTS = {"backend": 2, "frontend": 1, "quality": 1}
+DEFAULT_MAX_ATTEMPTS = 2
+
+EXPLICIT_PRIORITY = re.compile(r'priority\W{0,4}(critical|high|medium|low)\b', re.IGNORECASE)
+
+class TaskStatus(Enum):
+    AVAILABLE = "available"
+    ASSIGNED = "assigned"
+    BLOCKED = "blocked"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+@dataclass
+class AgentTask:
+    """A parent task of tasks.md with its subtasks; one worker implements it end to end"""
+    task_id: str
+    title: str
+    order: int
+    context: str = ""
+    subtasks: List[str] = field(default_factory=list)
+    dependencies: List[str] = field(default_factory=list)
+    priority: str = "medium"
+    capabilities: List[str] = field(default_factory=list)
+    estimate_hours: float = 0.0
+    rank_hours: float = 0.0  # Longest remaining path from this task's start to the end of the work
+    requirements: List[str] = field(default_factory=list)
+    on_critical_path: bool = False
+    done_in_source: bool = False
+    status: TaskStatus = TaskStatus.AVAILABLE
+    assigned_to: Optional[str] = None
+    attempts: int = 0
+    failed_agents: List[str] = field(default_factory=list)
+    score: float = 0.0
+    result: Optional[str] = None
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    duration_seconds: float = 0.0
+
+    @property
+    def key(self) -> str:
+        return f"task-{self.task_id}"
+
+    def text(self) -> str:
+        return "\n".join([self.title, self.context] + self.subtasks)
+
+@dataclass
+class WorkerAgent:
+    """One worker of an agent cluster; capacity is how many tasks it works on at once"""
+    agent_id: str
+    agent_type: str
+    capabilities: List[str]
+    capacity: int = 1
+    active: int = 0
+    completed: int = 0
+    failed: int = 0
+
+    @property
+    def assigned(self) -> int:
+        return self.active + self.completed + self.failed
+
+def _capabilities(text: str) -> List[str]:
+    words = set(re.findall(r'[a-z0-9]+(?:-[a-z0-9]+)*', text.lower()))
+    return [name for name, keywords in CAPABILITY_KEYWORDS.items() if words.intersection(keywords)]
+
+def tasks_from_graph(graph: TaskGraph) -> List[AgentTask]:
+    """Parent tasks of a task graph with priority, required capabilities and critical path rank
+
+    Tasks on the critical path are critical unless tasks.md gives a priority; tasks others wait for
+    are high.
+    """
+    schedules = [parent.schedule for parent in graph.parents.values() if parent.schedule]
+    makespan = max((schedule.latest_finish for schedule in schedules), default=0.0)
+
+    tasks = []
+    for parent in sorted(graph.parents.values(), key=lambda parent: parent.order):
+        task = AgentTask(
+            parent.task_id, parent.title, parent.order,
+            context=parent.context,
+            subtasks=[f"{task_id} {graph.nodes[task_id].title}" for task_id in parent.tasks
+                      if task_id != parent.task_id] + parent.notes,
+            dependencies=list(parent.dependencies),
+            estimate_hours=parent.estimate_hours,
+            requirements=parent.requirements,
+            done_in_source=all(graph.nodes[task_id].done for task_id in parent.tasks)
+        )
+        if parent.schedule and not task.done_in_source:
+            task.on_critical_path = parent.schedule.critical
+            task.rank_hours = round(makespan - parent.schedule.latest_start, 2)
+        tasks.append(task)
+
+    blocking = {dependency for task in tasks for dependency in task.dependencies}
+    for task in tasks:
+        task.capabilities = _capabilities(task.text())
+        explicit = EXPLICIT_PRIORITY.search(task.text())
+        if explicit:
+            task.priority = explicit.group(1).lower()
+        elif task.on_critical_path:
+            task.priority = "critical"
+        elif task.task_id in blocking:
+            task.priority = "high"
+        elif any(word in task.text().lower() for word in LOW_PRIORITY_KEYWORDS):
+            task.priority = "low"
+    return tasks
+
+def build_agents(clusters: Optional[Dict[str, int]] = None) -> List[WorkerAgent]:
+    """Worker agents from {"backend": 2, ...} (multi_agent.agents in automation-config.json)"""
+    agents = []
+    for agent_type, count in (clusters or DEFAULT_AGENTS).items():
+        for number in range(1, int(count) + 1):
+            agents.append(WorkerAgent(f"agent-{agent_type}-{number:03d}", agent_type, [agent_type]))
+    if not agents:
+        raise ValueError("Multi-agent coordination needs at least one worker agent")
+    return agents
+
+class AgentCoordinator:
+    """Assigns tasks to worker agents by weighted score, runs them concurrently and reassigns failures"""
+
+    def __init__(self, tasks: List[AgentTask], agents: List[WorkerAgent], max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 project_id: str = "", state_path: Optional[Path] = None):
+        self.tasks = {task.task_id: task for task in tasks}
+        self.agents = agents
+        self.max_attempts = max(1, max_attempts)
+        self.project_id = project_id
+        self.state_path = state_path
+        self.escalations: List[Dict[str, Any]] = []
+        self.logger = get_logger('agent_coordinator')
+        self._lock = threading.Lock()
+
+        for task in tasks:
+            if task.done_in_source:
+                task.status = TaskStatus.COMPLETED
+            task.dependencies = [dependency for dependency in task.dependencies if dependency in self.tasks]
+
+    # Scoring
+
+    def capability_match(self, task: AgentTask, agent: WorkerAgent) -> str:
+        if not task.capabilities:
+            return "good_match"  # Any cluster can take a task that names no specialization
+        covered = len(set(task.capabilities) & set(agent.capabilities)) / len(task.capabilities)
+        if covered == 1:
+            return "perfect_match"
+        if covered >= 0.5:
+            return "good_match"
+        return "partial_match" if covered > 0 else "poor_match"
+
+    def dependency_readiness(self, task: AgentTask) -> str:
+        done = sum(1 for dependency in task.dependencies if self.tasks[dependency].status == TaskStatus.COMPLETED)
+        if done == len(task.dependencies):
+            return "all_dependencies_ready"
+        return "some_ready" if done else "none_ready"
+
+    def availability(self, agent: WorkerAgent) -> str:
+        if agent.active == 0:
+            return "fully_available"
+        return "partially_available" if agent.active < agent.capacity else "busy"
+
+    def score(self, task: AgentTask, agent: WorkerAgent) -> float:
+        """Weighted assignment score (0-100) of giving task to agent"""
+        return (ASSIGNMENT_WEIGHTS["task_priority"] * PRIORITY_SCORES.get(task.priority, PRIORITY_SCORES["medium"])
+                + ASSIGNMENT_WEIGHTS["agent_capability_match"] * CAPABILITY_SCORES[self.capability_match(task, agent)]
+                + ASSIGNMENT_WEIGHTS["dependency_readiness"] * READINESS_SCORES[self.dependency_readiness(task)]
+                + ASSIGNMENT_WEIGHTS["agent_availability"] * AVAILABILITY_SCORES[self.availability(agent)])
+
+    # Dependency tracking
+
+    def find_cycle(self) -> Optional[List[str]]:
+        """A dependency chain that loops back on itself, or None"""
+        return find_cycle({task_id: task.dependencies for task_id, task in self.tasks.items()})
+
+    def _refresh_blocked(self):
+        """Tasks with unmet dependencies are blocked; they become available once those complete"""
+        for task in self.tasks.values():
+            if task.status in (TaskStatus.AVAILABLE, TaskStatus.BLOCKED):
+                ready = self.dependency_readiness(task) == "all_dependencies_ready"
+                task.status = TaskStatus.AVAILABLE if ready else TaskStatus.BLOCKED
+
+    def _fail_dependents(self, failed: AgentTask):
+        for task in self.tasks.values():
+            if failed.task_id in task.dependencies and task.status in (TaskStatus.AVAILABLE, TaskStatus.BLOCKED):
+                task.status = TaskStatus.FAILED
+                task.error = f"dependency Task {failed.task_id} failed"
+                self.logger.warning(f"⛔ Task {task.task_id} cannot run: {task.error}")
+                self._fail_dependents(task)
+
+    def _next_assignment(self) -> Optional[tuple]:
+        """Best (task, agent) pair among available tasks and agents with free capacity
+
+        The same task wanted by several agents goes to the highest capability score. Between equally
+        scored tasks the one with the longest remaining path goes first (critical path scheduling keeps
+        total wall time down), then the least loaded agent, then tasks.md order.
+        """
+        best, best_key = None, None
+        free_agents = [agent for agent in self.agents if agent.active < agent.capacity]
+        for task in self.tasks.values():
+            if task.status != TaskStatus.AVAILABLE:
+                continue
+            # A task is retried on a different agent while one that has not failed it is left
+            untried = [agent for agent in self.agents if agent.agent_id not in task.failed_agents]
+            candidates = [agent for agent in free_agents if agent in untried or not untried]
+            for agent in candidates:
+                key = (self.score(task, agent), task.rank_hours,
+                       CAPABILITY_SCORES[self.capability_match(task, agent)], -agent.assigned, -task.order)
+                if best_key is None or key > best_key:
+                    best, best_key = (task, agent), key
+        return best
+
+    # Execution
+
+    def run(self, worker: Callable[[AgentTask, WorkerAgent], str]) -> Dict[str, Any]:
+        """Implement every task with worker(task, agent) → content; returns the final coordination state
+
+        A dependency cycle is a deadlock that needs an architecture review, so it raises ValueError
+        before any work starts.
+        """
+        cycle = self.find_cycle()
+        if cycle:
+            chain = " → ".join(f"Task {task_id}" for task_id in cycle)
+            self.escalations.append({"conflict": "dependency_chain_deadlock", "tasks": cycle,
+                                     "resolution": "escalate_to_human_for_architecture_review"})
+            self._save_state()
+            raise ValueError(f"Dependency cycle in tasks ({chain}) needs an architecture review")
+
+        running: Dict[Future, tuple] = {}
+        pool = ThreadPoolExecutor(max_workers=sum(agent.capacity for agent in self.agents),
+                                  thread_name_prefix="agent")
+        try:
+            while True:
+                with self._lock:
+                    self._refresh_blocked()
+                    while True:
+                        assignment = self._next_assignment()
+                        if assignment is None:
+                            break
+                        task, agent = assignment
+                        self._assign(task, agent)
+                        context = contextvars.copy_context()
+                        running[pool.submit(context.run, worker, task, agent)] = (task, agent)
+                    self._save_state()
+
+                if not running:
+                    break
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                with self._lock:
+                    for future in finished:
+                        task, agent = running.pop(future)
+                        self._finish(task, agent, future)
+        finally:
+            pool.shutdown(wait=True)
+
+        with self._lock:
+            stuck = [task for task in self.tasks.values() if task.status in (TaskStatus.AVAILABLE, TaskStatus.BLOCKED)]
+            for task in stuck:
+                task.status = TaskStatus.FAILED
+                task.error = task.error or "no agent could be assigned"
+            self._save_state()
+            return self.coordination_state()
+
+    def _assign(self, task: AgentTask, agent: WorkerAgent):
+        task.score = round(self.score(task, agent), 1)
+        task.status = TaskStatus.ASSIGNED
+        task.assigned_to = agent.agent_id
+        task.attempts += 1
+        task.started_at = time.time()
+        agent.active += 1
+        progress.emit("agent_task", task_id=task.key, agent_id=agent.agent_id, state="running")
+        self.logger.info(f"🤝 Task {task.task_id} ({task.priority}) → {agent.agent_id} "
+                         f"(score {task.score}, attempt {task.attempts})")
+
+    def _finish(self, task: AgentTask, agent: WorkerAgent, future: Future):
+        agent.active -= 1
+        task.duration_seconds += time.time() - (task.started_at or time.time())
+        try:
+            task.result = future.result()
+            task.status = TaskStatus.COMPLETED
+            task.error = None
+            agent.completed += 1
+            metrics.AGENT_TASKS.inc(agent_type=agent.agent_type, outcome="completed")
+            progress.emit("agent_task", task_id=task.key, agent_id=agent.agent_id, state="completed")
+            self.logger.info(f"✅ Task {task.task_id} completed by {agent.agent_id}")
+            return
+        except Exception as e:
+            task.error = str(e)
+            agent.failed += 1
+            task.failed_agents.append(agent.agent_id)
+
+        if task.attempts < self.max_attempts:
+            task.status = TaskStatus.AVAILABLE
+            task.assigned_to = None
+            metrics.AGENT_TASKS.inc(agent_type=agent.agent_type, outcome="reassigned")
+            progress.emit("agent_task", task_id=task.key, agent_id=agent.agent_id, state="reassigned")
+            self.logger.warning(f"🔁 Task {task.task_id} failed on {agent.agent_id} ({task.error}), reassigning")
+        else:
+            task.status = TaskStatus.FAILED
+            metrics.AGENT_TASKS.inc(agent_type=agent.agent_type, outcome="failed")
+            progress.emit("agent_task", task_id=task.key, agent_id=agent.agent_id, state="failed")
+            self.logger.error(f"❌ Task {task.task_id} failed after {task.attempts} attempts: {task.error}")
+            self._fail_dependents(task)
+
+    # Coordination state
+
+    def coordination_state(self) -> Dict[str, Any]:
+        """Coordination state in the shape of agent-communication-system.md"""
+        tasks = list(self.tasks.values())
+        by_status = lambda status: [task.key for task in tasks if task.status == status]
+        return {
+            "coordination_state": {
+                "project_state": {
+                    "project_id": self.project_id,
+                    "current_phase": "implementation",
+                    "active_agents": [agent.agent_id for agent in self.agents if agent.active],
+                    "completed_tasks": by_status(TaskStatus.COMPLETED),
+                    "failed_tasks": {task.key: task.error for task in tasks if task.status == TaskStatus.FAILED},
+                    "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+                },
+                "task_assignment_state": {
+                    "available_tasks": by_status(TaskStatus.AVAILABLE),
+                    "assigned_tasks": {task.key: task.assigned_to for task in tasks
+                                       if task.status == TaskStatus.ASSIGNED},
+                    "blocked_tasks": {
+                        task.key: {
+                            "blocked_by": [self.tasks[d].key for d in task.dependencies
+                                           if self.tasks[d].status != TaskStatus.COMPLETED],
+                            "blocking_reason": "dependencies_not_ready"
+                        } for task in tasks if task.status == TaskStatus.BLOCKED
+                    },
+                    "dependency_graph": {
+                        task.key: {
+                            "depends_on": [self.tasks[d].key for d in task.dependencies],
+                            "blocks": [other.key for other in tasks if task.task_id in other.dependencies]
+                        } for task in tasks
+                    }
+                },
+                "tasks": {
+                    task.key: {
+                        "title": task.title,
+                        "status": task.status.value,
+                        "priority": task.priority,
+                        "capabilities": task.capabilities,
+                        "critical_path": task.on_critical_path,
+                        "estimate_hours": task.estimate_hours,
+                        "rank_hours": task.rank_hours,
+                        "requirements": task.requirements,
+                        "assigned_to": task.assigned_to,
+                        "score": task.score,
+                        "attempts": task.attempts,
+                        "failed_agents": task.failed_agents,
+                        "duration_seconds": round(task.duration_seconds, 2),
+                        "error": task.error
+                    } for task in tasks
+                },
+                "agents": {
+                    agent.agent_id: {
+                        "agent_type": agent.agent_type,
+                        "capabilities": agent.capabilities,
+                        "availability": self.availability(agent),
+                        "completed": agent.completed,
+                        "failed": agent.failed
+                    } for agent in self.agents
+                },
+                "escalations": self.escalations
+            }
+        }
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        tmp_path = self.state_path.parent / f".{self.state_path.name}.{os.getpid()}.tmp"
+        try:
+            tmp_path.write_text(json.dumps(self.coordination_state(), indent=2))
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            self.logger.warning(f"Could not save coordination state: {e}")
+
+def bus_worker(bus, assignment_payload: Optional[Callable[[AgentTask, WorkerAgent], Dict[str, Any]]] = None,
+               timeout: Optional[float] = None) -> Callable[[AgentTask, WorkerAgent], str]:
+    """Worker for AgentCoordinator.run that sends each assignment over an agent_bus.BusThread
+
+    The agent answers with task_completion (its content) or an error response, which fails the
+    attempt so the coordinator can reassign the task.
+    """
+    from agent_bus import AgentMessage, COORDINATOR_ID
+
+    def worker(task: AgentTask, agent: WorkerAgent) -> str:
+        payload = {
+            "agent_id": agent.agent_id,
+            "task_id": task.task_id,
+            "title": task.title,
+            "dependencies": task.dependencies,
+            "context": task.context,
+            "subtasks": task.subtasks,
+            "priority": task.priority
+        }
+        payload.update(assignment_payload(task, agent) if assignment_payload else {})
+        reply = bus.request(AgentMessage("task_assignment", COORDINATOR_ID, agent.agent_id, payload,
+                                         priority=task.priority), timeout)
+        if reply.message_type != "task_completion":
+            raise RuntimeError(reply.payload.get("error") or f"{agent.agent_id} replied {reply.message_type}")
+        return reply.payload["completion_artifacts"]["content"]
+
+    return worker
+
+def _nest_markdown(content: str) -> str:
+    """Worker output without its title, headings pushed one level down to sit under a task heading"""
+    lines = content.strip().splitlines()
+    if lines and lines[0].startswith("# "):
+        lines = lines[1:]
+    nested, in_fence = [], False
+    for line in lines:
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        nested.append(f"#{line}" if line.startswith("#") and not in_fence else line)
+    return "\n".join(nested).strip()
+
+def render_implementation_guide(feature_name: str, tasks: List[AgentTask]) -> str:
+    """One implementation guide from per-task results, in tasks.md order"""
+    parts = [f"# Implementation Guide - {feature_name}", "",
+             f"Implemented by {len({task.assigned_to for task in tasks if task.result})} coordinated agents; "
+             f"see `./coordination-state.json` for assignments.", ""]
+    for task in sorted(tasks, key=lambda task: task.order):
+        parts.append(f"## Task {task.task_id}: {task.title}")
+        if task.result:
+            parts.append(f"_Agent: {task.assigned_to} · priority {task.priority}_")
+            parts.append("")
+            parts.append(_nest_markdown(task.result))
+        elif task.done_in_source:
+            parts.append("_Already completed in tasks.md._")
+        else:
+            parts.append(f"> ⚠️ Not implemented: {task.error}")
+        parts.append("")
+    return "\n".join(parts).rstrip() + "\n"
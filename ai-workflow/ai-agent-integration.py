@@ -15,6 +15,12 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any
 import subprocess
 
+from concurrent.futures import ThreadPoolExecutor
+
+from manifest_journal import open_journal
+from quality_gates import validate_feature, find_feature_dirs, load_known_tech_stacks
+from workflow_logging import get_logger
+
 class AIAgentIntegration:
     """Handles AI agent integration for workflow execution"""
     
@@ -24,19 +30,7 @@ class AIAgentIntegration:
         
     def _setup_logging(self) -> logging.Logger:
         """Setup logging configuration"""
-        logger = logging.getLogger('ai_agent_integration')
-        level = logging.DEBUG if self.debug else logging.INFO
-        logger.setLevel(level)
-        
-        if not logger.handlers:
-            console_handler = logging.StreamHandler()
-            formatter = logging.Formatter(
-                '%(asctime)s - %(levelname)s - %(message)s'
-            )
-            console_handler.setFormatter(formatter)
-            logger.addHandler(console_handler)
-        
-        return logger
+        return get_logger('ai_agent_integration', logging.DEBUG if self.debug else logging.INFO)
     
     def process_workflow_outputs(self, feature_dir: Path) -> bool:
         """Process and validate workflow outputs in feature directory"""
@@ -59,22 +53,15 @@ class AIAgentIntegration:
         
         return True
     
-    def _process_ai_status_file(self, status_file: Path):
+    def _process_ai_status_file(self, status_file: Path) -> Optional[Dict[str, Any]]:
         """Process individual AI status file"""
         
         self.logger.info(f"📄 Processing: {status_file.name}")
         
         try:
-            with open(status_file, 'r') as f:
-                content = f.read()
+            execution_data = self._load_execution_data(status_file)
             
-            # Extract JSON data from markdown
-            import re
-            json_match = re.search(r'```json\s*\n(.*?)\n```', content, re.DOTALL)
-            
-            if json_match:
-                execution_data = json.loads(json_match.group(1))
-                
+            if execution_data:
                 # Display status information
                 self._display_execution_status(execution_data)
                 
@@ -82,8 +69,33 @@ class AIAgentIntegration:
                 if execution_data.get("execution_status") == "ready_for_ai_agent":
                     self._provide_ai_guidance(execution_data, status_file)
             
+            return execution_data
+            
         except Exception as e:
             self.logger.error(f"Error processing {status_file}: {e}")
+            return None
+    
+    def _load_execution_data(self, status_file: Path) -> Optional[Dict[str, Any]]:
+        """JSON block of a status file, with completion recorded in the feature manifest merged in"""
+        
+        with open(status_file, 'r') as f:
+            content = f.read()
+        
+        # Extract JSON data from markdown
+        import re
+        json_match = re.search(r'```json\s*\n(.*?)\n```', content, re.DOTALL)
+        if not json_match:
+            return None
+        
+        execution_data = json.loads(json_match.group(1))
+        
+        # Completion updates live in the feature manifest journal, not in the status file
+        manifest = open_journal(status_file.parent / "feature-manifest.json").read()
+        recorded_status = manifest.get("document_status", {}).get(status_file.stem)
+        if recorded_status:
+            execution_data.setdefault("completion_status", {}).update(recorded_status)
+        
+        return execution_data
     
     def _display_execution_status(self, execution_data: Dict[str, Any]):
         """Display execution status information"""
@@ -194,6 +206,84 @@ echo "🚀 Ready for AI agent execution!"
         except Exception as e:
             self.logger.error(f"Failed to create helper script: {e}")
     
+    def watch(self, workspace: Path, debounce_seconds: float = 0.3, poll_interval: float = 1.0,
+              force_polling: bool = False, auto_complete: bool = True):
+        """React to created or changed status and output files under workspace until interrupted"""
+        
+        from output_watcher import watch_changes
+        
+        if not workspace.is_dir():
+            raise ValueError(f"Workspace not found: {workspace}")
+        
+        print(f"👁️  Watching {workspace} for agent status and output files (Ctrl+C to stop)")
+        known_tech_stacks = load_known_tech_stacks()
+        status_index: Dict[Path, Dict[Path, Optional[Dict[str, Any]]]] = {}
+        
+        try:
+            for batch in watch_changes(workspace, debounce_seconds, poll_interval, force_polling):
+                by_feature: Dict[Path, List[Path]] = {}
+                for path in batch:
+                    by_feature.setdefault(path.parent, []).append(path)
+                for feature_dir, paths in by_feature.items():
+                    self._handle_feature_changes(feature_dir, paths, status_index, known_tech_stacks, auto_complete)
+        except KeyboardInterrupt:
+            print("\n👋 Watch stopped")
+    
+    def _handle_feature_changes(self, feature_dir: Path, paths: List[Path],
+                                status_index: Dict[Path, Dict[Path, Optional[Dict[str, Any]]]],
+                                known_tech_stacks: set, auto_complete: bool):
+        """Process only the changed files of one feature, then validate it and complete finished steps"""
+        
+        from output_watcher import STATUS_SUFFIX
+        
+        # Status files of a feature are read once, then kept current from change events
+        if feature_dir not in status_index:
+            status_index[feature_dir] = {path: self._safe_load_execution_data(path)
+                                         for path in feature_dir.glob(f"*{STATUS_SUFFIX}")}
+        statuses = status_index[feature_dir]
+        
+        for status_file in (path for path in paths if path.name.endswith(STATUS_SUFFIX)):
+            statuses[status_file] = self._process_ai_status_file(status_file)
+        
+        results = self.validate_feature_outputs(feature_dir, known_tech_stacks)
+        changed = ", ".join(path.name for path in paths)
+        print(f"{'✅' if results['validation_passed'] else '❌'} {feature_dir.name}: {changed}"
+              f" ({len(results['errors'])} problems, {results['quality_gates']['duration_ms']}ms)")
+        for error in results["errors"]:
+            print(f"   - {error}")
+        if results["manual_review_required"]:
+            print(f"   🚦 Manual review: {', '.join(results['manual_review_required'])}")
+        
+        if auto_complete:
+            self._complete_ready_steps(statuses, results)
+    
+    def _safe_load_execution_data(self, status_file: Path) -> Optional[Dict[str, Any]]:
+        try:
+            return self._load_execution_data(status_file)
+        except Exception as e:
+            self.logger.error(f"Error processing {status_file}: {e}")
+            return None
+    
+    def _complete_ready_steps(self, statuses: Dict[Path, Optional[Dict[str, Any]]], results: Dict[str, Any]):
+        """Mark steps completed once all their expected outputs exist and pass the quality gates"""
+        
+        for status_file, execution_data in statuses.items():
+            if not execution_data or execution_data.get("completion_status", {}).get("completed"):
+                continue
+            
+            expected = [Path(output).name for output in execution_data.get("expected_outputs", [])]
+            if not expected or not all((status_file.parent / name).exists() for name in expected):
+                continue
+            
+            problems = [error for error in results["errors"] if any(error.startswith(f"{name}:") for name in expected)]
+            if problems:
+                print(f"   ⏳ {status_file.stem}: outputs present, {len(problems)} quality problems before completion")
+                continue
+            
+            if self.mark_step_completed(status_file, True):
+                execution_data.setdefault("completion_status", {})["completed"] = True
+                print(f"   🏁 Marked {status_file.stem} completed")
+    
     def mark_step_completed(self, status_file: Path, success: bool = True, errors: List[str] = None) -> bool:
         """Mark a workflow step as completed"""
         
@@ -201,48 +291,95 @@ echo "🚀 Ready for AI agent execution!"
             self.logger.error(f"Status file not found: {status_file}")
             return False
         
+        completion_status = {
+            "started": True,
+            "completed": success,
+            "validated": success,
+            "completion_timestamp": datetime.now().isoformat()
+        }
+        if errors:
+            completion_status["errors"] = errors
+        
         try:
-            with open(status_file, 'r') as f:
-                content = f.read()
+            # Append to the journal instead of rewriting JSON embedded in the markdown
+            journal = open_journal(status_file.parent / "feature-manifest.json")
+            journal.append([
+                {"op": "merge", "path": ["document_status", status_file.stem], "value": completion_status}
+            ])
             
-            # Extract and update JSON data
-            import re
-            json_match = re.search(r'```json\s*\n(.*?)\n```', content, re.DOTALL)
-            
-            if json_match:
-                execution_data = json.loads(json_match.group(1))
-                
-                # Update completion status
-                execution_data["completion_status"]["started"] = True
-                execution_data["completion_status"]["completed"] = success
-                execution_data["completion_status"]["validated"] = success
-                execution_data["completion_status"]["completion_timestamp"] = datetime.now().isoformat()
-                
-                if errors:
-                    execution_data["completion_status"]["errors"] = errors
-                
-                # Update content
-                updated_json = json.dumps(execution_data, indent=2)
-                updated_content = re.sub(
-                    r'```json\s*\n.*?\n```',
-                    f'```json\n{updated_json}\n```',
-                    content,
-                    flags=re.DOTALL
-                )
-                
-                with open(status_file, 'w') as f:
-                    f.write(updated_content)
-                
-                self.logger.info(f"✅ Updated completion status: {status_file}")
-                return True
+            self.logger.info(f"✅ Recorded completion status for: {status_file.name}")
+            return True
             
         except Exception as e:
-            self.logger.error(f"Failed to update status file: {e}")
+            self.logger.error(f"Failed to record completion status: {e}")
             return False
+    
+    def run_remote_agent(self, socket_path: Path, agent_type: str, agent_id: Optional[str] = None,
+                         llm_provider: Optional[str] = None, llm_model: Optional[str] = None,
+                         connect_timeout: float = 60.0) -> int:
+        """Join a step 07 agent bus from this process and implement the tasks it is assigned
+        
+        Returns the number of tasks completed once the coordinator shuts the agent down.
+        """
+        
+        import asyncio
+        import time
+        from agent_bus import AgentMessage, COORDINATOR_ID, RemoteEndpoint, serve_assignments
+        from content_generation_engine import ContentGenerationEngine, ContentGenerationRequest, WorkflowContext
+        
+        agent_id = agent_id or f"agent-{agent_type}-{os.getpid()}"
+        engine = ContentGenerationEngine(debug=self.debug, user_provider=llm_provider, user_model=llm_model)
+        completed = []
+        
+        def generate(message: AgentMessage) -> str:
+            data = dict(message.payload["generation_request"])
+            context = dict(data.pop("context"))
+            context["feature_dir"] = Path(context["feature_dir"])
+            self.logger.info(f"🛠️  {agent_id} implementing Task {message.payload['task_id']}: {message.payload['title']}")
+            content = engine.generate_content(ContentGenerationRequest(context=WorkflowContext(**context), **data))
+            completed.append(message.payload["task_id"])
+            return content
+        
+        async def run():
+            registration = AgentMessage("agent_registration", agent_id, COORDINATOR_ID, {
+                "agent_id": agent_id, "agent_type": agent_type, "capabilities": [agent_type], "project_id": ""
+            })
+            deadline = time.monotonic() + connect_timeout
+            while True:
+                try:
+                    endpoint = await RemoteEndpoint.connect(socket_path, registration)
+                    break
+                except (FileNotFoundError, ConnectionRefusedError):
+                    if time.monotonic() > deadline:
+                        raise RuntimeError(f"No agent bus on {socket_path} after {connect_timeout}s")
+                    await asyncio.sleep(1.0)
+            self.logger.info(f"🔌 {agent_id} joined the agent bus on {socket_path}")
+            
+            loop = asyncio.get_running_loop()
+            
+            async def handle(message: AgentMessage) -> str:
+                return await loop.run_in_executor(None, generate, message)
+            
+            try:
+                await serve_assignments(endpoint, handle)
+            finally:
+                await endpoint.close()
+        
+        asyncio.run(run())
+        self.logger.info(f"👋 {agent_id} shut down after {len(completed)} tasks")
+        return len(completed)
+    
+    def show_manifest(self, feature_dir: Path, compact: bool = False) -> Optional[Dict[str, Any]]:
+        """Fold the feature manifest journal and return the current manifest"""
         
-        return False
+        journal = open_journal(feature_dir / "feature-manifest.json")
+        if not journal.exists():
+            self.logger.error(f"No feature manifest in: {feature_dir}")
+            return None
+        
+        return journal.compact() if compact else journal.read()
     
-    def validate_feature_outputs(self, feature_dir: Path) -> Dict[str, Any]:
+    def validate_feature_outputs(self, feature_dir: Path, known_tech_stacks: Optional[set] = None) -> Dict[str, Any]:
         """Validate all outputs in a feature directory"""
         
         validation_results = {
@@ -251,7 +388,8 @@ echo "🚀 Ready for AI agent execution!"
             "files_found": [],
             "missing_files": [],
             "validation_passed": True,
-            "errors": []
+            "errors": [],
+            "manual_review_required": []
         }
         
         if not feature_dir.exists():
@@ -261,7 +399,7 @@ echo "🚀 Ready for AI agent execution!"
         
         # Check for manifest file
         manifest_file = feature_dir / "feature-manifest.json"
-        if manifest_file.exists():
+        if open_journal(manifest_file).exists():
             validation_results["files_found"].append(str(manifest_file))
         else:
             validation_results["missing_files"].append(str(manifest_file))
@@ -285,11 +423,43 @@ echo "🚀 Ready for AI agent execution!"
         if artifacts_dir.exists():
             validation_results["files_found"].append(str(artifacts_dir))
         
+        # Configured quality gates: local checks over each document's section tree, no LLM pass
+        gates = validate_feature(feature_dir, known_tech_stacks)
+        self._apply_quality_gates(validation_results, gates)
+        
         self.logger.info(f"🔍 Validation complete for: {feature_dir}")
         self.logger.info(f"Files found: {len(validation_results['files_found'])}")
         self.logger.info(f"Missing files: {len(validation_results['missing_files'])}")
+        if validation_results["manual_review_required"]:
+            self.logger.info(f"🚦 Manual review triggered: {', '.join(validation_results['manual_review_required'])}")
         
         return validation_results
+    
+    def _apply_quality_gates(self, validation_results: Dict[str, Any], gates: Dict[str, Any]):
+        """Fold quality gate results into a validation report"""
+        
+        validation_results["quality_gates"] = {
+            "checks": gates["checks"],
+            "triggers": gates["triggers"],
+            "metrics": gates["metrics"],
+            "duration_ms": gates["duration_ms"]
+        }
+        validation_results["manual_review_required"] = gates["manual_review_required"]
+        if not gates["passed"]:
+            validation_results["validation_passed"] = False
+            for check in gates["checks"].values():
+                validation_results["errors"].extend(check["problems"])
+    
+    def validate_workspace_outputs(self, workspace: Path, workers: int = 8) -> List[Dict[str, Any]]:
+        """Validate every feature of a workspace (or project) in parallel"""
+        
+        feature_dirs = find_feature_dirs(workspace)
+        known_tech_stacks = load_known_tech_stacks()
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(feature_dirs) or 1)),
+                                thread_name_prefix="validate") as pool:
+            return list(pool.map(lambda feature_dir: self.validate_feature_outputs(feature_dir, known_tech_stacks),
+                                 feature_dirs))
 
 def main():
     """Main entry point for AI agent integration"""
@@ -313,6 +483,38 @@ def main():
     validate_parser = subparsers.add_parser('validate', help='Validate feature outputs')
     validate_parser.add_argument('feature_dir', type=Path, help='Feature directory to validate')
     
+    # Validate workspace command
+    workspace_parser = subparsers.add_parser('validate-workspace', help='Validate every feature of a workspace or project in parallel')
+    workspace_parser.add_argument('workspace', type=Path, help='Workspace (e.g. ~/Projects), project or feature directory')
+    workspace_parser.add_argument('--workers', type=int, default=8, help='Features validated in parallel (default: 8)')
+    
+    # Watch command
+    watch_parser = subparsers.add_parser('watch', help='Process status and output files as agents write them')
+    watch_parser.add_argument('workspace', type=Path, help='Workspace (e.g. ~/Projects), project or feature directory')
+    watch_parser.add_argument('--debounce', type=float, default=0.3, help='Seconds a file must be quiet before it is processed')
+    watch_parser.add_argument('--poll-interval', type=float, default=1.0, help='Polling interval when inotify is unavailable')
+    watch_parser.add_argument('--polling', action='store_true', help='Poll even when inotify is available')
+    watch_parser.add_argument('--no-auto-complete', action='store_true',
+                              help='Do not mark steps completed when their outputs pass validation')
+    
+    # Remote agent command
+    agent_parser = subparsers.add_parser('agent', help='Join a step 07 agent bus as a worker agent in this process')
+    agent_parser.add_argument('--socket', type=Path, required=True, help='multi_agent.message_bus.socket_path of the run')
+    agent_parser.add_argument('--agent-type', default='backend', help='Cluster this agent belongs to (backend, frontend, quality, ...)')
+    agent_parser.add_argument('--agent-id', help='Agent id (default: agent-<type>-<pid>)')
+    agent_parser.add_argument('--llm-provider', help='LLM provider for this agent')
+    agent_parser.add_argument('--llm-model', help='LLM model for this agent')
+    agent_parser.add_argument('--connect-timeout', type=float, default=60.0, help='Seconds to wait for the bus to open')
+    
+    # Task graph command
+    graph_parser = subparsers.add_parser('task-graph', help='Build the task DAG of a tasks.md (critical path, slack, width)')
+    graph_parser.add_argument('tasks', type=Path, help='tasks.md file or the feature directory containing it')
+    
+    # Manifest command
+    manifest_parser = subparsers.add_parser('manifest', help='Show the current feature manifest')
+    manifest_parser.add_argument('feature_dir', type=Path, help='Feature directory')
+    manifest_parser.add_argument('--compact', action='store_true', help='Fold the journal into feature-manifest.json')
+    
     # Global options
     parser.add_argument('--debug', action='store_true', help='Enable debug logging')
     
@@ -341,6 +543,41 @@ def main():
             results = integration.validate_feature_outputs(args.feature_dir)
             print(json.dumps(results, indent=2))
             sys.exit(0 if results['validation_passed'] else 1)
+            
+        elif args.command == 'validate-workspace':
+            results = integration.validate_workspace_outputs(args.workspace, args.workers)
+            print(json.dumps(results, indent=2))
+            failed = [r["feature_directory"] for r in results if not r["validation_passed"]]
+            review = [r["feature_directory"] for r in results if r["manual_review_required"]]
+            print(f"\n🚦 {len(results)} features validated: {len(results) - len(failed)} passed, "
+                  f"{len(failed)} failed, {len(review)} need manual review", file=sys.stderr)
+            sys.exit(0 if results and not failed else 1)
+            
+        elif args.command == 'watch':
+            integration.watch(args.workspace, args.debounce, args.poll_interval, args.polling,
+                              not args.no_auto_complete)
+            sys.exit(0)
+            
+        elif args.command == 'agent':
+            integration.run_remote_agent(args.socket, args.agent_type, args.agent_id,
+                                         args.llm_provider, args.llm_model, args.connect_timeout)
+            sys.exit(0)
+            
+        elif args.command == 'task-graph':
+            from task_graph import write_task_graph, graph_path
+            
+            tasks_path = args.tasks if args.tasks.is_file() else args.tasks / "tasks.md"
+            graph = write_task_graph(tasks_path)
+            print(json.dumps(graph.to_dict()["summary"], indent=2))
+            print(f"🕸️  Task graph saved to {graph_path(tasks_path)}", file=sys.stderr)
+            sys.exit(0 if not graph.cycle else 1)
+            
+        elif args.command == 'manifest':
+            manifest = integration.show_manifest(args.feature_dir, args.compact)
+            if manifest is None:
+                sys.exit(1)
+            print(json.dumps(manifest, indent=2))
+            sys.exit(0)
         
     except Exception as e:
         print(f"❌ AI Agent Integration Error: {e}")
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+"""
+🧠 Approval History - Indexed record of every human gate decision
+Answers rolling approval-rate queries by gate, content type, tech stack and user so learning mode can skip gates users reliably approve
+"""
+
+import getpass
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+APPROVAL_DB_ENV = "AI_WORKFLOW_APPROVAL_DB"
+DEFAULT_APPROVAL_DB = Path.home() / ".ai-workflow" / "approval-history.db"
+
+# Most recent decisions considered by a rolling query
+DEFAULT_WINDOW = 20
+# Recency weighting for confidence: a decision's weight halves every HALF_LIFE newer decisions
+HALF_LIFE = 5
+
+APPROVED = "approved"
+REJECTED = "rejected"
+SKIPPED = "skipped"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS gate_decisions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at REAL NOT NULL,
+    gate TEXT NOT NULL,
+    content_type TEXT NOT NULL DEFAULT '',
+    tech_stack TEXT NOT NULL DEFAULT '',
+    user TEXT NOT NULL DEFAULT '',
+    decision TEXT NOT NULL,
+    workflow TEXT,
+    mode TEXT,
+    project TEXT,
+    run_id TEXT,
+    wait_seconds REAL
+);
+CREATE INDEX IF NOT EXISTS idx_decisions_scope ON gate_decisions(gate, content_type, tech_stack, user, id);
+CREATE INDEX IF NOT EXISTS idx_decisions_gate_user ON gate_decisions(gate, user, id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_decisions_identity ON gate_decisions(recorded_at, gate, user);
+"""
+
+def current_user() -> str:
+    """Name decisions are recorded under"""
+    try:
+        return getpass.getuser()
+    except Exception:
+        return os.environ.get("USER", "unknown")
+
+def normalize_tech_stack(tech_stack: Any) -> str:
+    """'Python + Flask + PostgreSQL' and ['flask', 'python', 'postgresql'] share one key"""
+    if not tech_stack:
+        return ""
+    parts = tech_stack if isinstance(tech_stack, (list, tuple)) else re.split(r"[+,/]", str(tech_stack))
+    return "+".join(sorted({part.strip().lower() for part in parts if part and part.strip()}))
+
+@dataclass
+class ApprovalStats:
+    """Rolling approval statistics for one scope"""
+    scope: str
+    samples: int
+    approvals: int
+    approval_rate: float
+    confidence: float
+
+    def allows_auto_proceed(self, thresholds: Dict[str, Any]) -> bool:
+        """True when history is deep, approving and recent enough to skip the gate"""
+        return (self.samples >= thresholds.get("minimum_history_samples", 3)
+                and self.approval_rate >= thresholds.get("approval_rate_for_auto", 0.85)
+                and self.confidence >= thresholds.get("confidence_threshold", 0.9))
+
+class ApprovalHistory:
+    """SQLite store of gate decisions with indexed rolling queries"""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path or os.environ.get(APPROVAL_DB_ENV) or DEFAULT_APPROVAL_DB).expanduser()
+        self.logger = logging.getLogger('approval_history')
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()  # Concurrent runs (batch, daemon) share one connection
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._conn is None:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(str(self.db_path), timeout=10.0, check_same_thread=False)
+                self._conn.row_factory = sqlite3.Row
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.executescript(SCHEMA)
+            return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def record(self, gate: str, decision: str, content_type: str = "", tech_stack: Any = "",
+               user: Optional[str] = None, workflow: Optional[str] = None, mode: Optional[str] = None,
+               project: Optional[str] = None, run_id: Optional[str] = None,
+               wait_seconds: Optional[float] = None, recorded_at: Optional[float] = None):
+        """Store one human gate decision"""
+        with self._lock, self.conn:
+            self.conn.execute("""
+                INSERT OR IGNORE INTO gate_decisions (
+                    recorded_at, gate, content_type, tech_stack, user, decision,
+                    workflow, mode, project, run_id, wait_seconds
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (recorded_at or time.time(), gate, content_type or "", normalize_tech_stack(tech_stack),
+                  user or current_user(), decision, workflow, mode, project, run_id, wait_seconds))
+
+    def import_decisions(self, entries: List[Dict[str, Any]]) -> int:
+        """Seed from automation-config user_preferences.approval_history (re-importing is a no-op)"""
+        imported = 0
+        for entry in entries:
+            if not isinstance(entry, dict) or "gate" not in entry:
+                continue
+            decision = entry.get("decision")
+            if decision is None and "approved" in entry:
+                decision = APPROVED if entry["approved"] else REJECTED
+            if decision not in (APPROVED, REJECTED, SKIPPED):
+                continue
+            with self._lock:
+                before = self.conn.total_changes
+                self.record(entry["gate"], decision, entry.get("content_type", ""), entry.get("tech_stack", ""),
+                            entry.get("user"), entry.get("workflow"), entry.get("mode"), entry.get("project"),
+                            recorded_at=float(entry.get("recorded_at", 0)) or None)
+                imported += self.conn.total_changes - before
+        return imported
+
+    def stats(self, gate: str, content_type: Optional[str] = None, tech_stack: Any = None,
+              user: Optional[str] = None, window: int = DEFAULT_WINDOW) -> ApprovalStats:
+        """Rolling approval rate over the most recent decisions in one scope"""
+        clauses, params, scope = ["gate = ?"], [gate], [gate]
+        for column, value in (("content_type", content_type), ("tech_stack", tech_stack), ("user", user)):
+            if value is None:
+                continue
+            value = normalize_tech_stack(value) if column == "tech_stack" else value
+            clauses.append(f"{column} = ?")
+            params.append(value)
+            scope.append(f"{column}={value or '-'}")
+
+        with self._lock:
+            rows = self.conn.execute(f"""
+                SELECT decision FROM gate_decisions WHERE {' AND '.join(clauses)}
+                ORDER BY id DESC LIMIT ?
+            """, (*params, window)).fetchall()
+
+        approvals = sum(1 for row in rows if row["decision"] == APPROVED)
+        return ApprovalStats(
+            scope=" ".join(scope),
+            samples=len(rows),
+            approvals=approvals,
+            approval_rate=approvals / len(rows) if rows else 0.0,
+            confidence=self._recency_weighted_rate([row["decision"] for row in rows])
+        )
+
+    def known_tech_stacks(self) -> set:
+        """Every normalized tech stack that was approved at least once"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT tech_stack FROM gate_decisions WHERE tech_stack != '' AND decision = ?", (APPROVED,)
+            ).fetchall()
+        return {row["tech_stack"] for row in rows}
+
+    def _recency_weighted_rate(self, decisions_newest_first: List[str]) -> float:
+        # A recent rejection drags this below the plain rate, so one "no" re-enables the gate quickly
+        total = weighted = 0.0
+        for age, decision in enumerate(decisions_newest_first):
+            weight = 0.5 ** (age / HALF_LIFE)
+            total += weight
+            if decision == APPROVED:
+                weighted += weight
+        return weighted / total if total else 0.0
+
+    def evaluate(self, gate: str, thresholds: Dict[str, Any], content_type: str = "", tech_stack: Any = "",
+                 user: Optional[str] = None) -> ApprovalStats:
+        """Stats from the most specific scope with enough history (stack+user → user → everyone)"""
+        user = user or current_user()
+        minimum = thresholds.get("minimum_history_samples", 3)
+        window = thresholds.get("history_window", DEFAULT_WINDOW)
+
+        scopes = []
+        if tech_stack:
+            scopes.append({"tech_stack": tech_stack, "user": user})
+        scopes.extend([{"user": user}, {}])
+
+        stats = None
+        for scope in scopes:
+            stats = self.stats(gate, content_type=content_type or None, window=window, **scope)
+            if stats.samples >= minimum:
+                return stats
+        return stats
+
+_history: Optional[ApprovalHistory] = None
+_history_lock = threading.Lock()
+
+def get_approval_history() -> ApprovalHistory:
+    """Process-wide store (one connection per process, shared by every thread)"""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = ApprovalHistory()
+        return _history
@@ -11,14 +11,184 @@ import sys
 import argparse
 import logging
 import re
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Union
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any, Union, Callable
+from dataclasses import dataclass, asdict, replace
 import tempfile
 
+from workflow_logging import get_logger
+import workflow_metrics as metrics
+import workflow_tracing as tracing
+from quality_gates import section_key, satisfies_heading
+
 # Import our LLM integration
-from llm_api_integration import LLMAPIIntegration, LLMConfig, LLMRequest, LLMResponse, LLMProvider, load_llm_config
+from llm_api_integration import (LLMAPIIntegration, LLMConfig, LLMRequest, LLMResponse, LLMProvider, load_llm_config,
+                                 RateLimiter, CostBudget)
+
+# Content type → workflow_specific_configs entry in llm-config.json
+CONTENT_TYPE_CONFIGS = {
+    "mvp_entrypoint": "mvp_entrypoint",
+    "prd": "gen_prd",
+    "srs": "gen_srs",
+    "design_decisions": "gen_design_decisions",
+    "design_analysis": "gen_design",
+    "tasks": "gen_tasks_and_testing",
+    "task_processing": "process_tasks",
+    "completion_summary": "gen_completion_summary",
+    "enterprise": "enterprise_scaling",
+    "tech_stack": "tech_stack_consultation"
+}
+
+# Providers that reuse a cached prompt prefix without explicit cache markers (Ollama keeps the model loaded)
+PROMPT_CACHE_PROVIDERS = {LLMProvider.OPENAI, LLMProvider.AZURE_OPENAI, LLMProvider.LOCAL_OLLAMA}
+
+def split_markdown_sections(content: str) -> tuple:
+    """(preamble, [(title, text)]) split at level-2 headings; text includes the heading line"""
+    preamble, sections = [], []
+    for line in content.strip().splitlines():
+        if line.startswith("## "):
+            sections.append((line[3:].strip(), [line]))
+        elif sections:
+            sections[-1][1].append(line)
+        else:
+            preamble.append(line)
+    return "\n".join(preamble).strip(), [(title, "\n".join(lines).strip()) for title, lines in sections]
+
+def merge_markdown_sections(content: str, drafted: str, heading_order: List[str]) -> str:
+    """Insert drafted sections into generated content at their template position, replacing duplicates"""
+    preamble, generated = split_markdown_sections(content)
+    _, drafts = split_markdown_sections(drafted)
+    drafted_keys = {section_key(title) for title, _ in drafts}
+    sections = [(title, text) for title, text in generated if section_key(title) not in drafted_keys]
+    
+    rank = {section_key(title): i for i, title in reversed(list(enumerate(heading_order)))}
+    for title, text in drafts:
+        position = rank.get(section_key(title), len(rank))
+        index = next((i for i, (other, _) in enumerate(sections) if rank.get(section_key(other), -1) > position),
+                     len(sections))
+        sections.insert(index, (title, text))
+    
+    return "\n\n".join(([preamble] if preamble else []) + [text for _, text in sections])
+
+# Documents with required sections are requested as a section map so each section can be checked and repaired alone
+SECTION_MAP_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "preamble": {"type": "string", "description": "Markdown before the first section (may be empty)"},
+        "sections": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "heading": {"type": "string", "description": "Level-2 heading text without the leading ##"},
+                    "content": {"type": "string", "description": "Markdown body of the section"}
+                },
+                "required": ["heading", "content"]
+            }
+        }
+    },
+    "required": ["sections"]
+}
+REQUIRED_SECTION_PREFIX = "contains:## "
+MIN_SECTION_CHARS = 20
+REPAIR_SECTION_EXCERPT_CHARS = 1500
+REPAIR_CONTEXT_FIELDS = ("project_name", "primary_user", "user_pain_point", "recommended_tech_stack",
+                         "key_success_metric")
+
+def required_sections(criteria: List[str]) -> List[str]:
+    """Headings named by contains:## criteria, in criteria order"""
+    return [criterion[len(REQUIRED_SECTION_PREFIX):].strip() for criterion in criteria
+            if criterion.startswith(REQUIRED_SECTION_PREFIX)]
+
+def find_section(sections: List[tuple], required: str) -> Optional[int]:
+    return next((i for i, (heading, _) in enumerate(sections) if satisfies_heading(heading, required)), None)
+
+def section_map_instruction(required: List[str]) -> str:
+    """Output-format instruction appended to prompts that carry SECTION_MAP_SCHEMA"""
+    return (f"\n## Output Format\nReturn only a JSON object of the form "
+            f'{{"preamble": "...", "sections": [{{"heading": "...", "content": "..."}}]}}: one entry per level-2 '
+            f"section in document order, the heading without `##`, the content as markdown (### subsections stay "
+            f"inside it). Required sections: {', '.join(required)}.")
+
+def parse_section_map(content: str) -> Optional[tuple]:
+    """(preamble, [(heading, body)]) from a JSON section map reply, or None when the reply is not one"""
+    start, end = content.find("{"), content.rfind("}")
+    if start < 0 or end < start:
+        return None
+    try:
+        data = json.loads(content[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("sections"), list):
+        return None
+
+    sections = []
+    for item in data["sections"]:
+        if not isinstance(item, dict):
+            continue
+        heading = str(item.get("heading", "")).strip().lstrip("#").strip()
+        body = str(item.get("content", "")).strip()
+        # Models sometimes repeat the heading as the first line of the content
+        first_line, _, rest = body.partition("\n")
+        if first_line.startswith("#") and section_key(first_line.lstrip("#").strip()) == section_key(heading):
+            body = rest.strip()
+        if heading:
+            sections.append((heading, body))
+    return str(data.get("preamble") or "").strip(), sections
+
+def markdown_section_map(content: str) -> tuple:
+    """(preamble, [(heading, body)]) of a markdown document (replies that ignored the requested JSON)"""
+    preamble, sections = split_markdown_sections(content)
+    return preamble, [(title, text.partition("\n")[2].strip()) for title, text in sections]
+
+def render_section_map(preamble: str, sections: List[tuple]) -> str:
+    return "\n\n".join(([preamble] if preamble else []) + [f"## {heading}\n\n{body}".strip() for heading, body in sections])
+
+def section_problems(sections: List[tuple], criteria: List[str]) -> Dict[str, List[str]]:
+    """Required heading → what is wrong with it; document-wide checks are charged to a required section"""
+    required = required_sections(criteria)
+    if not required:
+        return {}
+
+    bodies = {}
+    for heading in required:
+        index = find_section(sections, heading)
+        if index is not None:
+            bodies[heading] = sections[index][1]
+    problems: Dict[str, List[str]] = {}
+    for heading in required:
+        if heading not in bodies:
+            problems[heading] = ["missing"]
+        elif len(bodies[heading]) < MIN_SECTION_CHARS:
+            problems[heading] = ["empty or placeholder content"]
+
+    document = render_section_map("", sections)
+    for criterion in criteria:
+        if criterion.startswith("contains:") and not criterion.startswith(REQUIRED_SECTION_PREFIX):
+            # Text like "- [ ]" belongs to the document's main required section (## Tasks for tasks.md)
+            required_text = criterion.split(":", 1)[1]
+            if required_text.lower() not in document.lower():
+                problems.setdefault(required[0], []).append(f"must contain `{required_text}`")
+        elif criterion.startswith("min_length:") and len(document) < int(criterion.split(":")[1]):
+            thinnest = min(required, key=lambda heading: len(bodies.get(heading, "")))
+            problems.setdefault(thinnest, []).append(f"too thin (document under {criterion.split(':')[1]} characters)")
+    return problems
+
+def apply_section_repairs(sections: List[tuple], repairs: List[tuple], required: List[str]) -> List[tuple]:
+    """Replace repaired sections in place; missing ones go right after the required section before them"""
+    result = list(sections)
+    for heading, body in repairs:
+        index = find_section(result, heading)
+        if index is not None:
+            result[index] = (result[index][0], body)
+            continue
+        earlier = required[:required.index(heading)] if heading in required else required
+        anchor = max((i for i, (other, _) in enumerate(result)
+                      if any(satisfies_heading(other, previous) for previous in earlier)), default=-1)
+        result.insert(anchor + 1, (heading, body))
+    return result
 
 @dataclass
 class WorkflowContext:
@@ -38,12 +208,16 @@ class ContentGenerationRequest:
     content_type: str  # prd, srs, tasks, etc.
     template_sections: Dict[str, str] = None
     ai_directives: List[str] = None
+    drafted_sections: Optional[str] = None  # Sections written ahead of time, merged into the output
 
 class ContentGenerationEngine:
     """Generates real workflow content using LLM APIs"""
     
     def __init__(self, llm_config_path: Optional[Path] = None, debug: bool = False, 
-                 user_provider: Optional[str] = None, user_model: Optional[str] = None):
+                 user_provider: Optional[str] = None, user_model: Optional[str] = None,
+                 llm_config_data: Optional[Dict[str, Any]] = None,
+                 rate_limiter: Optional[RateLimiter] = None, budget: Optional[CostBudget] = None,
+                 shared_from: Optional["ContentGenerationEngine"] = None):
         self.debug = debug
         self.logger = self._setup_logging()
         
@@ -51,8 +225,30 @@ class ContentGenerationEngine:
         self.user_provider = user_provider
         self.user_model = user_model
         
-        # Load LLM configuration
-        if llm_config_path and llm_config_path.exists():
+        # Warm caches reused for every generation made through this engine
+        self._llm_cache: Dict[tuple, LLMAPIIntegration] = {}
+        self._client_cache: Dict[tuple, Any] = {}
+        self._document_cache: Dict[str, str] = {}
+        self._cache_lock = threading.Lock()
+        self._document_index = None
+        
+        # Engines of concurrent runs can share provider clients, documents and limits
+        # while keeping their own integrations (so each run's usage stays separate)
+        self.rate_limiter = rate_limiter
+        self.budget = budget
+        if shared_from is not None:
+            self._client_cache = shared_from._client_cache
+            self._document_cache = shared_from._document_cache
+            self._cache_lock = shared_from._cache_lock
+            self.rate_limiter = rate_limiter or shared_from.rate_limiter
+            self.budget = budget or shared_from.budget
+            if llm_config_data is None:
+                llm_config_data = shared_from.llm_config_data
+        
+        # Load LLM configuration (callers holding a parsed config skip the disk read)
+        if llm_config_data is not None:
+            self.llm_config_data = llm_config_data
+        elif llm_config_path and llm_config_path.exists():
             with open(llm_config_path, 'r') as f:
                 self.llm_config_data = json.load(f)
         else:
@@ -68,19 +264,7 @@ class ContentGenerationEngine:
         
     def _setup_logging(self) -> logging.Logger:
         """Setup logging configuration"""
-        logger = logging.getLogger('content_generation_engine')
-        level = logging.DEBUG if self.debug else logging.INFO
-        logger.setLevel(level)
-        
-        if not logger.handlers:
-            console_handler = logging.StreamHandler()
-            formatter = logging.Formatter(
-                '%(asctime)s - %(levelname)s - %(message)s'
-            )
-            console_handler.setFormatter(formatter)
-            logger.addHandler(console_handler)
-        
-        return logger
+        return get_logger('content_generation_engine', logging.DEBUG if self.debug else logging.INFO)
     
     def _create_llm_integration(self, provider_name: str) -> LLMAPIIntegration:
         """Create LLM integration for specific provider"""
@@ -99,7 +283,35 @@ class ContentGenerationEngine:
             cost_limit_usd=provider_config["cost_limit_usd"]
         )
         
-        return LLMAPIIntegration(config, debug=self.debug)
+        return self._get_llm_integration(config)
+    
+    def _get_llm_integration(self, config: LLMConfig) -> LLMAPIIntegration:
+        """Reuse an integration (and its provider client) for identical settings"""
+        
+        llm_key = (config.provider, config.model, config.api_key, config.base_url,
+                   config.temperature, config.max_tokens)
+        client_key = (config.provider, config.api_key, config.base_url)
+        
+        with self._cache_lock:
+            metrics.record_cache("llm_integration", llm_key in self._llm_cache)
+            if llm_key not in self._llm_cache:
+                metrics.record_cache("provider_client", client_key in self._client_cache)
+                integration = LLMAPIIntegration(config, debug=self.debug, client=self._client_cache.get(client_key),
+                                                rate_limiter=self.rate_limiter, budget=self.budget)
+                if integration.client is not None:
+                    self._client_cache[client_key] = integration.client
+                self._llm_cache[llm_key] = integration
+            return self._llm_cache[llm_key]
+    
+    def _read_workflow_document(self, workflow_doc_path: Path) -> str:
+        """Read a workflow document once per engine"""
+        
+        key = str(workflow_doc_path)
+        metrics.record_cache("workflow_document", key in self._document_cache)
+        if key not in self._document_cache:
+            with open(workflow_doc_path, 'r', encoding='utf-8') as f:
+                self._document_cache[key] = f.read()
+        return self._document_cache[key]
     
     def generate_content(self, request: ContentGenerationRequest) -> str:
         """Generate content for workflow step using appropriate LLM"""
@@ -110,40 +322,176 @@ class ContentGenerationEngine:
         llm_integration = self._select_llm_for_content_type(request.content_type)
         
         # Create specialized prompt for content type
-        llm_request = self._create_specialized_prompt(request)
+        with tracing.span("prompt build", "prompt_build", content_type=request.content_type) as build_span:
+            # Documents with required sections come back as a section map and are validated here, per section
+            criteria = self._request_validation_criteria(request)
+            structured = self._structured_output(criteria)
+            llm_request = self._create_specialized_prompt(request, structured)
+            if structured:
+                llm_request = replace(llm_request, prompt=llm_request.prompt + section_map_instruction(required_sections(criteria)),
+                                      validation_criteria=None, response_schema=SECTION_MAP_SCHEMA)
+            if build_span:
+                build_span.set(prompt_chars=len(llm_request.prompt), structured=structured)
         
         # Generate content
         response = llm_integration.generate_content(llm_request)
         
-        if not response.validated:
-            self.logger.warning(f"Generated content failed validation: {response.validation_errors}")
+        if structured:
+            content = self._validate_and_repair(request, llm_integration, response.content, criteria)
+        else:
+            content = response.content
+            if not response.validated:
+                self.logger.warning(f"Generated content failed validation: {response.validation_errors}")
         
         # Post-process content
-        final_content = self._post_process_content(response.content, request)
+        with tracing.span("post-process", "post_process", content_type=request.content_type):
+            if request.drafted_sections:
+                content = merge_markdown_sections(content, request.drafted_sections,
+                                                  self._document_headings(Path(request.workflow_document)))
+            final_content = self._post_process_content(content, request)
         
         self.logger.info(f"✅ Generated {len(final_content)} characters of {request.content_type} content")
         
         return final_content
     
+    def draft_sections(self, request: ContentGenerationRequest, sections: List[str]) -> str:
+        """Write only the named sections of a document ahead of the rest (progressive drafting)"""
+        
+        llm_integration = self._select_llm_for_content_type(request.content_type)
+        llm_request = self._create_specialized_prompt(request)
+        llm_request.prompt += (f"\n\n**PARTIAL DRAFT**: Write ONLY these sections, in this order, each under its exact "
+                               f"heading: {', '.join(f'## {title}' for title in sections)}. The technical stack is not "
+                               f"decided yet, so do not name technologies.")
+        llm_request.validation_criteria = None
+        llm_request.content_type = f"{request.content_type}_draft"
+        
+        response = llm_integration.generate_content(llm_request)
+        
+        # Keep only the requested sections, under the template's exact headings
+        wanted = {section_key(title): title for title in sections}
+        kept = []
+        for title, text in split_markdown_sections(response.content)[1]:
+            if section_key(title) in wanted:
+                body = text.partition("\n")[2]
+                kept.append(f"## {wanted[section_key(title)]}\n{body}".strip())
+        return "\n\n".join(kept)
+    
+    def _structured_output(self, criteria: List[str]) -> bool:
+        """Request a section map when enabled and the document has required sections to check"""
+        settings = self.llm_config_data["prompt_engineering"].get("structured_output", {})
+        return bool(settings.get("enabled", True)) and bool(required_sections(criteria))
+    
+    def _validate_and_repair(self, request: ContentGenerationRequest, llm_integration: LLMAPIIntegration,
+                             reply: str, criteria: List[str]) -> str:
+        """Check each required section and regenerate only the ones that fail; returns the markdown document"""
+        
+        # A provider without JSON mode may still answer in markdown, which splits into the same map
+        preamble, sections = parse_section_map(reply) or markdown_section_map(reply)
+        problems = section_problems(sections, criteria)
+        if not problems:
+            return render_section_map(preamble, sections)
+        
+        labels = {"provider": llm_integration.config.provider.value, "model": llm_integration.config.model,
+                  "content_type": request.content_type}
+        metrics.VALIDATION_FAILURES.inc(**labels)
+        self.logger.warning(f"🩹 Repairing {len(problems)} section(s) of {request.content_type}: {problems}")
+        
+        max_rounds = int(self.llm_config_data["prompt_engineering"].get("structured_output", {}).get("max_repair_rounds", 1))
+        for _ in range(max_rounds):
+            failing = list(problems)
+            with tracing.span("section repair", "section_repair", content_type=request.content_type,
+                              sections=len(failing)):
+                try:
+                    repairs = self._repair_sections(request, llm_integration, sections, problems)
+                except Exception as e:
+                    self.logger.warning(f"Section repair failed: {e}")
+                    break
+            sections = apply_section_repairs(sections, repairs, required_sections(criteria))
+            problems = section_problems(sections, criteria)
+            for heading in failing:
+                outcome = "failed" if heading in problems else "repaired"
+                metrics.SECTION_REPAIRS.inc(content_type=request.content_type, outcome=outcome)
+            if not problems:
+                self.logger.info(f"✅ Repaired {len(failing)} section(s) of {request.content_type}")
+                break
+        
+        if problems:
+            self.logger.warning(f"Generated content failed validation: {problems}")
+        return render_section_map(preamble, sections)
+    
+    def _repair_sections(self, request: ContentGenerationRequest, llm_integration: LLMAPIIntegration,
+                         sections: List[tuple], problems: Dict[str, List[str]]) -> List[tuple]:
+        """One short call that rewrites only the failing sections (the rest of the document is not resent)"""
+        
+        project_data = request.context.project_data or {}
+        facts = {field: project_data[field] for field in REPAIR_CONTEXT_FIELDS if project_data.get(field)}
+        
+        prompt_parts = [f"Repair sections of `{request.output_file}` ({request.content_type}) "
+                        f"for the feature **{request.context.feature_name}**."]
+        if facts:
+            prompt_parts.append(f"Project data: {json.dumps(facts)}")
+        kept = [heading for heading, _ in sections if not any(satisfies_heading(heading, failing) for failing in problems)]
+        prompt_parts.append(f"These sections are fine and stay as they are: {', '.join(kept) or 'none'}.")
+        prompt_parts.append("\nWrite ONLY these sections, fixing what is listed:")
+        for heading, reasons in problems.items():
+            prompt_parts.append(f"- ## {heading}: {'; '.join(reasons)}")
+            index = find_section(sections, heading)
+            if index is not None and sections[index][1]:
+                prompt_parts.append(f"  Current content:\n```\n{sections[index][1][:REPAIR_SECTION_EXCERPT_CHARS]}\n```")
+        prompt_parts.append(section_map_instruction(list(problems)))
+        
+        response = llm_integration.generate_content(LLMRequest(
+            prompt="\n".join(prompt_parts),
+            system_prompt=self._system_prompt(request.content_type),
+            expected_format="json",
+            content_type=f"{request.content_type}_repair",
+            response_schema=SECTION_MAP_SCHEMA
+        ))
+        
+        # Keep only the sections that were asked for, under the required heading text
+        _, repaired = parse_section_map(response.content) or markdown_section_map(response.content)
+        repairs = []
+        for heading in problems:
+            index = find_section(repaired, heading)
+            if index is not None:
+                repairs.append((heading, repaired[index][1]))
+        return repairs
+    
+    def _document_headings(self, workflow_doc_path: Path) -> List[str]:
+        """Level-2 headings of a workflow document in order (the template's section order)"""
+        if not workflow_doc_path.exists():
+            return []
+        return [line[3:].strip() for line in self._read_workflow_document(workflow_doc_path).splitlines()
+                if line.startswith("## ")]
+    
+    def generate_reply(self, prompt: str, content_type: str, history: Optional[List[Dict[str, str]]] = None,
+                       on_token: Optional[Callable[[str], None]] = None,
+                       on_reset: Optional[Callable[[], None]] = None) -> LLMResponse:
+        """One conversational turn outside any workflow document (history holds the earlier turns)
+        
+        on_reset is called when a failed attempt already streamed tokens and the retry starts over.
+        """
+        
+        llm_integration = self._select_llm_for_content_type(content_type)
+        config = self.llm_config_data["workflow_specific_configs"].get(CONTENT_TYPE_CONFIGS.get(content_type, ""), {})
+        
+        return llm_integration.generate_content(LLMRequest(
+            prompt=prompt,
+            system_prompt=config.get("system_prompt"),
+            history=history,
+            content_type=content_type,
+            stream_callback=on_token,
+            stream_reset=on_reset
+        ))
+    
     def _select_llm_for_content_type(self, content_type: str) -> LLMAPIIntegration:
         """Select appropriate LLM integration based on content type"""
         
         workflow_configs = self.llm_config_data["workflow_specific_configs"]
         
         # Map content types to workflow configs
-        content_type_mapping = {
-            "mvp_entrypoint": "mvp_entrypoint",
-            "prd": "gen_prd", 
-            "srs": "gen_srs",
-            "design_decisions": "gen_design_decisions",
-            "design_analysis": "gen_design",
-            "tasks": "gen_tasks_and_testing",
-            "task_processing": "process_tasks",
-            "completion_summary": "gen_completion_summary",
-            "enterprise": "enterprise_scaling"
-        }
         
-        config_key = content_type_mapping.get(content_type, "gen_prd")
+        config_key = CONTENT_TYPE_CONFIGS.get(content_type, "gen_prd")
         
         if config_key in workflow_configs:
             config = workflow_configs[config_key]
@@ -176,7 +524,7 @@ class ContentGenerationEngine:
                 cost_limit_usd=provider_config["cost_limit_usd"]
             )
             
-            return LLMAPIIntegration(llm_config, debug=self.debug)
+            return self._get_llm_integration(llm_config)
         
         # Lazy initialization of default LLM
         if self.default_llm is None:
@@ -188,43 +536,83 @@ class ContentGenerationEngine:
         
         return self.default_llm
     
-    def _create_specialized_prompt(self, request: ContentGenerationRequest) -> LLMRequest:
-        """Create specialized prompt for specific content type"""
+    def warm_up(self, workflow_documents: List[Path], content_types: List[str],
+                prime: Optional[List[tuple]] = None) -> Dict[str, int]:
+        """Build clients, open connections and cache documents before the first generation
         
-        # Get workflow-specific configuration
-        workflow_configs = self.llm_config_data["workflow_specific_configs"]
-        content_type_mapping = {
-            "mvp_entrypoint": "mvp_entrypoint",
-            "prd": "gen_prd",
-            "srs": "gen_srs", 
-            "design_decisions": "gen_design_decisions",
-            "design_analysis": "gen_design",
-            "tasks": "gen_tasks_and_testing",
-            "task_processing": "process_tasks",
-            "completion_summary": "gen_completion_summary",
-            "enterprise": "enterprise_scaling"
-        }
+        prime lists (workflow_document, content_type) pairs whose prompt prefix is sent once with
+        max_tokens=1 so the provider's prompt cache already holds it when the real request arrives.
+        """
+        
+        summary = {"documents": 0, "connections": 0, "primed": 0}
+        with tracing.span("warm-up documents", "warm_up", documents=len(workflow_documents)):
+            for path in workflow_documents:
+                self._read_workflow_document(path)
+                summary["documents"] += 1
         
-        config_key = content_type_mapping.get(request.content_type, "gen_prd")
-        system_prompt = workflow_configs.get(config_key, {}).get("system_prompt", "You are a helpful AI assistant.")
+        # One handshake per distinct client (content types usually share one)
+        connected = set()
+        for content_type in content_types:
+            integration = self._select_llm_for_content_type(content_type)
+            client_key = (integration.config.provider, integration.config.api_key, integration.config.base_url)
+            if client_key in connected:
+                continue
+            connected.add(client_key)
+            with tracing.span("warm-up connection", "warm_up", provider=integration.config.provider.value):
+                if integration.open_connection():
+                    summary["connections"] += 1
         
-        # Build comprehensive prompt
-        prompt_parts = []
+        for workflow_document, content_type in prime or []:
+            integration = self._select_llm_for_content_type(content_type)
+            if integration.config.provider not in PROMPT_CACHE_PROVIDERS:
+                continue
+            # Counted in this engine's usage like any other request
+            primer = self._get_llm_integration(replace(integration.config, max_tokens=1))
+            try:
+                primer.generate_content(LLMRequest(
+                    prompt="\n".join(self._workflow_document_section(Path(workflow_document))),
+                    system_prompt=self._system_prompt(content_type),
+                    content_type="warm_up"
+                ))
+                summary["primed"] += 1
+            except Exception as e:
+                self.logger.debug(f"Prompt cache priming for {content_type} failed: {e}")
+        
+        return summary
+    
+    def _system_prompt(self, content_type: str) -> str:
+        workflow_configs = self.llm_config_data["workflow_specific_configs"]
+        config_key = CONTENT_TYPE_CONFIGS.get(content_type, "gen_prd")
+        return workflow_configs.get(config_key, {}).get("system_prompt", "You are a helpful AI assistant.")
+    
+    def _workflow_document_section(self, workflow_doc_path: Path) -> List[str]:
+        """Opening prompt lines shared by every request for a document (the cacheable prefix)"""
         
         # Add workflow document content (CRITICAL FIX!)
-        workflow_doc_path = Path(request.workflow_document)
         if workflow_doc_path.exists():
-            with open(workflow_doc_path, 'r', encoding='utf-8') as f:
-                workflow_content = f.read()
+            workflow_content = self._read_workflow_document(workflow_doc_path)
             
-            prompt_parts.append(f"# Workflow Document: {workflow_doc_path.name}")
-            prompt_parts.append(f"## Complete Workflow Document Content:")
-            prompt_parts.append(f"```markdown\n{workflow_content}\n```")
-            prompt_parts.append(f"\n**INSTRUCTION**: Follow the specific instructions, questions, and guidelines provided in the workflow document above.")
-        else:
-            # Fallback to filename only if file not found
-            prompt_parts.append(f"# Workflow Document: {request.workflow_document}")
-            prompt_parts.append(f"Please execute the instructions in the workflow document: {request.workflow_document}")
+            return [
+                f"# Workflow Document: {workflow_doc_path.name}",
+                f"## Complete Workflow Document Content:",
+                f"```markdown\n{workflow_content}\n```",
+                f"\n**INSTRUCTION**: Follow the specific instructions, questions, and guidelines provided in the workflow document above."
+            ]
+        
+        # Fallback to filename only if file not found
+        return [
+            f"# Workflow Document: {workflow_doc_path}",
+            f"Please execute the instructions in the workflow document: {workflow_doc_path}"
+        ]
+    
+    def _create_specialized_prompt(self, request: ContentGenerationRequest, structured: bool = False) -> LLMRequest:
+        """Create specialized prompt for specific content type (structured: the reply is a JSON section map)"""
+        
+        # Get workflow-specific configuration
+        system_prompt = self._system_prompt(request.content_type)
+        
+        # Build comprehensive prompt, starting with the document so its prefix stays cacheable
+        prompt_parts = self._workflow_document_section(Path(request.workflow_document))
         
         # Add context information
         prompt_parts.append(f"\n## Project Context")
@@ -298,6 +686,15 @@ class ContentGenerationEngine:
                     prompt_parts.append(f"### {step}")
                     prompt_parts.append(f"```\n{truncated}\n```")
         
+        # Add related documents from other features/projects (prior art from the search index)
+        related_documents = self._retrieve_related_documents(request)
+        if related_documents:
+            prompt_parts.append(f"\n## Related Prior Work (from other features)")
+            prompt_parts.append(f"Use these excerpts only as reference; the current project data takes precedence.")
+            for document in related_documents:
+                prompt_parts.append(f"### {document['project']} / {document['feature_dir']} / {document['doc_type']}")
+                prompt_parts.append(f"```\n{document['snippet']}\n```")
+        
         # Add AI directives if provided
         if request.ai_directives:
             prompt_parts.append(f"\n## AI Directives")
@@ -316,13 +713,17 @@ class ContentGenerationEngine:
         common_instructions = self.llm_config_data["prompt_engineering"]["common_instructions"]
         prompt_parts.append(f"\n## Instructions")
         for instruction in common_instructions:
+            # Section-map replies are JSON; only their section contents are markdown
+            if structured and "markdown formatting" in instruction.lower():
+                continue
             prompt_parts.append(f"- {instruction}")
         
         # Add specific output requirements
         prompt_parts.append(f"\n## Output Requirements")
         prompt_parts.append(f"- Generate content for: **{request.output_file}**")
         prompt_parts.append(f"- Content type: **{request.content_type}**")
-        prompt_parts.append(f"- Use markdown formatting for clear structure")
+        if not structured:
+            prompt_parts.append(f"- Use markdown formatting for clear structure")
         prompt_parts.append(f"- Follow the workflow document instructions precisely")
         prompt_parts.append(f"- Include all required sections and subsections")
         prompt_parts.append(f"- Make content practical and immediately actionable")
@@ -352,19 +753,74 @@ class ContentGenerationEngine:
             prompt_parts.append(f"")
             prompt_parts.append(f"{'='*80}")
         
-        full_prompt = "\n".join(prompt_parts)
+        # Sections drafted while the user was still answering questions
+        if request.drafted_sections:
+            prompt_parts.append(f"\n## Already Drafted Sections")
+            prompt_parts.append(request.drafted_sections)
+            prompt_parts.append(f"\n**INSTRUCTION**: The drafted sections above are final and will be merged into your output. "
+                                f"Write every other section of the document consistently with them and do not repeat them.")
         
-        # Get validation criteria for content type
-        validation_criteria = self._get_validation_criteria(request.content_type)
+        full_prompt = "\n".join(prompt_parts)
         
         return LLMRequest(
             prompt=full_prompt,
             system_prompt=system_prompt,
             context_data=request.context.project_data,
             expected_format="markdown",
-            validation_criteria=validation_criteria
+            validation_criteria=self._request_validation_criteria(request),
+            content_type=request.content_type
         )
     
+    def _request_validation_criteria(self, request: ContentGenerationRequest) -> List[str]:
+        """Criteria of the content type, minus required sections that were already drafted"""
+        
+        validation_criteria = self._get_validation_criteria(request.content_type)
+        if not request.drafted_sections:
+            return validation_criteria
+        
+        # The response itself will not contain the drafted headings
+        drafted_keys = {section_key(title) for title, _ in split_markdown_sections(request.drafted_sections)[1]}
+        return [c for c in validation_criteria
+                if not (c.startswith("contains:## ") and section_key(c[len("contains:## "):]) in drafted_keys)]
+    
+    def _retrieve_related_documents(self, request: ContentGenerationRequest) -> List[Dict[str, Any]]:
+        """Look up related generated documents in the workspace search index"""
+        retrieval_config = self.llm_config_data["prompt_engineering"].get("retrieval", {})
+        if not retrieval_config.get("enabled") or not request.context.project_data:
+            return []
+        
+        feature_dir = Path(request.context.feature_dir)
+        projects_dir = feature_dir.parent.parent.parent
+        if feature_dir.parent.name != "features" or not projects_dir.exists():
+            return []
+        
+        project_data = request.context.project_data
+        query_text = " ".join(str(project_data.get(key, "")) for key in
+                              ("user_pain_point", "primary_user", "recommended_tech_stack", "business_model"))
+        query_text += f" {request.context.feature_name}"
+        
+        try:
+            with self._cache_lock:
+                if self._document_index is None:
+                    from document_index import DocumentIndex
+                    self._document_index = DocumentIndex(projects_dir)
+                    self._document_index.update()
+                
+                related = self._document_index.retrieve_related(
+                    query_text,
+                    doc_type=Path(request.output_file).stem,
+                    exclude_feature_dir=feature_dir,
+                    limit=retrieval_config.get("max_results", 3)
+                )
+        except Exception as e:
+            self.logger.debug(f"Document retrieval skipped: {e}")
+            return []
+        
+        max_chars = retrieval_config.get("max_snippet_chars", 400)
+        for document in related:
+            document["snippet"] = document["snippet"][:max_chars]
+        return related
+    
     def _extract_backend_from_stack(self, tech_stack: str) -> str:
         """Extract backend technology from tech stack string"""
         if not tech_stack:
@@ -490,11 +946,21 @@ class ContentGenerationEngine:
     def get_usage_summary(self) -> Dict[str, Any]:
         """Get usage summary across all LLM integrations"""
         
-        # This would aggregate usage across all LLM integrations
-        # For now, return default LLM stats
-        if self.default_llm is None:
+        integrations = list(self._llm_cache.values())
+        if self.default_llm is not None and self.default_llm not in integrations:
+            integrations.append(self.default_llm)
+        
+        if not integrations:
             return {"usage": "no_llm_initialized"}
-        return self.default_llm.get_usage_stats()
+        if len(integrations) == 1:
+            return integrations[0].get_usage_stats()
+        
+        stats = [llm.get_usage_stats() for llm in integrations]
+        return {
+            "total_tokens": sum(entry["total_tokens"] for entry in stats),
+            "total_cost_usd": round(sum(entry["total_cost_usd"] for entry in stats), 4),
+            "integrations": stats
+        }
 
 def main():
     """Main entry point for content generation engine testing"""
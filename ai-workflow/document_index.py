@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+
+"""
+🔎 Document Index - Full-text search over generated project documentation
+SQLite FTS5 index of ~/Projects/*/features/*/*.md with field filters, phrase queries and ranked snippets
+"""
+
+import logging
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
+
+from workspace_catalog import CATALOG_FILENAME
+
+# Field filters understood by search(): field:value (quote values containing spaces)
+FIELD_FILTERS = {
+    "project": "d.project = ?",
+    "type": "d.doc_type = ?",
+    "feature": "d.feature_dir LIKE ?",
+    "date": "d.doc_date LIKE ?",
+    "after": "d.doc_date >= ?",
+    "before": "d.doc_date <= ?"
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    project TEXT NOT NULL,
+    feature_dir TEXT NOT NULL,
+    doc_type TEXT NOT NULL,
+    doc_date TEXT,
+    title TEXT,
+    mtime_ns INTEGER,
+    size INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_documents_project ON documents(project);
+CREATE INDEX IF NOT EXISTS idx_documents_type ON documents(doc_type);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(title, body, tokenize='porter unicode61');
+"""
+
+_DATE_PREFIX = re.compile(r'^(\d{4}-\d{2}-\d{2})-')
+_QUERY_TOKEN = re.compile(r'(-?)(?:(\w+):)?("[^"]*"|\S+)')
+_STOPWORDS = {"the", "and", "for", "with", "that", "this", "from", "into", "your", "will", "have", "are", "not"}
+
+def _fts_quote(term: str) -> str:
+    """Quote a term so FTS5 treats punctuation literally"""
+    return '"' + term.replace('"', '""') + '"'
+
+def parse_query(query: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """Split a search query into an FTS5 match expression and field filters
+
+    Supports bare words (ANDed), "exact phrases", OR, -negation,
+    title:word and the field filters project:, type:, feature:, date:, after:, before:.
+    """
+    positive: List[str] = []
+    negative: List[str] = []
+    filters: List[Tuple[str, str]] = []
+
+    for negate, field, value in _QUERY_TOKEN.findall(query):
+        value = value.strip('"') if value.startswith('"') else value
+        if not value:
+            continue
+
+        if field in FIELD_FILTERS:
+            filters.append((field, value))
+            continue
+
+        if value == "OR" and not field and not negate:
+            if positive:
+                positive.append("OR")
+            continue
+
+        term = _fts_quote(value)
+        if field == "title":
+            term = f"title : {term}"
+        elif field:
+            term = _fts_quote(f"{field}:{value}")
+        (negative if negate else positive).append(term)
+
+    if positive and positive[-1] == "OR":
+        positive.pop()
+
+    match = " ".join(positive)
+    if match and negative:
+        match = f"({match}) NOT ({' OR '.join(negative)})"
+    return match, filters
+
+class DocumentIndex:
+    """Incremental FTS5 index stored alongside the workspace catalog"""
+
+    def __init__(self, projects_dir: Optional[Path] = None, db_path: Optional[Path] = None):
+        self.projects_dir = Path(projects_dir) if projects_dir else Path.home() / "Projects"
+        self.db_path = Path(db_path) if db_path else self.projects_dir / CATALOG_FILENAME
+        self.logger = logging.getLogger('document_index')
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), timeout=10.0, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ------------------------------------------------------------------ writes
+
+    def index_document(self, path: Path):
+        """(Re)index one markdown document"""
+        path = Path(path)
+        feature_dir = path.parent
+        project = feature_dir.parent.parent.name
+        date_match = _DATE_PREFIX.match(feature_dir.name)
+
+        try:
+            body = path.read_text(encoding='utf-8')
+            stat = path.stat()
+        except (OSError, UnicodeDecodeError) as e:
+            self.logger.debug(f"Skipping {path}: {e}")
+            return
+
+        title = next((line.lstrip('#').strip() for line in body.splitlines() if line.startswith('#')), path.stem)
+
+        with self.conn:
+            row = self.conn.execute("SELECT id FROM documents WHERE path = ?", (str(path),)).fetchone()
+            if row:
+                self.conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (row["id"],))
+                self.conn.execute("""
+                    UPDATE documents SET title = ?, mtime_ns = ?, size = ? WHERE id = ?
+                """, (title, stat.st_mtime_ns, stat.st_size, row["id"]))
+                doc_id = row["id"]
+            else:
+                doc_id = self.conn.execute("""
+                    INSERT INTO documents (path, project, feature_dir, doc_type, doc_date, title, mtime_ns, size)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (str(path), project, feature_dir.name, path.stem.replace('_', '-'),
+                      date_match.group(1) if date_match else None, title,
+                      stat.st_mtime_ns, stat.st_size)).lastrowid
+            self.conn.execute("INSERT INTO documents_fts (rowid, title, body) VALUES (?, ?, ?)",
+                              (doc_id, title, body))
+
+    def _remove_document(self, doc_id: int):
+        with self.conn:
+            self.conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (doc_id,))
+            self.conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+    def update(self) -> Dict[str, int]:
+        """Index new/changed documents and drop deleted ones (stat-only for unchanged files)"""
+        known = {row["path"]: row for row in self.conn.execute("SELECT id, path, mtime_ns, size FROM documents")}
+        counts = {"indexed": 0, "removed": 0, "unchanged": 0}
+
+        if self.projects_dir.exists():
+            for path in self.projects_dir.glob("*/features/*/*.md"):
+                row = known.pop(str(path), None)
+                stat = path.stat()
+                if row and row["mtime_ns"] == stat.st_mtime_ns and row["size"] == stat.st_size:
+                    counts["unchanged"] += 1
+                    continue
+                self.index_document(path)
+                counts["indexed"] += 1
+
+        for row in known.values():
+            self._remove_document(row["id"])
+            counts["removed"] += 1
+
+        return counts
+
+    def rebuild(self) -> Dict[str, int]:
+        """Drop the index and re-index every document"""
+        with self.conn:
+            self.conn.execute("DELETE FROM documents")
+            self.conn.execute("DELETE FROM documents_fts")
+        return self.update()
+
+    # ------------------------------------------------------------------- reads
+
+    def search(self, query: str, limit: int = 10, exclude_feature_paths: Optional[List[str]] = None,
+               snippet_tokens: int = 24) -> List[Dict[str, Any]]:
+        """Ranked search; field-only queries list matching documents newest first"""
+        match, filters = parse_query(query)
+
+        where = []
+        params: List[Any] = []
+        for field, value in filters:
+            where.append(FIELD_FILTERS[field])
+            if field == "type":
+                value = value.replace('_', '-')
+            elif field in ("date", "feature"):
+                value = f"{value}%" if field == "date" else f"%{value}%"
+            params.append(value)
+        for feature_path in exclude_feature_paths or []:
+            where.append("d.path NOT LIKE ?")
+            params.append(f"{feature_path.rstrip('/')}/%")
+
+        if match:
+            sql = f"""
+                SELECT d.*, bm25(documents_fts, 5.0, 1.0) AS score,
+                       snippet(documents_fts, 1, '«', '»', '…', {int(snippet_tokens)}) AS snippet
+                FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid
+                WHERE documents_fts MATCH ? {''.join(' AND ' + clause for clause in where)}
+                ORDER BY score LIMIT ?
+            """
+            params = [match] + params + [limit]
+        elif filters:
+            sql = f"""
+                SELECT d.*, 0.0 AS score, substr(f.body, 1, 200) AS snippet
+                FROM documents d JOIN documents_fts f ON f.rowid = d.id
+                WHERE {' AND '.join(where)}
+                ORDER BY d.doc_date DESC, d.path LIMIT ?
+            """
+            params = params + [limit]
+        else:
+            return []
+
+        try:
+            rows = self.conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search query '{query}': {e}")
+
+        return [{
+            "project": row["project"],
+            "feature_dir": row["feature_dir"],
+            "doc_type": row["doc_type"],
+            "date": row["doc_date"],
+            "title": row["title"],
+            "path": row["path"],
+            "score": round(-row["score"], 3),
+            "snippet": " ".join(row["snippet"].split())
+        } for row in rows]
+
+    def retrieve_related(self, text: str, doc_type: Optional[str] = None, exclude_feature_dir: Optional[Path] = None,
+                         limit: int = 3) -> List[Dict[str, Any]]:
+        """Prior-art snippets for prompt assembly: OR of the salient words in `text`"""
+        words = []
+        for word in re.findall(r'[A-Za-z][A-Za-z0-9+#.-]{3,}', text.lower()):
+            word = word.strip('.-')
+            if word not in _STOPWORDS and word not in words:
+                words.append(word)
+        if not words:
+            return []
+
+        query = " OR ".join(words[:16])
+        if doc_type:
+            query += f" type:{doc_type}"
+        excluded = [str(exclude_feature_dir)] if exclude_feature_dir else []
+        return self.search(query, limit=limit, exclude_feature_paths=excluded)
+
+def notify_document_written(path: Path, projects_dir: Optional[Path] = None):
+    """Incrementally index a document after a workflow wrote it (never fails the caller)"""
+    path = Path(path)
+    index = DocumentIndex(projects_dir or path.parent.parent.parent.parent)
+    try:
+        index.index_document(path)
+    except Exception as e:
+        logging.getLogger('document_index').debug(f"Index update skipped for {path}: {e}")
+    finally:
+        index.close()
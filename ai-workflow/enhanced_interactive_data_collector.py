@@ -5,13 +5,20 @@ Implements the new questioning framework with user stories, business context,
 and AI-guided tech stack selection. Designed for CLI interaction with future GUI expansion.
 """
 
+import hashlib
 import json
+import os
 import re
+import sys
+import tempfile
+import time
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Union
-from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Union, TextIO, Callable
+from dataclasses import dataclass, asdict, fields, MISSING
 from enum import Enum
 
+import workflow_metrics as metrics
+
 
 class QuestionGroup(Enum):
     """Question groups for organized mental flow"""
@@ -60,36 +67,261 @@ class EnhancedProjectData:
         return json.dumps(self.to_dict(), indent=2)
 
 
+ANSWER_FIELDS = [f.name for f in fields(EnhancedProjectData)]
+REQUIRED_ANSWERS = [f.name for f in fields(EnhancedProjectData) if f.default is MISSING]
+COMPLEXITY_CHOICES = ("simple", "medium", "complex")
+
+
+def validate_answers(answers: Dict[str, Any]) -> Dict[str, str]:
+    """Check an answers mapping against EnhancedProjectData and normalize its values to strings"""
+    if not isinstance(answers, dict):
+        raise ValueError(f"Answers must be a mapping of field names to values, got {type(answers).__name__}")
+    
+    unknown = sorted(set(answers) - set(ANSWER_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown answer fields: {', '.join(unknown)} (expected: {', '.join(ANSWER_FIELDS)})")
+    
+    cleaned = {}
+    for key, value in answers.items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple)):
+            value = ", ".join(str(item) for item in value)
+        elif isinstance(value, dict):
+            raise ValueError(f"Answer '{key}' must be text, not a mapping")
+        value = str(value).strip()
+        if value:
+            cleaned[key] = value
+    
+    complexity = cleaned.get("project_complexity")
+    if complexity is not None and complexity.lower() not in COMPLEXITY_CHOICES:
+        raise ValueError(f"project_complexity must be one of {'/'.join(COMPLEXITY_CHOICES)}, got '{complexity}'")
+    
+    return cleaned
+
+
+def missing_required_answers(answers: Dict[str, str]) -> List[str]:
+    """Required EnhancedProjectData fields an answers mapping does not provide"""
+    return [name for name in REQUIRED_ANSWERS if not answers.get(name)]
+
+
+def load_answers(path: Path) -> Dict[str, Any]:
+    """Read one project's answers from a .json or .yaml/.yml file"""
+    path = Path(path)
+    text = path.read_text(encoding='utf-8')
+    
+    if path.suffix.lower() in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("PyYAML package required for YAML answers files. Install with: pip install pyyaml")
+        answers = yaml.safe_load(text)
+    else:
+        answers = json.loads(text)
+    
+    if not isinstance(answers, dict):
+        raise ValueError(f"{path}: answers file must contain a single mapping of field names to values")
+    return answers
+
+
+def read_answers_stream(stream: TextIO) -> List[Dict[str, Any]]:
+    """Read JSONL answers (one project per line) from a stream such as stdin"""
+    records = []
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {line_number}: invalid JSON ({e})")
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {line_number}: expected a JSON object")
+        records.append(record)
+    return records
+
+
+TECH_STACK_CACHE_ENV = "AI_WORKFLOW_TECH_STACK_CACHE"
+DEFAULT_TECH_STACK_CACHE = Path.home() / ".ai-workflow" / "tech-stack-cache.json"
+TECH_STACK_CACHE_MAX_ENTRIES = 200
+
+# Context fields that decide a recommendation (pain point and integrations only refine the wording)
+CONSULTATION_CONTEXT_KEYS = ("user_type", "access_method", "complexity", "team", "constraints")
+ACCESS_METHODS = ("web", "mobile", "desktop", "api")
+
+TECH_STACK_PROMPT = """Recommend exactly 3 technology stacks for this MVP, most suitable first.
+
+Project context: {context}
+
+Use exactly this format:
+Option 1 (RECOMMENDED): <stack, components joined with ' + '>
+✅ Pros: <one line>
+⚠️ Cons: <one line>
+Option 2: <stack>
+✅ Pros: <one line>
+⚠️ Cons: <one line>
+Option 3: <stack>
+✅ Pros: <one line>
+⚠️ Cons: <one line>"""
+
+# Used when no AI engine answers
+DEFAULT_TECH_STACK_OPTIONS = [
+    {"stack": "Node.js + Express + SQLite + Vanilla JS", "recommended": True,
+     "pros": "Simple setup, matches team skills, fast MVP development", "cons": "May need migration for scaling"},
+    {"stack": "Python + Flask + PostgreSQL + React", "recommended": False,
+     "pros": "Great for data handling, robust database", "cons": "More complex setup, learning curve for React"},
+    {"stack": "Airtable + Zapier (No-code)", "recommended": False,
+     "pros": "Ultra-fast MVP, no coding required", "cons": "Limited customization, vendor lock-in"},
+]
+
+OPTION_LINE = re.compile(r"^[\s*#]*Option\s+(\d+)\s*(\(recommended\))?[\s*]*[:\-–]\s*(.+?)[\s*]*$", re.IGNORECASE)
+PROS_LINE = re.compile(r"pros?\**\s*:\s*(.+)$", re.IGNORECASE)
+CONS_LINE = re.compile(r"cons?\**\s*:\s*(.+)$", re.IGNORECASE)
+
+
+def normalize_consultation_context(context: Dict[str, Any]) -> Dict[str, str]:
+    """Reduce consultation context to the words that matter, so similar projects share a cache key"""
+    normalized = {}
+    for key in CONSULTATION_CONTEXT_KEYS:
+        words = re.sub(r"[^a-z0-9+#.]+", " ", str(context.get(key, "")).lower()).split()
+        if key == "access_method":
+            words = [method for method in ACCESS_METHODS if method in words][:1] or words[:1]
+        normalized[key] = " ".join(sorted(set(words)))
+    return normalized
+
+
+def parse_tech_stack_options(text: str) -> List[Dict[str, Any]]:
+    """Options from an 'Option N: stack / Pros / Cons' reply"""
+    options = []
+    for line in text.splitlines():
+        match = OPTION_LINE.match(line)
+        if match:
+            options.append({"stack": match.group(3).strip(), "recommended": bool(match.group(2)),
+                            "pros": "", "cons": ""})
+            continue
+        if not options:
+            continue
+        for key, pattern in (("pros", PROS_LINE), ("cons", CONS_LINE)):
+            found = pattern.search(line)
+            if found and not options[-1][key]:
+                options[-1][key] = found.group(1).strip()
+    if options and not any(option["recommended"] for option in options):
+        options[0]["recommended"] = True
+    return options
+
+
+def format_tech_stack_options(options: List[Dict[str, Any]]) -> str:
+    lines = []
+    for number, option in enumerate(options, 1):
+        lines.append(f"Option {number}{' (RECOMMENDED)' if option.get('recommended') else ''}: {option['stack']}")
+        lines.append(f"✅ Pros: {option['pros']}")
+        lines.append(f"⚠️ Cons: {option['cons']}")
+    return "\n".join(lines)
+
+
+class TechStackCache:
+    """Recommendations keyed by normalized consultation context, kept across runs"""
+    
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or os.environ.get(TECH_STACK_CACHE_ENV) or DEFAULT_TECH_STACK_CACHE).expanduser()
+    
+    @staticmethod
+    def key(normalized_context: Dict[str, str]) -> str:
+        return hashlib.sha256(json.dumps(normalized_context, sort_keys=True).encode('utf-8')).hexdigest()[:32]
+    
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._load().get(key)
+    
+    def put(self, key: str, text: str):
+        entries = self._load()
+        entries[key] = {"text": text, "created_at": time.time()}
+        if len(entries) > TECH_STACK_CACHE_MAX_ENTRIES:
+            newest = sorted(entries.items(), key=lambda item: item[1].get("created_at", 0), reverse=True)
+            entries = dict(newest[:TECH_STACK_CACHE_MAX_ENTRIES])
+        tmp_path = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Unique per writer: concurrent runs in one process must not share a temp file
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.path.parent, prefix=f".{self.path.name}.",
+                                             suffix=".tmp", delete=False) as tmp_file:
+                tmp_path = Path(tmp_file.name)
+                json.dump(entries, tmp_file, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)  # Caching is best effort
+
+
 class EnhancedInteractiveDataCollector:
     """Enhanced CLI-based data collector with conversational AI tech stack guidance"""
     
-    def __init__(self, ai_engine=None):
-        """Initialize collector with optional AI engine for tech stack guidance"""
+    def __init__(self, ai_engine=None, answers: Optional[Dict[str, Any]] = None, prompt_missing: bool = True,
+                 on_group_complete: Optional[Callable[[QuestionGroup, Dict[str, Any]], None]] = None):
+        """Initialize collector with optional AI engine and preloaded answers
+        
+        With answers, only fields they don't cover are asked; prompt_missing=False fails instead of asking.
+        on_group_complete receives each finished group and a copy of the answers so far.
+        """
         self.ai_engine = ai_engine
+        self.answers = validate_answers(answers) if answers else {}
+        self.prompt_missing = prompt_missing
+        self.on_group_complete = on_group_complete
         self.collected_data = {}
+        self._consultation_history: Optional[List[Dict[str, str]]] = None
         
+    def needs_user_input(self) -> bool:
+        """True when collect_mvp_requirements will wait on the user (think-time worth overlapping)"""
+        return self.prompt_missing and bool(missing_required_answers(self.answers))
+    
     def collect_mvp_requirements(self) -> EnhancedProjectData:
         """Conduct enhanced CLI session with grouped questions and AI guidance"""
         
+        missing = missing_required_answers(self.answers)
+        if self.answers and not missing:
+            return self._collect_from_answers()
+        if not self.prompt_missing:
+            raise ValueError(f"Answers are missing required fields: {', '.join(missing)}")
+        
         print("🚀 ENHANCED MVP PROJECT INITIALIZATION")
         print("=" * 60)
         print("📊 Target Time: 10 minutes | Grouped by concern for optimal flow")
         print("Let's create a comprehensive project foundation.\n")
+        if self.answers:
+            print(f"📄 {len(self.answers)} answers preloaded - only asking for: {', '.join(missing)}\n")
         
         # Group 1: User Context (3-4 minutes)
         self._collect_user_context()
+        self._group_complete(QuestionGroup.USER_CONTEXT)
         
         # Group 2: Business Context (2-3 minutes)  
         self._collect_business_context()
+        self._group_complete(QuestionGroup.BUSINESS_CONTEXT)
         
         # Group 3: Technical Guidance (4-5 minutes)
         self._collect_technical_guidance()
+        self._group_complete(QuestionGroup.TECHNICAL_GUIDANCE)
         
         # Final confirmation and summary
         data = self._finalize_and_confirm()
         
         return data
     
+    def _group_complete(self, group: QuestionGroup):
+        """Tell the listener a group is answered; a failing listener never interrupts the questions"""
+        if self.on_group_complete is None:
+            return
+        try:
+            self.on_group_complete(group, dict(self.collected_data))
+        except Exception as e:
+            print(f"⚠️  Background work after {group.name.lower()} failed: {e}")
+    
     def _collect_user_context(self):
         """Collect user-focused questions (3-4 minutes)"""
         print(f"\n{QuestionGroup.USER_CONTEXT.value} GROUP (3-4 minutes)")
@@ -97,21 +329,24 @@ class EnhancedInteractiveDataCollector:
         
         # 1. Primary User Story (Multi-part)
         print("📋 Question 1: Primary User Story")
-        self.collected_data['primary_user'] = self._ask_question(
+        self.collected_data['primary_user'] = self._answer(
+            'primary_user',
             "Who is your primary user?",
             example="Small business owners managing customer data",
             description="Define the main person who will use this solution",
             required=True
         )
         
-        self.collected_data['user_pain_point'] = self._ask_question(
+        self.collected_data['user_pain_point'] = self._answer(
+            'user_pain_point',
             "What's their biggest pain point you're solving?",
             example="Manually tracking customer information in spreadsheets is error-prone and time-consuming",
             description="The core problem that drives user motivation",
             required=True
         )
         
-        self.collected_data['user_success_journey'] = self._ask_question(
+        self.collected_data['user_success_journey'] = self._answer(
+            'user_success_journey',
             "Walk me through their ideal success scenario in 2-3 steps",
             example="1. User quickly adds new customer, 2. System auto-organizes contact info, 3. User easily finds customer details when needed",
             description="End-to-end user value realization",
@@ -121,7 +356,8 @@ class EnhancedInteractiveDataCollector:
         
         # 2. Project Identity
         print("\n📋 Question 2: Project Identity")
-        self.collected_data['project_name'] = self._ask_question(
+        self.collected_data['project_name'] = self._answer(
+            'project_name',
             "What's your project name?",
             example="CustomerHub MVP",
             description="Official project name for documentation",
@@ -131,7 +367,8 @@ class EnhancedInteractiveDataCollector:
         # 3. User Access Pattern (Simplified - Fixed Stalling Issue)
         print("\n📋 Question 3: User Access Pattern")
         
-        self.collected_data['user_access_method'] = self._ask_question(
+        self.collected_data['user_access_method'] = self._answer(
+            'user_access_method',
             "How will users first discover/access your solution? (web/mobile/desktop/api/other)",
             example="web",
             description="Primary access method determines technical architecture",
@@ -141,10 +378,17 @@ class EnhancedInteractiveDataCollector:
         # Simple conditional follow-up (no complex nested logic to avoid stalling)
         access_method = self.collected_data['user_access_method'].lower()
         
-        if 'web' in access_method:
+        if self.answers:
+            # Follow-ups are optional: with an answers file only the file's values are used
+            for key in ('web_primary_device', 'mobile_app_type'):
+                if key in self.answers:
+                    self.collected_data[key] = self.answers[key]
+        
+        elif 'web' in access_method:
             print("   🚪 You mentioned web access. Would you like to specify device focus? (y/n)")
             if input("   ").strip().lower() in ['y', 'yes']:
-                self.collected_data['web_primary_device'] = self._ask_question(
+                self.collected_data['web_primary_device'] = self._answer(
+                    'web_primary_device',
                     "Desktop or mobile browser primary? (desktop/mobile/both)",
                     example="desktop",
                     required=False
@@ -153,7 +397,8 @@ class EnhancedInteractiveDataCollector:
         elif 'mobile' in access_method:
             print("   🚪 You mentioned mobile. Would you like to specify app type? (y/n)")
             if input("   ").strip().lower() in ['y', 'yes']:
-                self.collected_data['mobile_app_type'] = self._ask_question(
+                self.collected_data['mobile_app_type'] = self._answer(
+                    'mobile_app_type',
                     "Native app or web app? (native/web_app/cross_platform)",
                     example="web_app",
                     required=False
@@ -167,7 +412,8 @@ class EnhancedInteractiveDataCollector:
         # 4. Business Model (Simplified)
         print("📋 Question 4: Business Model")
         
-        self.collected_data['business_model'] = self._ask_question(
+        self.collected_data['business_model'] = self._answer(
+            'business_model',
             "How does this project create value? (free_tool/paid_service/internal_efficiency/cost_reduction/revenue_generation/other)",
             example="internal_efficiency",
             description="Core value proposition",
@@ -175,7 +421,8 @@ class EnhancedInteractiveDataCollector:
             context_aware=True
         )
         
-        self.collected_data['key_success_metric'] = self._ask_question(
+        self.collected_data['key_success_metric'] = self._answer(
+            'key_success_metric',
             "What's the key metric that shows it's working?",
             example="Reduces customer lookup time from 5 minutes to 30 seconds",
             description="Measurable success indicator",
@@ -185,7 +432,8 @@ class EnhancedInteractiveDataCollector:
         
         # 5. MVP Success Definition
         print("\n📋 Question 5: MVP Success Definition")
-        self.collected_data['three_month_success'] = self._ask_question(
+        self.collected_data['three_month_success'] = self._answer(
+            'three_month_success',
             "In 3 months, how will you know this MVP succeeded?",
             example="5 team members using it daily, 200+ customers tracked, zero data loss incidents",
             description="Concrete success criteria for MVP validation",
@@ -205,7 +453,8 @@ class EnhancedInteractiveDataCollector:
         print("   • medium: Real-time features, user authentication, file uploads, integrations")
         print("   • complex: ML/AI features, complex workflows, high-performance requirements")
         
-        self.collected_data['project_complexity'] = self._ask_question(
+        self.collected_data['project_complexity'] = self._answer(
+            'project_complexity',
             "Your complexity choice (simple/medium/complex)",
             example="simple",
             description="Complexity determines architecture recommendations",
@@ -219,21 +468,24 @@ class EnhancedInteractiveDataCollector:
         
         # 7. Team & Constraints (Multi-part)
         print("\n📋 Question 7: Team & Constraints")
-        self.collected_data['team_context'] = self._ask_question(
+        self.collected_data['team_context'] = self._answer(
+            'team_context',
             "What's your team size and skill level?",
             example="Solo developer, intermediate JavaScript, learning backend",
             description="Team capabilities inform technology choices",
             required=True
         )
         
-        self.collected_data['existing_integrations'] = self._ask_question(
+        self.collected_data['existing_integrations'] = self._answer(
+            'existing_integrations',
             "Any existing systems this needs to integrate with?",
             example="Must connect to existing Google Workspace, export to Excel",
             description="Integration requirements affect architecture",
             required=False
         )
         
-        self.collected_data['hard_constraints'] = self._ask_question(
+        self.collected_data['hard_constraints'] = self._answer(
+            'hard_constraints',
             "Hard constraints? (timeline, budget, compliance, etc.)",
             example="Must launch in 4 weeks, $0 hosting budget for first 3 months",
             description="Non-negotiable limitations",
@@ -242,11 +494,14 @@ class EnhancedInteractiveDataCollector:
         
         # 8. Interactive Tech Stack Guidance (Conversational AI Session)
         print("\n📋 Question 8: Interactive Tech Stack Guidance")
-        if self.ai_engine:
+        if self.answers:
+            self._apply_tech_stack_answers()
+        elif self.ai_engine:
             self._conduct_ai_tech_stack_consultation()
         else:
             # Fallback if no AI engine available
-            self.collected_data['recommended_tech_stack'] = self._ask_question(
+            self.collected_data['recommended_tech_stack'] = self._answer(
+                'recommended_tech_stack',
                 "What's your preferred technology stack?",
                 example="Node.js + Express + PostgreSQL + React",
                 description="Technology choices for backend, frontend, and data storage",
@@ -254,6 +509,25 @@ class EnhancedInteractiveDataCollector:
             )
             self.collected_data['tech_stack_reasoning'] = "User-specified stack (no AI consultation available)"
     
+    def _collect_from_answers(self) -> EnhancedProjectData:
+        """Build project data straight from a complete answers mapping (no prompts)"""
+        self.collected_data = {key: value for key, value in self.answers.items()
+                               if key not in ('recommended_tech_stack', 'tech_stack_reasoning')}
+        self.collected_data['project_complexity'] = self.collected_data['project_complexity'].lower()
+        self._apply_tech_stack_answers()
+        
+        data = EnhancedProjectData(**self.collected_data)
+        print(f"📄 Loaded answers for {data.project_name} ({len(self.answers)} fields, no prompts needed)")
+        return data
+    
+    def _apply_tech_stack_answers(self):
+        """Take the tech stack from the answers, or leave the choice to the design decisions step"""
+        stack = self.answers.get('recommended_tech_stack', '')
+        self.collected_data['recommended_tech_stack'] = stack
+        self.collected_data['tech_stack_reasoning'] = self.answers.get('tech_stack_reasoning') or (
+            "User-specified stack (answers file)" if stack
+            else "No stack given in answers file - to be recommended in design decisions")
+    
     def _provide_complexity_guidance(self, complexity: str):
         """Provide immediate guidance based on complexity choice"""
         guidance = {
@@ -280,67 +554,117 @@ class EnhancedInteractiveDataCollector:
             "constraints": self.collected_data.get('hard_constraints', ''),
             "integrations": self.collected_data.get('existing_integrations', '')
         }
-        
-        # For now, simulate AI consultation (replace with actual AI engine call)
-        print("🤖 AI: Based on your answers, I'm analyzing the best tech stack options...")
-        print("   📊 Considering: complexity, team skills, constraints, and integrations...")
-        print("   💭 Generating recommendations...\n")
-        
-        # Simulate AI providing options
-        print("🤖 AI: I have 3 recommendations for you:\n")
-        
-        print("   Option 1 (RECOMMENDED): Node.js + Express + SQLite + Vanilla JS")
-        print("      ✅ Pros: Simple setup, matches team skills, fast MVP development")
-        print("      ⚠️  Cons: May need migration for scaling\n")
-        
-        print("   Option 2: Python + Flask + PostgreSQL + React")
-        print("      ✅ Pros: Great for data handling, robust database")
-        print("      ⚠️  Cons: More complex setup, learning curve for React\n")
-        
-        print("   Option 3: No-code solution (Airtable + Zapier)")
-        print("      ✅ Pros: Ultra-fast MVP, no coding required")
-        print("      ⚠️  Cons: Limited customization, vendor lock-in\n")
+        context_summary = "; ".join(f"{key}: {value}" for key, value in context.items() if value)
+        
+        # Similar projects (same normalized context) get the cached answer instantly
+        cache = TechStackCache()
+        cache_key = TechStackCache.key(normalize_consultation_context(context))
+        cached = cache.get(cache_key)
+        metrics.record_cache("tech_stack_recommendation", cached is not None)
+        
+        if cached:
+            print("🤖 AI: Projects like yours got these recommendations:\n")
+            options_text = cached["text"]
+            print("   " + options_text.replace("\n", "\n   ") + "\n")
+        else:
+            print("🤖 AI: Based on your answers, here are my recommendations:\n")
+            options_text = self._stream_ai_reply(TECH_STACK_PROMPT.format(context=context_summary))
+        
+        options = parse_tech_stack_options(options_text or "")
+        if not options:
+            print("   ⚠️  Falling back to standard recommendations\n")
+            options = DEFAULT_TECH_STACK_OPTIONS
+            options_text = format_tech_stack_options(options)
+            print("   " + options_text.replace("\n", "\n   ") + "\n")
+        elif not cached:
+            cache.put(cache_key, options_text)
+        
+        # Follow-ups continue the conversation from a compact context turn instead of the full prompt
+        self._consultation_history = [
+            {"role": "user", "content": f"Project context: {context_summary}"},
+            {"role": "assistant", "content": options_text}
+        ]
         
         # Get user choice
+        numbers = [str(number) for number in range(1, len(options) + 1)]
         while True:
-            choice = input("🤖 AI: Which option interests you most, or would you like me to explain any option? (1/2/3/explain): ").strip()
+            choice = input(f"🤖 AI: Which option interests you most, or would you like me to explain any option? ({'/'.join(numbers)}/explain): ").strip()
             
-            if choice == "1":
-                self.collected_data['recommended_tech_stack'] = "Node.js + Express + SQLite + Vanilla JS"
-                self.collected_data['tech_stack_reasoning'] = "AI recommended based on team skills and simplicity requirements for fast MVP development."
-                self.collected_data['alternative_options'] = "Python+Flask+PostgreSQL+React, No-code solution"
-                break
-            elif choice == "2":
-                self.collected_data['recommended_tech_stack'] = "Python + Flask + PostgreSQL + React"
-                self.collected_data['tech_stack_reasoning'] = "AI recommended for robust data handling despite slightly higher complexity."
-                self.collected_data['alternative_options'] = "Node.js+Express+SQLite+VanillaJS, No-code solution"
-                break
-            elif choice == "3":
-                self.collected_data['recommended_tech_stack'] = "Airtable + Zapier (No-code)"
-                self.collected_data['tech_stack_reasoning'] = "AI recommended for ultra-fast MVP validation before committing to custom development."
-                self.collected_data['alternative_options'] = "Node.js+Express+SQLite+VanillaJS, Python+Flask+PostgreSQL+React"
+            if choice in numbers:
+                chosen = options[int(choice) - 1]
+                self.collected_data['recommended_tech_stack'] = chosen["stack"]
+                self.collected_data['tech_stack_reasoning'] = (
+                    f"{'AI recommended' if chosen.get('recommended') else 'Chosen from AI options'}: {chosen['pros'].rstrip('.')}."
+                    + (f" Trade-off: {chosen['cons']}" if chosen.get('cons') else ""))
+                self.collected_data['alternative_options'] = ", ".join(
+                    option["stack"] for option in options if option is not chosen)
                 break
             elif choice.lower() == "explain":
-                explain_choice = input("   Which option would you like me to explain? (1/2/3): ").strip()
-                if explain_choice == "1":
-                    print("   🤖 AI: Option 1 is perfect for your team's JavaScript skills and simple CRUD needs...")
-                elif explain_choice == "2":
-                    print("   🤖 AI: Option 2 offers more robust data handling if you expect complex queries...")
-                elif explain_choice == "3":
-                    print("   🤖 AI: Option 3 lets you validate your idea without any code...")
-                else:
-                    print("   ❌ Please choose 1, 2, or 3")
+                explain_choice = input(f"   Which option would you like me to explain? ({'/'.join(numbers)}): ").strip()
+                if explain_choice not in numbers:
+                    print(f"   ❌ Please choose {', '.join(numbers)}")
+                    continue
+                option = options[int(explain_choice) - 1]
+                explanation = self._continue_consultation(
+                    f"Explain option {explain_choice} ({option['stack']}) for this project in 3-4 sentences: "
+                    f"why it fits and the main risk.")
+                if explanation is None:
+                    print(f"   🤖 AI: {option['stack']} - {option['pros']}. Watch out: {option['cons']}")
             else:
-                print("   ❌ Please choose 1, 2, 3, or 'explain'")
+                print(f"   ❌ Please choose {', '.join(numbers)}, or 'explain'")
         
         print(f"   ✅ Tech Stack Decision Recorded!\n")
         
-        # Simulate AI challenging assumptions
-        challenge = input("🤖 AI: I notice you mentioned time constraints. Have you considered that option 3 (no-code) might get you to market 3x faster? (y/n): ").strip()
+        # AI challenges the assumptions behind the choice
+        print("🤖 AI: Before we move on, let me challenge that choice:")
+        challenge_text = self._continue_consultation(
+            f"The team chose {self.collected_data['recommended_tech_stack']}. In at most two sentences, challenge "
+            f"the riskiest assumption behind this choice given their constraints, and end by asking whether "
+            f"they want to reconsider.")
+        if challenge_text is None:
+            challenge_text = "Have you considered whether a simpler option would get you to market faster?"
+            print(f"   {challenge_text}")
+        challenge = input("🤖 AI: Reconsider? (y/n): ").strip()
         if challenge.lower() in ['y', 'yes']:
-            self.collected_data['challenged_assumptions'] = "AI challenged time constraints - suggested considering no-code for speed"
+            self.collected_data['challenged_assumptions'] = f"AI challenged: {challenge_text.strip()} User will reconsider."
         else:
-            self.collected_data['challenged_assumptions'] = "AI suggested speed consideration but user preferred code-based solution"
+            self.collected_data['challenged_assumptions'] = f"AI challenged: {challenge_text.strip()} User kept the choice."
+    
+    def _continue_consultation(self, prompt: str) -> Optional[str]:
+        """Next turn of the tech stack conversation; None when the AI is unavailable"""
+        history = self._consultation_history
+        reply = self._stream_ai_reply(prompt, history=history)
+        if reply is not None and history is not None:
+            history.extend([{"role": "user", "content": prompt}, {"role": "assistant", "content": reply}])
+        return reply
+    
+    def _stream_ai_reply(self, prompt: str, history: Optional[List[Dict[str, str]]] = None) -> Optional[str]:
+        """Ask the AI engine and print the reply token by token as it arrives"""
+        if not self.ai_engine:
+            return None
+        
+        streamed = []
+        
+        def show(text: str):
+            streamed.append(text)
+            print(text.replace("\n", "\n   "), end="", flush=True)
+        
+        def restart():
+            # The interrupted partial reply stays on screen; mark where the retried one begins
+            streamed.clear()
+            print("\n   ↻ Connection interrupted, starting the reply again:\n   ", end="", flush=True)
+        
+        print("   ", end="", flush=True)
+        try:
+            response = self.ai_engine.generate_reply(prompt, "tech_stack", history=history, on_token=show,
+                                                     on_reset=restart)
+        except Exception as e:
+            print(f"\n   ⚠️  AI consultation unavailable: {e}")
+            return None
+        if not streamed:
+            show(response.content)
+        print("\n")
+        return response.content
     
     def _finalize_and_confirm(self) -> EnhancedProjectData:
         """Final confirmation and summary before document generation"""
@@ -383,6 +707,14 @@ class EnhancedInteractiveDataCollector:
         
         return data
     
+    def _answer(self, key: str, question: str, required: bool = True, **kwargs) -> str:
+        """Preloaded answer for key, otherwise ask (optional fields are not asked when answers were given)"""
+        if key in self.answers:
+            return self.answers[key]
+        if self.answers and not required:
+            return ""
+        return self._ask_question(question, required=required, **kwargs)
+    
     def _ask_question(self, question: str, example: str = None, description: str = None, required: bool = True, context_aware: bool = False) -> str:
         """Ask a single question with AI-enhanced formatting and context-aware examples"""
         print(f"❓ {question}")
@@ -507,7 +839,9 @@ Example:"""
 def main():
     """Standalone test of enhanced interactive data collector"""
     try:
-        collector = EnhancedInteractiveDataCollector()
+        # Optional answers file: python enhanced_interactive_data_collector.py answers.json
+        answers = load_answers(Path(sys.argv[1])) if len(sys.argv) > 1 else None
+        collector = EnhancedInteractiveDataCollector(answers=answers)
         data = collector.collect_mvp_requirements()
         
         print("\n" + "=" * 60)
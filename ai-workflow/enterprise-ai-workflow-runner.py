@@ -11,12 +11,18 @@ import sys
 import argparse
 import logging
 import subprocess
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from workflow_logging import get_logger, log_context, configure_logging
+import workflow_metrics as metrics
+
 class AutomationMode(Enum):
     GUIDED = "guided"
     AUTONOMOUS = "autonomous" 
@@ -66,6 +72,16 @@ class EnterpriseWorkflowOrchestrator:
         self.config = self._load_config()
         self.workflow_steps = self._initialize_workflow_steps()
         self.logger = self._setup_logging()
+        self.metrics_file = None
+        
+        # LLM settings passed to the run session's generation engine
+        self.llm_provider = None
+        self.llm_model = None
+        self.llm_config_file = None
+        self.cost_limit = None
+        self.max_parallel_steps = self.config['enterprise_workflow_execution'].get('max_parallel_steps', 3)
+        self._mvp_context: Dict[str, str] = {}  # Distilled MVP documents, loaded once per run
+        self._approval_history_seeded = False  # enterprise_approval_history imported on first use
         
     def _load_config(self) -> Dict:
         """Load enterprise automation configuration"""
@@ -121,27 +137,7 @@ class EnterpriseWorkflowOrchestrator:
     
     def _setup_logging(self) -> logging.Logger:
         """Setup logging configuration"""
-        logger = logging.getLogger('enterprise_workflow_orchestrator')
-        logger.setLevel(logging.INFO)
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_formatter = logging.Formatter(
-            '%(asctime)s - %(levelname)s - %(message)s'
-        )
-        console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
-        
-        # File handler
-        log_file = Path(__file__).parent / 'enterprise-ai-workflow-execution.log'
-        file_handler = logging.FileHandler(log_file)
-        file_formatter = logging.Formatter(
-            '%(asctime)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
-        )
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
-        
-        return logger
+        return get_logger('enterprise_workflow_orchestrator', logging.INFO)
     
     def assess_enterprise_risk_score(self, context: EnterpriseExecutionContext) -> float:
         """Assess enterprise risk score for the workflow execution"""
@@ -185,8 +181,8 @@ class EnterpriseWorkflowOrchestrator:
             return GateDecision.OPTIONAL
         elif gate_behavior == "skip":
             return GateDecision.SKIP
-        elif gate_behavior == "learn_from_history":
-            return self._evaluate_enterprise_learning_gate(step, context)
+        elif gate_behavior.startswith("learn_from_") and gate_behavior.endswith("_history"):
+            return self._evaluate_enterprise_learning_gate(step, context, gate_behavior)
         elif gate_behavior == "required_for_new_architecture":
             return self._evaluate_architecture_gate(step, context)
         elif gate_behavior == "required_for_compliance_changes":
@@ -198,12 +194,64 @@ class EnterpriseWorkflowOrchestrator:
         else:
             return GateDecision.REQUIRED  # Default to safe
     
-    def _evaluate_enterprise_learning_gate(self, step: EnterpriseWorkflowStep, context: EnterpriseExecutionContext) -> GateDecision:
+    def _evaluate_enterprise_learning_gate(self, step: EnterpriseWorkflowStep, context: EnterpriseExecutionContext,
+                                           gate_behavior: str = "learn_from_history") -> GateDecision:
         """Evaluate gate requirement based on enterprise learning history"""
-        # TODO: Implement enterprise learning logic
-        # For now, default to required for enterprise safety
+        thresholds = dict(self.config['automation_modes'].get('learning', {}).get('learning_thresholds', {}))
+        
+        # Compliance-sensitive gates must clear the stricter compliance confidence bar
+        if gate_behavior == "learn_from_compliance_history" or (context.compliance_framework and step.compliance_impact):
+            thresholds["confidence_threshold"] = thresholds.get("compliance_confidence_threshold",
+                                                                thresholds.get("confidence_threshold", 0.95))
+        
+        try:
+            stats = self._approval_history().evaluate(
+                step.gate_name, thresholds,
+                content_type=self._content_type(step),
+                tech_stack=" + ".join(context.technology_stack or [])
+            )
+        except Exception as e:
+            self.logger.warning(f"Approval history unavailable, keeping enterprise gate {step.gate_name}: {e}")
+            return GateDecision.REQUIRED
+        
+        if stats.allows_auto_proceed(thresholds):
+            self.logger.info(f"Enterprise learning gate auto-approved: {step.gate_name} [{stats.scope}] "
+                             f"rate={stats.approval_rate:.2f} confidence={stats.confidence:.2f}")
+            return GateDecision.SKIP
         return GateDecision.REQUIRED
     
+    def _approval_history(self):
+        """Process-wide approval store, seeded once from user_preferences.enterprise_approval_history"""
+        from approval_history import get_approval_history
+        
+        history = get_approval_history()
+        if not self._approval_history_seeded:
+            seed = self.config.get("user_preferences", {}).get("enterprise_approval_history", [])
+            if seed:
+                history.import_decisions(seed)
+            self._approval_history_seeded = True
+        return history
+    
+    def _content_type(self, step: EnterpriseWorkflowStep) -> str:
+        """Content type the step's document generates (shared mapping with the workflow executor)"""
+        from run_session import load_script_module, SCRIPT_DIR
+        executor_module = load_script_module("workflow_executor", SCRIPT_DIR / "workflow-executor.py")
+        return executor_module.CONTENT_TYPES.get(step.doc_name, "")
+    
+    def _record_gate_decision(self, step: EnterpriseWorkflowStep, context: EnterpriseExecutionContext,
+                              approved: bool, wait_seconds: float):
+        """Feed an enterprise gate decision into the approval history used by learning mode"""
+        try:
+            self._approval_history().record(
+                step.gate_name, "approved" if approved else "rejected",
+                content_type=self._content_type(step),
+                tech_stack=" + ".join(context.technology_stack or []),
+                workflow="enterprise", mode=context.mode.value, project=context.project_root.name,
+                wait_seconds=round(wait_seconds, 3)
+            )
+        except Exception as e:
+            self.logger.warning(f"Could not record enterprise gate decision for {step.gate_name}: {e}")
+    
     def _evaluate_architecture_gate(self, step: EnterpriseWorkflowStep, context: EnterpriseExecutionContext) -> GateDecision:
         """Evaluate gate requirement for architecture decisions"""
         if context.architecture_impact:
@@ -315,45 +363,183 @@ class EnterpriseWorkflowOrchestrator:
             print("Enterprise workflow execution cancelled")
             return False
         
-        # Execute each step
-        success = True
-        for step, gate_decision in plan:
+        # One run session: executor, engine, provider clients and MVP context are shared by all steps
+        try:
+            session = self._create_run_session(context)
+        except Exception as e:
+            self.logger.error(f"Failed to initialize enterprise run session: {e}")
+            print(f"\n❌ ENTERPRISE WORKFLOW EXECUTION FAILED: {e}")
+            return False
+        
+        with log_context(run_id=session.run_id, project=context.project_root.name, feature=context.feature_name):
             try:
-                if not self._execute_enterprise_step(step, gate_decision, context):
-                    success = False
-                    break
-            except Exception as e:
-                self.logger.error(f"Enterprise step {step.number} failed: {e}")
-                success = False
-                break
+                self._load_mvp_context(context, session)
+                success = self._execute_enterprise_plan(plan, context, session)
+            finally:
+                session.close()
+        
+        metrics.RUNS.inc(workflow="enterprise", outcome="success" if success else "failure")
+        try:
+            metrics.REGISTRY.write_textfile(self.metrics_file)
+        except OSError as e:
+            self.logger.warning(f"Could not write metrics textfile: {e}")
         
         if success:
             self.logger.info("🎉 Enterprise workflow completed successfully!")
             print("\n🎉 ENTERPRISE WORKFLOW COMPLETED SUCCESSFULLY!")
+            print(f"📁 Enterprise outputs: {session.feature_dir}")
         else:
             self.logger.error("❌ Enterprise workflow execution failed")
             print("\n❌ ENTERPRISE WORKFLOW EXECUTION FAILED")
         
         return success
     
-    def _execute_enterprise_step(self, step: EnterpriseWorkflowStep, gate_decision: GateDecision, context: EnterpriseExecutionContext) -> bool:
-        """Execute a single enterprise workflow step"""
-        self.logger.info(f"Executing enterprise step {step.number}: {step.doc_name}")
-        
-        # Handle gate if required
-        if gate_decision in [GateDecision.REQUIRED, GateDecision.APPROVAL_BOARD_REQUIRED]:
-            if not self._execute_enterprise_human_gate(step, gate_decision, context):
-                return False
-        
-        # Execute the actual step
-        success = self._execute_enterprise_document_workflow(step, context)
-        
-        if success:
-            self.logger.info(f"✅ Enterprise step {step.number} completed successfully")
-        else:
-            self.logger.error(f"❌ Enterprise step {step.number} failed")
+    def _create_run_session(self, context: EnterpriseExecutionContext):
+        """Claim the enterprise feature directory and create the per-run session"""
+        from project_registry import allocate_feature_dir
+        from run_session import RunSession
+        
+        if context.enterprise_feature_dir is None:
+            context.enterprise_feature_dir = allocate_feature_dir(context.project_root, context.feature_name,
+                                                                  features_dirname="enterprise-features")
+        
+        documentation = self.config.get("enterprise_governance", {}).get("enterprise_documentation", {})
+        artifacts = documentation.get("artifacts_structure", {})
+        for relative_dir in artifacts.values():
+            (context.enterprise_feature_dir / relative_dir).mkdir(parents=True, exist_ok=True)
+        
+        return RunSession(
+            feature_name=context.feature_name,
+            feature_dir=context.enterprise_feature_dir,
+            mode=context.mode.value,
+            llm_provider=self.llm_provider,
+            llm_model=self.llm_model,
+            llm_config_file=self.llm_config_file,
+            cost_limit=self.cost_limit
+        )
+    
+    def _load_mvp_context(self, context: EnterpriseExecutionContext, session):
+        """Reuse the MVP's collected data and distilled documents as context for every enterprise step"""
+        from run_session import distill_markdown
+        
+        mvp_dirs = sorted((context.project_root / "features").glob("*/collected-project-data.json"),
+                          key=lambda path: path.stat().st_mtime, reverse=True)
+        if not mvp_dirs:
+            self.logger.info("No MVP artifacts found - enterprise steps start from the feature description only")
+            self._mvp_context = {}
+            return
+        
+        mvp_dir = mvp_dirs[0].parent
+        try:
+            with open(mvp_dirs[0], 'r', encoding='utf-8') as f:
+                session.record_project_data(json.load(f))
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"Could not load MVP project data from {mvp_dir}: {e}")
+        
+        max_chars = self.config['enterprise_workflow_execution'].get('mvp_context_max_chars', 2000)
+        self._mvp_context = {}
+        for doc_path in sorted(mvp_dir.glob("*.md")):
+            distilled = distill_markdown(doc_path.read_text(encoding='utf-8'), max_chars)
+            if len(distilled) > 50:
+                self._mvp_context[f"mvp-{doc_path.stem}"] = distilled
+        
+        print(f"📦 Reusing {len(self._mvp_context)} MVP artifacts from {mvp_dir.name} as distilled context")
+        self.logger.info(f"Loaded MVP context from {mvp_dir}: {sorted(self._mvp_context)}")
+    
+    def _execute_enterprise_plan(self, plan: List[Tuple[EnterpriseWorkflowStep, GateDecision]],
+                                 context: EnterpriseExecutionContext, session) -> bool:
+        """Run steps as soon as their dependency_chain entries finish, independent steps in parallel"""
+        steps = {step.number: step for step, _ in plan}
+        decisions = {step.number: decision for step, decision in plan}
+        pending = [step.number for step, _ in plan]
+        step_outputs: Dict[str, List[str]] = {}
+        running: Dict[Future, EnterpriseWorkflowStep] = {}
+        failed = False
+        
+        with ThreadPoolExecutor(max_workers=self.max_parallel_steps, thread_name_prefix="enterprise-step") as pool:
+            while pending or running:
+                if not failed:
+                    for number in list(pending):
+                        step = steps[number]
+                        if not all(dependency in step_outputs for dependency in step.dependencies if dependency in steps):
+                            continue
+                        
+                        pending.remove(number)
+                        # Gates are asked on the main thread while already-approved steps keep generating
+                        if not self._pass_enterprise_gate(step, decisions[number], context):
+                            failed = True
+                            break
+                        
+                        future = pool.submit(contextvars.copy_context().run, self._run_enterprise_step,
+                                             step, context, session, self._step_context(step, steps, step_outputs, session))
+                        running[future] = step
+                
+                if not running:
+                    if pending and not failed:
+                        self.logger.error(f"Unsatisfiable enterprise dependencies for steps: {pending}")
+                    break
+                
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step = running.pop(future)
+                    generated = future.result()
+                    if generated is None:
+                        failed = True
+                    else:
+                        step_outputs[step.number] = generated
+        
+        return not failed and len(step_outputs) == len(steps)
+    
+    def _step_context(self, step: EnterpriseWorkflowStep, steps: Dict[str, EnterpriseWorkflowStep],
+                      step_outputs: Dict[str, List[str]], session) -> Dict[str, str]:
+        """MVP context plus the outputs of this step's (transitive) dependencies - nothing timing-dependent"""
+        ancestors, stack = set(), list(step.dependencies)
+        while stack:
+            number = stack.pop()
+            if number in ancestors or number not in steps:
+                continue
+            ancestors.add(number)
+            stack.extend(steps[number].dependencies)
+        
+        context_outputs = dict(self._mvp_context)
+        for number in sorted(ancestors):
+            for stem in step_outputs.get(number, []):
+                if stem in session.previous_outputs:
+                    context_outputs[stem] = session.previous_outputs[stem]
+        return context_outputs
+    
+    def _run_enterprise_step(self, step: EnterpriseWorkflowStep, context: EnterpriseExecutionContext,
+                             session, previous_outputs: Dict[str, str]) -> Optional[List[str]]:
+        """Worker: execute one step; returns the output stems it generated, or None on failure"""
+        step_started = time.perf_counter()
+        generated = None
+        try:
+            with log_context(step=step.number):
+                self.logger.info(f"Executing enterprise step {step.number}: {step.doc_name}")
+                generated = self._execute_enterprise_document_workflow(step, context, session, previous_outputs)
+                if generated is not None:
+                    self.logger.info(f"✅ Enterprise step {step.number} completed successfully")
+                else:
+                    self.logger.error(f"❌ Enterprise step {step.number} failed")
+        except Exception as e:
+            self.logger.error(f"Enterprise step {step.number} failed: {e}")
+        finally:
+            metrics.STEP_DURATION.observe(time.perf_counter() - step_started, workflow="enterprise",
+                                          step=step.number, outcome="success" if generated is not None else "failure")
+        return generated
+    
+    def _pass_enterprise_gate(self, step: EnterpriseWorkflowStep, gate_decision: GateDecision,
+                              context: EnterpriseExecutionContext) -> bool:
+        """Ask for approval when the plan requires it"""
+        if gate_decision not in [GateDecision.REQUIRED, GateDecision.APPROVAL_BOARD_REQUIRED]:
+            return True
         
-        return success
+        gate_started = time.perf_counter()
+        approved = self._execute_enterprise_human_gate(step, gate_decision, context)
+        gate_wait = time.perf_counter() - gate_started
+        metrics.GATE_WAIT.observe(gate_wait, gate=step.gate_name, decision="approved" if approved else "rejected")
+        self._record_gate_decision(step, context, approved, gate_wait)
+        return approved
     
     def _execute_enterprise_human_gate(self, step: EnterpriseWorkflowStep, gate_decision: GateDecision, context: EnterpriseExecutionContext) -> bool:
         """Execute enterprise human approval gate"""
@@ -380,21 +566,36 @@ class EnterpriseWorkflowOrchestrator:
         
         return approved
     
-    def _execute_enterprise_document_workflow(self, step: EnterpriseWorkflowStep, context: EnterpriseExecutionContext) -> bool:
-        """Execute the actual enterprise document workflow step"""
-        # TODO: Implement actual enterprise document execution
-        # For now, just simulate successful execution
-        
+    def _execute_enterprise_document_workflow(self, step: EnterpriseWorkflowStep, context: EnterpriseExecutionContext,
+                                              session, previous_outputs: Dict[str, str]) -> Optional[List[str]]:
+        """Generate the step's enterprise document through the shared workflow executor"""
         print(f"  📄 Executing enterprise: {step.doc_name}")
         if step.compliance_impact:
             print(f"  📋 Compliance validation: {context.compliance_framework.value if context.compliance_framework else 'Standard'}")
         
-        # Simulate processing time
-        import time
-        time.sleep(1.5)  # Enterprise steps take longer
+        doc_path = Path(__file__).parent / "scaling-workflow" / step.doc_name
+        if not doc_path.exists():
+            self.logger.error(f"Enterprise workflow document not found: {doc_path}")
+            return None
+        
+        workflow_context = session.executor_module.WorkflowContext(
+            feature_name=context.feature_name,
+            feature_slug=context.feature_name.lower().replace(' ', '-').replace('_', '-'),
+            feature_dir=session.feature_dir,
+            mode=context.mode.value,
+            phase=step.phase,
+            step_number=step.number,
+            project_data=session.project_data,
+            generated_files=[],
+            execution_log=[],
+            previous_outputs=previous_outputs
+        )
+        
+        if not session.get_executor().execute_workflow_document(doc_path, workflow_context, ai_agent_available=True):
+            return None
         
         print(f"  ✅ Completed enterprise: {step.doc_name}")
-        return True
+        return [Path(generated).stem for generated in workflow_context.generated_files]
 
 def main():
     """Main entry point"""
@@ -424,6 +625,32 @@ def main():
                        action="store_true", 
                        help="Enable verbose logging")
     
+    parser.add_argument("--log-dir",
+                       type=Path,
+                       help="Directory for rotating JSON-lines logs (default: $AI_WORKFLOW_LOG_DIR or ~/.ai-workflow/logs)")
+    
+    parser.add_argument("--metrics-file",
+                       type=Path,
+                       help="Prometheus textfile written at the end of the run (default: $AI_WORKFLOW_METRICS_FILE or ~/.ai-workflow/metrics/ai_workflow.prom)")
+    
+    parser.add_argument("--llm-provider",
+                       help="LLM provider for enterprise document generation (openai, anthropic, google)")
+    
+    parser.add_argument("--llm-model",
+                       help="LLM model used for every enterprise step (e.g., gpt-4o, claude-3-5-sonnet)")
+    
+    parser.add_argument("--llm-config",
+                       type=Path,
+                       help="Path to custom LLM configuration file with provider settings")
+    
+    parser.add_argument("--cost-limit",
+                       type=float,
+                       help="Override cost limit for LLM usage in USD")
+    
+    parser.add_argument("--max-parallel",
+                       type=int,
+                       help="Maximum enterprise steps generated at once when dependencies allow (default: config max_parallel_steps)")
+    
     parser.add_argument("--compliance",
                        choices=[cf.value for cf in ComplianceFramework],
                        help="Compliance framework to apply")
@@ -439,12 +666,20 @@ def main():
     args = parser.parse_args()
     
     # Setup logging level
+    configure_logging(args.log_dir)
     if args.verbose:
         logging.getLogger('enterprise_workflow_orchestrator').setLevel(logging.DEBUG)
     
     try:
         # Initialize orchestrator
         orchestrator = EnterpriseWorkflowOrchestrator(args.config)
+        orchestrator.metrics_file = args.metrics_file
+        orchestrator.llm_provider = args.llm_provider
+        orchestrator.llm_model = args.llm_model
+        orchestrator.llm_config_file = args.llm_config
+        orchestrator.cost_limit = args.cost_limit
+        if args.max_parallel:
+            orchestrator.max_parallel_steps = args.max_parallel
         
         # Create execution context
         context = EnterpriseExecutionContext(
@@ -9,16 +9,34 @@ import json
 import os
 import sys
 import argparse
+import contextvars
+import itertools
 import logging
+import threading
 import time
-import requests
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Union
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any, Union, Callable
+from dataclasses import dataclass, asdict, replace
 from enum import Enum
-import openai
-from anthropic import Anthropic
+
+from workflow_logging import get_logger
+import workflow_metrics as metrics
+import workflow_tracing as tracing
+import workflow_progress as progress
+
+# Provider SDKs (openai, anthropic, google.generativeai, requests) are imported lazily
+# inside the adapter that needs them so CLI startup never pays for unused providers
+
+# Correlates llm_started/llm_finished progress events of concurrent requests
+_request_ids = itertools.count(1)
+
+# Tool Anthropic is forced to call when a request carries a response_schema
+STRUCTURED_OUTPUT_TOOL = "structured_output"
+
+# Meters opened by metered_cost() in the calling context (copied into worker threads with it)
+_cost_meters: contextvars.ContextVar = contextvars.ContextVar("llm_cost_meters", default=())
 
 class LLMProvider(Enum):
     OPENAI = "openai"
@@ -47,6 +65,11 @@ class LLMRequest:
     context_data: Optional[Dict[str, Any]] = None
     expected_format: str = "markdown"
     validation_criteria: Optional[List[str]] = None
+    content_type: Optional[str] = None  # Metrics label (prd, srs, tasks, ...)
+    history: Optional[List[Dict[str, str]]] = None  # Earlier {"role", "content"} turns of a conversation
+    stream_callback: Optional[Callable[[str], None]] = None  # Streams text deltas as they arrive
+    stream_reset: Optional[Callable[[], None]] = None  # Called before a retry re-streams from the start
+    response_schema: Optional[Dict[str, Any]] = None  # Reply is JSON of this shape (JSON mode / forced tool call)
 
 @dataclass
 class LLMResponse:
@@ -58,34 +81,105 @@ class LLMResponse:
     execution_time: float
     validated: bool = False
     validation_errors: List[str] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    time_to_first_token: Optional[float] = None
+
+class RateLimiter:
+    """Token bucket shared by every integration that should respect one provider quota"""
+    
+    def __init__(self, requests_per_minute: float, burst: Optional[int] = None):
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(burst or max(1, int(requests_per_minute / 6)))  # Up to 10 seconds' worth at once
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> float:
+        """Take one request slot, sleeping until it is due; returns the seconds waited"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the slot now so concurrent callers queue up behind each other
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+class CostBudget:
+    """Spend cap shared by several integrations (calls already in flight may overshoot it slightly)"""
+    
+    def __init__(self, limit_usd: float):
+        self.limit_usd = limit_usd
+        self.spent_usd = 0.0
+        self._lock = threading.Lock()
+    
+    def check(self):
+        with self._lock:
+            if self.spent_usd >= self.limit_usd:
+                raise RuntimeError(f"Shared budget exhausted: ${self.spent_usd:.2f} >= ${self.limit_usd:.2f}")
+    
+    def charge(self, cost_usd: float):
+        with self._lock:
+            self.spent_usd += cost_usd
+    
+    @property
+    def remaining_usd(self) -> float:
+        with self._lock:
+            return max(self.limit_usd - self.spent_usd, 0.0)
+
+class CostMeter:
+    """Spend of the calls made inside one metered_cost() block"""
+    
+    def __init__(self):
+        self.cost_usd = 0.0
+        self.calls = 0
+        self._lock = threading.Lock()
+    
+    def add(self, cost_usd: float):
+        with self._lock:
+            self.cost_usd += cost_usd
+            self.calls += 1
+
+@contextmanager
+def metered_cost():
+    """Attribute the cost of every call made in this block (and its copied contexts) to one meter
+    
+    Unlike a delta of an integration's totals, calls other threads make concurrently on the same
+    integration are not counted.
+    """
+    meter = CostMeter()
+    token = _cost_meters.set(_cost_meters.get() + (meter,))
+    try:
+        yield meter
+    finally:
+        _cost_meters.reset(token)
 
 class LLMAPIIntegration:
     """Universal LLM API integration for workflow automation"""
     
-    def __init__(self, config: LLMConfig, debug: bool = False):
+    def __init__(self, config: LLMConfig, debug: bool = False, client: Any = None,
+                 rate_limiter: Optional[RateLimiter] = None, budget: Optional[CostBudget] = None):
         self.config = config
         self.debug = debug
         self.logger = self._setup_logging()
         self.usage_tracker = {"total_tokens": 0, "total_cost_usd": 0.0}
+        self._usage_lock = threading.Lock()  # Sessions sharing this integration update it concurrently
+        
+        # Optional limits shared with other integrations (batch runs)
+        self.rate_limiter = rate_limiter
+        self.budget = budget
         
-        # Initialize API client based on provider
-        self.client = self._initialize_client()
+        # Initialize API client based on provider (or reuse a warm one from the caller)
+        self.client = client if client is not None else self._initialize_client()
         
     def _setup_logging(self) -> logging.Logger:
         """Setup logging configuration"""
-        logger = logging.getLogger('llm_api_integration')
-        level = logging.DEBUG if self.debug else logging.INFO
-        logger.setLevel(level)
-        
-        if not logger.handlers:
-            console_handler = logging.StreamHandler()
-            formatter = logging.Formatter(
-                '%(asctime)s - %(levelname)s - %(message)s'
-            )
-            console_handler.setFormatter(formatter)
-            logger.addHandler(console_handler)
-        
-        return logger
+        return get_logger('llm_api_integration', logging.DEBUG if self.debug else logging.INFO)
     
     def _initialize_client(self):
         """Initialize LLM API client based on provider"""
@@ -109,6 +203,7 @@ class LLMAPIIntegration:
             if not self.config.api_key:
                 raise ValueError("Anthropic API key required. Set ANTHROPIC_API_KEY environment variable.")
             
+            from anthropic import Anthropic
             return Anthropic(api_key=self.config.api_key)
             
         elif self.config.provider == LLMProvider.AZURE_OPENAI:
@@ -154,54 +249,151 @@ class LLMAPIIntegration:
             except ImportError:
                 raise ValueError("Google GenerativeAI package required. Install with: pip install google-generativeai")
     
+    def open_connection(self, timeout: float = 5.0) -> bool:
+        """Cheap authenticated round trip so TLS and the pooled connection are ready before real work"""
+        
+        try:
+            if self.config.provider in (LLMProvider.OPENAI, LLMProvider.AZURE_OPENAI, LLMProvider.GROQ,
+                                        LLMProvider.ANTHROPIC):
+                self.client.with_options(timeout=timeout, max_retries=0).models.list()
+            elif self.config.provider == LLMProvider.LOCAL_OLLAMA:
+                import requests
+                requests.get(f"{self.config.base_url}/api/tags", timeout=timeout).raise_for_status()
+            elif self.config.provider == LLMProvider.GOOGLE:
+                next(iter(self.client.list_models()), None)
+            return True
+        except Exception as e:
+            self.logger.debug(f"Connection warm-up to {self.config.provider.value} failed: {e}")
+            return False
+    
     def generate_content(self, request: LLMRequest) -> LLMResponse:
         """Generate content using configured LLM provider"""
         
         self.logger.info(f"🤖 Generating content with {self.config.provider.value} ({self.config.model})")
         
         # Check cost limits
-        if self.usage_tracker["total_cost_usd"] >= self.config.cost_limit_usd:
-            raise RuntimeError(f"Cost limit exceeded: ${self.usage_tracker['total_cost_usd']:.2f} >= ${self.config.cost_limit_usd}")
+        with self._usage_lock:
+            spent_usd = self.usage_tracker["total_cost_usd"]
+        if spent_usd >= self.config.cost_limit_usd:
+            raise RuntimeError(f"Cost limit exceeded: ${spent_usd:.2f} >= ${self.config.cost_limit_usd}")
+        if self.budget:
+            self.budget.check()
         
         start_time = time.time()
+        labels = {
+            "provider": self.config.provider.value,
+            "model": self.config.model,
+            "content_type": request.content_type or "unknown"
+        }
+        
+        request_id = next(_request_ids)
+        cost_limit = self.budget.limit_usd if self.budget else self.config.cost_limit_usd
+        progress.emit("llm_started", request_id=request_id, content_type=labels["content_type"])
+        try:
+            with tracing.span(f"llm {labels['content_type']}", "provider", **labels) as request_span:
+                response = self._generate_with_retries(request, labels, start_time)
+                if request_span:
+                    request_span.set(tokens_in=response.input_tokens, tokens_out=response.output_tokens,
+                                     cost_usd=response.cost_usd, validated=response.validated)
+        except Exception:
+            progress.emit("llm_finished", request_id=request_id, outcome="error", cost_limit_usd=cost_limit)
+            raise
+        progress.emit("llm_finished", request_id=request_id, outcome="success",
+                      tokens_out=response.output_tokens or response.tokens_used, cost_usd=response.cost_usd,
+                      cost_limit_usd=cost_limit)
+        return response
+    
+    def _generate_with_retries(self, request: LLMRequest, labels: Dict[str, str], start_time: float) -> LLMResponse:
+        """Call the provider with exponential backoff; each attempt is its own trace span
+        
+        A retry streams the reply again from its first token, so callers that already showed part of
+        a failed attempt get stream_reset first.
+        """
+        
+        streamed = False
+        if request.stream_callback:
+            on_text = request.stream_callback
+            
+            def deliver(text: str):
+                nonlocal streamed
+                streamed = True
+                on_text(text)
+            
+            request = replace(request, stream_callback=deliver)
         
         for attempt in range(self.config.max_retries):
             try:
-                # Generate content based on provider
-                if self.config.provider == LLMProvider.OPENAI:
-                    response = self._generate_openai(request)
-                elif self.config.provider == LLMProvider.ANTHROPIC:
-                    response = self._generate_anthropic(request)
-                elif self.config.provider == LLMProvider.AZURE_OPENAI:
-                    response = self._generate_azure_openai(request)
-                elif self.config.provider == LLMProvider.LOCAL_OLLAMA:
-                    response = self._generate_ollama(request)
-                elif self.config.provider == LLMProvider.GROQ:
-                    response = self._generate_groq(request)
-                elif self.config.provider == LLMProvider.GOOGLE:
-                    response = self._generate_google(request)
-                else:
-                    raise ValueError(f"Unsupported provider: {self.config.provider}")
+                if self.rate_limiter:
+                    with tracing.span("rate limit wait", "rate_limit"):
+                        self.rate_limiter.acquire()
+                with tracing.span(f"attempt {attempt + 1}", "provider_attempt", attempt=attempt + 1):
+                    response = self._call_provider(request)
                 
                 # Calculate execution time
                 execution_time = time.time() - start_time
+                response.execution_time = execution_time
                 
                 # Update usage tracking
-                self.usage_tracker["total_tokens"] += response.tokens_used
-                self.usage_tracker["total_cost_usd"] += response.cost_usd
+                with self._usage_lock:
+                    self.usage_tracker["total_tokens"] += response.tokens_used
+                    self.usage_tracker["total_cost_usd"] += response.cost_usd
+                if self.budget:
+                    self.budget.charge(response.cost_usd)
+                for meter in _cost_meters.get():
+                    meter.add(response.cost_usd)
                 
                 # Validate response if criteria provided
                 if request.validation_criteria:
                     response = self._validate_response(response, request.validation_criteria)
+                    if not response.validated:
+                        metrics.VALIDATION_FAILURES.inc(**labels)
                 
+                self._record_metrics(response, labels)
                 self.logger.info(f"✅ Content generated successfully ({response.tokens_used} tokens, ${response.cost_usd:.4f})")
                 return response
                 
             except Exception as e:
                 self.logger.warning(f"Attempt {attempt + 1} failed: {e}")
                 if attempt == self.config.max_retries - 1:
+                    metrics.LLM_REQUESTS.inc(outcome="error", **labels)
+                    metrics.LLM_LATENCY.observe(time.time() - start_time, **labels)
                     raise
-                time.sleep(2 ** attempt)  # Exponential backoff
+                metrics.LLM_RETRIES.inc(provider=labels["provider"], model=labels["model"])
+                progress.emit("llm_retry", content_type=labels["content_type"])
+                if streamed and request.stream_reset:
+                    request.stream_reset()
+                streamed = False
+                with tracing.span("retry backoff", "retry_backoff", seconds=2 ** attempt):
+                    time.sleep(2 ** attempt)  # Exponential backoff
+    
+    def _call_provider(self, request: LLMRequest) -> LLMResponse:
+        """Dispatch a single request to the configured provider"""
+        
+        if self.config.provider == LLMProvider.OPENAI:
+            return self._generate_openai(request)
+        elif self.config.provider == LLMProvider.ANTHROPIC:
+            return self._generate_anthropic(request)
+        elif self.config.provider == LLMProvider.AZURE_OPENAI:
+            return self._generate_azure_openai(request)
+        elif self.config.provider == LLMProvider.LOCAL_OLLAMA:
+            return self._generate_ollama(request)
+        elif self.config.provider == LLMProvider.GROQ:
+            return self._generate_groq(request)
+        elif self.config.provider == LLMProvider.GOOGLE:
+            return self._generate_google(request)
+        else:
+            raise ValueError(f"Unsupported provider: {self.config.provider}")
+    
+    def _record_metrics(self, response: LLMResponse, labels: Dict[str, str]):
+        """Record request, token, cost and latency metrics for a successful generation"""
+        metrics.LLM_REQUESTS.inc(outcome="success", **labels)
+        metrics.LLM_TOKENS.inc(response.input_tokens, direction="in", **labels)
+        metrics.LLM_TOKENS.inc(response.output_tokens or response.tokens_used, direction="out", **labels)
+        metrics.LLM_COST.inc(response.cost_usd, **labels)
+        metrics.LLM_LATENCY.observe(response.execution_time, **labels)
+        # Non-streaming calls deliver the first token with the whole response
+        ttft = response.time_to_first_token if response.time_to_first_token is not None else response.execution_time
+        metrics.LLM_TTFT.observe(ttft, **labels)
     
     def _generate_openai(self, request: LLMRequest) -> LLMResponse:
         """Generate content using OpenAI API"""
@@ -215,14 +407,21 @@ class LLMAPIIntegration:
         if request.context_data:
             user_content += f"\n\nContext Data:\n```json\n{json.dumps(request.context_data, indent=2)}\n```"
         
+        messages.extend(request.history or [])
         messages.append({"role": "user", "content": user_content})
         
+        if request.stream_callback:
+            return self._stream_openai(messages, request.stream_callback)
+        
+        # JSON mode works on every current chat model; the schema itself is spelled out in the prompt
+        extra = {"response_format": {"type": "json_object"}} if request.response_schema else {}
         response = self.client.chat.completions.create(
             model=self.config.model,
             messages=messages,
             max_tokens=self.config.max_tokens,
             temperature=self.config.temperature,
-            timeout=self.config.timeout
+            timeout=self.config.timeout,
+            **extra
         )
         
         content = response.choices[0].message.content
@@ -235,7 +434,48 @@ class LLMAPIIntegration:
             model=self.config.model,
             tokens_used=tokens_used,
             cost_usd=cost_usd,
-            execution_time=0  # Will be set by caller
+            execution_time=0,  # Will be set by caller
+            input_tokens=response.usage.prompt_tokens,
+            output_tokens=response.usage.completion_tokens
+        )
+    
+    def _stream_openai(self, messages: List[Dict[str, str]], on_text: Callable[[str], None]) -> LLMResponse:
+        """OpenAI-compatible streaming call; usage arrives with the final chunk"""
+        
+        started = time.time()
+        stream = self.client.chat.completions.create(
+            model=self.config.model,
+            messages=messages,
+            max_tokens=self.config.max_tokens,
+            temperature=self.config.temperature,
+            timeout=self.config.timeout,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        
+        parts, usage, first_token = [], None, None
+        for chunk in stream:
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                if first_token is None:
+                    first_token = time.time() - started
+                parts.append(chunk.choices[0].delta.content)
+                on_text(chunk.choices[0].delta.content)
+        
+        content = "".join(parts)
+        input_tokens = usage.prompt_tokens if usage else 0
+        output_tokens = usage.completion_tokens if usage else int(len(content.split()) * 1.3)
+        return LLMResponse(
+            content=content,
+            provider=self.config.provider.value,
+            model=self.config.model,
+            tokens_used=input_tokens + output_tokens,
+            cost_usd=self._calculate_openai_cost(input_tokens + output_tokens, self.config.model),
+            execution_time=0,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            time_to_first_token=first_token
         )
     
     def _generate_anthropic(self, request: LLMRequest) -> LLMResponse:
@@ -246,15 +486,31 @@ class LLMAPIIntegration:
         if request.context_data:
             full_prompt += f"\n\nContext Data:\n```json\n{json.dumps(request.context_data, indent=2)}\n```"
         
+        messages = list(request.history or []) + [{"role": "user", "content": full_prompt}]
+        if request.stream_callback:
+            return self._stream_anthropic(request, messages)
+        
+        extra = {}
+        if request.response_schema:
+            extra = {
+                "tools": [{"name": STRUCTURED_OUTPUT_TOOL, "description": "Return the requested output",
+                           "input_schema": request.response_schema}],
+                "tool_choice": {"type": "tool", "name": STRUCTURED_OUTPUT_TOOL}
+            }
         response = self.client.messages.create(
             model=self.config.model,
             max_tokens=self.config.max_tokens,
             temperature=self.config.temperature,
             system=request.system_prompt or "You are a helpful AI assistant.",
-            messages=[{"role": "user", "content": full_prompt}]
+            messages=messages,
+            **extra
         )
         
-        content = response.content[0].text
+        tool_inputs = [block.input for block in response.content if getattr(block, "type", "") == "tool_use"]
+        if tool_inputs:
+            content = json.dumps(tool_inputs[0])
+        else:
+            content = "".join(block.text for block in response.content if hasattr(block, "text"))
         tokens_used = response.usage.input_tokens + response.usage.output_tokens
         cost_usd = self._calculate_anthropic_cost(tokens_used, self.config.model)
         
@@ -264,9 +520,52 @@ class LLMAPIIntegration:
             model=self.config.model,
             tokens_used=tokens_used,
             cost_usd=cost_usd,
-            execution_time=0
+            execution_time=0,
+            input_tokens=response.usage.input_tokens,
+            output_tokens=response.usage.output_tokens
         )
     
+    def _stream_anthropic(self, request: LLMRequest, messages: List[Dict[str, str]]) -> LLMResponse:
+        """Anthropic streaming call"""
+        
+        started = time.time()
+        first_token = None
+        with self.client.messages.stream(
+            model=self.config.model,
+            max_tokens=self.config.max_tokens,
+            temperature=self.config.temperature,
+            system=request.system_prompt or "You are a helpful AI assistant.",
+            messages=messages
+        ) as stream:
+            for text in stream.text_stream:
+                if first_token is None:
+                    first_token = time.time() - started
+                request.stream_callback(text)
+            final = stream.get_final_message()
+        
+        tokens_used = final.usage.input_tokens + final.usage.output_tokens
+        return LLMResponse(
+            content="".join(block.text for block in final.content if hasattr(block, "text")),
+            provider=self.config.provider.value,
+            model=self.config.model,
+            tokens_used=tokens_used,
+            cost_usd=self._calculate_anthropic_cost(tokens_used, self.config.model),
+            execution_time=0,
+            input_tokens=final.usage.input_tokens,
+            output_tokens=final.usage.output_tokens,
+            time_to_first_token=first_token
+        )
+    
+    def _single_prompt(self, request: LLMRequest) -> str:
+        """System prompt, earlier turns and the prompt as one string for single-prompt providers"""
+        turns = [f"{turn['role'].capitalize()}: {turn['content']}" for turn in request.history or []]
+        if not turns and not request.system_prompt:
+            return request.prompt
+        turns.append(f"User: {request.prompt}")
+        if request.system_prompt:
+            turns.insert(0, f"System: {request.system_prompt}")
+        return "\n\n".join(turns)
+    
     def _generate_azure_openai(self, request: LLMRequest) -> LLMResponse:
         """Generate content using Azure OpenAI API"""
         # Similar to OpenAI but with Azure-specific configuration
@@ -275,30 +574,48 @@ class LLMAPIIntegration:
     def _generate_ollama(self, request: LLMRequest) -> LLMResponse:
         """Generate content using local Ollama API"""
         
+        import requests
+        
         url = f"{self.config.base_url}/api/generate"
         
         # Prepare prompt
-        full_prompt = request.prompt
-        if request.system_prompt:
-            full_prompt = f"System: {request.system_prompt}\n\nUser: {full_prompt}"
+        full_prompt = self._single_prompt(request)
         if request.context_data:
             full_prompt += f"\n\nContext Data:\n```json\n{json.dumps(request.context_data, indent=2)}\n```"
         
         payload = {
             "model": self.config.model,
             "prompt": full_prompt,
-            "stream": False,
+            "stream": bool(request.stream_callback),
             "options": {
                 "temperature": self.config.temperature,
                 "num_predict": self.config.max_tokens
             }
         }
+        if request.response_schema:
+            payload["format"] = "json"
         
-        response = requests.post(url, json=payload, timeout=self.config.timeout)
+        started = time.time()
+        first_token = None
+        response = requests.post(url, json=payload, timeout=self.config.timeout, stream=bool(request.stream_callback))
         response.raise_for_status()
         
-        result = response.json()
-        content = result.get("response", "")
+        if request.stream_callback:
+            # One JSON object per line; the last one (done=true) carries the counts
+            parts, result = [], {}
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                result = json.loads(line)
+                if result.get("response"):
+                    if first_token is None:
+                        first_token = time.time() - started
+                    parts.append(result["response"])
+                    request.stream_callback(result["response"])
+            content = "".join(parts)
+        else:
+            result = response.json()
+            content = result.get("response", "")
         
         # Estimate tokens (rough approximation)
         tokens_used = len(content.split()) * 1.3  # Rough token estimation
@@ -310,7 +627,10 @@ class LLMAPIIntegration:
             model=self.config.model,
             tokens_used=int(tokens_used),
             cost_usd=cost_usd,
-            execution_time=0
+            execution_time=0,
+            input_tokens=result.get("prompt_eval_count", int(len(full_prompt.split()) * 1.3)),
+            output_tokens=result.get("eval_count", int(tokens_used)),
+            time_to_first_token=first_token
         )
     
     def _generate_groq(self, request: LLMRequest) -> LLMResponse:
@@ -328,9 +648,7 @@ class LLMAPIIntegration:
         model = self.client.GenerativeModel(self.config.model)
         
         # Prepare prompt
-        full_prompt = request.prompt
-        if request.system_prompt:
-            full_prompt = f"System: {request.system_prompt}\n\nUser: {full_prompt}"
+        full_prompt = self._single_prompt(request)
         if request.context_data:
             full_prompt += f"\n\nContext Data:\n```json\n{json.dumps(request.context_data, indent=2)}\n```"
         
@@ -339,13 +657,28 @@ class LLMAPIIntegration:
             'temperature': self.config.temperature,
             'max_output_tokens': self.config.max_tokens,
         }
+        if request.response_schema:
+            generation_config['response_mime_type'] = 'application/json'
         
+        started = time.time()
+        first_token = None
         response = model.generate_content(
             full_prompt,
-            generation_config=generation_config
+            generation_config=generation_config,
+            stream=bool(request.stream_callback)
         )
         
-        content = response.text
+        if request.stream_callback:
+            parts = []
+            for chunk in response:
+                if chunk.text:
+                    if first_token is None:
+                        first_token = time.time() - started
+                    parts.append(chunk.text)
+                    request.stream_callback(chunk.text)
+            content = "".join(parts)
+        else:
+            content = response.text
         
         # Estimate tokens (rough approximation)
         tokens_used = len(content.split()) * 1.3  # Rough token estimation
@@ -357,7 +690,10 @@ class LLMAPIIntegration:
             model=self.config.model,
             tokens_used=int(tokens_used),
             cost_usd=cost_usd,
-            execution_time=0
+            execution_time=0,
+            input_tokens=int(len(full_prompt.split()) * 1.3),
+            output_tokens=int(tokens_used),
+            time_to_first_token=first_token
         )
     
     def _calculate_openai_cost(self, tokens: int, model: str) -> float:
@@ -437,11 +773,13 @@ class LLMAPIIntegration:
     
     def get_usage_stats(self) -> Dict[str, Any]:
         """Get current usage statistics"""
+        with self._usage_lock:
+            usage = dict(self.usage_tracker)
         return {
-            "total_tokens": self.usage_tracker["total_tokens"],
-            "total_cost_usd": round(self.usage_tracker["total_cost_usd"], 4),
+            "total_tokens": usage["total_tokens"],
+            "total_cost_usd": round(usage["total_cost_usd"], 4),
             "cost_limit_usd": self.config.cost_limit_usd,
-            "remaining_budget_usd": round(self.config.cost_limit_usd - self.usage_tracker["total_cost_usd"], 4),
+            "remaining_budget_usd": round(self.config.cost_limit_usd - usage["total_cost_usd"], 4),
             "provider": self.config.provider.value,
             "model": self.config.model
         }
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+
+"""
+📒 Manifest Journal - Append-only JSONL journal behind feature-manifest.json
+Records manifest updates as locked appends and folds them into a periodically compacted view
+"""
+
+import copy
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+JOURNAL_META_KEY = "_journal"
+DEFAULT_COMPACT_EVERY = 50
+
+@contextmanager
+def file_lock(lock_path: Path, exclusive: bool = True):
+    """Advisory inter-process lock held on a sidecar lock file"""
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def atomic_write_json(path: Path, data: Dict[str, Any]):
+    """Write JSON to a temp file and rename it over the target"""
+    tmp_path = path.parent / f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def apply_operation(state: Dict[str, Any], operation: Dict[str, Any]):
+    """Apply one journal operation (init/set/extend/merge) to a manifest dict"""
+    op = operation["op"]
+    value = operation.get("value")
+
+    if op == "init":
+        if not state:
+            state.update(copy.deepcopy(value))
+        return
+
+    path = operation["path"]
+    target = state
+    for key in path[:-1]:
+        target = target.setdefault(key, {})
+    leaf = path[-1]
+
+    if op == "set":
+        target[leaf] = value
+    elif op == "extend":
+        target.setdefault(leaf, []).extend(value)
+    elif op == "merge":
+        target.setdefault(leaf, {}).update(value)
+    else:
+        raise ValueError(f"Unknown manifest journal operation: {op}")
+
+class ManifestJournal:
+    """Append-only journal plus materialized JSON view for one manifest file"""
+
+    def __init__(self, view_path: Path, compact_every: int = DEFAULT_COMPACT_EVERY):
+        self.view_path = Path(view_path)
+        self.journal_path = self.view_path.with_name(self.view_path.stem + ".journal.jsonl")
+        self.lock_path = self.view_path.with_name(self.view_path.name + ".lock")
+        self.compact_every = compact_every
+
+        # Incremental fold state: snapshot generation, journal byte offset, folded manifest
+        self._state: Optional[Dict[str, Any]] = None
+        self._generation = -1
+        self._last_seq = 0
+        self._offset = 0
+        self._pending_events = 0
+        self._view_stat = None
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        """Whether the manifest has a view or any journaled events"""
+        return self.view_path.exists() or self.journal_path.exists()
+
+    def append(self, operations: List[Dict[str, Any]], base: Optional[Dict[str, Any]] = None) -> int:
+        """Atomically append one event; `base` initializes the manifest if it is still empty"""
+        with self._lock, file_lock(self.lock_path, exclusive=True):
+            self._refresh_locked()
+
+            if base is not None and not self._state:
+                operations = [{"op": "init", "value": base}] + list(operations)
+
+            event = {
+                "seq": self._last_seq + 1,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "operations": operations
+            }
+
+            self.view_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.journal_path, 'a') as f:
+                f.write(json.dumps(event) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+                self._offset = f.tell()
+
+            self._apply_event(event)
+
+            if not self.view_path.exists() or self._pending_events >= self.compact_every:
+                self._compact_locked()
+
+            return event["seq"]
+
+    def read(self) -> Dict[str, Any]:
+        """Return the current manifest, folding only journal entries not yet seen"""
+        with self._lock, file_lock(self.lock_path, exclusive=False):
+            self._refresh_locked()
+            return copy.deepcopy(self._state)
+
+    def compact(self) -> Dict[str, Any]:
+        """Fold the journal into the JSON view and truncate the journal"""
+        with self._lock, file_lock(self.lock_path, exclusive=True):
+            self._refresh_locked()
+            if self._pending_events or not self.view_path.exists():
+                self._compact_locked()
+            return copy.deepcopy(self._state)
+
+    def _refresh_locked(self):
+        """Reload the snapshot if another process compacted, then fold new journal lines"""
+        view_stat = None
+        if self.view_path.exists():
+            stat = self.view_path.stat()
+            view_stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        if self._state is None or view_stat != self._view_stat:
+            snapshot = {}
+            if view_stat:
+                with open(self.view_path, 'r') as f:
+                    snapshot = json.load(f)
+            snapshot_meta = snapshot.pop(JOURNAL_META_KEY, {})
+
+            generation = snapshot_meta.get("generation", 0)
+            if self._state is None or generation != self._generation:
+                self._state = snapshot
+                self._generation = generation
+                self._last_seq = snapshot_meta.get("last_seq", 0)
+                self._offset = 0
+                self._pending_events = 0
+            self._view_stat = view_stat
+
+        if not self.journal_path.exists():
+            return
+
+        with open(self.journal_path, 'r') as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # Partial line from an in-progress or crashed writer
+                self._offset += len(line.encode("utf-8"))
+                if line.strip():
+                    self._apply_event(json.loads(line))
+
+    def _apply_event(self, event: Dict[str, Any]):
+        """Fold one event unless the snapshot already contains it"""
+        if event["seq"] <= self._last_seq:
+            return
+        for operation in event["operations"]:
+            apply_operation(self._state, operation)
+        self._last_seq = event["seq"]
+        self._pending_events += 1
+
+    def _compact_locked(self):
+        """Write the folded state as the new view, then start an empty journal"""
+        snapshot = copy.deepcopy(self._state)
+        snapshot[JOURNAL_META_KEY] = {
+            "generation": self._generation + 1,
+            "last_seq": self._last_seq,
+            "compacted_at": datetime.now(timezone.utc).isoformat()
+        }
+        atomic_write_json(self.view_path, snapshot)
+
+        # Events up to last_seq are in the view; a crash before truncation is harmless
+        open(self.journal_path, 'w').close()
+        stat = self.view_path.stat()
+        self._view_stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        self._generation += 1
+        self._offset = 0
+        self._pending_events = 0
+
+_JOURNALS: Dict[str, ManifestJournal] = {}
+_JOURNALS_LOCK = threading.Lock()
+
+def open_journal(view_path: Path) -> ManifestJournal:
+    """Process-wide journal instance per manifest so folds stay incremental"""
+    key = str(Path(view_path).resolve())
+    with _JOURNALS_LOCK:
+        if key not in _JOURNALS:
+            _JOURNALS[key] = ManifestJournal(Path(view_path))
+        return _JOURNALS[key]
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+
+"""
+👁️ Output Watcher - Event feed of changed status and output files under a workspace
+Uses inotify on Linux (through libc, no extra packages) and falls back to stat polling; bursts of writes are debounced per file
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from quality_gates import DOCUMENT_TYPES
+
+STATUS_SUFFIX = "-output.md"
+
+# Workspace → project → features → feature directory
+MAX_WATCH_DEPTH = 3
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+EVENT_HEADER = struct.Struct("iIII")
+
+def is_watched_file(path: Path) -> bool:
+    """Agent status files and generated workflow documents (never manifests or helper scripts we write)"""
+    return path.name.endswith(STATUS_SUFFIX) or path.name in DOCUMENT_TYPES
+
+def _watched_dirs(root: Path, depth: int = 0) -> Iterator[Tuple[Path, int]]:
+    yield root, depth
+    if depth >= MAX_WATCH_DEPTH:
+        return
+    try:
+        children = [child for child in root.iterdir() if child.is_dir() and not child.name.startswith(".")]
+    except OSError:
+        return
+    for child in children:
+        yield from _watched_dirs(child, depth + 1)
+
+def _watched_files(directory: Path) -> List[Path]:
+    try:
+        return [path for path in directory.iterdir() if path.is_file() and is_watched_file(path)]
+    except OSError:
+        return []
+
+class InotifyWatcher:
+    """Kernel notifications for every directory down to feature level; new directories are watched as they appear"""
+
+    def __init__(self, root: Path):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = root
+        self._dirs: Dict[int, Tuple[Path, int]] = {}
+        self._add_tree(root, 0)
+
+    def _add_tree(self, directory: Path, depth: int) -> List[Path]:
+        """Watch directory and its subdirectories; returns files already inside (written before the watch existed)"""
+        existing = []
+        for path, level in _watched_dirs(directory, depth):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(str(path)), WATCH_MASK)
+            if wd < 0:
+                if path == self.root:
+                    raise OSError(ctypes.get_errno(), f"Cannot watch {path}")
+                continue
+            self._dirs[wd] = (path, level)
+            existing.extend(_watched_files(path))
+        return existing
+
+    def read(self, timeout: float) -> List[Path]:
+        """Changed files reported within timeout seconds"""
+        ready, _, _ = select.select([self.fd], [], [], max(0.0, timeout))
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changed = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped: report everything once rather than miss a change
+                changed.extend(path for directory, _ in self._dirs.values() for path in _watched_files(directory))
+                continue
+            if wd not in self._dirs or not name:
+                continue
+            directory, level = self._dirs[wd]
+            path = directory / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and level < MAX_WATCH_DEPTH:
+                    changed.extend(self._add_tree(path, level + 1))
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO) and is_watched_file(path):
+                changed.append(path)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class PollingWatcher:
+    """Fallback that stats watched files every interval (no file is read unless it changed)"""
+
+    def __init__(self, root: Path, interval: float = 1.0):
+        self.root = root
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for directory, _ in _watched_dirs(self.root):
+            for path in _watched_files(directory):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def read(self, timeout: float) -> List[Path]:
+        time.sleep(max(0.0, min(timeout, self.interval)))
+        snapshot = self._scan()
+        changed = [path for path, signature in snapshot.items() if self._snapshot.get(path) != signature]
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+class Debouncer:
+    """Holds each path until it has been quiet for quiet_seconds, so a burst of writes is handled once"""
+
+    def __init__(self, quiet_seconds: float):
+        self.quiet_seconds = quiet_seconds
+        self._pending: Dict[Path, float] = {}
+
+    def add(self, paths: List[Path], now: float):
+        for path in paths:
+            self._pending[path] = now
+
+    def ready(self, now: float) -> List[Path]:
+        settled = [path for path, last in self._pending.items() if now - last >= self.quiet_seconds]
+        for path in settled:
+            del self._pending[path]
+        return settled
+
+    def next_timeout(self, now: float, idle: float) -> float:
+        if not self._pending:
+            return idle
+        return max(0.0, min(last + self.quiet_seconds for last in self._pending.values()) - now)
+
+def open_watcher(root: Path, poll_interval: float = 1.0, force_polling: bool = False):
+    """inotify when the platform has it, otherwise polling"""
+    if not force_polling:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError) as e:
+            logging.getLogger('output_watcher').info(f"inotify unavailable ({e}), polling every {poll_interval}s")
+    return PollingWatcher(root, poll_interval)
+
+def watch_changes(root: Path, debounce_seconds: float = 0.3, poll_interval: float = 1.0,
+                  force_polling: bool = False) -> Iterator[List[Path]]:
+    """Yield batches of settled, changed status/output files until the caller stops iterating"""
+    watcher = open_watcher(root, poll_interval, force_polling)
+    debouncer = Debouncer(debounce_seconds)
+    try:
+        while True:
+            now = time.monotonic()
+            changed = watcher.read(debouncer.next_timeout(now, poll_interval))
+            now = time.monotonic()
+            debouncer.add([path for path in changed if path.exists()], now)
+            settled = debouncer.ready(now)
+            if settled:
+                yield sorted(settled)
+    finally:
+        watcher.close()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+"""
+🗂️ Project Registry - Safe concurrent updates to project-manifest.json
+Locked read-modify-write of the project manifest, unique feature directories and a per-project run registry
+"""
+
+import json
+import os
+import socket
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Callable
+
+from manifest_journal import file_lock, atomic_write_json
+from workspace_catalog import notify_project_changed
+
+PROJECT_MANIFEST = "project-manifest.json"
+MAX_FINISHED_RUNS = 100
+
+def _lock_path(project_root: Path) -> Path:
+    return project_root / f"{PROJECT_MANIFEST}.lock"
+
+def read_project_manifest(project_root: Path) -> Dict[str, Any]:
+    """Read the project manifest under a shared lock"""
+    with file_lock(_lock_path(project_root), exclusive=False):
+        with open(project_root / PROJECT_MANIFEST, 'r') as f:
+            return json.load(f)
+
+def update_project_manifest(project_root: Path, updater: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+    """Apply `updater` to the project manifest under an exclusive lock and write it atomically"""
+    manifest_path = project_root / PROJECT_MANIFEST
+    with file_lock(_lock_path(project_root), exclusive=True):
+        manifest = {}
+        if manifest_path.exists():
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+        updater(manifest)
+        atomic_write_json(manifest_path, manifest)
+
+    notify_project_changed(project_root)
+    return manifest
+
+def allocate_feature_dir(project_root: Path, feature_name: str, features_dirname: str = "features") -> Path:
+    """Claim a feature directory no other run is using (YYYY-MM-DD-slug, then -2, -3, ...)"""
+    feature_slug = feature_name.lower().replace(' ', '-').replace('_', '-')
+    date_prefix = datetime.now().strftime('%Y-%m-%d')
+    features_dir = project_root / features_dirname
+    features_dir.mkdir(parents=True, exist_ok=True)
+
+    base_name = f"{date_prefix}-{feature_slug}"
+    attempt = 1
+    while True:
+        candidate = features_dir / (base_name if attempt == 1 else f"{base_name}-{attempt}")
+        try:
+            candidate.mkdir()  # Atomic: exactly one run wins each name
+            return candidate
+        except FileExistsError:
+            attempt += 1
+
+def _pid_alive(pid: int) -> bool:
+    """Whether a process with this PID still exists on this host"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def register_run(project_root: Path, run_id: str, command: str, feature_name: str, feature_dir: Path):
+    """Record a workflow run as active for this project"""
+    def add_run(manifest: Dict[str, Any]):
+        manifest.setdefault("runs", {})[run_id] = {
+            "command": command,
+            "feature_name": feature_name,
+            "feature_dir": str(feature_dir),
+            "status": "running",
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "started_at": datetime.now().isoformat(),
+            "finished_at": None
+        }
+
+    update_project_manifest(project_root, add_run)
+
+def finish_run(project_root: Path, run_id: str, success: bool, feature_name: Optional[str] = None):
+    """Mark a run finished; successful feature runs are added to the project's feature list"""
+    def complete_run(manifest: Dict[str, Any]):
+        runs = manifest.setdefault("runs", {})
+        if run_id in runs:
+            runs[run_id]["status"] = "succeeded" if success else "failed"
+            runs[run_id]["finished_at"] = datetime.now().isoformat()
+
+        if success and feature_name:
+            features = manifest.setdefault("features", [])
+            if feature_name not in features:
+                features.append(feature_name)
+
+        # Keep the registry bounded: drop the oldest finished runs
+        finished = sorted((r for r in runs.items() if r[1]["status"] != "running"),
+                          key=lambda item: item[1]["finished_at"] or "")
+        for old_run_id, _ in finished[:max(0, len(finished) - MAX_FINISHED_RUNS)]:
+            del runs[old_run_id]
+
+    update_project_manifest(project_root, complete_run)
+
+def active_runs(project_root: Path, manifest: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Runs still marked running, excluding ones whose process died on this host"""
+    if manifest is None:
+        manifest = read_project_manifest(project_root)
+    hostname = socket.gethostname()
+
+    runs = []
+    for run_id, run in manifest.get("runs", {}).items():
+        if run["status"] != "running":
+            continue
+        if run.get("host") == hostname and not _pid_alive(run.get("pid", 0)):
+            continue  # Crashed or killed without finishing
+        runs.append(dict(run, run_id=run_id))
+    return runs
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+
+"""
+🚦 Quality Gates - Local rule engine for generated workflow documents
+Parses each document once into a section tree and evaluates the configured automated checks and manual-review triggers in milliseconds
+"""
+
+import json
+import operator
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Callable
+
+SCRIPT_DIR = Path(__file__).parent
+
+# Generated document → content type (its validation_criteria entry in llm-config.json)
+DOCUMENT_TYPES = {
+    "project-initialization.md": "mvp_entrypoint",
+    "prd.md": "prd",
+    "srs.md": "srs",
+    "design-decisions.md": "design_decisions",
+    "design-analysis.md": "design_analysis",
+    "tasks.md": "tasks",
+    "implementation-guide.md": "task_processing",
+    "completion-summary.md": "completion_summary",
+    "project-history.md": "project_history",
+    "transition-analysis.md": "enterprise",
+    "enterprise-prd.md": "prd",
+    "enterprise-srs.md": "srs",
+    "enterprise-design-decisions.md": "design_decisions",
+    "enterprise-design-analysis.md": "design_analysis",
+    "enterprise-tasks.md": "tasks",
+    "enterprise-completion-summary.md": "completion_summary",
+    "enterprise-project-history.md": "project_history"
+}
+
+ENTERPRISE_DOCUMENTS = {name for name in DOCUMENT_TYPES if name.startswith("enterprise-")} | {"transition-analysis.md"}
+
+# Ordinal words usable on the right of a trigger comparison ("coordination_complexity > moderate")
+ORDINALS = {"none": 0, "low": 1, "simple": 1, "moderate": 2, "medium": 2, "high": 3, "complex": 3, "critical": 4}
+
+# A performance budget at or under this many milliseconds counts as strict
+STRICT_LATENCY_MS = 200
+
+# A document listing this many risks scores 1.0
+RISK_SCORE_SATURATION = 10
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le, "==": operator.eq, "!=": operator.ne
+}
+
+TRIGGER_PATTERN = re.compile(r'^\s*([A-Za-z_]\w*)\s*(?:(>=|<=|==|!=|>|<)\s*(\S+))?\s*$')
+LINK_PATTERN = re.compile(r'\[[^\]]*\]\(([^)\s]+)[^)]*\)')
+LATENCY_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*ms\b', re.IGNORECASE)
+BULLET_PATTERN = re.compile(r'^\s*(?:[-*+]|\d+\.)\s+\S')
+
+# Parsed documents kept by (mtime, size) so repeated validation (watch mode) only reparses changed files
+PARSE_CACHE_SIZE = 2048
+_parse_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_parse_lock = threading.Lock()
+
+def section_key(title: str) -> str:
+    """Heading text without numbering or emphasis, so "## 2. **Goals**:" matches "Goals" """
+    return re.sub(r'^[\d.\s]+', '', title).strip(' *:_').lower()
+
+def satisfies_heading(heading: str, required: str) -> bool:
+    """Same leniency as contains:## X, which "## X (Context-Embedded)" also passes"""
+    return section_key(heading).startswith(section_key(required))
+
+@dataclass
+class Section:
+    """A heading and the lines under it (up to the next heading of the same or higher level)"""
+    title: str
+    level: int
+    line: int
+    body: List[str] = field(default_factory=list)
+    children: List["Section"] = field(default_factory=list)
+
+    def text(self) -> str:
+        """Body including every nested section"""
+        return "\n".join(self.body + [child.text() for child in self.children])
+
+@dataclass
+class ParsedDocument:
+    """One generated document, parsed in a single pass"""
+    path: Path
+    sections: List[Section]
+    headings: List[Section]
+    word_count: int
+    links: List[str]
+    unbalanced_fence: bool
+
+    def find(self, title: str) -> List[Section]:
+        key = section_key(title)
+        return [section for section in self.headings if section_key(section.title) == key]
+
+    def sections_matching(self, word: str) -> List[Section]:
+        return [section for section in self.headings if word in section_key(section.title)]
+
+def parse_document(path: Path) -> ParsedDocument:
+    """Section tree, word count, links and fence balance from one read of the file"""
+    root = Section("", 0, 0)
+    stack = [root]
+    headings = []
+    links = []
+    words = 0
+    in_fence = False
+
+    for number, line in enumerate(path.read_text(encoding='utf-8').splitlines(), 1):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+            stack[-1].body.append(line)
+            continue
+
+        heading = re.match(r'^(#{1,6})\s+(.*\S)', line) if not in_fence else None
+        if heading:
+            section = Section(heading.group(2).strip(), len(heading.group(1)), number)
+            while stack[-1].level >= section.level:
+                stack.pop()
+            stack[-1].children.append(section)
+            stack.append(section)
+            headings.append(section)
+        else:
+            stack[-1].body.append(line)
+            links.extend(LINK_PATTERN.findall(line))
+        words += len(line.split())
+
+    return ParsedDocument(path, root.children, headings, words, links, in_fence)
+
+def parse_document_cached(path: Path) -> ParsedDocument:
+    """parse_document, reusing the previous parse while the file is unchanged"""
+    stat = path.stat()
+    signature = (stat.st_mtime_ns, stat.st_size)
+    key = str(path)
+    with _parse_lock:
+        cached = _parse_cache.get(key)
+        if cached and cached[0] == signature:
+            _parse_cache.move_to_end(key)
+            return cached[1]
+
+    document = parse_document(path)
+    with _parse_lock:
+        _parse_cache[key] = (signature, document)
+        _parse_cache.move_to_end(key)
+        while len(_parse_cache) > PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+    return document
+
+@dataclass
+class CompiledTrigger:
+    """A manual_validation_triggers expression parsed once: a metric alone, or "metric op value" """
+    name: str
+    expression: str
+    metric: str
+    compare: Optional[Callable[[Any, Any], bool]] = None
+    value: Any = None
+
+    def evaluate(self, metrics: Dict[str, Any]) -> Optional[bool]:
+        """True/False, or None when the documents don't provide the metric"""
+        actual = metrics.get(self.metric)
+        if actual is None:
+            return None
+        if self.compare is None:
+            return bool(actual)
+        if isinstance(actual, str):
+            actual = ORDINALS.get(actual.strip().lower(), actual)
+        try:
+            return self.compare(actual, self.value)
+        except TypeError:
+            return None
+
+@lru_cache(maxsize=None)
+def compile_trigger(name: str, expression: str) -> CompiledTrigger:
+    """Parse a trigger expression; unsupported syntax raises ValueError"""
+    match = TRIGGER_PATTERN.match(expression)
+    if not match:
+        raise ValueError(f"Unsupported quality gate trigger '{name}': {expression}")
+    metric, op, raw = match.groups()
+    if op is None:
+        return CompiledTrigger(name, expression, metric)
+
+    value: Any = ORDINALS.get(raw.lower(), raw)
+    if value is raw:
+        try:
+            value = float(raw)
+        except ValueError:
+            pass
+    return CompiledTrigger(name, expression, metric, OPERATORS[op], value)
+
+def _load_json(path: Path) -> Dict[str, Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+class QualityGateEngine:
+    """Evaluates one quality_gates configuration against feature directories"""
+
+    def __init__(self, gates: Dict[str, Any], validation_criteria: Dict[str, List[str]],
+                 trusted_tech_stacks: Optional[List[str]] = None):
+        self.checks = [name for name, enabled in gates.get("automated_validation", {}).items() if enabled]
+        self.triggers = [compile_trigger(name, expression)
+                         for name, expression in gates.get("manual_validation_triggers", {}).items()]
+        self.trusted_tech_stacks = trusted_tech_stacks or []
+
+        # Required headings per content type come from the same criteria the generator validates against
+        self.required_sections = {
+            content_type: [c[len("contains:## "):] for c in criteria if c.startswith("contains:## ")]
+            for content_type, criteria in validation_criteria.items()
+        }
+
+        self._check_handlers = {
+            "document_structure_check": self._check_structure,
+            "required_sections_present": self._check_required_sections,
+            "context_references_valid": self._check_references,
+            "manifest_consistency": self._check_manifest,
+            "enterprise_manifest_consistency": self._check_manifest,
+            "compliance_section_validation": self._check_compliance_section
+        }
+
+    def validate_feature(self, feature_dir: Path, known_tech_stacks: Optional[set] = None) -> Dict[str, Any]:
+        """Run every enabled check and trigger; passed is False when any check found a problem"""
+        started = time.perf_counter()
+        documents = {path.name: parse_document_cached(path) for path in sorted(feature_dir.glob("*.md"))
+                     if path.name in DOCUMENT_TYPES}
+
+        checks = {}
+        for name in self.checks:
+            handler = self._check_handlers.get(name)
+            if handler is None:
+                checks[name] = {"passed": None, "problems": [], "note": "no local rule for this check"}
+                continue
+            problems = handler(feature_dir, documents)
+            checks[name] = {"passed": not problems, "problems": problems}
+
+        metrics = self._metrics(feature_dir, documents, known_tech_stacks)
+        triggers = {}
+        for trigger in self.triggers:
+            fired = trigger.evaluate(metrics)
+            triggers[trigger.name] = {"expression": trigger.expression, "fired": fired,
+                                      "value": metrics.get(trigger.metric)}
+
+        return {
+            "feature_directory": str(feature_dir),
+            "passed": all(check["passed"] is not False for check in checks.values()),
+            "documents": len(documents),
+            "checks": checks,
+            "triggers": triggers,
+            "manual_review_required": [name for name, result in triggers.items() if result["fired"]],
+            "metrics": metrics,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    def _check_structure(self, feature_dir: Path, documents: Dict[str, ParsedDocument]) -> List[str]:
+        problems = []
+        for name, document in documents.items():
+            if not document.headings:
+                problems.append(f"{name}: no headings")
+                continue
+            if document.unbalanced_fence:
+                problems.append(f"{name}: unclosed code block")
+            previous_level = 0
+            for section in document.headings:
+                if previous_level and section.level > previous_level + 1:
+                    problems.append(f"{name}:{section.line}: heading '{section.title}' skips a level")
+                if not section.children and not "".join(section.body).strip():
+                    problems.append(f"{name}:{section.line}: section '{section.title}' is empty")
+                previous_level = section.level
+        return problems
+
+    def _check_required_sections(self, feature_dir: Path, documents: Dict[str, ParsedDocument]) -> List[str]:
+        problems = []
+        for name, document in documents.items():
+            for title in self.required_sections.get(DOCUMENT_TYPES[name], []):
+                if not any(satisfies_heading(section.title, title) for section in document.headings):
+                    problems.append(f"{name}: missing section '## {title}'")
+        return problems
+
+    def _check_references(self, feature_dir: Path, documents: Dict[str, ParsedDocument]) -> List[str]:
+        problems = []
+        for name, document in documents.items():
+            for target in document.links:
+                if re.match(r'^[a-z][a-z0-9+.-]*:', target, re.IGNORECASE) or target.startswith("#"):
+                    continue  # URLs and in-document anchors
+                if not (feature_dir / target.split("#")[0]).exists():
+                    problems.append(f"{name}: broken reference '{target}'")
+        return problems
+
+    def _check_manifest(self, feature_dir: Path, documents: Dict[str, ParsedDocument]) -> List[str]:
+        from manifest_journal import open_journal
+
+        journal = open_journal(feature_dir / "feature-manifest.json")
+        if not journal.exists():
+            return ["feature-manifest.json missing"]
+        manifest = journal.read()
+
+        problems = []
+        slug = manifest.get("feature_metadata", {}).get("feature_slug")
+        if slug and not feature_dir.name.endswith(slug):
+            problems.append(f"manifest feature_slug '{slug}' does not match directory '{feature_dir.name}'")
+        for generated in manifest.get("generated_files", []):
+            if not (feature_dir / Path(generated).name).exists():
+                problems.append(f"manifest lists {Path(generated).name} but the file is missing")
+        return problems
+
+    def _check_compliance_section(self, feature_dir: Path, documents: Dict[str, ParsedDocument]) -> List[str]:
+        enterprise = [document for name, document in documents.items() if name in ENTERPRISE_DOCUMENTS]
+        if enterprise and not any(document.sections_matching("compliance") for document in enterprise):
+            return ["no enterprise document has a compliance section"]
+        return []
+
+    def _metrics(self, feature_dir: Path, documents: Dict[str, ParsedDocument],
+                 known_tech_stacks: Optional[set]) -> Dict[str, Any]:
+        """Values trigger expressions can reference (missing documents leave their metrics unset)"""
+        metrics: Dict[str, Any] = {}
+
+        # Enterprise documents win over their lean counterparts in the same directory
+        for name in sorted(documents, key=lambda n: n in ENTERPRISE_DOCUMENTS):
+            stem = Path(name).stem.replace("enterprise-", "").replace("-", "_")
+            metrics[f"{stem}_word_count"] = documents[name].word_count
+
+        risk_sections = [s for document in documents.values() for s in document.sections_matching("risk")]
+        if risk_sections:
+            risks = sum(1 for section in risk_sections for line in section.body if BULLET_PATTERN.match(line))
+            metrics["risk_score"] = round(min(1.0, risks / RISK_SCORE_SATURATION), 2)
+
+        srs = documents.get("enterprise-srs.md") or documents.get("srs.md")
+        if srs:
+            budgets = [float(value) for section in srs.sections_matching("performance")
+                       for value in LATENCY_PATTERN.findall(section.text())]
+            metrics["srs_performance_budgets_strict"] = any(value <= STRICT_LATENCY_MS for value in budgets)
+
+        tech_stack = _load_json(feature_dir / "collected-project-data.json").get("recommended_tech_stack")
+        if tech_stack:
+            from approval_history import normalize_tech_stack
+
+            if known_tech_stacks is None:
+                known_tech_stacks = load_known_tech_stacks()
+            known = known_tech_stacks | {normalize_tech_stack(stack) for stack in self.trusted_tech_stacks}
+            if known:
+                metrics["tech_stack_differs_from_history"] = normalize_tech_stack(tech_stack) not in known
+
+        return metrics
+
+def load_known_tech_stacks() -> set:
+    """Tech stacks approved at some gate before (own connection, so worker threads can call this)"""
+    from approval_history import ApprovalHistory
+
+    history = ApprovalHistory()
+    try:
+        return history.known_tech_stacks()
+    except Exception:
+        return set()
+    finally:
+        history.close()
+
+@lru_cache(maxsize=None)
+def get_quality_gates(enterprise: bool = False) -> QualityGateEngine:
+    """Engine for the lean or enterprise gate configuration, built (and its triggers compiled) once per process"""
+    automation = _load_json(SCRIPT_DIR / "automation-config.json")
+    gates = _load_json(SCRIPT_DIR / "enterprise-automation-config.json").get("enterprise_quality_gates", {}) \
+        if enterprise else automation.get("quality_gates", {})
+    criteria = _load_json(SCRIPT_DIR / "llm-config.json").get("prompt_engineering", {}).get("validation_criteria", {})
+    trusted = automation.get("user_preferences", {}).get("trusted_technology_stacks", [])
+    return QualityGateEngine(gates, criteria, trusted)
+
+def validate_feature(feature_dir: Path, known_tech_stacks: Optional[set] = None) -> Dict[str, Any]:
+    """Quality gates for one feature directory (enterprise gates when it holds enterprise documents)"""
+    enterprise = any((feature_dir / name).exists() for name in ENTERPRISE_DOCUMENTS)
+    return get_quality_gates(enterprise).validate_feature(feature_dir, known_tech_stacks)
+
+def find_feature_dirs(workspace: Path) -> List[Path]:
+    """Feature directories of a workspace (~/Projects), of one project, or the feature directory itself"""
+    if (workspace / "feature-manifest.json").exists() or (workspace / "feature-manifest.journal.jsonl").exists():
+        return [workspace]
+    candidates = list(workspace.glob("features/*")) + list(workspace.glob("*/features/*"))
+    return sorted(path for path in candidates if path.is_dir())
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+
+"""
+🧭 Run Session - Per-run state shared by every workflow step
+Owns loaded modules, parsed configs, provider clients, caches and accumulated project context
+"""
+
+import json
+import sys
+import threading
+import contextvars
+import dataclasses
+import importlib.util
+import time
+import uuid
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor, wait as futures_wait
+from typing import Dict, List, Optional, Any, Callable
+
+from workflow_logging import get_logger
+import workflow_metrics as metrics
+import workflow_tracing as tracing
+
+SCRIPT_DIR = Path(__file__).parent
+
+# Process-wide module cache so long-lived processes (daemon, batch) load each script once
+_MODULE_CACHE: Dict[str, Any] = {}
+_MODULE_LOCK = threading.Lock()
+
+def load_script_module(module_name: str, script_path: Path):
+    """Load a hyphenated script as a module, reusing it until the file changes"""
+    with _MODULE_LOCK:
+        mtime = script_path.stat().st_mtime
+        cached = _MODULE_CACHE.get(module_name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        spec = importlib.util.spec_from_file_location(module_name, script_path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+
+        _MODULE_CACHE[module_name] = (mtime, module)
+        return module
+
+def _request_fingerprint(request) -> str:
+    """Everything that determines a request's prompt; a draft is only reused if this is unchanged"""
+    return json.dumps(dataclasses.asdict(request), sort_keys=True, default=str)
+
+@dataclasses.dataclass
+class SpeculativeDraft:
+    """Content generated in the background for a step whose gate is still open"""
+    output_file: str
+    fingerprint: str
+    future: Optional[Future] = None
+    cost_usd: float = 0.0
+    meter: Optional[Any] = None  # Spend of the calls the draft finished so far, while it runs
+    finished: bool = False
+    discarded: bool = False
+
+def distill_markdown(content: str, max_chars: int = 2000) -> str:
+    """Headings plus the first lines under each, so earlier artifacts fit in a prompt"""
+    lines = []
+    size = 0
+    kept_under_heading = 0
+    for line in content.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped == "---":
+            continue
+        if stripped.startswith("#"):
+            kept_under_heading = 0
+        elif kept_under_heading >= 2:
+            continue
+        else:
+            kept_under_heading += 1
+        if size + len(stripped) + 1 > max_chars:
+            break
+        lines.append(stripped)
+        size += len(stripped) + 1
+    return "\n".join(lines)
+
+class RunSession:
+    """State created once per workflow run and passed to every step"""
+
+    def __init__(self, feature_name: str, feature_dir: Path, mode: str,
+                 llm_api_enabled: bool = True, llm_provider: Optional[str] = None, llm_model: Optional[str] = None,
+                 llm_config_file: Optional[Path] = None, cost_limit: Optional[float] = None,
+                 debug: bool = False, speculation_budget_usd: Optional[float] = None,
+                 answers: Optional[Dict[str, Any]] = None, interactive: bool = True,
+                 shared_engine: Any = None, multi_agent: Optional[Dict[str, Any]] = None):
+        self.run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.feature_name = feature_name
+        self.feature_dir = feature_dir
+        self.mode = mode
+        self.llm_api_enabled = llm_api_enabled
+        self.llm_provider = llm_provider
+        self.llm_model = llm_model
+        self.llm_config_file = llm_config_file
+        self.cost_limit = cost_limit
+        self.debug = debug
+        self.logger = get_logger('run_session')
+        
+        # Step 01 answers supplied up front (--answers); interactive=False never prompts for missing ones
+        self.answers = answers
+        self.interactive = interactive
+
+        self.feature_dir.mkdir(parents=True, exist_ok=True)
+
+        # Loaded once per run (and once per process for the module itself)
+        self.executor_module = load_script_module("workflow_executor", SCRIPT_DIR / "workflow-executor.py")
+        
+        # Batch/daemon runs share one warm engine's clients, caches, rate limiter and budget
+        self.shared_engine = shared_engine
+        self.llm_config_data = shared_engine.llm_config_data if shared_engine else self._load_llm_config()
+
+        # Accumulated context carried from step to step
+        self.project_data: Dict[str, Any] = self._load_project_data()
+        self.previous_outputs: Dict[str, str] = self._load_existing_outputs()
+
+        self._document_cache: Dict[str, Dict[str, Any]] = {}
+        self._engine = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+        # Speculative drafts generated while a human gate is open (None budget = disabled)
+        self.speculation_budget_usd = speculation_budget_usd
+        self.speculation_wasted_usd = 0.0
+        self._speculations: Dict[str, SpeculativeDraft] = {}
+        self._running_drafts: List[SpeculativeDraft] = []  # Any of them may still end up discarded
+        self._draft_estimate_usd = 0.0  # Cost of the most expensive finished draft
+        self._speculation_pool: Optional[ThreadPoolExecutor] = None
+        
+        # Sections of later documents drafted from partial step 01 answers (progressive drafting)
+        self._section_drafts: Dict[str, SpeculativeDraft] = {}
+        
+        # Background warm-up overlapping step 01's question time
+        self._warm_up: Optional[threading.Thread] = None
+        
+        # Step 07 runs tasks.md on coordinated worker agents when enabled (workflow_execution.multi_agent)
+        self.multi_agent = multi_agent or {}
+
+    def _load_llm_config(self) -> Dict[str, Any]:
+        """Parse the LLM configuration once for the whole run"""
+        config_path = self.llm_config_file if self.llm_config_file and self.llm_config_file.exists() \
+            else SCRIPT_DIR / "llm-config.json"
+        with open(config_path, 'r') as f:
+            return json.load(f)
+
+    def _load_project_data(self) -> Dict[str, Any]:
+        """Pick up project data collected by an earlier step 01 in this feature directory"""
+        data_file = self.feature_dir / "collected-project-data.json"
+        if data_file.exists():
+            try:
+                with open(data_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                self.logger.warning(f"Could not load {data_file}: {e}")
+        return {}
+
+    def _load_existing_outputs(self) -> Dict[str, str]:
+        """Read outputs already present in the feature directory once at run start"""
+        outputs = {}
+        for file_path in self.feature_dir.glob("*.md"):
+            try:
+                content = file_path.read_text(encoding='utf-8')
+                if len(content) > 50:  # Only include substantial content
+                    outputs[file_path.stem] = content
+            except Exception:
+                pass  # Skip files that can't be read
+        return outputs
+
+    def get_engine(self):
+        """Content generation engine shared by all steps (keeps provider clients warm)"""
+        with self._lock:
+            if self._engine is None:
+                from content_generation_engine import ContentGenerationEngine
+                from llm_api_integration import CostBudget
+                # --cost-limit caps this run; a shared engine already carries the batch-wide budget
+                budget = CostBudget(self.cost_limit) if self.cost_limit is not None and self.shared_engine is None else None
+                self._engine = ContentGenerationEngine(
+                    debug=self.debug,
+                    user_provider=self.llm_provider,
+                    user_model=self.llm_model,
+                    llm_config_data=self.llm_config_data,
+                    budget=budget,
+                    shared_from=self.shared_engine
+                )
+            return self._engine
+    
+    def cost_usd(self) -> float:
+        """LLM spend of this run so far"""
+        if self._engine is None:
+            return 0.0
+        return self._engine_cost(self._engine)
+
+    def get_executor(self):
+        """Workflow document executor bound to this session"""
+        with self._lock:
+            if self._executor is None:
+                executor = self.executor_module.WorkflowDocumentExecutor(debug=self.debug, session=self)
+                executor.llm_api_enabled = self.llm_api_enabled
+                executor.llm_provider = self.llm_provider
+                executor.llm_model = self.llm_model
+                executor.llm_config_file = self.llm_config_file
+                executor.cost_limit = self.cost_limit
+                self._executor = executor
+            return self._executor
+
+    def parse_document(self, document_path: Path, parser: Callable[[Path], Dict[str, Any]]) -> Dict[str, Any]:
+        """Parse a workflow document once per run"""
+        key = str(document_path)
+        metrics.record_cache("parsed_document", key in self._document_cache)
+        if key not in self._document_cache:
+            self._document_cache[key] = parser(document_path)
+        return self._document_cache[key]
+
+    def start_warm_up(self, document_path: Path, prime: bool = True) -> bool:
+        """Warm the engine in the background while the user answers step 01's questions
+        
+        Builds provider clients, opens their connections, parses and caches every workflow document
+        next to document_path and (with prime) sends the next documents' prompt prefix once so the
+        first real generation starts hot.
+        """
+        settings = self.llm_config_data.get("prompt_engineering", {}).get("warm_up", {})
+        if not self.llm_api_enabled or not settings.get("enabled", True) or self._warm_up is not None:
+            return False
+        
+        executor = self.get_executor()
+        documents = sorted(p for p in document_path.parent.glob("*.md")
+                           if p.name in self.executor_module.CONTENT_TYPES)
+        content_types = ["tech_stack"] + [self.executor_module.CONTENT_TYPES[p.name] for p in documents]
+        
+        primed = []
+        if prime and settings.get("prime_prompt_cache", False) and document_path in documents:
+            start = documents.index(document_path)
+            primed = [(p, self.executor_module.CONTENT_TYPES[p.name])
+                      for p in documents[start:start + settings.get("prime_documents", 2)]]
+        
+        def warm_up():
+            started = time.time()
+            try:
+                with tracing.span("warm-up", "warm_up", documents=len(documents), primed=len(primed)):
+                    for path in documents:
+                        self.parse_document(path, executor._parse_workflow_document)
+                    summary = self.get_engine().warm_up(documents, content_types, primed)
+                self.logger.info(f"🔥 Warm-up finished in {time.time() - started:.1f}s: {summary['documents']} documents, "
+                                 f"{summary['connections']} connections, {summary['primed']} prompt prefixes primed")
+            except Exception as e:
+                self.logger.warning(f"Warm-up failed (first generation will start cold): {e}")
+        
+        # Carry log context and the active trace into the warm-up thread
+        context = contextvars.copy_context()
+        self._warm_up = threading.Thread(target=context.run, args=(warm_up,), name="warm-up", daemon=True)
+        self._warm_up.start()
+        return True
+    
+    def finish_warm_up(self):
+        """Give a still-running warm-up a bounded head start before the first generation"""
+        if self._warm_up is None or not self._warm_up.is_alive():
+            return
+        settings = self.llm_config_data.get("prompt_engineering", {}).get("warm_up", {})
+        with tracing.span("warm-up wait", "warm_up"):
+            self._warm_up.join(settings.get("max_wait_seconds", 15))
+    
+    def draft_sections(self, request, sections: List[str]) -> bool:
+        """Draft the sections of a later document that the answers so far already determine
+        
+        The draft is only used if the answers it was built from are unchanged when its step runs.
+        """
+        if not self.llm_api_enabled or not sections:
+            return False
+        
+        with self._lock:
+            if request.output_file in self._section_drafts:
+                return True
+            if self._speculation_pool is None:
+                self._speculation_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculate")
+        
+        draft = SpeculativeDraft(request.output_file, json.dumps(request.context.project_data, sort_keys=True, default=str))
+        with self._lock:
+            self._running_drafts.append(draft)
+        context = contextvars.copy_context()
+        draft.future = self._speculation_pool.submit(context.run, self._generate_sections, draft, request, sections)
+        with self._lock:
+            self._section_drafts[request.output_file] = draft
+        self.logger.info(f"✏️  Drafting {', '.join(sections)} of {request.output_file} while questions continue")
+        return True
+    
+    def _generate_sections(self, draft: SpeculativeDraft, request, sections: List[str]) -> str:
+        from llm_api_integration import metered_cost
+        
+        engine = self.get_engine()
+        with metered_cost() as meter:
+            draft.meter = meter
+            try:
+                with tracing.span(f"draft sections {request.content_type}", "speculative", output=request.output_file):
+                    return engine.draft_sections(request, sections)
+            finally:
+                self._finish_draft(draft, meter.cost_usd)
+    
+    def take_section_draft(self, request) -> Optional[str]:
+        """Drafted sections for this request, if every answer they were based on is unchanged"""
+        with self._lock:
+            draft = self._section_drafts.pop(request.output_file, None)
+        if draft is None:
+            return None
+        
+        project_data = request.context.project_data or {}
+        if any(project_data.get(key) != value for key, value in json.loads(draft.fingerprint).items()):
+            self._discard(draft, "stale")
+            return None
+        
+        try:
+            with tracing.span("wait for drafted sections", "speculative", output=request.output_file):
+                content = draft.future.result()
+        except Exception as e:
+            metrics.SPECULATIONS.inc(outcome="failed")
+            self.logger.warning(f"Section draft for {request.output_file} failed, generating in full: {e}")
+            return None
+        if not content:
+            self._discard(draft, "empty")
+            return None
+        
+        metrics.SPECULATIONS.inc(outcome="committed")
+        self.logger.info(f"✏️  Merging drafted sections into {request.output_file}")
+        return content
+    
+    def speculate(self, request) -> bool:
+        """Start generating a gated step's content in the background while the human decides"""
+        if self.speculation_budget_usd is None or not self.llm_api_enabled:
+            return False
+        if request.content_type == "task_processing" and self.multi_agent.get("enabled", False):
+            return False  # Step 07 runs on the agent pool, which a single-call draft would bypass
+
+        with self._lock:
+            if request.output_file in self._speculations:
+                return True
+            # Drafts still running may yet be discarded: reserve their likely cost, and this draft's, up front
+            committed = self.speculation_wasted_usd + sum(
+                max(running.meter.cost_usd if running.meter else 0.0, self._draft_estimate_usd)
+                for running in self._running_drafts)
+            over_budget = committed + self._draft_estimate_usd >= self.speculation_budget_usd
+            if not over_budget:
+                draft = SpeculativeDraft(request.output_file, _request_fingerprint(request))
+                self._running_drafts.append(draft)
+                section_draft = self._section_drafts.get(request.output_file)
+                if self._speculation_pool is None:
+                    self._speculation_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculate")
+        if over_budget:
+            metrics.SPECULATIONS.inc(outcome="over_budget")
+            self.logger.info(f"⏸️  Speculative generation paused: ${committed:.4f} discarded or reserved for running "
+                             f"drafts (budget ${self.speculation_budget_usd:.2f})")
+            return False
+
+        # Carry log context and the active trace into the worker thread
+        context = contextvars.copy_context()
+        draft.future = self._speculation_pool.submit(context.run, self._generate_draft, draft, request, section_draft)
+        with self._lock:
+            self._speculations[request.output_file] = draft
+        self.logger.info(f"⚡ Speculatively generating {request.output_file} while the gate is open")
+        return True
+
+    def _generate_draft(self, draft: SpeculativeDraft, request, section_draft: Optional[SpeculativeDraft] = None) -> str:
+        from llm_api_integration import metered_cost
+
+        engine = self.get_engine()
+        with metered_cost() as meter:
+            draft.meter = meter
+            try:
+                with tracing.span(f"speculative {request.content_type}", "speculative", output=request.output_file):
+                    # A gated step never reaches the executor's own draft merge, so claim its drafted sections here.
+                    # Only a section draft submitted before this one is waited for: it is ahead in the pool's queue.
+                    if section_draft is not None:
+                        futures_wait([section_draft.future])
+                        drafted_sections = self.take_section_draft(request)
+                        if drafted_sections:
+                            request = dataclasses.replace(request, drafted_sections=drafted_sections)
+                    return engine.generate_content(request)
+            finally:
+                self._finish_draft(draft, meter.cost_usd)
+
+    def _finish_draft(self, draft: SpeculativeDraft, cost_usd: float):
+        """Record a draft's own spend; count it as waste if the draft was discarded while running"""
+        with self._lock:
+            draft.cost_usd = cost_usd
+            draft.finished = True
+            discarded = draft.discarded
+            if draft in self._running_drafts:
+                self._running_drafts.remove(draft)
+            self._draft_estimate_usd = max(self._draft_estimate_usd, cost_usd)
+        if discarded:
+            self._waste(draft)
+
+    def _engine_cost(self, engine) -> float:
+        return float(engine.get_usage_summary().get("total_cost_usd", 0.0) or 0.0)
+
+    def _waste(self, draft: SpeculativeDraft):
+        with self._lock:
+            self.speculation_wasted_usd += draft.cost_usd
+        metrics.SPECULATIVE_WASTE.inc(draft.cost_usd)
+
+    def take_speculation(self, request) -> Optional[str]:
+        """Commit the draft for this request if it was built from identical inputs"""
+        with self._lock:
+            draft = self._speculations.pop(request.output_file, None)
+        if draft is None:
+            return None
+
+        if draft.fingerprint != _request_fingerprint(request):
+            self._discard(draft, "stale")
+            return None
+
+        try:
+            content = draft.future.result()
+        except Exception as e:
+            metrics.SPECULATIONS.inc(outcome="failed")
+            self.logger.warning(f"Speculative draft for {request.output_file} failed, regenerating: {e}")
+            return None
+
+        metrics.SPECULATIONS.inc(outcome="committed")
+        self.logger.info(f"⚡ Using speculative draft for {request.output_file}")
+        return content
+
+    def discard_speculation(self, reason: str = "discarded"):
+        """Drop every pending draft (gate rejected or step skipped); their spend counts against the budget"""
+        with self._lock:
+            drafts = list(self._speculations.values())
+            self._speculations.clear()
+        for draft in drafts:
+            self._discard(draft, reason)
+
+    def _discard(self, draft: SpeculativeDraft, reason: str):
+        metrics.SPECULATIONS.inc(outcome=reason)
+        self.logger.info(f"🗑️  Discarding speculative draft for {draft.output_file} ({reason})")
+        with self._lock:
+            draft.discarded = True
+            finished = draft.finished
+        if finished:
+            self._waste(draft)
+
+    def record_project_data(self, project_data: Dict[str, Any]):
+        """Make step 01's collected data available to every later step"""
+        self.project_data = dict(project_data)
+
+    def record_output(self, output_path: Path, content: str):
+        """Remember a generated document so later steps don't re-read the directory"""
+        if len(content) > 50:
+            self.previous_outputs[output_path.stem] = content
+
+        if output_path.parent.parent.name == "features":
+            from document_index import notify_document_written
+            notify_document_written(output_path)
+
+    def close(self):
+        """Fold the run's manifest journal into feature-manifest.json"""
+        from manifest_journal import open_journal
+
+        self.discard_speculation()
+        with self._lock:
+            unused = list(self._section_drafts.values())
+            self._section_drafts.clear()
+        for draft in unused:
+            self._discard(draft, "unused")
+        if self._speculation_pool is not None:
+            self._speculation_pool.shutdown(wait=False, cancel_futures=True)
+
+        journal = open_journal(self.feature_dir / "feature-manifest.json")
+        if journal.exists():
+            try:
+                journal.compact()
+            except Exception as e:
+                self.logger.warning(f"Could not compact feature manifest: {e}")
+
+        from workspace_catalog import notify_feature_changed
+        notify_feature_changed(self.feature_dir)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+
+"""
+⏱️ CLI Startup Benchmark - Import-time budgets for workflow-runner.py and ai-agent-integration.py subcommands
+Runs each subcommand under `python -X importtime` and enforces per-command startup budgets
+"""
+
+import json
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+from typing import List, Optional, Tuple
+from dataclasses import dataclass, asdict
+
+SCRIPT_DIR = Path(__file__).parent
+
+# Modules that must never be imported just to start the CLI
+HEAVY_MODULES = ["openai", "anthropic", "google.generativeai", "requests", "httpx", "grpc"]
+
+@dataclass
+class StartupBudget:
+    name: str
+    command: List[str]
+    budget_ms: float
+    forbidden_modules: List[str]
+
+@dataclass
+class StartupResult:
+    name: str
+    import_time_ms: float
+    budget_ms: float
+    modules_imported: int
+    forbidden_imported: List[str]
+    within_budget: bool
+
+DEFAULT_BUDGETS = [
+    StartupBudget("help", ["workflow-runner.py", "--help"], 150.0, HEAVY_MODULES),
+    StartupBudget("list-projects", ["workflow-runner.py", "list-projects"], 150.0, HEAVY_MODULES),
+    StartupBudget("status", ["workflow-runner.py", "status", "startup-benchmark-missing-project"], 150.0, HEAVY_MODULES),
+    StartupBudget("create-mvp --help", ["workflow-runner.py", "create-mvp", "--help"], 150.0, HEAVY_MODULES),
+    StartupBudget("add-feature --help", ["workflow-runner.py", "add-feature", "--help"], 150.0, HEAVY_MODULES),
+    StartupBudget("serve --help", ["workflow-runner.py", "serve", "--help"], 150.0, HEAVY_MODULES),
+    StartupBudget("search --help", ["workflow-runner.py", "search", "--help"], 150.0, HEAVY_MODULES),
+    StartupBudget("daemon-status --help", ["workflow-runner.py", "daemon-status", "--help"], 150.0, HEAVY_MODULES),
+    StartupBudget("agent-integration --help", ["ai-agent-integration.py", "--help"], 150.0, HEAVY_MODULES),
+    StartupBudget("validate --help", ["ai-agent-integration.py", "validate", "--help"], 150.0, HEAVY_MODULES),
+    StartupBudget("validate-workspace --help", ["ai-agent-integration.py", "validate-workspace", "--help"], 150.0, HEAVY_MODULES),
+    StartupBudget("watch --help", ["ai-agent-integration.py", "watch", "--help"], 150.0, HEAVY_MODULES),
+    StartupBudget("agent --help", ["ai-agent-integration.py", "agent", "--help"], 150.0, HEAVY_MODULES),
+    StartupBudget("task-graph --help", ["ai-agent-integration.py", "task-graph", "--help"], 150.0, HEAVY_MODULES),
+    # Touching the engine must not pull in any provider SDK until a provider is used
+    StartupBudget("import content_generation_engine", ["-c", "import content_generation_engine"], 250.0, HEAVY_MODULES),
+]
+
+def parse_importtime(stderr: str) -> Tuple[float, List[str]]:
+    """Parse `-X importtime` output into total milliseconds and imported module names"""
+    total_us = 0
+    modules = []
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # Header line
+
+        cumulative_us = int(parts[1].strip())
+        name = parts[2].rstrip()
+
+        # Top-level imports are not indented; their cumulative time already covers nested imports
+        if not name.startswith("  "):
+            total_us += cumulative_us
+        modules.append(name.strip())
+
+    return total_us / 1000.0, modules
+
+def measure_startup(budget: StartupBudget, runs: int = 3) -> StartupResult:
+    """Measure best-of-N import time for one command"""
+    best_ms: Optional[float] = None
+    modules: List[str] = []
+
+    for _ in range(runs):
+        cmd = [sys.executable, "-X", "importtime"]
+        if budget.command[0].endswith(".py"):
+            cmd.append(str(SCRIPT_DIR / budget.command[0]))
+            cmd.extend(budget.command[1:])
+        else:
+            cmd.extend(budget.command)
+
+        result = subprocess.run(cmd, capture_output=True, text=True, cwd=SCRIPT_DIR, timeout=60)
+        import_time_ms, modules = parse_importtime(result.stderr)
+        if best_ms is None or import_time_ms < best_ms:
+            best_ms = import_time_ms
+
+    forbidden = sorted({
+        module for module in modules
+        for heavy in budget.forbidden_modules
+        if module == heavy or module.startswith(heavy + ".")
+    })
+
+    return StartupResult(
+        name=budget.name,
+        import_time_ms=round(best_ms or 0.0, 1),
+        budget_ms=budget.budget_ms,
+        modules_imported=len(modules),
+        forbidden_imported=forbidden,
+        within_budget=(best_ms or 0.0) <= budget.budget_ms and not forbidden
+    )
+
+def run_benchmark(budgets: List[StartupBudget], runs: int = 3) -> List[StartupResult]:
+    """Measure every command in the budget table"""
+    return [measure_startup(budget, runs) for budget in budgets]
+
+def print_results(results: List[StartupResult]):
+    """Print a startup budget table"""
+    print(f"\n⏱️  CLI STARTUP BUDGETS")
+    print("=" * 78)
+    print(f"{'Command':<36} {'Import ms':>10} {'Budget ms':>10} {'Modules':>8}  Result")
+    print("-" * 78)
+    for result in results:
+        icon = "✅" if result.within_budget else "❌"
+        print(f"{result.name:<36} {result.import_time_ms:>10.1f} {result.budget_ms:>10.1f} {result.modules_imported:>8}  {icon}")
+        if result.forbidden_imported:
+            print(f"   ⚠️  Heavy modules imported: {', '.join(result.forbidden_imported)}")
+    print("=" * 78)
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="⏱️ CLI Startup Benchmark - Import-time budgets for workflow-runner.py and ai-agent-integration.py subcommands"
+    )
+
+    parser.add_argument("--runs",
+                       type=int,
+                       default=3,
+                       help="Runs per command; the fastest run is reported (default: 3)")
+
+    parser.add_argument("--budget-scale",
+                       type=float,
+                       default=1.0,
+                       help="Multiply all budgets (e.g. 2.0 on slow CI machines)")
+
+    parser.add_argument("--json",
+                       action="store_true",
+                       help="Print results as JSON")
+
+    args = parser.parse_args()
+
+    budgets = [
+        StartupBudget(b.name, b.command, b.budget_ms * args.budget_scale, b.forbidden_modules)
+        for b in DEFAULT_BUDGETS
+    ]
+    results = run_benchmark(budgets, runs=args.runs)
+
+    if args.json:
+        print(json.dumps([asdict(result) for result in results], indent=2))
+    else:
+        print_results(results)
+
+    sys.exit(0 if all(result.within_budget for result in results) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+
+"""
+🕸️ Task Graph - Typed dependency DAG extracted from a generated tasks.md
+Critical path, slack and parallel width by the critical path method, stored as JSON next to the document
+"""
+
+import json
+import re
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+from quality_gates import parse_document, section_key
+
+# Tasks without an estimate count this many hours
+DEFAULT_ESTIMATE_HOURS = 2.0
+UNIT_HOURS = {"h": 1.0, "d": 8.0, "w": 40.0}
+
+TASK_LINE = re.compile(r'^(\s*)[-*]\s+\[([ xX])\]\s+\**(\d+(?:\.\d+)*)\.?\**\s*(.*)$')
+TASK_REFERENCE = re.compile(r'Task\s+(\d+(?:\.\d+)*)', re.IGNORECASE)
+DEPENDS_PHRASE = re.compile(r'(?:depends on|requires|after|blocked by)\s+\**Task\s+(\d+(?:\.\d+)*)', re.IGNORECASE)
+ESTIMATE = re.compile(r'\b(\d+(?:\.\d+)?)\s*(h|hrs?|hours?|d|days?|w|wks?|weeks?)\b', re.IGNORECASE)
+REQUIREMENT_ID = re.compile(r'\b(?:REQ|NFR|FR|US|SEC|PERF)-[A-Za-z0-9]+(?:[.-][A-Za-z0-9]+)*\b')
+ARROW = re.compile(r'→|->')
+
+@dataclass
+class Timing:
+    """Critical path method schedule of one item (hours from the start of the remaining work)"""
+    earliest_start: float
+    earliest_finish: float
+    latest_start: float
+    latest_finish: float
+    slack: float
+    critical: bool
+
+@dataclass
+class TaskNode:
+    """A unit of work: a subtask, or a parent task that has none"""
+    task_id: str
+    title: str
+    parent: str
+    estimate_hours: float
+    estimated: bool
+    done: bool = False
+    dependencies: List[str] = field(default_factory=list)
+    requirements: List[str] = field(default_factory=list)
+    schedule: Optional[Timing] = None
+
+    @property
+    def remaining_hours(self) -> float:
+        return 0.0 if self.done else self.estimate_hours
+
+@dataclass
+class ParentTask:
+    """A numbered parent task of tasks.md and the nodes it is made of"""
+    task_id: str
+    title: str
+    order: int
+    done: bool = False
+    context: str = ""
+    notes: List[str] = field(default_factory=list)
+    tasks: List[str] = field(default_factory=list)
+    dependencies: List[str] = field(default_factory=list)
+    requirements: List[str] = field(default_factory=list)
+    acceptance_criteria: List[str] = field(default_factory=list)
+    estimate_hours: float = 0.0
+    schedule: Optional[Timing] = None
+
+@dataclass
+class TaskGraph:
+    """Nodes and parent tasks of one tasks.md with their schedules"""
+    source: str
+    nodes: Dict[str, TaskNode]
+    parents: Dict[str, ParentTask]
+    critical_path: List[str] = field(default_factory=list)
+    makespan_hours: float = 0.0
+    max_parallel_width: int = 0
+    cycle: Optional[List[str]] = None
+
+    @property
+    def total_hours(self) -> float:
+        return sum(node.remaining_hours for node in self.nodes.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "generated_at": datetime.now().isoformat(),
+            "summary": {
+                "tasks": len(self.nodes),
+                "parent_tasks": len(self.parents),
+                "remaining_hours": round(self.total_hours, 2),
+                "makespan_hours": round(self.makespan_hours, 2),
+                "parallel_speedup": round(self.total_hours / self.makespan_hours, 2) if self.makespan_hours else None,
+                "max_parallel_width": self.max_parallel_width,
+                "critical_path": self.critical_path,
+                "cycle": self.cycle
+            },
+            "tasks": [asdict(node) for node in self.nodes.values()],
+            "parent_tasks": [asdict(parent) for parent in self.parents.values()]
+        }
+
+def find_cycle(dependencies: Dict[str, List[str]]) -> Optional[List[str]]:
+    """A dependency chain that loops back on itself (first node repeated at the end), or None"""
+    visiting: List[str] = []
+    done = set()
+
+    def visit(item: str) -> Optional[List[str]]:
+        if item in visiting:
+            return visiting[visiting.index(item):] + [item]
+        if item in done:
+            return None
+        visiting.append(item)
+        for dependency in dependencies.get(item, []):
+            cycle = visit(dependency)
+            if cycle:
+                return cycle
+        visiting.pop()
+        done.add(item)
+        return None
+
+    for item in dependencies:
+        cycle = visit(item)
+        if cycle:
+            return cycle
+    return None
+
+def critical_path_schedule(durations: Dict[str, float], dependencies: Dict[str, List[str]]) -> Dict[str, Timing]:
+    """Earliest/latest start and finish and slack of every item; a cycle raises ValueError"""
+    cycle = find_cycle(dependencies)
+    if cycle:
+        raise ValueError(f"Dependency cycle: {' → '.join(cycle)}")
+
+    order: List[str] = []
+    placed = set()
+
+    def place(item: str):
+        if item not in placed:
+            placed.add(item)
+            for dependency in dependencies.get(item, []):
+                place(dependency)
+            order.append(item)
+
+    for item in durations:
+        place(item)
+
+    earliest: Dict[str, float] = {}
+    for item in order:
+        earliest[item] = max((earliest[d] + durations[d] for d in dependencies.get(item, [])), default=0.0)
+    makespan = max((earliest[item] + durations[item] for item in order), default=0.0)
+
+    successors: Dict[str, List[str]] = {item: [] for item in order}
+    for item in order:
+        for dependency in dependencies.get(item, []):
+            successors[dependency].append(item)
+    latest_finish: Dict[str, float] = {}
+    for item in reversed(order):
+        latest_finish[item] = min((latest_finish[s] - durations[s] for s in successors[item]), default=makespan)
+
+    timings = {}
+    for item in order:
+        slack = latest_finish[item] - durations[item] - earliest[item]
+        timings[item] = Timing(round(earliest[item], 2), round(earliest[item] + durations[item], 2),
+                               round(latest_finish[item] - durations[item], 2), round(latest_finish[item], 2),
+                               round(slack, 2), abs(slack) < 1e-9)
+    return timings
+
+def _estimate(text: str) -> Optional[float]:
+    match = ESTIMATE.search(text)
+    if not match:
+        return None
+    return float(match.group(1)) * UNIT_HOURS[match.group(2)[0].lower()]
+
+def _requirements(text: str) -> List[str]:
+    return list(dict.fromkeys(REQUIREMENT_ID.findall(text)))
+
+def _major(task_id: str) -> str:
+    return task_id.split(".")[0]
+
+def parse_task_graph(tasks_path: Path) -> TaskGraph:
+    """Typed DAG of a tasks.md
+
+    Subtasks of a parent run in their listed order. Cross-task dependencies come from the Task
+    Dependencies chains ("**Task 1.2** → **Task 2.1**") and "depends on Task X" phrases; a parent
+    reference ("Task 2.0") means its last subtask before an arrow and its first one after it.
+    """
+    document = parse_document(tasks_path)
+    parents: Dict[str, ParentTask] = {}
+    nodes: Dict[str, TaskNode] = {}
+    explicit: Dict[str, Optional[float]] = {}
+
+    # "## Tasks (Context-Embedded)", not the "# Tasks for ..." title above it
+    task_lines = next((section.body for section in document.headings if section_key(section.title).startswith("tasks")
+                       and any(TASK_LINE.match(line) for line in section.body)), [])
+    current: Optional[ParentTask] = None
+    for line in task_lines:
+        match = TASK_LINE.match(line)
+        if match:
+            indent, checked, task_id, title = match.groups()
+            title = title.strip()
+            if not indent and _major(task_id) not in parents:
+                current = ParentTask(task_id, title, len(parents), done=checked != " ",
+                                     requirements=_requirements(title))
+                parents[_major(task_id)] = current
+                explicit[current.task_id] = _estimate(title)
+            elif current and task_id not in nodes:
+                nodes[task_id] = TaskNode(task_id, title, current.task_id, DEFAULT_ESTIMATE_HOURS, False,
+                                          done=checked != " " or current.done, requirements=_requirements(title))
+                explicit[task_id] = _estimate(title)
+                current.tasks.append(task_id)
+        elif current and line.strip():
+            stripped = re.sub(r'^[-*]\s+', '', line.strip())
+            if stripped.lower().startswith("**context**"):
+                current.context = stripped.split(":", 1)[-1].strip(" *")
+            else:
+                current.notes.append(stripped)
+            current.requirements.extend(r for r in _requirements(stripped) if r not in current.requirements)
+
+    # Estimates: the subtask's own, else a share of its parent's, else the default
+    for parent in parents.values():
+        if not parent.tasks:
+            nodes[parent.task_id] = TaskNode(parent.task_id, parent.title, parent.task_id, DEFAULT_ESTIMATE_HOURS,
+                                             False, done=parent.done)
+            parent.tasks.append(parent.task_id)
+        unestimated = [task_id for task_id in parent.tasks if explicit.get(task_id) is None]
+        share = explicit.get(parent.task_id) / len(unestimated) if explicit.get(parent.task_id) and unestimated else None
+        for task_id in parent.tasks:
+            hours = explicit.get(task_id) if explicit.get(task_id) is not None else share
+            if hours is not None:
+                nodes[task_id].estimate_hours, nodes[task_id].estimated = hours, True
+        for previous, task_id in zip(parent.tasks, parent.tasks[1:]):
+            nodes[task_id].dependencies.append(previous)
+
+    # Acceptance criteria are listed in parent task order
+    criteria = [line.strip()[2:].strip() for section in document.headings
+                if section_key(section.title).startswith("acceptance criteria")
+                for line in section.body if line.strip().startswith(("- ", "* "))]
+    for parent, criterion in zip(sorted(parents.values(), key=lambda p: p.order), criteria):
+        parent.acceptance_criteria.append(criterion)
+        parent.requirements.extend(r for r in _requirements(criterion) if r not in parent.requirements)
+
+    def resolve(ref: str, first: bool) -> Optional[str]:
+        if ref in nodes:
+            return ref
+        parent = parents.get(_major(ref))
+        if parent is None:
+            return None
+        return parent.tasks[0] if first else parent.tasks[-1]
+
+    def depend(task_id: Optional[str], dependency: Optional[str]):
+        if task_id and dependency and task_id != dependency and dependency not in nodes[task_id].dependencies:
+            nodes[task_id].dependencies.append(dependency)
+
+    for section in document.headings:
+        if "dependencies" not in section_key(section.title):
+            continue
+        for line in section.text().splitlines():
+            if ARROW.search(line):
+                refs = TASK_REFERENCE.findall(line)
+                for before, after in zip(refs, refs[1:]):
+                    depend(resolve(after, True), resolve(before, False))
+
+    for parent in parents.values():
+        text = "\n".join([parent.title, parent.context] + parent.notes + [nodes[t].title for t in parent.tasks])
+        for ref in DEPENDS_PHRASE.findall(text):
+            if parents.get(_major(ref)) is not parent:
+                depend(parent.tasks[0], resolve(ref, False))
+
+    for parent in parents.values():
+        parent.estimate_hours = sum(nodes[task_id].estimate_hours for task_id in parent.tasks)
+        for task_id in parent.tasks:
+            for dependency in nodes[task_id].dependencies:
+                owner = nodes[dependency].parent
+                if owner != parent.task_id and owner not in parent.dependencies:
+                    parent.dependencies.append(owner)
+
+    graph = TaskGraph(str(tasks_path), nodes, {parent.task_id: parent for parent in parents.values()})
+    _schedule(graph)
+    return graph
+
+def _schedule(graph: TaskGraph):
+    """Fill in schedules, critical path and width; a cycle is recorded instead"""
+    node_dependencies = {task_id: node.dependencies for task_id, node in graph.nodes.items()}
+    graph.cycle = find_cycle(node_dependencies)
+    if graph.cycle:
+        return
+
+    timings = critical_path_schedule({task_id: node.remaining_hours for task_id, node in graph.nodes.items()},
+                                     node_dependencies)
+    for task_id, timing in timings.items():
+        graph.nodes[task_id].schedule = timing
+    graph.makespan_hours = max((timing.earliest_finish for timing in timings.values()), default=0.0)
+
+    # Walk back from the last critical task through critical predecessors that end as it starts
+    remaining = [node for node in graph.nodes.values() if node.remaining_hours]
+    end = max((node for node in remaining if node.schedule.critical),
+              key=lambda node: node.schedule.earliest_finish, default=None)
+    path = []
+    while end is not None:
+        path.append(end.task_id)
+        end = next((graph.nodes[d] for d in end.dependencies if graph.nodes[d].schedule.critical
+                    and graph.nodes[d].remaining_hours
+                    and abs(graph.nodes[d].schedule.earliest_finish - end.schedule.earliest_start) < 1e-9), None)
+    graph.critical_path = list(reversed(path))
+
+    # Most tasks in progress at once when every task starts as early as possible
+    events = sorted([(node.schedule.earliest_start, 1) for node in remaining] +
+                    [(node.schedule.earliest_finish, -1) for node in remaining])
+    width = running = 0
+    for _, change in events:
+        running += change
+        width = max(width, running)
+    graph.max_parallel_width = width
+
+    parent_dependencies = {task_id: parent.dependencies for task_id, parent in graph.parents.items()}
+    if not find_cycle(parent_dependencies):
+        durations = {task_id: sum(graph.nodes[t].remaining_hours for t in parent.tasks)
+                     for task_id, parent in graph.parents.items()}
+        for task_id, timing in critical_path_schedule(durations, parent_dependencies).items():
+            graph.parents[task_id].schedule = timing
+
+def graph_path(tasks_path: Path) -> Path:
+    """tasks.md → tasks-graph.json, enterprise-tasks.md → enterprise-tasks-graph.json"""
+    return tasks_path.with_name(f"{tasks_path.stem}-graph.json")
+
+def write_task_graph(tasks_path: Path) -> TaskGraph:
+    """Parse tasks_path and store its graph as JSON next to it"""
+    graph = parse_task_graph(tasks_path)
+    graph_path(tasks_path).write_text(json.dumps(graph.to_dict(), indent=2))
+    return graph
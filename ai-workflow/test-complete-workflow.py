@@ -363,6 +363,36 @@ class WorkflowTester:
         
         return success_rate >= 0.8  # 80% pass rate required
     
+    def test_startup_budget(self) -> bool:
+        """Test that every CLI subcommand starts within its import-time budget"""
+        self.log_header("Testing CLI Startup Budget")
+        
+        try:
+            cmd = [
+                "python3", str(self.script_dir / "startup-benchmark.py"),
+                "--json"
+            ]
+            
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+            measurements = json.loads(result.stdout)
+            
+            for measurement in measurements:
+                if measurement["within_budget"]:
+                    self.log_success(f"{measurement['name']}: {measurement['import_time_ms']}ms (budget {measurement['budget_ms']}ms)")
+                else:
+                    self.log_error(f"{measurement['name']}: {measurement['import_time_ms']}ms (budget {measurement['budget_ms']}ms)")
+                    if measurement["forbidden_imported"]:
+                        self.log_error(f"   Heavy modules imported: {', '.join(measurement['forbidden_imported'])}")
+            
+            return result.returncode == 0
+            
+        except subprocess.TimeoutExpired:
+            self.log_error("Startup benchmark timed out")
+            return False
+        except Exception as e:
+            self.log_error(f"Startup benchmark error: {e}")
+            return False
+    
     def cleanup_test_artifacts(self):
         """Clean up test projects and files"""
         if not self.cleanup_enabled:
@@ -469,7 +499,12 @@ class WorkflowTester:
         if not results["error_handling"]:
             self.failed_tests.append("Error Handling")
         
-        # Test 6: LLM Integration (if requested and available)
+        # Test 6: CLI Startup Budget
+        results["startup_budget"] = self.test_startup_budget()
+        if not results["startup_budget"]:
+            self.failed_tests.append("CLI Startup Budget")
+        
+        # Test 7: LLM Integration (if requested and available)
         if test_llm:
             self.log_header("Testing LLM Integration")
             
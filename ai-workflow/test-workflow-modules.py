@@ -0,0 +1,1824 @@
+#!/usr/bin/env python3
+
+"""
+🧪 Workflow Module Test Suite
+Fast, offline behaviour tests for the supporting modules behind workflow-runner.py
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    BLUE = '\033[0;34m'
+    PURPLE = '\033[0;35m'
+    CYAN = '\033[0;36m'
+    NC = '\033[0m'  # No Color
+
+class ModuleTester:
+    """Behaviour tests for individual workflow modules (no LLM, no network)"""
+    
+    def __init__(self, debug: bool = False):
+        self.debug = debug
+        self.script_dir = Path(__file__).parent
+        self.work_dir = Path(tempfile.mkdtemp(prefix="ai-workflow-module-tests-"))
+        self.failed_tests = []
+    
+    def log_info(self, message: str):
+        print(f"{Colors.BLUE}ℹ️  {message}{Colors.NC}")
+    
+    def log_success(self, message: str):
+        print(f"{Colors.GREEN}✅ {message}{Colors.NC}")
+    
+    def log_warning(self, message: str):
+        print(f"{Colors.YELLOW}⚠️  {message}{Colors.NC}")
+    
+    def log_error(self, message: str):
+        print(f"{Colors.RED}❌ {message}{Colors.NC}")
+    
+    def log_header(self, message: str):
+        print(f"{Colors.PURPLE}🚀 {message}{Colors.NC}")
+    
+    def check(self, condition: bool, message: str) -> bool:
+        """Log one assertion and return its outcome"""
+        if condition:
+            if self.debug:
+                self.log_success(message)
+        else:
+            self.log_error(message)
+        return condition
+    
+    def scratch_dir(self, name: str) -> Path:
+        """Fresh directory under the suite's temporary root"""
+        path = self.work_dir / name
+        shutil.rmtree(path, ignore_errors=True)
+        path.mkdir(parents=True)
+        return path
+    
+    def wait_for(self, predicate: Callable[[], bool], timeout: float = 5.0) -> bool:
+        """Poll until predicate holds or the timeout expires"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.01)
+        return predicate()
+    
+    def load_script(self, filename: str):
+        """Import a hyphenated CLI script as a module"""
+        import importlib.util
+        
+        name = filename[:-3].replace("-", "_")
+        if name not in sys.modules:
+            spec = importlib.util.spec_from_file_location(name, self.script_dir / filename)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[name] = module
+            spec.loader.exec_module(module)
+        return sys.modules[name]
+    
+    def test_daemon_job_queue(self) -> bool:
+        """Test daemon job validation, backpressure and finished-job eviction"""
+        self.log_header("Testing Workflow Daemon Job Queue")
+        from workflow_daemon import WorkflowJobQueue, JobStatus
+        
+        results = []
+        
+        # Unknown job types are rejected before queueing
+        job_queue = WorkflowJobQueue(handler=lambda job: {"success": True})
+        try:
+            job_queue.submit("deploy", {})
+            results.append(self.check(False, "Unknown job type accepted"))
+        except ValueError:
+            results.append(self.check(True, "Unknown job type rejected"))
+        job_queue.shutdown()
+        
+        # Queued plus running jobs are capped at max_pending
+        release = threading.Event()
+        job_queue = WorkflowJobQueue(handler=lambda job: release.wait(5) and {"success": True},
+                                     max_workers=1, max_pending=2)
+        job_queue.submit("create-mvp", {"project": "a"})
+        job_queue.submit("create-mvp", {"project": "b"})
+        try:
+            job_queue.submit("create-mvp", {"project": "c"})
+            results.append(self.check(False, "Submission beyond max_pending accepted"))
+        except RuntimeError:
+            results.append(self.check(True, "Submission beyond max_pending rejected"))
+        release.set()
+        job_queue.shutdown()
+        
+        # Failed handlers mark the job failed instead of killing the worker
+        job_queue = WorkflowJobQueue(handler=lambda job: sys.exit(3))
+        job = job_queue.submit("create-mvp", {"project": "a"})
+        job_queue.shutdown()
+        results.append(self.check(job.status == JobStatus.FAILED and job.error, "Handler exit recorded as failed job"))
+        
+        # Finished jobs beyond the count cap are evicted oldest first
+        job_queue = WorkflowJobQueue(handler=lambda job: {"success": True}, max_workers=1, max_finished_jobs=2)
+        jobs = [job_queue.submit("create-mvp", {"project": str(i)}) for i in range(5)]
+        self.wait_for(lambda: all(job.finished for job in jobs))
+        remaining = {job.job_id for job in job_queue.list_jobs()}
+        results.append(self.check(remaining == {jobs[3].job_id, jobs[4].job_id},
+                                  f"Count cap keeps the newest finished jobs ({len(remaining)} kept)"))
+        results.append(self.check(job_queue.get(jobs[0].job_id) is None, "Evicted job no longer queryable"))
+        job_queue.shutdown()
+        
+        # Finished jobs past their TTL are evicted; running ones never are
+        release = threading.Event()
+        
+        def handler(job):
+            if job.params.get("block"):
+                release.wait(5)
+            return {"success": True}
+        
+        job_queue = WorkflowJobQueue(handler=handler, max_workers=2, job_ttl_seconds=0)
+        done = job_queue.submit("create-mvp", {"project": "done"})
+        running = job_queue.submit("create-mvp", {"project": "running", "block": True})
+        self.wait_for(lambda: done.finished)
+        time.sleep(0.01)
+        health = job_queue.health()
+        results.append(self.check([job.job_id for job in job_queue.list_jobs()] == [running.job_id],
+                                  "TTL evicts finished jobs but keeps running ones"))
+        results.append(self.check(health["jobs"]["succeeded"] == 0 and health["jobs"]["running"] == 1,
+                                  "Health counts reflect evicted jobs"))
+        release.set()
+        job_queue.shutdown()
+        
+        return all(results)
+    
+    def test_manifest_journal(self) -> bool:
+        """Test journal folding, cross-instance visibility, compaction and torn writes"""
+        self.log_header("Testing Manifest Journal")
+        from manifest_journal import ManifestJournal, apply_operation
+        
+        results = []
+        view_path = self.scratch_dir("journal") / "feature-manifest.json"
+        
+        # Operations fold onto the base manifest
+        journal = ManifestJournal(view_path, compact_every=1000)
+        journal.append([{"op": "set", "path": ["status"], "value": "in_progress"}],
+                       base={"feature": "auth", "steps": {}, "files": []})
+        journal.append([{"op": "merge", "path": ["steps", "01"], "value": {"status": "completed"}},
+                        {"op": "extend", "path": ["files"], "value": ["prd.md"]}])
+        manifest = journal.read()
+        results.append(self.check(manifest == {"feature": "auth", "status": "in_progress",
+                                               "steps": {"01": {"status": "completed"}}, "files": ["prd.md"]},
+                                  "Operations fold onto the base manifest"))
+        
+        # A second base never re-initializes an existing manifest
+        journal.append([], base={"feature": "other"})
+        results.append(self.check(journal.read()["feature"] == "auth", "Existing manifest not re-initialized"))
+        
+        # Concurrent writers through separate instances (as separate processes would) lose nothing
+        writers = [ManifestJournal(view_path, compact_every=7) for _ in range(4)]
+        
+        def write(writer: ManifestJournal, index: int):
+            for n in range(10):
+                writer.append([{"op": "extend", "path": ["files"], "value": [f"{index}-{n}.md"]}])
+        
+        threads = [threading.Thread(target=write, args=(writer, i)) for i, writer in enumerate(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        files = ManifestJournal(view_path).read()["files"]
+        results.append(self.check(len(files) == 41 and len(set(files)) == 41,
+                                  f"Concurrent appends all visible ({len(files)}/41)"))
+        results.append(self.check(journal.read() == ManifestJournal(view_path).read(),
+                                  "Stale instance catches up after foreign compactions"))
+        
+        # Compaction folds everything into the view and empties the journal
+        state = journal.compact()
+        view = json.loads(view_path.read_text())
+        view.pop("_journal")
+        results.append(self.check(view == state and journal.journal_path.read_text() == "",
+                                  "Compaction writes the view and truncates the journal"))
+        
+        # A torn trailing line from a crashed writer is ignored until completed
+        with open(journal.journal_path, 'a') as f:
+            f.write('{"seq": 999, "operations": [{"op": "set", "path": ["status"], "value": "torn"}]')
+        results.append(self.check(ManifestJournal(view_path).read()["status"] == "in_progress",
+                                  "Partial journal line ignored"))
+        
+        try:
+            apply_operation({}, {"op": "delete", "path": ["status"]})
+            results.append(self.check(False, "Unknown operation accepted"))
+        except ValueError:
+            results.append(self.check(True, "Unknown operation rejected"))
+        
+        return all(results)
+    
+    def test_project_registry(self) -> bool:
+        """Test locked project manifest updates, feature dir allocation and the run registry"""
+        self.log_header("Testing Project Registry")
+        from project_registry import (update_project_manifest, read_project_manifest, allocate_feature_dir,
+                                      register_run, finish_run, active_runs)
+        
+        results = []
+        project_root = self.scratch_dir("registry") / "my-app"
+        project_root.mkdir()
+        update_project_manifest(project_root, lambda manifest: manifest.update(features=[]))
+        
+        # Concurrent read-modify-write cycles never lose an update
+        def add_features(index: int):
+            for n in range(10):
+                update_project_manifest(project_root, lambda manifest: manifest["features"].append(f"{index}-{n}"))
+        
+        threads = [threading.Thread(target=add_features, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        features = read_project_manifest(project_root)["features"]
+        results.append(self.check(len(features) == 40 and len(set(features)) == 40,
+                                  f"Concurrent manifest updates all kept ({len(features)}/40)"))
+        
+        # Concurrent runs of the same feature get distinct directories
+        claimed = []
+        threads = [threading.Thread(target=lambda: claimed.append(allocate_feature_dir(project_root, "User Auth")))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        names = sorted(path.name for path in claimed)
+        results.append(self.check(len(set(names)) == 5 and names[0].endswith("-user-auth"),
+                                  f"Feature directories unique per run ({', '.join(names)})"))
+        
+        # Runs are active until finished; dead local processes are not reported
+        register_run(project_root, "run-live", "add-feature", "user-auth", claimed[0])
+        register_run(project_root, "run-dead", "add-feature", "payments", claimed[1])
+        update_project_manifest(project_root, lambda manifest: manifest["runs"]["run-dead"].update(pid=2 ** 22 + 1))
+        results.append(self.check([run["run_id"] for run in active_runs(project_root)] == ["run-live"],
+                                  "Crashed runs excluded from active runs"))
+        
+        finish_run(project_root, "run-live", success=True, feature_name="user-auth")
+        manifest = read_project_manifest(project_root)
+        results.append(self.check(manifest["runs"]["run-live"]["status"] == "succeeded"
+                                  and "user-auth" in manifest["features"] and not active_runs(project_root),
+                                  "Finished run recorded and feature registered"))
+        
+        finish_run(project_root, "run-dead", success=False, feature_name="payments")
+        results.append(self.check("payments" not in read_project_manifest(project_root)["features"],
+                                  "Failed run does not register its feature"))
+        
+        return all(results)
+    
+    def test_workspace_catalog(self) -> bool:
+        """Test catalog indexing, queries and reconciliation of out-of-band changes"""
+        self.log_header("Testing Workspace Catalog")
+        from workspace_catalog import WorkspaceCatalog
+        
+        results = []
+        projects_dir = self.scratch_dir("catalog")
+        
+        def make_project(name: str, status: str, documents: List[str]) -> Path:
+            feature_dir = projects_dir / name / "features" / "2026-01-15-mvp"
+            feature_dir.mkdir(parents=True)
+            (projects_dir / name / "project-manifest.json").write_text(json.dumps(
+                {"status": status, "features": ["mvp"], "created_at": f"2026-01-1{len(name)}"}))
+            for document in documents:
+                (feature_dir / document).write_text("# Doc\n")
+            return feature_dir
+        
+        shop_feature = make_project("shop", "active", ["prd.md"])
+        make_project("blog-app", "draft", ["prd.md", "tasks.md"])
+        
+        catalog = WorkspaceCatalog(projects_dir)
+        catalog.reconcile()
+        results.append(self.check([p["name"] for p in catalog.list_projects()] == ["blog-app", "shop"],
+                                  "Projects indexed on first reconcile"))
+        results.append(self.check([p["name"] for p in catalog.list_projects(status="draft")] == ["blog-app"]
+                                  and [p["name"] for p in catalog.list_projects(name_filter="sho")] == ["shop"],
+                                  "Status and name filters applied"))
+        results.append(self.check([p["documents_count"] for p in catalog.list_projects(sort="documents", descending=True)] == [2, 1],
+                                  "Sorted by document count"))
+        
+        # Out-of-band changes: a file inside an existing feature dir, a new project, a removed project
+        time.sleep(0.05)
+        (shop_feature / "tasks.md").write_text("# Tasks\n")
+        make_project("crm", "active", [])
+        shutil.rmtree(projects_dir / "blog-app")
+        catalog.reconcile()
+        shop = catalog.get_project("shop")
+        results.append(self.check(shop["documents_count"] == 2 and shop["feature_dirs"][0]["documents"] == ["prd.md", "tasks.md"],
+                                  f"Global reconcile sees files added inside a feature dir ({shop['documents_count']} documents)"))
+        results.append(self.check(sorted(p["name"] for p in catalog.list_projects()) == ["crm", "shop"],
+                                  "Global reconcile adds new and drops removed projects"))
+        
+        # Single-project reconcile catches a removed document too
+        time.sleep(0.05)
+        (shop_feature / "prd.md").unlink()
+        catalog.reconcile("shop")
+        results.append(self.check(catalog.get_project("shop")["documents_count"] == 1,
+                                  "Project reconcile sees removed documents"))
+        
+        try:
+            catalog.list_projects(sort="size")
+            results.append(self.check(False, "Unknown sort key accepted"))
+        except ValueError:
+            results.append(self.check(True, "Unknown sort key rejected"))
+        
+        catalog.close()
+        return all(results)
+    
+    def test_document_index(self) -> bool:
+        """Test query parsing, ranked search, field filters and incremental updates"""
+        self.log_header("Testing Document Index")
+        from document_index import DocumentIndex, parse_query
+        
+        results = []
+        projects_dir = self.scratch_dir("index")
+        documents = {
+            ("shop", "2026-01-15-mvp", "prd.md"): "# Shop PRD\nCustomers pay with Stripe checkout sessions.\n",
+            ("shop", "2026-02-01-payments", "tech_spec.md"): "# Payments Spec\nStripe webhooks confirm refunds.\n",
+            ("blog", "2026-01-20-mvp", "prd.md"): "# Blog PRD\nAuthors publish posts with markdown.\n",
+        }
+        for (project, feature, name), body in documents.items():
+            feature_dir = projects_dir / project / "features" / feature
+            feature_dir.mkdir(parents=True, exist_ok=True)
+            (feature_dir / name).write_text(body)
+        
+        match, filters = parse_query('stripe -refunds "checkout sessions" project:shop')
+        results.append(self.check(match == '("stripe" "checkout sessions") NOT ("refunds")' and filters == [("project", "shop")],
+                                  f"Query parsed into match and filters ({match})"))
+        
+        index = DocumentIndex(projects_dir)
+        results.append(self.check(index.update() == {"indexed": 3, "removed": 0, "unchanged": 0}, "Initial update indexes all documents"))
+        results.append(self.check(index.update()["unchanged"] == 3, "Unchanged documents skipped on re-update"))
+        
+        hits = index.search("stripe")
+        results.append(self.check(len(hits) == 2 and all(hit["project"] == "shop" for hit in hits) and "«Stripe»" in hits[0]["snippet"],
+                                  "Ranked search returns highlighted snippets"))
+        results.append(self.check([hit["doc_type"] for hit in index.search("stripe type:tech_spec")] == ["tech-spec"],
+                                  "Type filter normalizes underscores"))
+        results.append(self.check([hit["project"] for hit in index.search("after:2026-01-16 type:prd")] == ["blog"],
+                                  "Field-only query filters by date"))
+        results.append(self.check(len(index.search("stripe", exclude_feature_paths=[str(projects_dir / "shop" / "features" / "2026-01-15-mvp")])) == 1,
+                                  "Excluded feature dirs not returned"))
+        
+        # Edits and deletions are picked up incrementally
+        blog_prd = projects_dir / "blog" / "features" / "2026-01-20-mvp" / "prd.md"
+        blog_prd.write_text("# Blog PRD\nAuthors publish posts and accept Stripe tips.\n")
+        (projects_dir / "shop" / "features" / "2026-02-01-payments" / "tech_spec.md").unlink()
+        counts = index.update()
+        results.append(self.check(counts["indexed"] == 1 and counts["removed"] == 1, f"Incremental update counts ({counts})"))
+        results.append(self.check(sorted(hit["project"] for hit in index.search("stripe")) == ["blog", "shop"],
+                                  "Edited and deleted documents reflected in search"))
+        
+        related = index.retrieve_related("Stripe tips for authors", exclude_feature_dir=blog_prd.parent)
+        results.append(self.check([hit["project"] for hit in related] == ["shop"], "Related prior art excludes the current feature"))
+        
+        results.append(self.check(index.search('NEAR( "unbalanced') == [] and index.search("  ") == [],
+                                  "Punctuation-only and empty queries return nothing"))
+        
+        index.close()
+        return all(results)
+    
+    def test_workflow_tracing(self) -> bool:
+        """Test span nesting, error capture, exports and the critical path"""
+        self.log_header("Testing Workflow Tracing")
+        import contextvars
+        import workflow_tracing
+        
+        results = []
+        
+        with workflow_tracing.span("outside", "step") as outside:
+            results.append(self.check(outside is None, "Spans are no-ops without an active trace"))
+        
+        def traced_call(name: str, seconds: float):
+            with workflow_tracing.span(name, "provider_call"):
+                time.sleep(seconds)
+        
+        with workflow_tracing.start_trace("run-1", project="shop") as tracer:
+            with workflow_tracing.span("01-prd", "step") as step:
+                step.set(tokens=120, cost=None)
+                
+                # Parallel calls on worker threads inherit the current span through a copied context
+                workers = [threading.Thread(target=contextvars.copy_context().run, args=(traced_call, name, seconds))
+                           for name, seconds in (("fast", 0.01), ("slow", 0.05))]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+            try:
+                with workflow_tracing.span("02-spec", "step"):
+                    raise RuntimeError("provider down")
+            except RuntimeError:
+                pass
+        
+        spans = {span.name: span for span in tracer.spans}
+        results.append(self.check(spans["slow"].parent_id == spans["01-prd"].span_id
+                                  and spans["01-prd"].parent_id == tracer.root.span_id,
+                                  "Spans nest under the current span across threads"))
+        results.append(self.check(spans["01-prd"].attributes == {"tokens": 120}, "None-valued attributes dropped"))
+        results.append(self.check(spans["02-spec"].error == "provider down", "Span errors recorded"))
+        
+        path_names = [span.name for span, _ in tracer.critical_path()]
+        results.append(self.check(path_names == ["workflow run", "01-prd", "slow", "02-spec"],
+                                  f"Critical path follows the slowest parallel child ({' → '.join(path_names)})"))
+        
+        trace_dir = self.scratch_dir("traces")
+        chrome_path, otlp_path = workflow_tracing.export_trace(tracer, trace_dir)
+        chrome = json.loads(chrome_path.read_text())
+        otlp = json.loads(otlp_path.read_text())["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        kinds = {span["name"]: span["kind"] for span in otlp}
+        results.append(self.check(len([e for e in chrome["traceEvents"] if e["ph"] == "X"]) == len(tracer.spans),
+                                  "Chrome trace has one event per span"))
+        results.append(self.check(len({span["traceId"] for span in otlp}) == 1 and kinds["slow"] == workflow_tracing.SPAN_KIND_INTERNAL
+                                  and next(span for span in otlp if span["name"] == "02-spec")["status"]["code"] == workflow_tracing.STATUS_ERROR,
+                                  "OTLP export shares one trace ID and marks errors"))
+        
+        return all(results)
+    
+    def test_cost_attribution(self) -> bool:
+        """Test that metered_cost() books only the calls made in its own context"""
+        self.log_header("Testing Per-Call Cost Attribution")
+        import contextvars
+        from llm_api_integration import LLMAPIIntegration, LLMConfig, LLMProvider, LLMRequest, LLMResponse, metered_cost
+        
+        results = []
+        integration = LLMAPIIntegration(LLMConfig(provider=LLMProvider.OPENAI, model="gpt-4o-mini"), client=object())
+        integration._call_provider = lambda request: LLMResponse(content="ok", provider="openai", model="gpt-4o-mini",
+                                                                 tokens_used=10, cost_usd=float(request.prompt),
+                                                                 execution_time=0.0)
+        
+        # A draft and a foreground step share one integration, as speculation does
+        meters = {}
+        
+        def generate(name: str, costs: List[float]):
+            with metered_cost() as meter:
+                meters[name] = meter
+                for cost in costs:
+                    integration.generate_content(LLMRequest(prompt=str(cost)))
+                    time.sleep(0.005)
+        
+        threads = [threading.Thread(target=contextvars.copy_context().run, args=(generate, "draft", [0.25, 0.25])),
+                   threading.Thread(target=contextvars.copy_context().run, args=(generate, "step", [1.0, 1.0, 1.0]))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        results.append(self.check(meters["draft"].cost_usd == 0.5 and meters["draft"].calls == 2,
+                                  f"Draft meter counts only its own calls (${meters['draft'].cost_usd})"))
+        results.append(self.check(meters["step"].cost_usd == 3.0, f"Concurrent step meter unaffected (${meters['step'].cost_usd})"))
+        results.append(self.check(integration.get_usage_stats()["total_cost_usd"] == 3.5, "Integration totals still cover every call"))
+        
+        with metered_cost() as outer:
+            integration.generate_content(LLMRequest(prompt="0.5"))
+            with metered_cost() as inner:
+                integration.generate_content(LLMRequest(prompt="0.25"))
+        integration.generate_content(LLMRequest(prompt="4.0"))
+        results.append(self.check(outer.cost_usd == 0.75 and inner.cost_usd == 0.25, "Nested meters both count inner calls"))
+        
+        return all(results)
+    
+    def test_approval_history(self) -> bool:
+        """Test cross-thread recording, seeding, scope fallback and recency-weighted confidence"""
+        self.log_header("Testing Approval History")
+        from approval_history import ApprovalHistory, normalize_tech_stack, APPROVED, REJECTED
+        
+        results = []
+        history = ApprovalHistory(self.scratch_dir("approvals") / "approval-history.db")
+        thresholds = {"minimum_history_samples": 3, "approval_rate_for_auto": 0.8, "confidence_threshold": 0.8}
+        
+        # One connection opened on the main thread serves batch/daemon worker threads
+        history.record("prd_generation", APPROVED, "prd", "Python + Flask", user="ana")
+        errors = []
+        
+        def record_from_worker(index: int):
+            try:
+                history.record("prd_generation", APPROVED, "prd", ["flask", "python"], user="ana", recorded_at=1000.0 + index)
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=record_from_worker, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results.append(self.check(not errors, f"Worker threads record on the shared connection ({errors[:1]})"))
+        
+        stats = history.evaluate("prd_generation", thresholds, "prd", "flask / python", user="ana")
+        results.append(self.check(normalize_tech_stack("Python + Flask") == "flask+python" and stats.samples == 5
+                                  and "tech_stack=flask+python" in stats.scope and stats.allows_auto_proceed(thresholds),
+                                  f"Stack-scoped history allows auto-proceed ({stats.scope})"))
+        
+        # Thin scopes fall back to wider ones; a fresh rejection outweighs older approvals
+        stats = history.evaluate("prd_generation", thresholds, "prd", "Go + Gin", user="ana")
+        results.append(self.check(stats.samples == 5 and "tech_stack" not in stats.scope, "Unknown stack falls back to the user scope"))
+        history.record("prd_generation", REJECTED, "prd", "Python + Flask", user="ana")
+        stats = history.evaluate("prd_generation", thresholds, "prd", "Python + Flask", user="ana")
+        results.append(self.check(stats.confidence < stats.approval_rate and not stats.allows_auto_proceed(thresholds),
+                                  f"Recent rejection re-enables the gate (rate {stats.approval_rate:.2f}, confidence {stats.confidence:.2f})"))
+        
+        seed = [{"gate": "srs_generation", "approved": True, "recorded_at": 1.0, "user": "ana"},
+                {"gate": "srs_generation", "decision": "skipped", "recorded_at": 2.0, "user": "ana"},
+                {"gate": "srs_generation", "decision": "maybe"}, {"approved": True}]
+        results.append(self.check(history.import_decisions(seed) == 2 and history.import_decisions(seed) == 0,
+                                  "Seeding imports valid entries once"))
+        
+        history.close()
+        
+        # Both runners start unseeded rather than relying on a missing attribute
+        for script, config, cls in (("workflow-runner.py", "automation-config.json", "WorkflowOrchestrator"),
+                                    ("enterprise-ai-workflow-runner.py", "enterprise-automation-config.json", "EnterpriseWorkflowOrchestrator")):
+            runner = getattr(self.load_script(script), cls)(self.script_dir / config)
+            results.append(self.check(runner._approval_history_seeded is False, f"{cls} initializes _approval_history_seeded"))
+        
+        return all(results)
+    
+    def test_tech_stack_cache(self) -> bool:
+        """Test that concurrent cache writers never corrupt the cache or leave temp files"""
+        self.log_header("Testing Tech Stack Cache")
+        from enhanced_interactive_data_collector import TechStackCache
+        
+        results = []
+        cache_dir = self.scratch_dir("tech-stack-cache")
+        cache = TechStackCache(cache_dir / "tech-stack-cache.json")
+        errors = []
+        
+        def put_many(index: int):
+            try:
+                for n in range(20):
+                    cache.put(f"{index}-{n}", "Python + Flask + SQLite " * 50)
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=put_many, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        results.append(self.check(not errors, f"Concurrent puts succeed ({errors[:1]})"))
+        results.append(self.check([path.name for path in cache_dir.iterdir()] == ["tech-stack-cache.json"],
+                                  "No temp files left behind"))
+        results.append(self.check(len(json.loads(cache.path.read_text())) > 0, "Cache file stays valid JSON"))
+        
+        key = TechStackCache.key({"complexity": "simple", "access": "web"})
+        cache.put(key, "FastAPI")
+        results.append(self.check(TechStackCache(cache.path).get(key)["text"] == "FastAPI", "Entries persist across instances"))
+        
+        return all(results)
+    
+    def test_stream_retry_reset(self) -> bool:
+        """Test that a retry after a partially streamed attempt resets the stream first"""
+        self.log_header("Testing Streaming Retries")
+        from llm_api_integration import LLMAPIIntegration, LLMConfig, LLMProvider, LLMRequest, LLMResponse
+        
+        results = []
+        integration = LLMAPIIntegration(LLMConfig(provider=LLMProvider.OPENAI, model="gpt-4o-mini", max_retries=3),
+                                        client=object())
+        failures = ["Option 1: Fla", None]  # First attempt dies mid-stream, second before any token
+        
+        def flaky_stream(request: LLMRequest) -> LLMResponse:
+            if failures:
+                partial = failures.pop(0)
+                if partial:
+                    request.stream_callback(partial)
+                raise ConnectionError("stream interrupted")
+            for token in ("Option 1: ", "Flask ", "+ SQLite"):
+                request.stream_callback(token)
+            return LLMResponse(content="Option 1: Flask + SQLite", provider="openai", model="gpt-4o-mini",
+                               tokens_used=10, cost_usd=0.0, execution_time=0.0)
+        
+        integration._call_provider = flaky_stream
+        shown, resets = [], []
+        
+        def reset():
+            resets.append(len(shown))
+            shown.clear()
+        
+        response = integration.generate_content(LLMRequest(prompt="stack?", stream_callback=shown.append, stream_reset=reset))
+        results.append(self.check("".join(shown) == response.content, f"Stream after reset holds only the final reply ({''.join(shown)!r})"))
+        results.append(self.check(resets == [1], f"Reset signalled once, only after streamed text ({resets})"))
+        
+        return all(results)
+    
+    def test_quality_gates(self) -> bool:
+        """Test required-section checks against headings taken from the lean workflow templates"""
+        self.log_header("Testing Quality Gates")
+        from quality_gates import QualityGateEngine
+        
+        results = []
+        templates = Path(__file__).parent / "lean-workflow"
+        
+        def template_headings(filename: str, first: str, last: str) -> List[str]:
+            headings = [line[3:].strip() for line in (templates / filename).read_text().splitlines() if line.startswith("## ")]
+            return headings[headings.index(first):headings.index(last) + 1]
+        
+        def write_document(path: Path, headings: List[str]):
+            path.write_text("".join(f"## {heading}\n- [ ] Filled in for {heading}\n\n" for heading in headings))
+        
+        criteria = json.loads((Path(__file__).parent / "llm-config.json").read_text())["prompt_engineering"]["validation_criteria"]
+        engine = QualityGateEngine({"automated_validation": {"required_sections_present": True}}, criteria)
+        
+        feature_dir = self.scratch_dir("gates") / "2026-01-15-mvp"
+        feature_dir.mkdir()
+        prd_headings = template_headings("02-gen-prd.md", "Overview", "Linkages (optional)")
+        srs_headings = template_headings("03-gen-srs.md", "Scope Summary", "Linkages")
+        write_document(feature_dir / "prd.md", prd_headings + srs_headings[:1])
+        write_document(feature_dir / "tasks.md", template_headings("06-gen-tasks-and-testing.md", "Executive Context (Distilled for AI Agents)", "Success Criteria"))
+        
+        problems = engine.validate_feature(feature_dir)["checks"]["required_sections_present"]["problems"]
+        results.append(self.check(problems == [], f"Template headings such as '{srs_headings[0]}' and 'Tasks (Context-Embedded)' satisfy the criteria ({problems})"))
+        
+        write_document(feature_dir / "prd.md", prd_headings)
+        problems = engine.validate_feature(feature_dir)["checks"]["required_sections_present"]["problems"]
+        results.append(self.check(problems == ["prd.md: missing section '## Scope'"],
+                                  f"'Out of Scope / Non-Goals' does not count as a Scope section ({problems})"))
+        
+        return all(results)
+    
+    def test_output_watcher(self) -> bool:
+        """Test debouncing, inotify and polling change detection, and watch_changes batching"""
+        self.log_header("Testing Output Watcher")
+        from output_watcher import Debouncer, InotifyWatcher, PollingWatcher, is_watched_file, watch_changes
+        
+        results = []
+        results.append(self.check(is_watched_file(Path("backend-output.md")) and is_watched_file(Path("prd.md"))
+                                  and not is_watched_file(Path("feature-manifest.json")) and not is_watched_file(Path("notes.md")),
+                                  "Only status files and workflow documents are watched"))
+        
+        debouncer = Debouncer(0.5)
+        path = Path("agent-output.md")
+        debouncer.add([path], now=10.0)
+        debouncer.add([path], now=10.3)
+        results.append(self.check(debouncer.ready(10.6) == [] and abs(debouncer.next_timeout(10.6, idle=5.0) - 0.2) < 1e-9,
+                                  "Later writes extend the quiet period"))
+        results.append(self.check(debouncer.ready(10.8) == [path] and debouncer.ready(20.0) == [], "Burst released once after it settles"))
+        results.append(self.check(debouncer.next_timeout(20.0, idle=5.0) == 5.0, "Idle timeout when nothing is pending"))
+        
+        def feature_dir(root: Path) -> Path:
+            directory = root / "shop" / "features" / "2026-01-15-mvp"
+            directory.mkdir(parents=True)
+            return directory
+        
+        # Directories created after the watch started are picked up, with files already inside them
+        root = self.scratch_dir("watch-inotify")
+        try:
+            watcher = InotifyWatcher(root)
+        except OSError as e:
+            self.log_warning(f"inotify unavailable, skipping kernel watcher checks ({e})")
+        else:
+            try:
+                feature = feature_dir(root)
+                (feature / "backend-output.md").write_text("## Status\nDone\n")
+                (feature / "notes.md").write_text("ignored\n")
+                seen = set()
+                results.append(self.check(self.wait_for(lambda: seen.update(watcher.read(0.1)) or feature / "backend-output.md" in seen),
+                                          "inotify reports status files in newly created feature directories"))
+                (feature / "prd.md").write_text("# PRD\n")
+                results.append(self.check(self.wait_for(lambda: seen.update(watcher.read(0.1)) or feature / "prd.md" in seen)
+                                          and feature / "notes.md" not in seen, "inotify reports watched documents only"))
+            finally:
+                watcher.close()
+        
+        root = self.scratch_dir("watch-polling")
+        feature = feature_dir(root)
+        (feature / "backend-output.md").write_text("first\n")
+        watcher = PollingWatcher(root, interval=0.01)
+        results.append(self.check(watcher.read(0.01) == [], "Polling reports nothing for unchanged files"))
+        (feature / "backend-output.md").write_text("second, longer\n")
+        (feature / "frontend-output.md").write_text("new\n")
+        results.append(self.check(sorted(path.name for path in watcher.read(0.01)) == ["backend-output.md", "frontend-output.md"],
+                                  "Polling reports modified and new files"))
+        
+        # A burst of writes to one file arrives as a single batch
+        root = self.scratch_dir("watch-changes")
+        feature = feature_dir(root)
+        batches = []
+        
+        def consume():
+            for batch in watch_changes(root, debounce_seconds=0.2, poll_interval=0.05, force_polling=True):
+                batches.append(batch)
+                break
+        
+        consumer = threading.Thread(target=consume, daemon=True)
+        consumer.start()
+        time.sleep(0.1)
+        for index in range(5):
+            (feature / "backend-output.md").write_text(f"progress {index}\n")
+            time.sleep(0.03)
+        consumer.join(timeout=5)
+        results.append(self.check(batches == [[feature / "backend-output.md"]], f"Burst of writes yields one batch ({batches})"))
+        
+        # Watch dispatch completes a step once its expected outputs exist and pass the gates
+        integration = self.load_script("ai-agent-integration.py").AIAgentIntegration()
+        status_file = feature / "02-gen-prd-output.md"
+        status_file.write_text("# Status\n```json\n" + json.dumps({"expected_outputs": ["prd.md"], "completion_status": {"started": True}}) + "\n```\n")
+        status_index = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            integration._handle_feature_changes(feature, [status_file], status_index, set(), auto_complete=True)
+            waiting = not integration._load_execution_data(status_file)["completion_status"].get("completed")
+            (feature / "prd.md").write_text("# PRD\n## Goals\nShip checkout.\n## Scope\nCards only.\n")
+            integration._handle_feature_changes(feature, [feature / "prd.md"], status_index, set(), auto_complete=True)
+        results.append(self.check(waiting and integration._load_execution_data(status_file)["completion_status"].get("completed") is True,
+                                  "Step marked completed only after its output arrives"))
+        
+        return all(results)
+    
+    def test_agent_coordinator(self) -> bool:
+        """Test dependency ordering, parallel assignment, reassignment, failure cascades and cycle escalation"""
+        self.log_header("Testing Agent Coordinator")
+        from agent_coordinator import AgentCoordinator, AgentTask, TaskStatus, build_agents
+        
+        results = []
+        state_path = self.scratch_dir("coordinator") / "coordination-state.json"
+        
+        def make_tasks() -> List[AgentTask]:
+            return [AgentTask("1.0", "Auth API", 1, capabilities=["backend"]),
+                    AgentTask("2.0", "Login page", 2, capabilities=["frontend"], dependencies=["1.0"]),
+                    AgentTask("3.0", "Docs site", 3)]
+        
+        events, lock = [], threading.Lock()
+        both_started = threading.Barrier(2, timeout=5)
+        
+        def worker(task: AgentTask, agent) -> str:
+            with lock:
+                events.append(("start", task.task_id, agent.agent_type))
+            if task.task_id in ("1.0", "3.0"):
+                both_started.wait()  # Independent tasks must run at the same time
+            with lock:
+                events.append(("end", task.task_id, agent.agent_type))
+            return f"implemented {task.task_id}"
+        
+        coordinator = AgentCoordinator(make_tasks(), build_agents({"backend": 1, "frontend": 1}), state_path=state_path)
+        state = coordinator.run(worker)["coordination_state"]
+        results.append(self.check(sorted(state["project_state"]["completed_tasks"]) == ["task-1.0", "task-2.0", "task-3.0"],
+                                  "Every task completed"))
+        results.append(self.check(events.index(("start", "2.0", "frontend")) > events.index(("end", "1.0", "backend")),
+                                  "Dependent task waits for its dependency and goes to the matching agent"))
+        results.append(self.check(json.loads(state_path.read_text())["coordination_state"]["tasks"]["task-2.0"]["status"] == "completed",
+                                  "coordination-state.json written"))
+        
+        # A task failing on one agent is retried on another; one failing everywhere fails its dependents
+        failing = {"1.0": 1, "3.0": 99}
+        
+        def flaky_worker(task: AgentTask, agent) -> str:
+            with lock:
+                if failing.get(task.task_id, 0) > 0:
+                    failing[task.task_id] -= 1
+                    raise RuntimeError(f"{agent.agent_id} crashed")
+            return "ok"
+        
+        tasks = make_tasks()
+        tasks.append(AgentTask("4.0", "Docs search", 4, dependencies=["3.0"]))
+        coordinator = AgentCoordinator(tasks, build_agents({"backend": 2}), max_attempts=2)
+        coordinator.run(flaky_worker)
+        by_id = {task.task_id: task for task in tasks}
+        results.append(self.check(by_id["1.0"].status == TaskStatus.COMPLETED and by_id["1.0"].attempts == 2
+                                  and len(by_id["1.0"].failed_agents) == 1 and by_id["1.0"].assigned_to not in by_id["1.0"].failed_agents,
+                                  "Failed task reassigned to a different agent"))
+        results.append(self.check(by_id["3.0"].status == TaskStatus.FAILED and by_id["3.0"].attempts == 2,
+                                  "Task fails after max_attempts"))
+        results.append(self.check(by_id["4.0"].status == TaskStatus.FAILED and by_id["4.0"].error == "dependency Task 3.0 failed",
+                                  "Dependents of a failed task fail without running"))
+        
+        cyclic = [AgentTask("1.0", "A", 1, dependencies=["2.0"]), AgentTask("2.0", "B", 2, dependencies=["1.0"])]
+        coordinator = AgentCoordinator(cyclic, build_agents({"backend": 1}), state_path=state_path)
+        try:
+            coordinator.run(worker)
+            results.append(self.check(False, "Dependency cycle rejected"))
+        except ValueError:
+            escalations = json.loads(state_path.read_text())["coordination_state"]["escalations"]
+            results.append(self.check([e["conflict"] for e in escalations] == ["dependency_chain_deadlock"],
+                                      "Dependency cycle escalated before any work starts"))
+        
+        return all(results)
+    
+    def test_agent_pool_gate(self) -> bool:
+        """Test that a gated step 07 runs on the agent pool instead of a speculative single-call draft"""
+        self.log_header("Testing Agent Pool Behind a Gate")
+        
+        results = []
+        runner = self.load_script("workflow-runner.py")
+        orchestrator = runner.WorkflowOrchestrator(self.script_dir / "automation-config.json")
+        orchestrator.llm_api_enabled = True
+        workflow_execution = orchestrator.config["workflow_execution"]
+        workflow_execution["speculative_generation"]["enabled"] = True
+        workflow_execution["multi_agent"] = {"enabled": True, "agents": {"backend": 1, "frontend": 1}, "max_attempts": 1}
+        orchestrator._execute_human_gate = lambda step, context: runner.GateResponse.APPROVED
+        
+        project_root = self.scratch_dir("agent-pool")
+        feature_dir = project_root / "features" / "2026-01-15-mvp"
+        feature_dir.mkdir(parents=True)
+        (feature_dir / "tasks.md").write_text("# Tasks\n\n## Tasks (Context-Embedded)\n"
+                                              "- [ ] 1.0 Auth API\n  - [ ] 1.1 Login endpoint\n"
+                                              "- [ ] 2.0 Login page UI\n  - [ ] 2.1 Build form component\n")
+        context = runner.ExecutionContext(feature_name="shop-mvp", mode=runner.AutomationMode.GUIDED,
+                                          project_root=project_root, feature_dir=feature_dir, interactive=True)
+        session = orchestrator._create_run_session(context)
+        
+        class RecordingEngine:
+            def __init__(self):
+                self.requests = []
+            
+            def generate_content(self, request) -> str:
+                self.requests.append(request)
+                return "## Implementation\nDone.\n"
+            
+            def get_usage_summary(self) -> Dict[str, float]:
+                return {"total_cost_usd": 0.0}
+        
+        engine = RecordingEngine()
+        session._engine = engine
+        step = next(step for step in orchestrator.workflow_steps if step.doc_name.startswith("07-"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            success = orchestrator._execute_step(step, runner.GateDecision.REQUIRED, context, session)
+        
+        agent_requests = [request for request in engine.requests
+                          if any("implementing ONLY Task" in directive for directive in request.ai_directives or [])]
+        results.append(self.check(success and len(agent_requests) == 2 and len(engine.requests) == 2,
+                                  f"Step 07 generated per task on the pool, with no speculative draft ({len(engine.requests)} calls)"))
+        results.append(self.check((feature_dir / "coordination-state.json").exists(), "Coordinator wrote coordination-state.json"))
+        
+        return all(results)
+    
+    def test_task_graph(self) -> bool:
+        """Test tasks.md parsing, estimates, dependencies, critical path scheduling and the stored JSON"""
+        self.log_header("Testing Task Graph")
+        from agent_coordinator import tasks_from_graph
+        from task_graph import critical_path_schedule, graph_path, parse_task_graph, write_task_graph
+        
+        results = []
+        tasks_path = self.scratch_dir("task-graph") / "tasks.md"
+        tasks_path.write_text(
+            "# Tasks for Shop\n\n"
+            "## Tasks (Context-Embedded)\n"
+            "- [ ] 1.0 Auth API (6h) REQ-1\n"
+            "  - **Context**: JWT sessions\n"
+            "  - [ ] 1.1 User schema\n"
+            "  - [ ] 1.2 Login endpoint (4h) NFR-2\n"
+            "- [ ] 2.0 Login page UI\n"
+            "  - [ ] 2.1 Build form component (1d)\n"
+            "- [x] 3.0 Project setup\n"
+            "  - [x] 3.1 Repository scaffolding\n"
+            "- [ ] 4.0 API docs (depends on Task 1.0)\n"
+            "  - [ ] 4.1 Endpoint reference\n\n"
+            "### Acceptance Criteria\n"
+            "- Users can log in (REQ-7)\n\n"
+            "## Task Dependencies\n"
+            "1. **Task 1.2** → **Task 2.1**\n"
+        )
+        
+        graph = parse_task_graph(tasks_path)
+        nodes = graph.nodes
+        results.append(self.check(list(nodes) == ["1.1", "1.2", "2.1", "3.1", "4.1"] and list(graph.parents) == ["1.0", "2.0", "3.0", "4.0"],
+                                  "Subtasks become nodes under their parent tasks"))
+        results.append(self.check([nodes[t].estimate_hours for t in nodes] == [6.0, 4.0, 8.0, 2.0, 2.0],
+                                  "Estimates: own, parent share, days, and the default"))
+        results.append(self.check(nodes["1.2"].dependencies == ["1.1"] and nodes["2.1"].dependencies == ["1.2"]
+                                  and nodes["4.1"].dependencies == ["1.2"], "Order, arrow chains and 'depends on' phrases become edges"))
+        results.append(self.check(graph.parents["1.0"].context == "JWT sessions" and graph.parents["1.0"].requirements == ["REQ-1", "REQ-7"]
+                                  and nodes["1.2"].requirements == ["NFR-2"], "Context and requirement IDs linked"))
+        results.append(self.check(nodes["3.1"].done and nodes["3.1"].remaining_hours == 0.0, "Checked tasks count as done"))
+        
+        results.append(self.check(graph.critical_path == ["1.1", "1.2", "2.1"] and graph.makespan_hours == 18.0,
+                                  f"Critical path and makespan ({graph.critical_path}, {graph.makespan_hours}h)"))
+        results.append(self.check(nodes["4.1"].schedule.slack == 6.0 and not nodes["4.1"].schedule.critical,
+                                  "Off-path task has slack"))
+        results.append(self.check(graph.max_parallel_width == 2, f"Maximal parallel width ({graph.max_parallel_width})"))
+        
+        # The scheduler runs tasks with the longest remaining path first
+        ranked = {task.task_id: task for task in tasks_from_graph(graph)}
+        results.append(self.check(ranked["1.0"].rank_hours == 18.0 and ranked["2.0"].rank_hours == 8.0 and ranked["4.0"].rank_hours == 2.0
+                                  and ranked["1.0"].priority == "critical" and ranked["3.0"].done_in_source,
+                                  "Coordinator tasks ranked by remaining critical path"))
+        
+        write_task_graph(tasks_path)
+        summary = json.loads(graph_path(tasks_path).read_text())["summary"]
+        results.append(self.check(graph_path(tasks_path).name == "tasks-graph.json" and summary["critical_path"] == ["1.1", "1.2", "2.1"]
+                                  and summary["parallel_speedup"] == 1.11, "Graph stored as JSON next to tasks.md"))
+        
+        tasks_path.write_text("## Tasks\n- [ ] 1.0 A\n  - [ ] 1.1 One\n  - [ ] 1.2 Two\n\n## Task Dependencies\n- Task 1.2 → Task 1.1\n")
+        graph = parse_task_graph(tasks_path)
+        results.append(self.check(graph.cycle is not None and graph.critical_path == [], f"Dependency cycle recorded ({graph.cycle})"))
+        try:
+            critical_path_schedule({"a": 1.0, "b": 1.0}, {"a": ["b"], "b": ["a"]})
+            results.append(self.check(False, "Scheduling a cycle raises ValueError"))
+        except ValueError:
+            results.append(self.check(True, "Scheduling a cycle raises ValueError"))
+        
+        return all(results)
+    
+    def test_agent_bus(self) -> bool:
+        """Test message validation, priority mailboxes with backpressure, and in-process agents over BusThread"""
+        self.log_header("Testing Agent Bus")
+        import asyncio
+        import contextvars
+        from agent_bus import AgentMessage, BusThread, MessageBus
+        from agent_coordinator import AgentTask, WorkerAgent, bus_worker
+        
+        results = []
+        try:
+            AgentMessage("task_assignment", "coordination_system", "agent-1", {"agent_id": "agent-1"}).validate()
+            results.append(self.check(False, "Message missing payload fields rejected"))
+        except ValueError as e:
+            results.append(self.check("task_id" in str(e), "Message missing payload fields rejected"))
+        
+        async def mailbox_checks() -> List[bool]:
+            bus = MessageBus(queue_size=2)
+            bus.register("agent-1")
+            heartbeat = lambda: AgentMessage("agent_heartbeat", "coordination_system", "agent-1",
+                                             {"agent_id": "agent-1", "status": "idle", "current_task": None, "resource_usage": {}})
+            alert = AgentMessage("performance_alert", "coordination_system", "agent-1",
+                                 {"monitoring_agent": "m", "metric_type": "p95", "current_value": 900, "budget_limit": 200})
+            checks = [bus.try_send(heartbeat()), await bus.receive("agent-1") is not None]
+            bus.try_send(heartbeat())
+            await bus.send(alert)
+            checks.append(not bus.try_send(heartbeat()))
+            try:
+                await bus.send(heartbeat(), timeout=0.05)
+                checks.append(False)
+            except RuntimeError:
+                checks.append(True)
+            checks.append((await bus.receive("agent-1")).message_type == "performance_alert")
+            stats = bus.stats()["agent-1"]
+            checks.append(stats["dropped"] == 2 and stats["blocked"] == 1 and stats["max_depth"] == 2)
+            return checks
+        
+        checks = asyncio.run(mailbox_checks())
+        results.append(self.check(all(checks[:3]), "Full mailbox refuses try_send"))
+        results.append(self.check(checks[3], "Send waiting on a full mailbox times out"))
+        results.append(self.check(checks[4], "Critical messages delivered before queued low-priority ones"))
+        results.append(self.check(checks[5], "Mailbox stats count drops, blocked sends and depth"))
+        
+        # In-process agents answer assignments in worker threads that see the caller's context variables
+        marker = contextvars.ContextVar("bus_test_marker", default=None)
+        token = marker.set("run-42")
+        bus = BusThread(queue_size=4)
+        try:
+            def handler(message: AgentMessage) -> str:
+                if message.payload["task_id"] == "2.0":
+                    raise RuntimeError("compile error")
+                return f"{message.payload['title']} in {marker.get()}"
+            
+            bus.start_agent("agent-backend-001", handler)
+            worker = bus_worker(bus, timeout=5)
+            agent = WorkerAgent("agent-backend-001", "backend", ["backend"])
+            content = worker(AgentTask("1.0", "Auth API", 1), agent)
+            results.append(self.check(content == "Auth API in run-42", f"Handler reply carries the caller's context ({content})"))
+            try:
+                worker(AgentTask("2.0", "Login page", 2), agent)
+                results.append(self.check(False, "Handler error fails the attempt"))
+            except RuntimeError as e:
+                results.append(self.check(str(e) == "compile error", "Handler error fails the attempt"))
+        finally:
+            bus.close()
+            marker.reset(token)
+        
+        return all(results)
+    
+    def test_progress_dashboard(self) -> bool:
+        """Test that the live dashboard only takes over the console of a single interactive run"""
+        self.log_header("Testing Progress Dashboard")
+        import workflow_progress as progress
+        
+        class Terminal(io.StringIO):
+            def isatty(self) -> bool:
+                return True
+        
+        # Checks are logged after the real streams are back
+        observed: List[Tuple[bool, str]] = []
+        saved = (sys.stdin, sys.stdout, sys.stderr)
+        try:
+            sys.stdin, sys.stdout, sys.stderr = Terminal(), Terminal(), Terminal()
+            with progress.live_dashboard(True, refresh_seconds=0.01) as dashboard:
+                observed.append((dashboard is not None and sys.stdout is not saved[1], "Dashboard shown in an interactive terminal"))
+                with progress.live_dashboard(True) as nested:
+                    observed.append((nested is None, "A second run does not take over the console"))
+                try:
+                    progress.Dashboard().start()
+                    observed.append((False, "Starting a second dashboard raises RuntimeError"))
+                except RuntimeError:
+                    observed.append((True, "Starting a second dashboard raises RuntimeError"))
+            observed.append((not isinstance(sys.stdout, progress._PassThrough), "Console streams restored when the run ends"))
+            
+            sys.stdin = io.StringIO()
+            with progress.live_dashboard(True) as dashboard:
+                observed.append((dashboard is None, "No dashboard when stdin is not a terminal (batch, daemon, piped)"))
+        finally:
+            sys.stdin, sys.stdout, sys.stderr = saved
+        
+        return all([self.check(condition, message) for condition, message in observed])
+    
+    def test_structured_prompt(self) -> bool:
+        """Test that section-map prompts do not also ask for markdown output"""
+        self.log_header("Testing Structured Output Prompts")
+        from content_generation_engine import ContentGenerationEngine, ContentGenerationRequest, WorkflowContext
+        from llm_api_integration import LLMResponse
+        
+        results = []
+        config = json.loads((self.script_dir / "llm-config.json").read_text())
+        config["prompt_engineering"].get("retrieval", {})["enabled"] = False
+        body = "Detailed enough to pass every length criterion. " * 10
+        reply = json.dumps({"preamble": "", "sections": [{"heading": "Goals", "content": body}, {"heading": "Scope", "content": body}]})
+        
+        class RecordingIntegration:
+            def __init__(self):
+                self.requests = []
+            
+            def generate_content(self, request) -> LLMResponse:
+                self.requests.append(request)
+                content = reply if request.response_schema else f"## Goals\n{body}\n## Scope\n{body}"
+                return LLMResponse(content=content, provider="openai", model="gpt-4o-mini", tokens_used=10, cost_usd=0.0,
+                                   execution_time=0.0, validated=True)
+        
+        feature_dir = self.scratch_dir("structured-prompt")
+        request = ContentGenerationRequest(str(self.script_dir / "lean-workflow" / "02-gen-prd.md"),
+                                           WorkflowContext("Shop", "shop", feature_dir, "02", "planning", {"project_name": "Shop"}),
+                                           "prd.md", "prd")
+        results.append(self.check(config["prompt_engineering"]["structured_output"]["enabled"] is True,
+                                  "llm-config.json ships with structured output enabled"))
+        prompts = {}
+        for enabled in (None, True, False):
+            if enabled is None:
+                config["prompt_engineering"].pop("structured_output")  # Code default when the key is missing
+            else:
+                config["prompt_engineering"]["structured_output"] = {"enabled": enabled, "max_repair_rounds": 1}
+            engine = ContentGenerationEngine(llm_config_data=config)
+            integration = RecordingIntegration()
+            engine._select_llm_for_content_type = lambda content_type: integration
+            content = engine.generate_content(request)
+            prompts[enabled] = integration.requests[0]
+            results.append(self.check("## Goals" in content, f"Document generated ({'default' if enabled is None else 'structured' if enabled else 'markdown'} output)"))
+        
+        results.append(self.check(prompts[None].response_schema is not None, "Section maps are the default without a structured_output key"))
+        results.append(self.check(prompts[True].response_schema is not None and "Use markdown formatting" not in prompts[True].prompt,
+                                  "Section-map prompt does not ask for markdown formatting of the whole reply"))
+        results.append(self.check(prompts[False].response_schema is None and "Use markdown formatting" in prompts[False].prompt,
+                                  "Markdown prompt keeps its formatting instruction"))
+        
+        return all(results)
+    
+    def test_non_interactive_gate(self) -> bool:
+        """Test that a run which cannot prompt fails at a required gate without reading stdin"""
+        self.log_header("Testing Gates in Non-Interactive Runs")
+        import builtins
+        
+        results = []
+        runner = self.load_script("workflow-runner.py")
+        orchestrator = runner.WorkflowOrchestrator(self.script_dir / "automation-config.json")
+        project_root = self.scratch_dir("non-interactive")
+        context = runner.ExecutionContext(feature_name="shop-mvp", mode=runner.AutomationMode.GUIDED,
+                                          project_root=project_root, feature_dir=project_root, interactive=False)
+        session = orchestrator._create_run_session(context)
+        step = next(step for step in orchestrator.workflow_steps if step.doc_name.startswith("02-"))
+        
+        prompts = []
+        
+        def fail_on_input(prompt=""):
+            prompts.append(prompt)
+            raise AssertionError("input() called")
+        
+        original_input = builtins.input
+        builtins.input = fail_on_input
+        error = None
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                orchestrator._execute_step(step, runner.GateDecision.REQUIRED, context, session)
+        except RuntimeError as e:
+            error = str(e)
+        finally:
+            builtins.input = original_input
+            session.close()
+        
+        results.append(self.check(error is not None and "cannot prompt" in error,
+                                  f"Required gate raised instead of prompting ({error})"))
+        results.append(self.check(not prompts, "No prompt was read from stdin"))
+        results.append(self.check(not session._speculations, "No draft was speculated for a gate that cannot open"))
+        
+        return all(results)
+    
+    def test_workflow_logging(self) -> bool:
+        """Test context fields in the JSON log and that emitting never waits on a stuck handler"""
+        self.log_header("Testing Workflow Logging")
+        import workflow_logging
+        from workflow_logging import configure_logging, console_redirected, get_log_dir, get_logger, log_context
+        
+        results = []
+        previous_dir = get_log_dir()
+        log_dir = self.scratch_dir("logging")
+        configure_logging(log_dir)
+        logger = get_logger("test_workflow_logging")
+        file_handler = next(handler for handler in workflow_logging._listener.handlers
+                            if isinstance(handler.formatter, workflow_logging.JSONFormatter))
+        
+        emit_seconds = float("inf")
+        with console_redirected(io.StringIO(), level=logging.CRITICAL):
+            with log_context(run_id="run-1", project="shop"):
+                with log_context(step=3):
+                    logger.info("inside step")
+                logger.info("after step")
+            logger.info("outside run")
+            
+            # A stuck file handler holds up the listener thread, never the code that logs
+            file_handler.acquire()
+            try:
+                started = time.perf_counter()
+                for index in range(2000):
+                    logger.info(f"burst {index}")
+                emit_seconds = time.perf_counter() - started
+            finally:
+                file_handler.release()
+            workflow_logging.shutdown_logging()  # Drains the queue into the file
+        configure_logging(previous_dir, file_logging=previous_dir is not None)
+        
+        entries = [json.loads(line) for line in (log_dir / workflow_logging.LOG_FILENAME).read_text().splitlines()]
+        by_message = {entry["message"]: entry for entry in entries}
+        inside, after, outside = by_message.get("inside step", {}), by_message.get("after step", {}), by_message.get("outside run", {})
+        results.append(self.check(inside.get("run_id") == "run-1" and inside.get("project") == "shop" and inside.get("step") == 3,
+                                  "Nested log_context merges run, project and step fields"))
+        results.append(self.check(after.get("run_id") == "run-1" and "step" not in after,
+                                  "Leaving the inner block drops its step field"))
+        results.append(self.check(outside and not any(field in outside for field in workflow_logging.CONTEXT_FIELDS),
+                                  "Records outside log_context carry no context fields"))
+        results.append(self.check(emit_seconds < 1.0,
+                                  f"2000 records emitted while the handler was stuck ({emit_seconds:.3f}s)"))
+        results.append(self.check(sum(entry["message"].startswith("burst ") for entry in entries) == 2000,
+                                  "Every queued record reached the JSON log"))
+        
+        return all(results)
+    
+    def test_metrics_textfile(self) -> bool:
+        """Test the Prometheus text format and the textfile a finished run writes"""
+        self.log_header("Testing Metrics Textfile")
+        import workflow_metrics as metrics
+        
+        results = []
+        registry = metrics.MetricsRegistry()
+        requests = registry.register(metrics.Counter("test_requests_total", "Requests", ("model", "outcome")))
+        latency = registry.register(metrics.Histogram("test_latency_seconds", "Latency", ("model",), buckets=(0.5, 2.0)))
+        requests.inc(model='gpt "4"', outcome="success")
+        requests.inc(2, model='gpt "4"', outcome="success")
+        latency.observe(0.3, model="a")
+        latency.observe(1.0, model="a")
+        latency.observe(5.0, model="a")
+        
+        metrics_dir = self.scratch_dir("metrics")
+        path = registry.write_textfile(metrics_dir / "nested" / "run.prom")
+        lines = path.read_text().splitlines()
+        results.append(self.check(lines[:2] == ["# HELP test_requests_total Requests", "# TYPE test_requests_total counter"],
+                                  "Counter has HELP and TYPE headers"))
+        results.append(self.check('test_requests_total{model="gpt \\"4\\"",outcome="success"} 3' in lines,
+                                  "Counter sample has escaped labels and the summed value"))
+        results.append(self.check(['test_latency_seconds_bucket{model="a",le="0.5"} 1',
+                                   'test_latency_seconds_bucket{model="a",le="2"} 2',
+                                   'test_latency_seconds_bucket{model="a",le="+Inf"} 3',
+                                   'test_latency_seconds_sum{model="a"} 6.3',
+                                   'test_latency_seconds_count{model="a"} 3'] == lines[-5:],
+                                  "Histogram buckets are cumulative with sum and count"))
+        results.append(self.check(sorted(item.name for item in path.parent.iterdir()) == ["run.prom"],
+                                  "Textfile written atomically with no temp file left behind"))
+        
+        runner = self.load_script("workflow-runner.py")
+        orchestrator = runner.WorkflowOrchestrator(self.script_dir / "automation-config.json")
+        orchestrator.metrics_file = metrics_dir / "ai_workflow.prom"
+        runs_before = metrics.RUNS.value(workflow="mvp", outcome="failure")
+        orchestrator._write_metrics(False)
+        text = orchestrator.metrics_file.read_text()
+        results.append(self.check(f'ai_workflow_runs_total{{workflow="mvp",outcome="failure"}} {runs_before + 1:g}' in text,
+                                  "Finished run counted in the --metrics-file textfile"))
+        results.append(self.check("# TYPE ai_workflow_llm_request_duration_seconds histogram" in text,
+                                  "Textfile carries every registered metric"))
+        
+        return all(results)
+    
+    def test_speculation_budget(self) -> bool:
+        """Test that drafts still running count against the speculation budget before another one starts"""
+        self.log_header("Testing Speculation Budget Reservations")
+        import llm_api_integration
+        from content_generation_engine import ContentGenerationRequest, WorkflowContext
+        
+        results = []
+        runner = self.load_script("workflow-runner.py")
+        orchestrator = runner.WorkflowOrchestrator(self.script_dir / "automation-config.json")
+        orchestrator.llm_api_enabled = True
+        orchestrator.config["workflow_execution"]["speculative_generation"] = {"enabled": True, "max_discarded_cost_usd": 0.5}
+        project_root = self.scratch_dir("speculation-budget")
+        context = runner.ExecutionContext(feature_name="shop-mvp", mode=runner.AutomationMode.GUIDED,
+                                          project_root=project_root, feature_dir=project_root, interactive=False)
+        session = orchestrator._create_run_session(context)
+        
+        class GatedEngine:
+            """Each draft costs $0.30 and runs until its output file is released"""
+            def __init__(self):
+                self.released = {}
+            
+            def generate_content(self, request) -> str:
+                self.released.setdefault(request.output_file, threading.Event()).wait(5)
+                for meter in llm_api_integration._cost_meters.get():
+                    meter.add(0.3)
+                return f"# {request.output_file}\n"
+            
+            def release(self, output_file: str):
+                self.released.setdefault(output_file, threading.Event()).set()
+            
+            def get_usage_summary(self) -> Dict[str, float]:
+                return {"total_cost_usd": 0.0}
+        
+        def request(output_file: str) -> ContentGenerationRequest:
+            workflow_context = WorkflowContext(feature_name="shop-mvp", feature_slug="shop-mvp", feature_dir=project_root,
+                                               workflow_step=output_file, phase="planning", project_data={})
+            return ContentGenerationRequest(workflow_document=output_file, context=workflow_context,
+                                            output_file=output_file, content_type="prd")
+        
+        engine = GatedEngine()
+        session._engine = engine
+        try:
+            engine.release("prd.md")
+            session.speculate(request("prd.md"))
+            results.append(self.check(session.take_speculation(request("prd.md")) == "# prd.md\n",
+                                      "Committed draft prices later ones at $0.30"))
+            
+            results.append(self.check(session.speculate(request("srs.md")), "Draft started within budget"))
+            session.discard_speculation("skipped")
+            results.append(self.check(not session.speculate(request("design.md")),
+                                      "Discarded draft still running is reserved: $0.30 + $0.30 would exceed $0.50"))
+            
+            engine.release("srs.md")
+            self.wait_for(lambda: session.speculation_wasted_usd > 0)
+            results.append(self.check(abs(session.speculation_wasted_usd - 0.3) < 1e-9 and not session._running_drafts,
+                                      f"Finished discarded draft booked as waste (${session.speculation_wasted_usd:.2f})"))
+            results.append(self.check(not session.speculate(request("design.md")), "Budget stays closed once spent"))
+        finally:
+            for output_file in ("prd.md", "srs.md", "design.md"):
+                engine.release(output_file)
+            session.close()
+        
+        return all(results)
+    
+    def test_enterprise_plan(self) -> bool:
+        """Test dependency scheduling of enterprise steps, gate and step failures, and session cleanup"""
+        self.log_header("Testing Enterprise Step Scheduling")
+        import builtins
+        
+        results = []
+        enterprise = self.load_script("enterprise-ai-workflow-runner.py")
+        orchestrator = enterprise.EnterpriseWorkflowOrchestrator(self.script_dir / "enterprise-automation-config.json")
+        orchestrator.max_parallel_steps = 3
+        project_root = self.scratch_dir("enterprise")
+        context = enterprise.EnterpriseExecutionContext(feature_name="audit-log", mode=enterprise.AutomationMode.GUIDED,
+                                                        project_root=project_root)
+        
+        # Risk and compliance run side by side; architecture needs both, the rollout plan needs architecture
+        def step(number: str, dependencies: List[str]):
+            return enterprise.EnterpriseWorkflowStep(number, f"{number}-doc.md", "planning", f"gate_{number}", dependencies)
+        
+        plan = [(step("11", []), enterprise.GateDecision.SKIP),
+                (step("12", ["00"]), enterprise.GateDecision.SKIP),
+                (step("13", ["11", "12"]), enterprise.GateDecision.REQUIRED),
+                (step("14", ["13"]), enterprise.GateDecision.SKIP)]
+        session = type("Session", (), {"previous_outputs": {}})()
+        
+        def run(gated_out=(), failing=()):
+            events, lock = [], threading.Lock()
+            
+            def run_step(step, context, session, previous_outputs):
+                with lock:
+                    events.append(("start", step.number))
+                time.sleep(0.05)
+                with lock:
+                    events.append(("end", step.number))
+                return None if step.number in failing else [f"doc-{step.number}"]
+            
+            orchestrator._run_enterprise_step = run_step
+            orchestrator._pass_enterprise_gate = lambda step, decision, context: step.number not in gated_out
+            return orchestrator._execute_enterprise_plan(plan, context, session), events
+        
+        success, events = run()
+        position = {event: index for index, event in enumerate(events)}
+        results.append(self.check(success and len(events) == 8, f"Every step ran once ({len(events) // 2} steps)"))
+        results.append(self.check(position[("start", "12")] < position[("end", "11")],
+                                  "Independent steps run in parallel (a dependency outside the plan is ignored)"))
+        results.append(self.check(position[("start", "13")] > max(position[("end", "11")], position[("end", "12")])
+                                  and position[("start", "14")] > position[("end", "13")],
+                                  "Each step starts only after its dependencies finished"))
+        
+        success, events = run(gated_out={"13"})
+        started = {number for event, number in events if event == "start"}
+        results.append(self.check(not success and started == {"11", "12"},
+                                  f"Rejected gate stops the plan after running steps finish (ran {sorted(started)})"))
+        
+        success, events = run(failing={"11"})
+        started = {number for event, number in events if event == "start"}
+        results.append(self.check(not success and "13" not in started and "14" not in started,
+                                  "Failed step blocks the steps that depend on it"))
+        
+        # A failing plan still closes the run session
+        closed = []
+        orchestrator.create_enterprise_execution_plan = lambda context: plan
+        orchestrator.display_enterprise_execution_plan = lambda plan, context: None
+        orchestrator._create_run_session = lambda context: type("Session", (), {
+            "run_id": "run-1", "feature_dir": project_root, "close": lambda self: closed.append(True)})()
+        orchestrator._load_mvp_context = lambda context, session: None
+        
+        def fail_plan(plan, context, session):
+            raise RuntimeError("step pool crashed")
+        
+        orchestrator._execute_enterprise_plan = fail_plan
+        original_input = builtins.input
+        builtins.input = lambda prompt="": "y"
+        error = None
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                orchestrator.execute_enterprise_workflow(context)
+        except RuntimeError as e:
+            error = e
+        finally:
+            builtins.input = original_input
+        results.append(self.check(error is not None and closed == [True], "Run session closed when the plan raises"))
+        
+        return all(results)
+    
+    def test_batch_runs(self) -> bool:
+        """Test batch validation, concurrent projects, and the unattended copy each project runs on"""
+        self.log_header("Testing Batch MVP Creation")
+        
+        results = []
+        runner = self.load_script("workflow-runner.py")
+        orchestrator = runner.WorkflowOrchestrator(self.script_dir / "automation-config.json")
+        orchestrator.llm_provider = "openai"
+        orchestrator.shared_engine = type("Engine", (), {"llm_config_data": {"providers": {"openai": {}, "anthropic": {}}},
+                                                         "budget": None})()
+        answers = {"primary_user": "Shop owners", "user_pain_point": "Manual stock lists",
+                   "user_success_journey": "Scan, count, reorder", "user_access_method": "web",
+                   "business_model": "subscription", "key_success_metric": "Weekly active shops",
+                   "three_month_success": "50 shops", "project_complexity": "simple", "team_context": "solo"}
+        records = [dict(answers, project_name=f"Shop {index}") for index in range(3)]
+        records.append({"project": "shop-claude", "answers": dict(answers, project_name="Claude Shop"),
+                        "llm_provider": "anthropic"})
+        
+        active, peak, ran, lock = [0], [0], [], threading.Lock()
+        
+        def fake_project(orchestrator, project):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+                ran.append(project)
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return {"project": project.project_name, "success": project.project_name != "shop-2", "cost_usd": 0.1,
+                    "error": None, "llm": project.llm_provider or "default", "seconds": 0.05}
+        
+        original_project = runner.run_batch_project
+        runner.run_batch_project = fake_project
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                invalid = runner.run_batch(orchestrator, records + [{"project_name": "Broken"},
+                                                                    dict(answers, project_name="Shop 0")], workers=4)
+            results.append(self.check(invalid is False and not ran,
+                                      "Invalid or duplicate records reject the whole batch before anything is created"))
+            
+            with contextlib.redirect_stdout(io.StringIO()):
+                success = runner.run_batch(orchestrator, records, workers=4)
+        finally:
+            runner.run_batch_project = original_project
+        results.append(self.check(sorted(project.project_name for project in ran) == ["shop-0", "shop-1", "shop-2", "shop-claude"]
+                                  and next(p for p in ran if p.project_name == "shop-claude").llm_provider == "anthropic",
+                                  "Every record became a project with its own provider override"))
+        results.append(self.check(peak[0] > 1, f"Projects ran concurrently (peak {peak[0]})"))
+        results.append(self.check(success is False, "One failed project fails the batch"))
+        
+        # Each project runs unattended on its own copy of the shared orchestrator
+        project_root = self.scratch_dir("batch-project")
+        seen, initialized = {}, []
+        
+        def execute_workflow(context, dry_run=False):
+            seen.update(mode=context.mode, interactive=context.interactive, answers=context.answers)
+            context.cost_usd = 0.25
+            if context.answers.get("project_name") == "Broken":
+                raise RuntimeError("provider unavailable")
+            return True
+        
+        orchestrator.execute_workflow = execute_workflow
+        original_prepare, original_mark = runner.prepare_mvp_context, runner.mark_mvp_initialized
+        runner.prepare_mvp_context = lambda name, mode: runner.ExecutionContext(feature_name=f"{name}-mvp", mode=mode,
+                                                                                  project_root=project_root / name)
+        runner.mark_mvp_initialized = lambda root, mode: initialized.append(root.name)
+        try:
+            result = runner.run_batch_project(orchestrator, runner.BatchProject("shop-claude", records[3]["answers"],
+                                                                                "anthropic", "claude-3-haiku"))
+            failed = runner.run_batch_project(orchestrator, runner.BatchProject("broken", dict(answers, project_name="Broken")))
+        finally:
+            runner.prepare_mvp_context, runner.mark_mvp_initialized = original_prepare, original_mark
+        results.append(self.check(seen["mode"] == runner.AutomationMode.AUTONOMOUS and seen["interactive"] is False,
+                                  "Batch project runs autonomously and never prompts"))
+        results.append(self.check(result["success"] and result["cost_usd"] == 0.25 and result["llm"] == "anthropic/claude-3-haiku"
+                                  and initialized == ["shop-claude"], f"Result carries cost, LLM and initialization ({result['llm']})"))
+        results.append(self.check(orchestrator.llm_provider == "openai" and orchestrator.llm_model is None,
+                                  "Provider override stays on the project's copy of the orchestrator"))
+        results.append(self.check(not failed["success"] and failed["error"] == "provider unavailable" and failed["llm"] == "openai",
+                                  "A raising project reports its error instead of stopping the batch"))
+        
+        return all(results)
+    
+    def test_warm_up(self) -> bool:
+        """Test the background warm-up: opt-in prompt priming, one handshake per client and the bounded wait"""
+        self.log_header("Testing Warm-Up")
+        from content_generation_engine import ContentGenerationEngine
+        from llm_api_integration import LLMConfig, LLMProvider, LLMResponse
+        
+        results = []
+        runner = self.load_script("workflow-runner.py")
+        orchestrator = runner.WorkflowOrchestrator(self.script_dir / "automation-config.json")
+        orchestrator.llm_api_enabled = True
+        project_root = self.scratch_dir("warm-up")
+        entrypoint = self.script_dir / "lean-workflow" / "01-mvp-entrypoint.md"
+        
+        class BlockingEngine:
+            def __init__(self, fail: bool = False):
+                self.calls, self.release, self.fail = [], threading.Event(), fail
+            
+            def warm_up(self, documents, content_types, primed):
+                self.calls.append((documents, content_types, primed))
+                self.release.wait(5)
+                if self.fail:
+                    raise ConnectionError("provider unreachable")
+                return {"documents": len(documents), "connections": 1, "primed": len(primed)}
+        
+        def start(prime_prompt_cache: bool, prime: bool, max_wait_seconds: float = 15, fail: bool = False):
+            context = runner.ExecutionContext(feature_name="shop-mvp", mode=runner.AutomationMode.GUIDED,
+                                              project_root=project_root, feature_dir=project_root, interactive=False)
+            session = orchestrator._create_run_session(context)
+            session.llm_config_data["prompt_engineering"]["warm_up"] = {
+                "enabled": True, "prime_prompt_cache": prime_prompt_cache, "prime_documents": 2,
+                "max_wait_seconds": max_wait_seconds}
+            session._engine = BlockingEngine(fail)
+            started = session.start_warm_up(entrypoint, prime=prime)
+            return session, started
+        
+        session, started = start(prime_prompt_cache=False, prime=True, max_wait_seconds=0.1)
+        self.wait_for(lambda: session._engine.calls)
+        documents, content_types, primed = session._engine.calls[0]
+        results.append(self.check(started and not session.start_warm_up(entrypoint), "Warm-up starts once per session"))
+        results.append(self.check(entrypoint in documents and content_types[0] == "tech_stack" and "prd" in content_types,
+                                  f"Every workflow document is parsed and its client warmed ({len(documents)} documents)"))
+        results.append(self.check(primed == [], "Prompt cache priming is opt-in (prime_prompt_cache)"))
+        
+        waited = time.perf_counter()
+        session.finish_warm_up()
+        waited = time.perf_counter() - waited
+        results.append(self.check(0.05 <= waited < 2 and session._warm_up.is_alive(),
+                                  f"First generation waits at most max_wait_seconds for warm-up ({waited:.2f}s)"))
+        session._engine.release.set()
+        session._warm_up.join(5)
+        session.close()
+        
+        session, _ = start(prime_prompt_cache=True, prime=True)
+        session._engine.release.set()
+        session.finish_warm_up()
+        primed = session._engine.calls[0][2]
+        results.append(self.check([(path.name, content_type) for path, content_type in primed]
+                                  == [("01-mvp-entrypoint.md", "mvp_entrypoint"), ("02-gen-prd.md", "prd")],
+                                  "Enabled priming sends the next prime_documents prompt prefixes"))
+        session.close()
+        
+        session, _ = start(prime_prompt_cache=True, prime=False)
+        session._engine.release.set()
+        session.finish_warm_up()
+        results.append(self.check(session._engine.calls[0][2] == [],
+                                  "No priming when answers are preloaded (no think time to hide it in)"))
+        session.close()
+        
+        session, _ = start(prime_prompt_cache=False, prime=False, fail=True)
+        session._engine.release.set()
+        session.finish_warm_up()
+        results.append(self.check(not session._warm_up.is_alive(), "A failing warm-up ends quietly"))
+        session.close()
+        
+        # Engine: one handshake per distinct client, priming only where providers cache prompts
+        config = json.loads((self.script_dir / "llm-config.json").read_text())
+        engine = ContentGenerationEngine(llm_config_data=config)
+        
+        class FakeIntegration:
+            def __init__(self, provider: LLMProvider, api_key: str):
+                self.config = LLMConfig(provider=provider, model="model", api_key=api_key)
+                self.connections, self.requests = 0, []
+            
+            def open_connection(self) -> bool:
+                self.connections += 1
+                return True
+            
+            def generate_content(self, request) -> LLMResponse:
+                self.requests.append(request)
+                return LLMResponse(content="", provider="openai", model="model", tokens_used=1, cost_usd=0.0,
+                                   execution_time=0.0)
+        
+        openai, anthropic, primer = (FakeIntegration(LLMProvider.OPENAI, "key-1"), FakeIntegration(LLMProvider.ANTHROPIC, "key-2"),
+                                     FakeIntegration(LLMProvider.OPENAI, "key-1"))
+        primer_configs = []
+        engine._select_llm_for_content_type = lambda content_type: anthropic if content_type == "srs" else openai
+        engine._get_llm_integration = lambda llm_config: primer_configs.append(llm_config) or primer
+        workflow_dir = self.script_dir / "lean-workflow"
+        summary = engine.warm_up([workflow_dir / "02-gen-prd.md", workflow_dir / "03-gen-srs.md"], ["tech_stack", "prd", "srs"],
+                                 [(workflow_dir / "02-gen-prd.md", "prd"), (workflow_dir / "03-gen-srs.md", "srs")])
+        results.append(self.check(summary == {"documents": 2, "connections": 2, "primed": 1}
+                                  and openai.connections == 1 and anthropic.connections == 1,
+                                  f"One connection per distinct client ({summary})"))
+        results.append(self.check(len(primer.requests) == 1 and primer_configs[0].max_tokens == 1
+                                  and "02-gen-prd.md" in primer.requests[0].prompt,
+                                  "Only the caching provider's prefix is primed, with max_tokens=1"))
+        
+        return all(results)
+    
+    def test_drafted_sections(self) -> bool:
+        """Test that a speculative draft waits for section drafts queued before it, and only for those"""
+        self.log_header("Testing Drafted Sections Behind a Gate")
+        from concurrent.futures import TimeoutError as FutureTimeout
+        from content_generation_engine import ContentGenerationRequest, WorkflowContext
+        
+        results = []
+        runner = self.load_script("workflow-runner.py")
+        orchestrator = runner.WorkflowOrchestrator(self.script_dir / "automation-config.json")
+        orchestrator.llm_api_enabled = True
+        orchestrator.config["workflow_execution"]["speculative_generation"] = {"enabled": True, "max_discarded_cost_usd": 0.5}
+        project_root = self.scratch_dir("drafted-sections")
+        answers = {"primary_user": "Shop owners", "user_pain_point": "Manual stock lists"}
+        request = ContentGenerationRequest(str(self.script_dir / "lean-workflow" / "02-gen-prd.md"),
+                                           WorkflowContext("Shop", "shop", project_root, "02", "planning", answers),
+                                           "prd.md", "prd")
+        
+        class DraftingEngine:
+            def __init__(self):
+                self.drafted_sections = []
+            
+            def draft_sections(self, request, sections: List[str]) -> str:
+                time.sleep(0.05)
+                return "## Overview\nDrafted from the first answers.\n"
+            
+            def generate_content(self, request) -> str:
+                self.drafted_sections.append(request.drafted_sections)
+                return "# PRD\n"
+            
+            def get_usage_summary(self) -> Dict[str, float]:
+                return {"total_cost_usd": 0.0}
+        
+        def new_session():
+            context = runner.ExecutionContext(feature_name="shop-mvp", mode=runner.AutomationMode.GUIDED,
+                                              project_root=project_root, feature_dir=project_root, interactive=False)
+            session = orchestrator._create_run_session(context)
+            session._engine = DraftingEngine()
+            return session
+        
+        # Sections drafted during step 01 are merged into the draft made while step 02's gate is open
+        session = new_session()
+        session.draft_sections(request, ["Overview"])
+        session.speculate(request)
+        content = session.take_speculation(request)
+        results.append(self.check(content == "# PRD\n" and session._engine.drafted_sections == ["## Overview\nDrafted from the first answers.\n"],
+                                  "Speculative draft waited for the earlier section draft and merged it"))
+        session.close()
+        
+        # A section draft queued behind the speculative one on the single worker must not be waited for
+        session = new_session()
+        engine, started = session._engine, threading.Event()
+        session.get_engine = lambda: (started.wait(5), engine)[1]
+        session.speculate(request)
+        session.draft_sections(request, ["Overview"])
+        section_draft = session._section_drafts[request.output_file]
+        started.set()
+        try:
+            content = session._speculations[request.output_file].future.result(timeout=2)
+        except FutureTimeout:
+            content = None
+            section_draft.future.cancel()  # Unblock the stuck worker
+        results.append(self.check(content == "# PRD\n" and engine.drafted_sections == [None],
+                                  "Later section draft is left for the step instead of deadlocking the pool"))
+        results.append(self.check(session._section_drafts.get(request.output_file) is section_draft,
+                                  "Later section draft stays available to the step"))
+        session.close()
+        
+        return all(results)
+    
+    def test_agent_pool_errors(self) -> bool:
+        """Test that agent pool failures keep their message and only credential errors mention the API key"""
+        self.log_header("Testing Step Error Messages")
+        
+        results = []
+        runner = self.load_script("workflow-runner.py")
+        orchestrator = runner.WorkflowOrchestrator(self.script_dir / "automation-config.json")
+        orchestrator.llm_api_enabled = True
+        orchestrator.config["workflow_execution"]["multi_agent"] = {"enabled": True, "agents": {"backend": 1, "frontend": 1},
+                                                                    "max_attempts": 1}
+        
+        class FailingEngine:
+            def __init__(self, error: Exception, failing_task: str = ""):
+                self.error, self.failing_task = error, failing_task
+            
+            def generate_content(self, request) -> str:
+                if any(f"Task {self.failing_task}:" in directive for directive in request.ai_directives or []) or not self.failing_task:
+                    raise self.error
+                return "## Implementation\nDone.\n"
+            
+            def get_usage_summary(self) -> Dict[str, float]:
+                return {"total_cost_usd": 0.0}
+        
+        def run_step(prefix: str, engine) -> str:
+            project_root = self.scratch_dir(f"step-errors-{prefix}")
+            feature_dir = project_root / "features" / "2026-01-15-mvp"
+            feature_dir.mkdir(parents=True)
+            (feature_dir / "tasks.md").write_text("# Tasks\n\n## Tasks (Context-Embedded)\n"
+                                                  "- [ ] 1.0 Auth API\n  - [ ] 1.1 Login endpoint\n"
+                                                  "- [ ] 2.0 Login page UI\n  - [ ] 2.1 Build form component\n")
+            context = runner.ExecutionContext(feature_name="shop-mvp", mode=runner.AutomationMode.GUIDED,
+                                              project_root=project_root, feature_dir=feature_dir, interactive=False)
+            session = orchestrator._create_run_session(context)
+            session._engine = engine
+            step = next(step for step in orchestrator.workflow_steps if step.doc_name.startswith(prefix))
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                success = orchestrator._execute_step(step, runner.GateDecision.SKIP, context, session)
+            session.close()
+            return "" if success else output.getvalue()
+        
+        output = run_step("07-", FailingEngine(RuntimeError("context window exceeded"), failing_task="2.0"))
+        results.append(self.check("Tasks 2.0 were not implemented" in output and "API key" not in output,
+                                  "Agent pool failure is reported with its own message"))
+        
+        output = run_step("02-", FailingEngine(ValueError("LLM initialization failed: OpenAI API key required. Set OPENAI_API_KEY environment variable.")))
+        results.append(self.check("system requires valid API key" in output, "Missing credentials still point at the API key"))
+        
+        output = run_step("02-", FailingEngine(ConnectionError("provider unreachable")))
+        results.append(self.check("provider unreachable" in output and "API key" not in output,
+                                  "Other generation failures are not blamed on the API key"))
+        
+        return all(results)
+    
+    def test_agent_bus_defaults(self) -> bool:
+        """Test step 07 with the shipped multi-agent settings: the pool behind the in-process message bus"""
+        self.log_header("Testing Step 07 With Default Settings")
+        
+        results = []
+        runner = self.load_script("workflow-runner.py")
+        orchestrator = runner.WorkflowOrchestrator(self.script_dir / "automation-config.json")
+        orchestrator.llm_api_enabled = True
+        settings = orchestrator.config["workflow_execution"]["multi_agent"]
+        results.append(self.check(settings["enabled"] and settings["message_bus"]["enabled"] and not settings["message_bus"]["socket_path"],
+                                  "Agent pool and in-process message bus are on by default"))
+        
+        project_root = self.scratch_dir("agent-bus-defaults")
+        feature_dir = project_root / "features" / "2026-01-15-mvp"
+        feature_dir.mkdir(parents=True)
+        (feature_dir / "tasks.md").write_text("# Tasks\n\n## Tasks (Context-Embedded)\n"
+                                              "- [ ] 1.0 Auth API\n  - [ ] 1.1 Login endpoint\n"
+                                              "- [ ] 2.0 Login page UI\n  - [ ] 2.1 Build form component\n"
+                                              "- [ ] 3.0 API docs (depends on Task 1.0)\n  - [ ] 3.1 Endpoint reference\n")
+        context = runner.ExecutionContext(feature_name="shop-mvp", mode=runner.AutomationMode.GUIDED,
+                                          project_root=project_root, feature_dir=feature_dir, interactive=False)
+        session = orchestrator._create_run_session(context)
+        
+        class RecordingEngine:
+            def __init__(self):
+                self.threads, self.lock = [], threading.Lock()
+            
+            def generate_content(self, request) -> str:
+                with self.lock:
+                    self.threads.append(threading.current_thread().name)
+                return "## Implementation\nDone.\n"
+            
+            def get_usage_summary(self) -> Dict[str, float]:
+                return {"total_cost_usd": 0.0}
+        
+        engine = RecordingEngine()
+        session._engine = engine
+        step = next(step for step in orchestrator.workflow_steps if step.doc_name.startswith("07-"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            success = orchestrator._execute_step(step, runner.GateDecision.SKIP, context, session)
+        session.close()
+        
+        state = json.loads((feature_dir / "coordination-state.json").read_text())
+        guide = (feature_dir / "implementation-guide.md").read_text()
+        results.append(self.check(success and len(engine.threads) == 3, f"One generation per parent task ({len(engine.threads)} calls)"))
+        results.append(self.check(all(not name.startswith("agent") for name in engine.threads),
+                                  f"Tasks reached the agents over the bus, not the coordinator's worker threads ({sorted(set(engine.threads))})"))
+        results.append(self.check(state and all(f"Task {number}" in guide for number in ("1.0", "2.0", "3.0")),
+                                  "Guide merges every task and coordination state was written"))
+        
+        return all(results)
+    
+    def cleanup(self):
+        """Remove the suite's temporary directory"""
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+    
+    def run_module_test_suite(self, only: List[str] = None) -> Dict[str, bool]:
+        """Run every module test (or the named subset)"""
+        self.log_header("🧪 WORKFLOW MODULE TEST SUITE")
+        
+        tests: List[Tuple[str, Callable[[], bool]]] = [
+            ("daemon_job_queue", self.test_daemon_job_queue),
+            ("manifest_journal", self.test_manifest_journal),
+            ("project_registry", self.test_project_registry),
+            ("workspace_catalog", self.test_workspace_catalog),
+            ("document_index", self.test_document_index),
+            ("workflow_tracing", self.test_workflow_tracing),
+            ("cost_attribution", self.test_cost_attribution),
+            ("approval_history", self.test_approval_history),
+            ("tech_stack_cache", self.test_tech_stack_cache),
+            ("stream_retry_reset", self.test_stream_retry_reset),
+            ("quality_gates", self.test_quality_gates),
+            ("output_watcher", self.test_output_watcher),
+            ("agent_coordinator", self.test_agent_coordinator),
+            ("agent_pool_gate", self.test_agent_pool_gate),
+            ("task_graph", self.test_task_graph),
+            ("agent_bus", self.test_agent_bus),
+            ("progress_dashboard", self.test_progress_dashboard),
+            ("structured_prompt", self.test_structured_prompt),
+            ("non_interactive_gate", self.test_non_interactive_gate),
+            ("workflow_logging", self.test_workflow_logging),
+            ("metrics_textfile", self.test_metrics_textfile),
+            ("speculation_budget", self.test_speculation_budget),
+            ("enterprise_plan", self.test_enterprise_plan),
+            ("batch_runs", self.test_batch_runs),
+            ("warm_up", self.test_warm_up),
+            ("drafted_sections", self.test_drafted_sections),
+            ("agent_pool_errors", self.test_agent_pool_errors),
+            ("agent_bus_defaults", self.test_agent_bus_defaults),
+        ]
+        
+        results = {}
+        for name, test in tests:
+            if only and name not in only:
+                continue
+            try:
+                results[name] = bool(test())
+            except Exception as e:
+                self.log_error(f"{name} raised {e.__class__.__name__}: {e}")
+                results[name] = False
+            if results[name]:
+                self.log_success(f"{name} passed")
+            else:
+                self.failed_tests.append(name)
+        
+        return results
+    
+    def print_test_summary(self, results: Dict[str, bool]):
+        """Print test summary"""
+        print()
+        self.log_header("🎯 TEST RESULTS SUMMARY")
+        
+        passed_tests = [name for name, success in results.items() if success]
+        failed_tests = [name for name, success in results.items() if not success]
+        
+        if passed_tests:
+            print(f"{Colors.GREEN}✅ PASSED TESTS ({len(passed_tests)}):{Colors.NC}")
+            for test in passed_tests:
+                print(f"   ✅ {test}")
+            print()
+        
+        if failed_tests:
+            print(f"{Colors.RED}❌ FAILED TESTS ({len(failed_tests)}):{Colors.NC}")
+            for test in failed_tests:
+                print(f"   ❌ {test}")
+            print()
+        
+        self.log_info(f"📊 {len(passed_tests)}/{len(results)} module tests passed")
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="🧪 Workflow Module Test Suite"
+    )
+    
+    parser.add_argument("tests",
+                       nargs="*",
+                       help="Run only these tests (default: all)")
+    
+    parser.add_argument("--debug",
+                       action="store_true",
+                       help="Log every passing assertion")
+    
+    args = parser.parse_args()
+    
+    tester = ModuleTester(debug=args.debug)
+    
+    try:
+        results = tester.run_module_test_suite(only=args.tests)
+        tester.print_test_summary(results)
+        sys.exit(0 if results and all(results.values()) else 1)
+    
+    except KeyboardInterrupt:
+        print(f"\n{Colors.YELLOW}⚠️  Test interrupted by user{Colors.NC}")
+        sys.exit(1)
+    finally:
+        tester.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -12,12 +12,48 @@ import argparse
 import logging
 import subprocess
 import re
+from functools import partial
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 import tempfile
 
+from workflow_logging import get_logger
+import workflow_tracing as tracing
+import workflow_progress as progress
+
+# Content type generated by each workflow document (also scopes approval history)
+CONTENT_TYPES = {
+    "01-mvp-entrypoint.md": "mvp_entrypoint",
+    "02-gen-prd.md": "prd",
+    "03-gen-srs.md": "srs", 
+    "04-gen-design-decisions-lite.md": "design_decisions",
+    "05-gen-design.md": "design_analysis",
+    "06-gen-tasks-and-testing.md": "tasks",
+    "07-process-tasks.md": "task_processing",
+    "08-gen-completion-summary.md": "completion_summary",
+    "09-gen-project-history.md": "project_history",
+    # Enterprise workflow mappings
+    "s01-mvp-to-scaling-transition.md": "enterprise",
+    "s02-gen-design-decisions-scaling.md": "design_decisions",
+    "s03-gen-srs-scaling.md": "srs",
+    "s04-create-prd-scaling.md": "prd",
+    "s05-gen-design-scaling.md": "design_analysis",
+    "s06-tasks-and-testing-scaling.md": "tasks",
+    "s07-gen-enterprise-completion-summary.md": "completion_summary",
+    "s08-gen-enterprise-history.md": "project_history"
+}
+
+def _is_authentication_error(error: BaseException) -> bool:
+    """Missing or rejected provider credentials, anywhere in the exception chain"""
+    while error is not None:
+        if type(error).__name__ in ("AuthenticationError", "PermissionDeniedError") or \
+                getattr(error, "status_code", None) in (401, 403) or "api key" in str(error).lower():
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
 @dataclass
 class WorkflowContext:
     """Context data passed between workflow steps"""
@@ -30,34 +66,19 @@ class WorkflowContext:
     project_data: Dict[str, Any]
     generated_files: List[str]
     execution_log: List[str]
+    previous_outputs: Optional[Dict[str, str]] = None  # Explicit step context (e.g. only dependency outputs)
     
     def save_to_manifest(self):
-        """Save context to feature manifest"""
-        manifest_path = self.feature_dir / "feature-manifest.json"
-        
-        if manifest_path.exists():
-            with open(manifest_path, 'r') as f:
-                manifest = json.load(f)
-        else:
-            manifest = self._create_base_manifest()
-        
-        # Update workflow status
-        manifest["workflow_status"]["current_phase"] = self.phase
-        manifest["workflow_status"]["last_updated"] = datetime.now(timezone.utc).isoformat()
-        
-        # Update execution log
-        if "execution_log" not in manifest:
-            manifest["execution_log"] = []
-        manifest["execution_log"].extend(self.execution_log)
-        
-        # Update generated files
-        if "generated_files" not in manifest:
-            manifest["generated_files"] = []
-        manifest["generated_files"].extend(self.generated_files)
+        """Append this step's updates to the feature manifest journal"""
+        from manifest_journal import open_journal
         
-        # Save updated manifest
-        with open(manifest_path, 'w') as f:
-            json.dump(manifest, f, indent=2)
+        journal = open_journal(self.feature_dir / "feature-manifest.json")
+        journal.append([
+            {"op": "set", "path": ["workflow_status", "current_phase"], "value": self.phase},
+            {"op": "set", "path": ["workflow_status", "last_updated"], "value": datetime.now(timezone.utc).isoformat()},
+            {"op": "extend", "path": ["execution_log"], "value": self.execution_log},
+            {"op": "extend", "path": ["generated_files"], "value": self.generated_files}
+        ], base=self._create_base_manifest())
     
     def _create_base_manifest(self):
         """Create base manifest structure"""
@@ -82,10 +103,13 @@ class WorkflowContext:
 class WorkflowDocumentExecutor:
     """Executes individual workflow documents with AI integration"""
     
-    def __init__(self, debug: bool = False):
+    def __init__(self, debug: bool = False, session=None):
         self.debug = debug
         self.logger = self._setup_logging()
         
+        # Optional RunSession shared across steps (engine, parsed docs, project data)
+        self.session = session
+        
         # LLM API integration attributes
         self.llm_api_enabled = False
         self.llm_provider = None
@@ -95,20 +119,7 @@ class WorkflowDocumentExecutor:
         
     def _setup_logging(self) -> logging.Logger:
         """Setup logging configuration"""
-        logger = logging.getLogger('workflow_executor')
-        level = logging.DEBUG if self.debug else logging.INFO
-        logger.setLevel(level)
-        
-        # Console handler
-        if not logger.handlers:
-            console_handler = logging.StreamHandler()
-            formatter = logging.Formatter(
-                '%(asctime)s - %(levelname)s - %(message)s'
-            )
-            console_handler.setFormatter(formatter)
-            logger.addHandler(console_handler)
-        
-        return logger
+        return get_logger('workflow_executor', logging.DEBUG if self.debug else logging.INFO)
     
     def execute_workflow_document(self, 
                                   document_path: Path, 
@@ -119,7 +130,11 @@ class WorkflowDocumentExecutor:
         self.logger.info(f"🔄 Executing workflow document: {document_path.name}")
         
         # Parse workflow document for instructions
-        instructions = self._parse_workflow_document(document_path)
+        with tracing.span(f"parse {document_path.name}", "parse"):
+            if self.session:
+                instructions = self.session.parse_document(document_path, self._parse_workflow_document)
+            else:
+                instructions = self._parse_workflow_document(document_path)
         
         if not instructions:
             self.logger.error(f"❌ Failed to parse workflow document: {document_path}")
@@ -275,55 +290,42 @@ class WorkflowDocumentExecutor:
             if document_path.name == "01-mvp-entrypoint.md":
                 return self._execute_interactive_mvp_initialization(document_path, context)
             
-            # Import content generation engine
-            from content_generation_engine import ContentGenerationEngine, ContentGenerationRequest, WorkflowContext as CGContext
-            
             # Create content generation engine with user's provider/model selection
-            engine = ContentGenerationEngine(
-                debug=self.debug,
-                user_provider=self.llm_provider,
-                user_model=self.llm_model
-            )
-            
-            # Determine content type from document name
-            content_type = self._determine_content_type(document_path.name)
-            
-            # Create workflow context for content generation
-            cg_context = CGContext(
-                feature_name=context.feature_name,
-                feature_slug=context.feature_slug,
-                feature_dir=context.feature_dir,
-                workflow_step=context.step_number,
-                phase=context.phase,
-                project_data=context.project_data,
-                previous_outputs=self._load_previous_outputs(context)
-            )
+            engine = self._get_engine()
             
-            # Generate primary output file
-            primary_output = self._get_primary_output_file(document_path.name)
+            # Build the request for the primary output file
+            request = self._create_generation_request(document_path, instructions, context)
             
-            if primary_output:
-                request = ContentGenerationRequest(
-                    workflow_document=str(document_path),  # Pass full path instead of just name
-                    context=cg_context,
-                    output_file=primary_output,
-                    content_type=content_type,
-                    template_sections=instructions.get('template_sections', {}),
-                    ai_directives=instructions.get('ai_directives', [])
-                )
+            if request:
+                content_type = request.content_type
+                primary_output = request.output_file
                 
-                # Generate REAL content using LLM
-                content = engine.generate_content(request)
+                # Generate REAL content using LLM (or claim the draft generated while the gate was open)
+                with tracing.span(f"generate {content_type}", "generate", output=primary_output):
+                    content = self.session.take_speculation(request) if self.session else None
+                    if content is None and content_type == "task_processing":
+                        content = self._execute_with_agent_pool(request, context)
+                    if content is None:
+                        # Sections drafted during step 01 are merged in; only the rest is generated now
+                        if self.session:
+                            request.drafted_sections = self.session.take_section_draft(request)
+                        content = engine.generate_content(request)
                 
                 # Save generated content
                 output_path = context.feature_dir / primary_output
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                with open(output_path, 'w') as f:
-                    f.write(content)
+                with tracing.span(f"write {primary_output}", "write", bytes=len(content)):
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                    
+                    with open(output_path, 'w') as f:
+                        f.write(content)
+                    
+                    self.logger.info(f"✅ Generated REAL content: {output_path}")
+                    context.generated_files.append(str(output_path))
+                    if self.session:
+                        self.session.record_output(output_path, content)
                 
-                self.logger.info(f"✅ Generated REAL content: {output_path}")
-                context.generated_files.append(str(output_path))
+                if content_type == "tasks":
+                    self._write_task_graph(output_path)
             
             # Status tracking now handled by feature manifest only
             
@@ -334,36 +336,199 @@ class WorkflowDocumentExecutor:
             raise RuntimeError(f"LLM integration required but not available: {e}")
         except Exception as e:
             self.logger.error(f"❌ CRITICAL: LLM API execution failed: {e}")
-            raise RuntimeError(f"LLM API execution failed - system requires valid API key: {e}")
+            if _is_authentication_error(e):
+                raise RuntimeError(f"LLM API execution failed - system requires valid API key: {e}")
+            raise  # Agent pool and generation failures keep their own message
+    
+    def _write_task_graph(self, tasks_path: Path):
+        """Store the task DAG of a generated tasks.md next to it (tasks-graph.json)"""
+        
+        from task_graph import write_task_graph, graph_path
+        
+        try:
+            graph = write_task_graph(tasks_path)
+        except Exception as e:
+            self.logger.warning(f"Could not build the task graph of {tasks_path.name}: {e}")
+            return
+        
+        if graph.cycle:
+            self.logger.warning(f"⚠️  Task dependency cycle in {tasks_path.name}: {' → '.join(graph.cycle)}")
+        else:
+            self.logger.info(f"🕸️  {len(graph.nodes)} tasks, {graph.total_hours:.1f}h of work in "
+                             f"{graph.makespan_hours:.1f}h on the critical path (width {graph.max_parallel_width})")
+        self.logger.info(f"🕸️  Task graph saved to {graph_path(tasks_path).name}")
+    
+    def _execute_with_agent_pool(self, request, context: WorkflowContext) -> Optional[str]:
+        """Implement tasks.md on coordinated worker agents, independent tasks in parallel
+        
+        Returns the merged implementation guide, or None to generate it in one call instead
+        (multi-agent disabled, fewer than two tasks, or a dependency cycle escalated for review).
+        """
+        settings = self.session.multi_agent if self.session else {}
+        tasks_path = context.feature_dir / "tasks.md"
+        if not settings.get("enabled", False) or not tasks_path.exists():
+            return None
+        
+        from agent_coordinator import AgentCoordinator, build_agents, tasks_from_graph, render_implementation_guide
+        from task_graph import write_task_graph
+        
+        # Tasks longest path first, so the critical path never waits behind work that has slack
+        tasks = tasks_from_graph(write_task_graph(tasks_path))
+        if len([task for task in tasks if not task.done_in_source]) < 2:
+            return None
+        
+        engine = self._get_engine()
+        
+        def task_request(task, agent):
+            done = [f"Task {other.task_id}: {other.title}" for other in tasks if other.result]
+            directives = list(request.ai_directives or []) + [
+                f"You are {agent.agent_id} ({agent.agent_type} agent) implementing ONLY Task {task.task_id}: {task.title}",
+                f"Task context: {task.context or 'see tasks.md'}",
+                f"Subtasks, in order: {'; '.join(task.subtasks) or 'none listed'}",
+                f"Already implemented by other agents (integrate, do not redo): {'; '.join(done) or 'nothing yet'}"
+            ]
+            return replace(request, ai_directives=directives)
+        
+        def implement(task, agent) -> str:
+            with tracing.span(f"agent task {task.task_id}", "generate", agent=agent.agent_id):
+                return engine.generate_content(task_request(task, agent))
+        
+        agents = build_agents(settings.get("agents"))
+        worker = implement
+        bus = None
+        bus_settings = settings.get("message_bus", {})
+        if bus_settings.get("enabled", False):
+            bus, agents, worker = self._start_agent_bus(bus_settings, tasks, agents, task_request, implement)
+        
+        coordinator = AgentCoordinator(
+            tasks,
+            agents,
+            max_attempts=settings.get("max_attempts", 2),
+            project_id=context.feature_slug,
+            state_path=context.feature_dir / "coordination-state.json"
+        )
+        
+        print(f"  🤝 Coordinating {len(tasks)} tasks across {len(coordinator.agents)} agents")
+        try:
+            coordinator.run(worker)
+        except ValueError as e:
+            self.logger.warning(f"⚠️  {e}; see coordination-state.json. Generating the guide in one call instead")
+            return None
+        finally:
+            if bus:
+                self.logger.debug(f"Agent bus mailboxes: {bus.stats()}")
+                bus.close()
+        
+        content = render_implementation_guide(context.feature_name, tasks)
+        failed = [task.task_id for task in tasks if task.error and not task.result]
+        if failed:
+            # Keep the finished tasks' work; the step still fails so the gaps are not missed
+            (context.feature_dir / request.output_file).write_text(content)
+            raise RuntimeError(f"Tasks {', '.join(failed)} were not implemented (see coordination-state.json)")
+        return content
+    
+    def _start_agent_bus(self, bus_settings: Dict[str, Any], tasks, agents, task_request, implement):
+        """Run the agents behind a message bus: in-process, or remote processes joining over a Unix socket
+        
+        Returns the bus, the agents that will take assignments and the coordinator's worker.
+        """
+        
+        from agent_bus import BusThread
+        from agent_coordinator import WorkerAgent, bus_worker
+        
+        bus = BusThread(bus_settings.get("queue_size", 64))
+        payload = None
+        
+        socket_path = bus_settings.get("socket_path")
+        if socket_path:
+            socket_path = Path(socket_path).expanduser()
+            bus.serve_unix(socket_path)
+            expected = bus_settings.get("remote_agents", 1)
+            print(f"  🔌 Waiting for {expected} agents on {socket_path} "
+                  f"(./ai-agent-integration.py agent --socket {socket_path} --agent-type backend)")
+            joined = bus.wait_for_registrations(expected, bus_settings.get("registration_timeout_seconds", 60))
+            if joined:
+                agents = [WorkerAgent(m.payload["agent_id"], m.payload["agent_type"], list(m.payload["capabilities"]))
+                          for m in joined]
+                # Remote agents generate themselves from the full request
+                payload = lambda task, agent: {"generation_request": asdict(task_request(task, agent))}
+            else:
+                self.logger.warning("⚠️  No remote agent joined the bus; running the agents in-process")
+        
+        if payload is None:
+            tasks_by_id = {task.task_id: task for task in tasks}
+            for agent in agents:
+                bus.start_agent(agent.agent_id,
+                                lambda message, agent=agent: implement(tasks_by_id[message.payload["task_id"]], agent))
+        
+        return bus, agents, bus_worker(bus, payload, bus_settings.get("task_timeout_seconds", 600))
     
     # Removed _execute_with_ai_instructions_fallback function
     # System now fails fast when LLM API is not available
     
+    def build_generation_request(self, document_path: Path, context: WorkflowContext):
+        """Build the content request a step would send, without generating (used for speculative drafts)"""
+        
+        if document_path.name == "01-mvp-entrypoint.md":
+            return None  # Step 01 needs interactive answers first
+        
+        if self.session:
+            instructions = self.session.parse_document(document_path, self._parse_workflow_document)
+        else:
+            instructions = self._parse_workflow_document(document_path)
+        
+        if not instructions:
+            return None
+        
+        return self._create_generation_request(document_path, instructions, context)
+    
+    def _create_generation_request(self, document_path: Path, instructions: Dict[str, Any], context: WorkflowContext):
+        """Content generation request for the document's primary output file (None if it has none)"""
+        
+        # Import content generation engine
+        from content_generation_engine import ContentGenerationRequest, WorkflowContext as CGContext
+        
+        # Generate primary output file
+        primary_output = self._get_primary_output_file(document_path.name)
+        if not primary_output:
+            return None
+        
+        # Create workflow context for content generation
+        cg_context = CGContext(
+            feature_name=context.feature_name,
+            feature_slug=context.feature_slug,
+            feature_dir=context.feature_dir,
+            workflow_step=context.step_number,
+            phase=context.phase,
+            project_data=context.project_data,
+            previous_outputs=self._load_previous_outputs(context)
+        )
+        
+        return ContentGenerationRequest(
+            workflow_document=str(document_path),  # Pass full path instead of just name
+            context=cg_context,
+            output_file=primary_output,
+            content_type=self._determine_content_type(document_path.name),  # Content type from document name
+            template_sections=instructions.get('template_sections', {}),
+            ai_directives=instructions.get('ai_directives', [])
+        )
+    
+    def _get_engine(self):
+        """Get the session's warm engine, or build one for standalone execution"""
+        if self.session:
+            return self.session.get_engine()
+        
+        from content_generation_engine import ContentGenerationEngine
+        return ContentGenerationEngine(
+            debug=self.debug,
+            user_provider=self.llm_provider,
+            user_model=self.llm_model
+        )
+    
     def _determine_content_type(self, document_name: str) -> str:
         """Determine content type from workflow document name"""
         
-        content_type_mapping = {
-            "01-mvp-entrypoint.md": "mvp_entrypoint",
-            "02-gen-prd.md": "prd",
-            "03-gen-srs.md": "srs", 
-            "04-gen-design-decisions-lite.md": "design_decisions",
-            "05-gen-design.md": "design_analysis",
-            "06-gen-tasks-and-testing.md": "tasks",
-            "07-process-tasks.md": "task_processing",
-            "08-gen-completion-summary.md": "completion_summary",
-            "09-gen-project-history.md": "project_history",
-            # Enterprise workflow mappings
-            "s01-mvp-to-scaling-transition.md": "enterprise",
-            "s02-gen-design-decisions-scaling.md": "design_decisions",
-            "s03-gen-srs-scaling.md": "srs",
-            "s04-create-prd-scaling.md": "prd",
-            "s05-gen-design-scaling.md": "design_analysis",
-            "s06-tasks-and-testing-scaling.md": "tasks",
-            "s07-gen-enterprise-completion-summary.md": "completion_summary",
-            "s08-gen-enterprise-history.md": "project_history"
-        }
-        
-        return content_type_mapping.get(document_name, "prd")
+        return CONTENT_TYPES.get(document_name, "prd")
     
     def _get_primary_output_file(self, document_name: str) -> Optional[str]:
         """Get primary output file for workflow document"""
@@ -394,6 +559,14 @@ class WorkflowDocumentExecutor:
     def _load_previous_outputs(self, context: WorkflowContext) -> Dict[str, str]:
         """Load content from previous workflow outputs for context"""
         
+        # Caller-scoped context wins (parallel schedulers pass only the step's dependencies)
+        if context.previous_outputs is not None:
+            return dict(context.previous_outputs)
+        
+        # The session already holds every output generated or found in this run
+        if self.session:
+            return dict(self.session.previous_outputs)
+        
         previous_outputs = {}
         
         # Try to load previous outputs from feature directory
@@ -479,6 +652,22 @@ class WorkflowDocumentExecutor:
         with open(output_path, 'w') as f:
             f.write(content)
     
+    def _draft_ahead(self, document_path: Path, context: WorkflowContext, group, collected: Dict[str, Any]):
+        """Start drafting later documents' sections that only depend on the question groups answered so far"""
+        
+        settings = self.session.llm_config_data.get("prompt_engineering", {}).get("progressive_drafting", {})
+        if not settings.get("enabled", True):
+            return
+        
+        for entry in settings.get("drafts", []):
+            if entry.get("after_group") != group.name:
+                continue
+            draft_doc = document_path.parent / entry["document"]
+            step_context = replace(context, step_number=draft_doc.name.split("-")[0], project_data=collected)
+            request = self.build_generation_request(draft_doc, step_context)
+            if request:
+                self.session.draft_sections(request, entry.get("sections", []))
+    
     def _execute_interactive_mvp_initialization(self, document_path: Path, context: WorkflowContext) -> bool:
         """Execute MVP initialization using interactive data collection + AI generation"""
         
@@ -497,31 +686,41 @@ class WorkflowDocumentExecutor:
             ai_engine = None
             if self.llm_api_enabled:
                 try:
-                    from content_generation_engine import ContentGenerationEngine
-                    ai_engine = ContentGenerationEngine(
-                        debug=self.debug,
-                        user_provider=self.llm_provider,
-                        user_model=self.llm_model
-                    )
+                    ai_engine = self._get_engine()
                     self.logger.info("✅ AI engine available for tech stack guidance")
                 except Exception as e:
                     self.logger.warning(f"Could not create AI engine for tech stack guidance: {e}")
             
             # Collect data interactively with enhanced framework
-            collector = EnhancedInteractiveDataCollector(ai_engine=ai_engine)
-            project_data = collector.collect_mvp_requirements()
+            # Preloaded answers skip the prompts; fields they miss are only asked when a terminal is attached
+            answers = self.session.answers if self.session else None
+            interactive = self.session.interactive if self.session else True
+            # Finished question groups let later documents start drafting while the rest is answered
+            draft_ahead = partial(self._draft_ahead, document_path, context) if self.session and ai_engine else None
+            collector = EnhancedInteractiveDataCollector(ai_engine=ai_engine, answers=answers,
+                                                         prompt_missing=interactive and (not answers or sys.stdin.isatty()),
+                                                         on_group_complete=draft_ahead)
+            
+            # Use the user's think-time to build clients, open connections, cache documents and prime
+            # prompt caches; headless runs still warm up but don't pay for priming
+            if self.session and ai_engine:
+                self.session.start_warm_up(document_path, prime=collector.needs_user_input())
+            with tracing.span("collect requirements", "user_input"), progress.paused(collector.needs_user_input()):
+                project_data = collector.collect_mvp_requirements()
+            if self.session:
+                self.session.finish_warm_up()
             
             self.logger.info(f"✅ Collected enhanced project data: {project_data.project_name}")
             
+            # Share collected data with every later step in this run
+            if self.session:
+                self.session.record_project_data(project_data.to_dict())
+            
             # Now generate the document using collected data
-            from content_generation_engine import ContentGenerationEngine, ContentGenerationRequest, WorkflowContext as CGContext
+            from content_generation_engine import ContentGenerationRequest, WorkflowContext as CGContext
             
-            # Create content generation engine with user's provider/model selection
-            engine = ContentGenerationEngine(
-                debug=self.debug,
-                user_provider=self.llm_provider,
-                user_model=self.llm_model
-            )
+            # Reuse the AI engine from tech stack guidance when available
+            engine = ai_engine or self._get_engine()
             
             # Create workflow context with collected project data
             cg_context = CGContext(
@@ -551,21 +750,25 @@ class WorkflowDocumentExecutor:
             
             # Generate content with collected data
             self.logger.info(f"🤖 Generating {output_file} with collected project data...")
-            content = engine.generate_content(request)
+            with tracing.span("generate mvp_entrypoint", "generate", output=output_file):
+                content = engine.generate_content(request)
             
             # Save to feature directory
             output_path = context.feature_dir / output_file
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            self.logger.info(f"✅ Generated: {output_path}")
-            
-            # Also save collected data as JSON for next steps
-            data_file = context.feature_dir / "collected-project-data.json"
-            with open(data_file, 'w', encoding='utf-8') as f:
-                f.write(project_data.to_json())
+            with tracing.span(f"write {output_file}", "write", bytes=len(content)):
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                
+                self.logger.info(f"✅ Generated: {output_path}")
+                if self.session:
+                    self.session.record_output(output_path, content)
+                
+                # Also save collected data as JSON for next steps
+                data_file = context.feature_dir / "collected-project-data.json"
+                with open(data_file, 'w', encoding='utf-8') as f:
+                    f.write(project_data.to_json())
             
             self.logger.info(f"💾 Saved project data: {data_file}")
             
@@ -8,16 +8,23 @@ Orchestrates AI agents through the MVP workflow with smart automation
 import json
 import os
 import sys
+import time
 import argparse
 import logging
 import subprocess
 import getpass
+import copy
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from workflow_logging import get_logger, log_context, configure_logging
+import workflow_metrics as metrics
+import workflow_tracing as tracing
+import workflow_progress as progress
+
 class AutomationMode(Enum):
     GUIDED = "guided"
     AUTONOMOUS = "autonomous" 
@@ -29,6 +36,11 @@ class GateDecision(Enum):
     SKIP = "skip"
     LEARN_FROM_HISTORY = "learn_from_history"
 
+class GateResponse(Enum):
+    APPROVED = "approved"
+    REJECTED = "rejected"
+    SKIPPED = "skipped"
+
 @dataclass
 class WorkflowStep:
     number: str
@@ -48,6 +60,17 @@ class ExecutionContext:
     approval_history: Dict[str, bool] = None
     context_mode: str = "STANDALONE_FEATURE"
     existing_project: Optional[str] = None
+    answers: Optional[Dict] = None  # Step 01 answers from --answers
+    interactive: bool = True  # False: never prompt (missing answers, start confirmation, gates)
+    cost_usd: float = 0.0  # LLM spend of the run, filled in when it finishes
+
+@dataclass
+class BatchProject:
+    """One line of a create-mvp --batch file"""
+    project_name: str
+    answers: Dict
+    llm_provider: Optional[str] = None
+    llm_model: Optional[str] = None
 
 def prompt_ai_vendor_setup() -> tuple:
     """Interactive prompt for AI vendor, model selection, and API key"""
@@ -337,9 +360,8 @@ build/
                 }
             }
             
-            import json
-            with open(manifest_path, 'w') as f:
-                json.dump(manifest, f, indent=2)
+            from manifest_journal import atomic_write_json
+            atomic_write_json(manifest_path, manifest)
             print("📊 Created project-manifest.json")
             
         print("🎉 Standard project structure created!")
@@ -364,18 +386,41 @@ def validate_project_name(project_name: str) -> str:
     
     return normalized
 
-def list_projects() -> None:
-    """List all MVP projects in ~/Projects/"""
+def list_projects(status: Optional[str] = None, name_filter: Optional[str] = None, sort: str = "name",
+                  descending: bool = False, limit: Optional[int] = None, as_json: bool = False,
+                  reindex: bool = False) -> None:
+    """List all MVP projects in ~/Projects/ from the workspace catalog"""
+    from workspace_catalog import WorkspaceCatalog
+    
     projects_dir = Path.home() / "Projects"
     
     if not projects_dir.exists():
+        if as_json:
+            print("[]")
+            return
         print("📁 No ~/Projects/ directory found")
         print("💡 Create your first MVP with: ./workflow-runner.py create-mvp PROJECT_NAME")
         return
     
-    project_dirs = [d for d in projects_dir.iterdir() if d.is_dir()]
+    catalog = WorkspaceCatalog(projects_dir)
+    try:
+        if reindex:
+            catalog.rebuild()
+        else:
+            catalog.reconcile()
+        projects = catalog.list_projects(status=status, name_filter=name_filter, sort=sort,
+                                         descending=descending, limit=limit)
+    finally:
+        catalog.close()
+    
+    if as_json:
+        print(json.dumps(projects, indent=2))
+        return
     
-    if not project_dirs:
+    if not projects:
+        if status or name_filter:
+            print("📁 No projects match the given filters")
+            return
         print("📁 No projects found in ~/Projects/")
         print("💡 Create your first MVP with: ./workflow-runner.py create-mvp PROJECT_NAME")
         return
@@ -383,24 +428,21 @@ def list_projects() -> None:
     print("📋 MVP PROJECTS IN ~/Projects/")
     print("=" * 40)
     
-    for project_dir in sorted(project_dirs):
-        manifest_path = project_dir / "project-manifest.json"
-        if manifest_path.exists():
-            try:
-                import json
-                with open(manifest_path, 'r') as f:
-                    manifest = json.load(f)
-                status = manifest.get('status', 'unknown')
-                created = manifest.get('created_at', 'unknown')[:10]  # Just date
-                features_count = len(manifest.get('features', []))
-                print(f"  📁 {project_dir.name} - {status} (created: {created}, {features_count} features)")
-            except:
-                print(f"  📁 {project_dir.name} - status unknown")
+    for project in projects:
+        if not project["is_mvp"]:
+            print(f"  📁 {project['name']} - not an MVP project")
+        elif project["status"] is None:
+            print(f"  📁 {project['name']} - status unknown")
         else:
-            print(f"  📁 {project_dir.name} - not an MVP project")
+            created = (project["created_at"] or "unknown")[:10]  # Just date
+            print(f"  📁 {project['name']} - {project['status']} "
+                  f"(created: {created}, {project['features_count']} features)")
 
-def show_project_status(project_name: str) -> None:
-    """Show detailed status for a project"""
+def show_project_status(project_name: str, as_json: bool = False) -> None:
+    """Show detailed status for a project from the workspace catalog"""
+    from workspace_catalog import WorkspaceCatalog
+    from project_registry import active_runs
+    
     project_path = Path.home() / "Projects" / project_name
     
     if not project_path.exists():
@@ -414,9 +456,20 @@ def show_project_status(project_name: str) -> None:
         return
     
     try:
-        import json
-        with open(manifest_path, 'r') as f:
-            manifest = json.load(f)
+        catalog = WorkspaceCatalog(project_path.parent)
+        try:
+            catalog.reconcile(project_name)
+            project = catalog.get_project(project_name)
+        finally:
+            catalog.close()
+        
+        manifest = project["manifest"]
+        running = active_runs(project_path, manifest)
+        
+        if as_json:
+            project["active_runs"] = running
+            print(json.dumps(project, indent=2))
+            return
         
         print(f"📊 PROJECT STATUS: {project_name}")
         print("=" * 50)
@@ -434,19 +487,23 @@ def show_project_status(project_name: str) -> None:
         else:
             print("  • No additional features yet")
         
+        # Show workflow runs in progress
+        if running:
+            print(f"\n🏃 ACTIVE RUNS ({len(running)}):")
+            print("-" * 30)
+            for run in running:
+                print(f"  • {run['run_id']} - {run['command']} '{run['feature_name']}' "
+                      f"(pid {run['pid']}, started {run['started_at'][:19]})")
+                print(f"     📁 {Path(run['feature_dir']).name}/")
+        
         # Show feature directories
-        features_dir = project_path / "features"
-        if features_dir.exists():
-            feature_dirs = sorted([d for d in features_dir.iterdir() if d.is_dir()])
-            if feature_dirs:
-                print(f"\n📄 GENERATED DOCUMENTATION:")
-                print("-" * 30)
-                for feature_dir in feature_dirs:
-                    print(f"  📁 {feature_dir.name}/")
-                    # Count generated files
-                    md_files = list(feature_dir.glob("*.md"))
-                    if md_files:
-                        print(f"     📋 {len(md_files)} documents generated")
+        if project["feature_dirs"]:
+            print(f"\n📄 GENERATED DOCUMENTATION:")
+            print("-" * 30)
+            for feature_dir in project["feature_dirs"]:
+                print(f"  📁 {feature_dir['name']}/")
+                if feature_dir["documents_count"]:
+                    print(f"     📋 {feature_dir['documents_count']} documents generated")
         
         print(f"\n🚀 NEXT STEPS:")
         print("-" * 30)
@@ -456,6 +513,36 @@ def show_project_status(project_name: str) -> None:
     except Exception as e:
         print(f"❌ Error reading project status: {e}")
 
+def search_documents(query: str, limit: int = 10, as_json: bool = False, reindex: bool = False) -> None:
+    """Full-text search across generated documentation in ~/Projects/"""
+    from document_index import DocumentIndex
+    
+    index = DocumentIndex(Path.home() / "Projects")
+    try:
+        if reindex:
+            index.rebuild()
+        else:
+            index.update()
+        results = index.search(query, limit=limit)
+    finally:
+        index.close()
+    
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+    
+    if not results:
+        print(f"🔎 No documents match: {query}")
+        return
+    
+    print(f"🔎 {len(results)} RESULTS FOR: {query}")
+    print("=" * 50)
+    for rank, result in enumerate(results, 1):
+        print(f"\n{rank}. 📄 {result['project']} / {result['feature_dir']} / {Path(result['path']).name}")
+        print(f"   {result['title']}")
+        print(f"   {result['snippet']}")
+    print(f"\n💡 Open with: less {results[0]['path']}")
+
 class WorkflowOrchestrator:
     """Intelligent workflow orchestrator for AI agents"""
     
@@ -472,6 +559,18 @@ class WorkflowOrchestrator:
         self.llm_config_file = None
         self.cost_limit = None
         
+        # Prometheus textfile written at the end of each run (None: $AI_WORKFLOW_METRICS_FILE or default)
+        self.metrics_file = None
+        self.trace_enabled = False
+        self.trace_dir = None
+        self.dashboard = False
+        
+        # Warm engine whose clients, caches, rate limiter and budget concurrent runs share (batch, daemon)
+        self.shared_engine = None
+        
+        # user_preferences.approval_history is imported into the approval store on first use
+        self._approval_history_seeded = False
+        
     def _load_config(self) -> Dict:
         """Load automation configuration"""
         try:
@@ -523,27 +622,7 @@ class WorkflowOrchestrator:
     
     def _setup_logging(self) -> logging.Logger:
         """Setup logging configuration"""
-        logger = logging.getLogger('workflow_orchestrator')
-        logger.setLevel(logging.INFO)
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_formatter = logging.Formatter(
-            '%(asctime)s - %(levelname)s - %(message)s'
-        )
-        console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
-        
-        # File handler
-        log_file = Path(__file__).parent / 'ai-workflow-execution.log'
-        file_handler = logging.FileHandler(log_file)
-        file_formatter = logging.Formatter(
-            '%(asctime)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
-        )
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
-        
-        return logger
+        return get_logger('workflow_orchestrator', logging.INFO)
     
     def assess_risk_score(self, context: ExecutionContext) -> float:
         """Assess risk score for the workflow execution"""
@@ -572,7 +651,7 @@ class WorkflowOrchestrator:
         elif gate_behavior == "skip":
             return GateDecision.SKIP
         elif gate_behavior == "learn_from_history":
-            return self._evaluate_learning_gate(step, context)
+            return GateDecision.LEARN_FROM_HISTORY  # Resolved at step time, once the tech stack is known
         elif gate_behavior == "required_for_new_tech":
             return self._evaluate_technology_gate(step, context)
         elif gate_behavior == "required_for_destructive":
@@ -580,12 +659,74 @@ class WorkflowOrchestrator:
         else:
             return GateDecision.REQUIRED  # Default to safe
     
-    def _evaluate_learning_gate(self, step: WorkflowStep, context: ExecutionContext) -> GateDecision:
-        """Evaluate gate requirement based on learning history"""
-        # TODO: Implement learning logic
-        # For now, default to required
+    def _evaluate_learning_gate(self, step: WorkflowStep, context: ExecutionContext, session) -> GateDecision:
+        """Skip the gate when this user reliably approves it for this kind of project"""
+        thresholds = self.config['automation_modes'].get('learning', {}).get('learning_thresholds', {})
+        try:
+            history = self._approval_history()
+            stats = history.evaluate(
+                step.gate_name, thresholds,
+                content_type=session.executor_module.CONTENT_TYPES.get(step.doc_name, ""),
+                tech_stack=self._resolve_tech_stack(context, session)
+            )
+        except Exception as e:
+            self.logger.warning(f"Approval history unavailable, keeping gate {step.gate_name}: {e}")
+            return GateDecision.REQUIRED
+        
+        if stats.allows_auto_proceed(thresholds):
+            print(f"🧠 Learning gate auto-approved: {step.gate_name} "
+                  f"({stats.approvals}/{stats.samples} approved, confidence {stats.confidence:.2f})")
+            self.logger.info(f"Learning gate auto-approved: {step.gate_name} [{stats.scope}] "
+                             f"rate={stats.approval_rate:.2f} confidence={stats.confidence:.2f}")
+            return GateDecision.SKIP
+        
+        self.logger.info(f"Learning gate requires approval: {step.gate_name} [{stats.scope}] "
+                         f"samples={stats.samples} rate={stats.approval_rate:.2f} confidence={stats.confidence:.2f}")
         return GateDecision.REQUIRED
     
+    def _approval_history(self):
+        """Process-wide approval store, seeded once from user_preferences.approval_history"""
+        from approval_history import get_approval_history
+        
+        history = get_approval_history()
+        if not self._approval_history_seeded:
+            seed = self.config.get("user_preferences", {}).get("approval_history", [])
+            if seed:
+                history.import_decisions(seed)
+            self._approval_history_seeded = True
+        return history
+    
+    def _resolve_tech_stack(self, context: ExecutionContext, session) -> str:
+        """Tech stack chosen in step 01 of this run, or of the project's MVP run"""
+        if context.technology_stack:
+            return " + ".join(context.technology_stack)
+        
+        stack = session.project_data.get("recommended_tech_stack", "")
+        if not stack:
+            for data_file in sorted(context.project_root.glob("features/*/collected-project-data.json")):
+                try:
+                    with open(data_file, 'r', encoding='utf-8') as f:
+                        stack = json.load(f).get("recommended_tech_stack", "")
+                except (OSError, json.JSONDecodeError):
+                    continue
+                if stack:
+                    break
+        return stack
+    
+    def _record_gate_decision(self, step: WorkflowStep, context: ExecutionContext, session,
+                              response: GateResponse, wait_seconds: float):
+        """Feed a human gate decision into the approval history used by learning mode"""
+        try:
+            self._approval_history().record(
+                step.gate_name, response.value,
+                content_type=session.executor_module.CONTENT_TYPES.get(step.doc_name, ""),
+                tech_stack=self._resolve_tech_stack(context, session),
+                workflow="mvp", mode=context.mode.value, project=context.project_root.name,
+                run_id=session.run_id, wait_seconds=round(wait_seconds, 3)
+            )
+        except Exception as e:
+            self.logger.warning(f"Could not record gate decision for {step.gate_name}: {e}")
+    
     def _evaluate_technology_gate(self, step: WorkflowStep, context: ExecutionContext) -> GateDecision:
         """Evaluate gate requirement for technology decisions"""
         # TODO: Check if technology stack contains new/unknown technologies
@@ -666,8 +807,8 @@ class WorkflowOrchestrator:
             print("\n✅ DRY RUN COMPLETE - No actions executed")
             return True
         
-        # Confirm execution (skip prompt in autonomous mode)
-        if context.mode.value == "autonomous":
+        # Confirm execution (skip prompt in autonomous mode and in runs that cannot prompt)
+        if context.mode.value == "autonomous" or not context.interactive:
             print("\n🚀 Starting autonomous workflow execution...")
         else:
             response = input("\nStart workflow execution? (y/N): ")
@@ -675,18 +816,60 @@ class WorkflowOrchestrator:
                 print("Workflow execution cancelled")
                 return False
         
+        # Create the run session once: modules, configs, clients and context are shared by all steps
+        try:
+            session = self._create_run_session(context)
+        except Exception as e:
+            self.logger.error(f"Failed to initialize run session: {e}")
+            print(f"\n❌ WORKFLOW EXECUTION FAILED: {e}")
+            return False
+        
+        with log_context(run_id=session.run_id, project=context.project_root.name, feature=context.feature_name), \
+                progress.live_dashboard(self.dashboard):
+            if not self.trace_enabled:
+                return self._execute_plan(plan, context, session)
+            
+            with tracing.start_trace(session.run_id, f"workflow {context.feature_name}",
+                                     project=context.project_root.name, mode=context.mode.value) as tracer:
+                success = self._execute_plan(plan, context, session)
+            self._export_trace(tracer)
+            return success
+    
+    def _execute_plan(self, plan: List[Tuple[WorkflowStep, GateDecision]], context: ExecutionContext, session) -> bool:
+        """Run every planned step inside the run session"""
+        self._register_run(context, session)
+        progress.emit("run_started", feature=context.feature_name,
+                      steps=[{"number": step.number, "name": step.doc_name, "dependencies": step.dependencies}
+                             for step, _ in plan])
+        
         # Execute each step
         success = True
         for step, gate_decision in plan:
+            step_started = time.perf_counter()
+            step_success = False
+            progress.emit("step", number=step.number, state="running")
             try:
-                if not self._execute_step(step, gate_decision, context):
-                    success = False
-                    break
+                with log_context(step=step.number), tracing.span(f"step {step.number} {step.doc_name}", "step",
+                                                                  phase=step.phase, gate=gate_decision.value):
+                    step_success = self._execute_step(step, gate_decision, context, session)
             except Exception as e:
                 self.logger.error(f"Step {step.number} failed: {e}")
+            finally:
+                metrics.STEP_DURATION.observe(time.perf_counter() - step_started, workflow="mvp", step=step.number,
+                                              outcome="success" if step_success else "failure")
+                if not step_success:
+                    progress.emit("step", number=step.number, state="failed")
+            if not step_success:
                 success = False
                 break
         
+        with tracing.span("finalize run", "write"):
+            context.cost_usd = session.cost_usd()
+            session.close()
+            self._finish_run(context, session, success)
+            self._write_metrics(success)
+        progress.emit("run_finished", success=success)
+        
         if success:
             self.logger.info("🎉 Workflow completed successfully!")
             print("\n🎉 WORKFLOW COMPLETED SUCCESSFULLY!")
@@ -696,26 +879,155 @@ class WorkflowOrchestrator:
         
         return success
     
-    def _execute_step(self, step: WorkflowStep, gate_decision: GateDecision, context: ExecutionContext) -> bool:
+    def _export_trace(self, tracer):
+        """Write the run's trace files and print where the time went"""
+        print(f"\n{tracer.summary()}")
+        try:
+            chrome_path, otlp_path = tracing.export_trace(tracer, self.trace_dir)
+            print(f"📊 Trace: {chrome_path} (open in https://ui.perfetto.dev)")
+            print(f"📊 OTLP:  {otlp_path}")
+        except OSError as e:
+            self.logger.warning(f"Could not write trace files: {e}")
+    
+    def _write_metrics(self, success: bool):
+        """Count the run and write the Prometheus textfile"""
+        metrics.RUNS.inc(workflow="mvp", outcome="success" if success else "failure")
+        try:
+            metrics_path = metrics.REGISTRY.write_textfile(self.metrics_file)
+            self.logger.debug(f"📈 Metrics written to {metrics_path}")
+        except OSError as e:
+            self.logger.warning(f"Could not write metrics textfile: {e}")
+    
+    def _resolve_feature_dir(self, context: ExecutionContext) -> Path:
+        """Claim a feature directory no concurrent run on this project is using"""
+        from project_registry import allocate_feature_dir
+        return allocate_feature_dir(context.project_root, context.feature_name)
+    
+    def _register_run(self, context: ExecutionContext, session):
+        """Record this run in the project's run registry"""
+        if not (context.project_root / "project-manifest.json").exists():
+            return
+        
+        from project_registry import register_run
+        command = "add-feature" if context.context_mode == "FEATURE_ADDITION" else "create-mvp"
+        try:
+            register_run(context.project_root, session.run_id, command, context.feature_name, session.feature_dir)
+        except Exception as e:
+            self.logger.warning(f"Could not register run {session.run_id}: {e}")
+    
+    def _finish_run(self, context: ExecutionContext, session, success: bool):
+        """Mark this run finished in the project's run registry"""
+        if not (context.project_root / "project-manifest.json").exists():
+            return
+        
+        from project_registry import finish_run
+        feature_name = context.feature_name if context.context_mode == "FEATURE_ADDITION" else None
+        try:
+            finish_run(context.project_root, session.run_id, success, feature_name)
+        except Exception as e:
+            self.logger.warning(f"Could not finish run {session.run_id}: {e}")
+    
+    def _create_run_session(self, context: ExecutionContext):
+        """Create the per-run session passed to every step"""
+        from run_session import RunSession
+        
+        if context.feature_dir is None:
+            context.feature_dir = self._resolve_feature_dir(context)
+        
+        return RunSession(
+            feature_name=context.feature_name,
+            feature_dir=context.feature_dir,
+            mode=context.mode.value,
+            llm_api_enabled=self.llm_api_enabled,
+            llm_provider=self.llm_provider,
+            llm_model=self.llm_model,
+            llm_config_file=self.llm_config_file,
+            cost_limit=self.cost_limit,
+            speculation_budget_usd=self._speculation_budget(),
+            answers=context.answers,
+            interactive=context.interactive,
+            shared_engine=self.shared_engine,
+            multi_agent=self.config.get("workflow_execution", {}).get("multi_agent")
+        )
+    
+    def create_shared_engine(self, requests_per_minute: Optional[float] = None,
+                             budget_usd: Optional[float] = None):
+        """Engine every concurrent run borrows provider clients, caches and limits from"""
+        from content_generation_engine import ContentGenerationEngine
+        from llm_api_integration import RateLimiter, CostBudget
+        
+        return ContentGenerationEngine(
+            llm_config_path=self.llm_config_file,
+            user_provider=self.llm_provider,
+            user_model=self.llm_model,
+            rate_limiter=RateLimiter(requests_per_minute) if requests_per_minute else None,
+            budget=CostBudget(budget_usd) if budget_usd is not None else None
+        )
+    
+    def _speculation_budget(self) -> Optional[float]:
+        """Discarded-draft spend allowed per run, or None when speculative generation is off"""
+        speculation = self.config.get("workflow_execution", {}).get("speculative_generation", {})
+        if not speculation.get("enabled", False):
+            return None
+        return float(speculation.get("max_discarded_cost_usd", 0.5))
+    
+    def _execute_step(self, step: WorkflowStep, gate_decision: GateDecision, context: ExecutionContext, session) -> bool:
         """Execute a single workflow step"""
         self.logger.info(f"Executing step {step.number}: {step.doc_name}")
         
-        # Handle gate if required
+        # Learning gates are decided now that step 01's answers (tech stack) are available
+        if gate_decision == GateDecision.LEARN_FROM_HISTORY:
+            gate_decision = self._evaluate_learning_gate(step, context, session)
+        
+        # Handle gate if required (drafting the step's content in the background meanwhile)
         if gate_decision == GateDecision.REQUIRED:
-            if not self._execute_human_gate(step, context):
+            if not context.interactive:
+                raise RuntimeError(f"Gate {step.gate_name} needs a human decision, but this run cannot prompt")
+            self._start_speculation(step, context, session)
+            gate_started = time.perf_counter()
+            progress.emit("step", number=step.number, state="gate")
+            with tracing.span(f"gate {step.gate_name}", "gate_wait", gate=step.gate_name) as gate_span, progress.paused():
+                response = self._execute_human_gate(step, context)
+                if gate_span:
+                    gate_span.set(response=response.value)
+            gate_wait = time.perf_counter() - gate_started
+            metrics.GATE_WAIT.observe(gate_wait, gate=step.gate_name, decision=response.value)
+            self._record_gate_decision(step, context, session, response, gate_wait)
+            if response != GateResponse.APPROVED:
+                session.discard_speculation(response.value)
+            if response == GateResponse.REJECTED:
                 return False
+            if response == GateResponse.SKIPPED:
+                progress.emit("step", number=step.number, state="skipped")
+                return True
+            progress.emit("step", number=step.number, state="running")
         
         # Execute the actual step
-        success = self._execute_document_workflow(step, context)
+        success = self._execute_document_workflow(step, context, session)
         
         if success:
+            progress.emit("step", number=step.number, state="completed")
             self.logger.info(f"✅ Step {step.number} completed successfully")
         else:
             self.logger.error(f"❌ Step {step.number} failed")
         
         return success
     
-    def _execute_human_gate(self, step: WorkflowStep, context: ExecutionContext) -> bool:
+    def _start_speculation(self, step: WorkflowStep, context: ExecutionContext, session):
+        """Start generating the gated step in the background so approval time overlaps generation"""
+        if not self.llm_api_enabled or session.speculation_budget_usd is None:
+            return
+        
+        try:
+            doc_path = Path(__file__).parent / "lean-workflow" / step.doc_name
+            executor = session.get_executor()
+            request = executor.build_generation_request(doc_path, self._create_workflow_context(step, context, session))
+            if request:
+                session.speculate(request)
+        except Exception as e:
+            self.logger.debug(f"Speculative generation not started for step {step.number}: {e}")
+    
+    def _execute_human_gate(self, step: WorkflowStep, context: ExecutionContext) -> GateResponse:
         """Execute human approval gate with enhanced context"""
         print(f"\n🚪 HUMAN GATE: {step.gate_name}")
         print("=" * 60)
@@ -767,17 +1079,17 @@ class WorkflowOrchestrator:
                 if response == 'y':
                     print("✅ Step approved - proceeding...")
                     self.logger.info(f"Gate approved: {step.gate_name}")
-                    return True
+                    return GateResponse.APPROVED
                     
                 elif response == 'n' or response == '':
                     print("❌ Step rejected - stopping workflow")
                     self.logger.warning(f"Gate rejected: {step.gate_name}")
-                    return False
+                    return GateResponse.REJECTED
                     
                 elif response == 's':
                     print("⏭️ Step skipped - continuing to next step")
                     self.logger.info(f"Gate skipped: {step.gate_name}")
-                    return True
+                    return GateResponse.SKIPPED
                     
                 elif response == '?':
                     print(f"\n📖 STEP DETAILS:")
@@ -796,17 +1108,28 @@ class WorkflowOrchestrator:
                     
             except KeyboardInterrupt:
                 print("\n❌ Workflow cancelled by user")
-                return False
+                return GateResponse.REJECTED
+    
+    def _create_workflow_context(self, step: WorkflowStep, context: ExecutionContext, session):
+        """Executor context for one step of this run"""
+        return session.executor_module.WorkflowContext(
+            feature_name=context.feature_name,
+            feature_slug=context.feature_name.lower().replace(' ', '-').replace('_', '-'),
+            feature_dir=session.feature_dir,
+            mode=context.mode.value,
+            phase=step.phase,
+            step_number=step.number,
+            project_data=session.project_data,  # Populated by interactive collection in Step 01
+            generated_files=[],
+            execution_log=[]
+        )
     
-    def _execute_document_workflow(self, step: WorkflowStep, context: ExecutionContext) -> bool:
+    def _execute_document_workflow(self, step: WorkflowStep, context: ExecutionContext, session) -> bool:
         """Execute the actual document workflow step"""
         print(f"  📄 Executing: {step.doc_name}")
         
-        # Prepare feature directory
-        feature_slug = context.feature_name.lower().replace(' ', '-').replace('_', '-')
-        date_prefix = datetime.now().strftime('%Y-%m-%d')
-        feature_dir = context.project_root / "features" / f"{date_prefix}-{feature_slug}"
-        feature_dir.mkdir(parents=True, exist_ok=True)
+        # Feature directory is fixed for the whole run by the session
+        feature_dir = session.feature_dir
         
         # Prepare document path
         workflow_dir = Path(__file__).parent / "lean-workflow"
@@ -816,47 +1139,15 @@ class WorkflowOrchestrator:
             self.logger.error(f"Workflow document not found: {doc_path}")
             return False
         
-        # Execute using workflow executor (direct module import - no subprocess)
+        # Execute using the session's workflow executor (loaded once per run - no subprocess)
         try:
-            # Import workflow executor using importlib to handle hyphenated filename
-            import sys
-            import importlib.util
-            
-            # Load workflow-executor.py as a module
-            workflow_executor_path = Path(__file__).parent / "workflow-executor.py"
-            spec = importlib.util.spec_from_file_location("workflow_executor", workflow_executor_path)
-            workflow_executor_module = importlib.util.module_from_spec(spec)
-            sys.modules["workflow_executor"] = workflow_executor_module
-            spec.loader.exec_module(workflow_executor_module)
-            
-            # Import the classes we need
-            WorkflowDocumentExecutor = workflow_executor_module.WorkflowDocumentExecutor
-            WorkflowContext = workflow_executor_module.WorkflowContext
+            executor = session.get_executor()
             
-            # Create workflow executor instance
-            executor = WorkflowDocumentExecutor(debug=False)
-            
-            # Configure LLM API settings if enabled
             if self.llm_api_enabled:
-                executor.llm_api_enabled = True
-                executor.llm_provider = self.llm_provider
-                executor.llm_model = self.llm_model
-                executor.llm_config_file = self.llm_config_file
-                executor.cost_limit = self.cost_limit
                 self.logger.info(f"🤖 LLM API enabled: Real content generation mode!")
             
             # Create workflow context for executor
-            workflow_context = WorkflowContext(
-                feature_name=context.feature_name,
-                feature_slug=context.feature_name.lower().replace(' ', '-').replace('_', '-'),
-                feature_dir=feature_dir,
-                mode=context.mode.value,
-                phase=step.phase,
-                step_number=step.number,
-                project_data={},  # Will be populated by interactive collection in Step 01
-                generated_files=[],
-                execution_log=[]
-            )
+            workflow_context = self._create_workflow_context(step, context, session)
             
             # Execute the workflow document directly
             success = executor.execute_workflow_document(
@@ -884,8 +1175,319 @@ class WorkflowOrchestrator:
             print(f"  ❌ Failed: {step.doc_name} - {e}")
             return False
 
+def prepare_mvp_context(project_name: str, mode: AutomationMode) -> ExecutionContext:
+    """Create the project structure and execution context for a new MVP"""
+    project_root = Path.home() / "Projects" / project_name
+    
+    # Check if project already exists
+    if project_root.exists():
+        raise FileExistsError(f"Project '{project_name}' already exists at {project_root}")
+    
+    # Create project directory and structure
+    project_root.mkdir(parents=True, exist_ok=True)
+    print(f"🚀 Creating new MVP project: {project_name}")
+    print(f"📁 Project location: {project_root}")
+    
+    # Create standard project structure
+    create_project_structure(project_root, project_name)
+    
+    # Create execution context for MVP initialization  
+    return ExecutionContext(
+        feature_name=f"{project_name}-mvp-initialization",
+        mode=mode,
+        project_root=project_root,
+        context_mode="MVP_CREATION"
+    )
+
+def prepare_feature_context(feature_name: str, project_name: str, mode: AutomationMode) -> ExecutionContext:
+    """Validate the target project and build the execution context for a new feature"""
+    project_root = Path.home() / "Projects" / project_name
+    
+    # Check if project exists
+    if not project_root.exists():
+        raise FileNotFoundError(f"Project '{project_name}' not found in ~/Projects/")
+    
+    # Verify it's an MVP project
+    manifest_path = project_root / "project-manifest.json"
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"'{project_name}' is not an MVP project (no project-manifest.json)")
+    
+    print(f"➕ Adding feature '{feature_name}' to project '{project_name}'")
+    
+    # Create execution context for feature addition
+    return ExecutionContext(
+        feature_name=feature_name,
+        mode=mode,
+        project_root=project_root,
+        context_mode="FEATURE_ADDITION",
+        existing_project=project_name
+    )
+
+def load_answers_records(source: str) -> List[Dict]:
+    """Answers from a .json/.yaml file (one project) or '-' for JSONL on stdin (one project per line)"""
+    from enhanced_interactive_data_collector import load_answers, read_answers_stream
+    
+    if source == "-":
+        return read_answers_stream(sys.stdin)
+    return [load_answers(Path(source))]
+
+def split_answers_record(record: Dict, project_name: Optional[str] = None) -> Tuple[str, Dict]:
+    """Project directory name and validated collector answers for one record
+    
+    A record may carry a "project" key naming the directory; otherwise project_name is slugified.
+    """
+    from enhanced_interactive_data_collector import validate_answers
+    
+    answers = dict(record)
+    directory = project_name or answers.pop("project", None) or answers.get("project_name", "")
+    answers.pop("project", None)
+    return validate_project_name(str(directory)), validate_answers(answers)
+
+def parse_batch_record(record: Dict) -> BatchProject:
+    """Project, answers and provider/model override from one batch line
+    
+    Lines are either {"project": ..., "answers": {...}, "llm_provider": ..., "llm_model": ...}
+    or flat answers with the same optional project/llm_* keys.
+    """
+    record = dict(record)
+    llm_provider = record.pop("llm_provider", None)
+    llm_model = record.pop("llm_model", None)
+    
+    if "answers" in record:
+        answers = record.pop("answers")
+        project = record.pop("project", None)
+        if record:
+            raise ValueError(f"unknown keys next to answers: {', '.join(sorted(record))}")
+        if not isinstance(answers, dict):
+            raise ValueError("answers must be an object")
+        record = dict(answers, project=project) if project else answers
+    
+    project_name, answers = split_answers_record(record)
+    return BatchProject(project_name, answers, llm_provider, llm_model)
+
+def _batch_settings(orchestrator: WorkflowOrchestrator) -> Dict:
+    return orchestrator.config.get("workflow_execution", {}).get("batch_execution", {})
+
+def run_batch_project(orchestrator: WorkflowOrchestrator, project: BatchProject) -> Dict:
+    """Create one batch MVP unattended on a copy of the shared orchestrator"""
+    job_orchestrator = copy.copy(orchestrator)
+    job_orchestrator.dashboard = False  # Concurrent projects would fight over the process-wide stdout
+    job_orchestrator.llm_provider = project.llm_provider or orchestrator.llm_provider
+    job_orchestrator.llm_model = project.llm_model or orchestrator.llm_model
+    
+    started = time.perf_counter()
+    result = {"project": project.project_name, "success": False, "cost_usd": 0.0, "error": None,
+              "llm": "/".join(filter(None, [job_orchestrator.llm_provider, job_orchestrator.llm_model])) or "default"}
+    try:
+        # Batch projects have no terminal attached, so they always run autonomously
+        context = prepare_mvp_context(project.project_name, AutomationMode.AUTONOMOUS)
+        context.answers = project.answers
+        context.interactive = False
+        context.risk_score = job_orchestrator.assess_risk_score(context)
+        result["success"] = job_orchestrator.execute_workflow(context, dry_run=False)
+        result["cost_usd"] = context.cost_usd
+        if result["success"]:
+            mark_mvp_initialized(context.project_root, AutomationMode.AUTONOMOUS.value)
+        else:
+            result["error"] = "workflow failed (see logs)"
+    except Exception as e:
+        result["error"] = str(e)
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+def run_batch(orchestrator: WorkflowOrchestrator, records: List[Dict], workers: Optional[int] = None) -> bool:
+    """Create one MVP per batch record concurrently, sharing clients, caches, rate limit and budget"""
+    from concurrent.futures import ThreadPoolExecutor
+    from enhanced_interactive_data_collector import missing_required_answers
+    
+    settings = _batch_settings(orchestrator)
+    workers = max(1, workers or settings.get("max_workers", 4))
+    
+    if orchestrator.shared_engine is None:
+        budget = orchestrator.cost_limit if orchestrator.cost_limit is not None else settings.get("max_budget_usd")
+        orchestrator.shared_engine = orchestrator.create_shared_engine(
+            requests_per_minute=settings.get("requests_per_minute"), budget_usd=budget)
+    providers = orchestrator.shared_engine.llm_config_data["providers"]
+    
+    # Validate every record before creating anything
+    projects, errors = [], []
+    for index, record in enumerate(records, 1):
+        try:
+            project = parse_batch_record(record)
+            missing = missing_required_answers(project.answers)
+            if missing:
+                raise ValueError(f"missing required fields: {', '.join(missing)}")
+            if project.llm_provider and project.llm_provider not in providers:
+                raise ValueError(f"unknown llm_provider '{project.llm_provider}' (configured: {', '.join(providers)})")
+            projects.append(project)
+        except ValueError as e:
+            errors.append(f"record {index}: {e}")
+    duplicates = sorted({p.project_name for p in projects if [q.project_name for q in projects].count(p.project_name) > 1})
+    if duplicates:
+        errors.append(f"duplicate project names: {', '.join(duplicates)}")
+    if errors:
+        print("❌ Invalid batch - nothing was created:")
+        for error in errors:
+            print(f"   • {error}")
+        return False
+    
+    print(f"📦 Creating {len(projects)} MVP project(s) with {min(workers, len(projects))} worker(s)")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+        results = list(pool.map(lambda project: run_batch_project(orchestrator, project), projects))
+    
+    print_batch_summary(results, time.perf_counter() - started, orchestrator.shared_engine.budget)
+    return all(result["success"] for result in results)
+
+def print_batch_summary(results: List[Dict], wall_seconds: float, budget=None) -> None:
+    """Per-project status, wall time and cost"""
+    width = max([len("PROJECT")] + [len(result["project"]) for result in results])
+    total_cost = sum(result["cost_usd"] for result in results)
+    created = sum(1 for result in results if result["success"])
+    
+    print(f"\n📊 BATCH SUMMARY: {created}/{len(results)} created in {wall_seconds:.1f}s, ${total_cost:.4f} total")
+    if budget is not None:
+        print(f"   💰 Shared budget: ${budget.spent_usd:.4f} of ${budget.limit_usd:.4f} used")
+    print(f"   {'PROJECT':<{width}}  {'STATUS':<10}  {'TIME':>8}  {'COST':>9}  LLM")
+    for result in results:
+        status = "✅ created" if result["success"] else "❌ failed"
+        cost = f"${result['cost_usd']:.4f}"
+        print(f"   {result['project']:<{width}}  {status:<10}  {result['seconds']:>7.1f}s  {cost:>9}  {result['llm']}")
+    for result in results:
+        if result["error"]:
+            print(f"   ❌ {result['project']}: {result['error']}")
+
+def mark_mvp_initialized(project_root: Path, mode: str) -> None:
+    """Update project status after a successful create-mvp run"""
+    from project_registry import update_project_manifest
+    
+    def set_initialized(manifest: Dict):
+        manifest["status"] = "initialized"
+        manifest.setdefault("mvp_context", {})["automation_mode"] = mode
+    
+    try:
+        update_project_manifest(project_root, set_initialized)
+    except Exception as e:
+        print(f"⚠️  Could not update project status: {e}")
+
+def run_daemon_job(orchestrator: WorkflowOrchestrator, job) -> Dict:
+    """Execute a daemon job unattended on a copy of the warm orchestrator"""
+    params = job.params
+    
+    # Shallow copy shares the parsed config, steps and logger but keeps LLM overrides per job
+    job_orchestrator = copy.copy(orchestrator)
+    job_orchestrator.dashboard = False  # Jobs run concurrently and without a terminal
+    job_orchestrator.llm_provider = params.get("llm_provider") or orchestrator.llm_provider
+    job_orchestrator.llm_model = params.get("llm_model") or orchestrator.llm_model
+    if params.get("cost_limit") is not None:
+        job_orchestrator.cost_limit = params["cost_limit"]
+    
+    # Daemon jobs have no terminal attached, so they always run autonomously
+    mode = AutomationMode.AUTONOMOUS
+    
+    if job.job_type == "create-mvp":
+        project_name = validate_project_name(params.get("project_name", ""))
+        context = prepare_mvp_context(project_name, mode)
+    else:
+        context = prepare_feature_context(params.get("feature_name", ""), params.get("project_name", ""), mode)
+    context.answers = params.get("answers")
+    context.interactive = False
+    
+    context.risk_score = job_orchestrator.assess_risk_score(context)
+    success = job_orchestrator.execute_workflow(context, dry_run=False)
+    
+    if success and job.job_type == "create-mvp":
+        mark_mvp_initialized(context.project_root, mode.value)
+    
+    return {
+        "success": success,
+        "project_root": str(context.project_root),
+        "feature_name": context.feature_name,
+        "feature_dir": str(context.feature_dir) if context.feature_dir else None
+    }
+
+def serve_daemon(args) -> None:
+    """Start the long-lived workflow daemon"""
+    from workflow_daemon import WorkflowJobQueue, serve
+    
+    orchestrator = WorkflowOrchestrator(args.config)
+    orchestrator.metrics_file = args.metrics_file
+    orchestrator.trace_enabled = args.trace or args.trace_dir is not None
+    orchestrator.trace_dir = args.trace_dir
+    orchestrator.llm_api_enabled = True
+    orchestrator.llm_provider = args.llm_provider
+    orchestrator.llm_model = args.llm_model
+    orchestrator.llm_config_file = args.llm_config
+    orchestrator.cost_limit = args.cost_limit
+    
+    # Pay module import and client setup once up front instead of on every job
+    try:
+        orchestrator.shared_engine = orchestrator.create_shared_engine()
+    except Exception as e:
+        print(f"⚠️  Content generation engine not preloaded: {e}")
+    
+    job_queue = WorkflowJobQueue(
+        handler=lambda job: run_daemon_job(orchestrator, job),
+        max_workers=args.workers,
+        max_pending=args.max_pending,
+        job_ttl_seconds=args.job_ttl,
+        max_finished_jobs=args.max_finished_jobs
+    )
+    serve(job_queue, host=args.daemon_host, port=args.daemon_port)
+
+def submit_to_daemon(args) -> None:
+    """Submit create-mvp/add-feature to a running daemon instead of executing locally"""
+    from workflow_daemon import submit_job, wait_for_job
+    
+    params = {
+        "project_name": args.project_name,
+        "llm_provider": args.llm_provider,
+        "llm_model": args.llm_model,
+        "cost_limit": args.cost_limit
+    }
+    if args.command == "add-feature":
+        params["feature_name"] = args.feature_name
+    
+    if args.answers == "-" or getattr(args, "batch", None):
+        # One daemon job per batch/stdin JSONL project
+        for record in args.answers_records:
+            project = parse_batch_record(record)
+            job = submit_job("create-mvp", dict(params, project_name=project.project_name, answers=project.answers,
+                                                llm_provider=project.llm_provider or args.llm_provider,
+                                                llm_model=project.llm_model or args.llm_model),
+                             host=args.daemon_host, port=args.daemon_port)
+            print(f"📥 Submitted create-mvp job {job['job_id']} for {project.project_name}")
+        print("💡 Check progress with: ./workflow-runner.py daemon-status")
+        return
+    if args.answers_records:
+        _, params["answers"] = split_answers_record(args.answers_records[0], args.project_name)
+    
+    job = submit_job(args.command, params, host=args.daemon_host, port=args.daemon_port)
+    print(f"📥 Submitted {args.command} job {job['job_id']} to daemon at {args.daemon_host}:{args.daemon_port}")
+    
+    if not args.wait:
+        print(f"💡 Check progress with: ./workflow-runner.py daemon-status {job['job_id']}")
+        return
+    
+    job = wait_for_job(job["job_id"], host=args.daemon_host, port=args.daemon_port)
+    print(f"🏁 Job {job['job_id']} {job['status']} in {job['duration_seconds']}s")
+    if job.get("error"):
+        print(f"❌ {job['error']}")
+    sys.exit(0 if job["status"] == "succeeded" else 1)
+
+def show_daemon_status(args) -> None:
+    """Show daemon health or a single job's status"""
+    from workflow_daemon import get_health, get_job
+    
+    if args.job_id:
+        print(json.dumps(get_job(args.job_id, host=args.daemon_host, port=args.daemon_port), indent=2))
+    else:
+        print(json.dumps(get_health(host=args.daemon_host, port=args.daemon_port), indent=2))
+
 def main():
     """Main entry point with subcommand support"""
+    from workflow_daemon import DEFAULT_DAEMON_HOST, DEFAULT_DAEMON_PORT
+    
     parser = argparse.ArgumentParser(
         description="""
 🤖 AI Workflow Runner - Intelligent Project & Feature Management
@@ -919,6 +1521,15 @@ EXAMPLES:
                        (default: guided)
                        """)
     
+    parser.add_argument("--answers",
+                       metavar="FILE",
+                       help="""
+                       Answers for the Step 01 questions (.json or .yaml) so MVP
+                       initialization runs without prompts; only fields the file
+                       is missing are asked. Use '-' to read JSONL from stdin, one
+                       project per line (create-mvp with --mode autonomous).
+                       """)
+    
     parser.add_argument("--dry-run", 
                        action="store_true",
                        help="""
@@ -941,6 +1552,13 @@ EXAMPLES:
                        Shows full execution details and API interactions.
                        """)
     
+    parser.add_argument("--log-dir",
+                       type=Path,
+                       help="""
+                       Directory for rotating JSON-lines logs
+                       (default: $AI_WORKFLOW_LOG_DIR or ~/.ai-workflow/logs).
+                       """)
+    
     # Advanced LLM configuration (LLM API is always enabled)
     parser.add_argument("--llm-provider",
                        help="""
@@ -970,6 +1588,59 @@ EXAMPLES:
                        Workflow will stop if this limit is exceeded. Useful for budget control.
                        """)
     
+    # Observability
+    parser.add_argument("--metrics-file",
+                       type=Path,
+                       help="""
+                       Prometheus textfile written at the end of each run
+                       (default: $AI_WORKFLOW_METRICS_FILE or ~/.ai-workflow/metrics/ai_workflow.prom).
+                       """)
+    
+    parser.add_argument("--metrics-port",
+                       type=int,
+                       help="Also serve live metrics on http://127.0.0.1:PORT/metrics while running")
+    
+    parser.add_argument("--trace",
+                       action="store_true",
+                       help="""
+                       Record a span trace of each run and print its critical path. Writes
+                       <run_id>.trace.json (Chrome/Perfetto) and <run_id>.otlp.json (OpenTelemetry).
+                       """)
+    
+    parser.add_argument("--trace-dir",
+                       type=Path,
+                       help="Directory for trace files; implies --trace (default: $AI_WORKFLOW_TRACE_DIR or ~/.ai-workflow/traces)")
+    
+    parser.add_argument("--dashboard",
+                       action="store_true",
+                       help="""
+                       Replace the log stream with a live progress view: step states, in-flight
+                       requests, tokens/sec, elapsed time and ETA, spend against --cost-limit,
+                       cache hit rate and retries (single interactive runs in a terminal only;
+                       ignored for batch runs and piped input or output).
+                       """)
+    
+    # Daemon client configuration
+    parser.add_argument("--daemon",
+                       action="store_true",
+                       help="""
+                       Submit create-mvp/add-feature to a running 'serve' daemon instead of
+                       executing locally. Jobs run unattended in autonomous mode.
+                       """)
+    
+    parser.add_argument("--wait",
+                       action="store_true",
+                       help="With --daemon, block until the submitted job finishes.")
+    
+    parser.add_argument("--daemon-host",
+                       default=DEFAULT_DAEMON_HOST,
+                       help=f"Workflow daemon host (default: {DEFAULT_DAEMON_HOST})")
+    
+    parser.add_argument("--daemon-port",
+                       type=int,
+                       default=DEFAULT_DAEMON_PORT,
+                       help=f"Workflow daemon port (default: {DEFAULT_DAEMON_PORT})")
+    
     # Create subparsers for commands
     subparsers = parser.add_subparsers(
         dest="command",
@@ -1001,17 +1672,37 @@ EXAMPLES:
   ./workflow-runner.py create-mvp my-awesome-app
   ./workflow-runner.py create-mvp user-dashboard --mode autonomous
   ./workflow-runner.py create-mvp api-service --dry-run
+  ./workflow-runner.py --answers answers.yaml --mode autonomous create-mvp api-service
+  cat projects.jsonl | ./workflow-runner.py --answers - --mode autonomous create-mvp
+  ./workflow-runner.py create-mvp --batch projects.jsonl --workers 4
         """,
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     create_mvp_parser.add_argument(
         "project_name",
+        nargs="?",
         help="""
         Name of the new MVP project. Will be created in ~/Projects/PROJECT_NAME.
         Use lowercase with hyphens (e.g., 'user-auth-service', 'task-manager').
-        Must not already exist.
+        Must not already exist. May be omitted with --answers (taken from the
+        answers' "project" or "project_name").
+        """
+    )
+    create_mvp_parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="""
+        JSONL file ('-' for stdin) with one project per line:
+        {"project": ..., "answers": {...}, "llm_provider": ..., "llm_model": ...}.
+        All projects run unattended in one process with shared LLM clients,
+        caches, rate limiter and budget (--cost-limit caps the whole batch).
         """
     )
+    create_mvp_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Projects created concurrently with --batch (default: batch_execution.max_workers)"
+    )
     
     # add-feature subcommand  
     add_feature_parser = subparsers.add_parser(
@@ -1026,11 +1717,16 @@ documentation for the additional functionality.
 
 WHAT IT CREATES:
 • Feature-specific documentation in features/YYYY-MM-DD-FEATURE-NAME/
+  (suffixed -2, -3, ... when another run already claimed that name)
 • Updated PRD with new feature requirements
 • Additional design decisions for the feature
 • Implementation tasks specific to the feature
 • Integration guidance with existing codebase
 
+Several add-feature runs can target the same project at once: project-manifest.json
+updates are locked and atomic, and each run gets its own feature directory and an
+entry in the project's run registry (see 'status').
+
 EXAMPLES:
   ./workflow-runner.py add-feature user-auth my-awesome-app
   ./workflow-runner.py add-feature payment-system ecommerce-app
@@ -1070,11 +1766,51 @@ WHAT IT SHOWS:
 • Number of features added
 • Whether it's a valid MVP project (has project-manifest.json)
 
+Answers come from a SQLite catalog (~/Projects/.workspace-catalog.db) that is updated
+whenever workflows write manifests or outputs; projects edited by hand are picked up
+by a cheap modification-time check.
+
 EXAMPLES:
   ./workflow-runner.py list-projects
+  ./workflow-runner.py list-projects --filter-status initialized --sort created --desc
+  ./workflow-runner.py list-projects --name shop --json
         """,
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
+    list_projects_parser.add_argument(
+        "--filter-status",
+        help="Only show projects with this status (e.g. initializing, initialized)"
+    )
+    list_projects_parser.add_argument(
+        "--name",
+        help="Only show projects whose name contains this text"
+    )
+    list_projects_parser.add_argument(
+        "--sort",
+        choices=["name", "created", "updated", "features", "documents", "status"],
+        default="name",
+        help="Sort order (default: name)"
+    )
+    list_projects_parser.add_argument(
+        "--desc",
+        action="store_true",
+        help="Sort descending"
+    )
+    list_projects_parser.add_argument(
+        "--limit",
+        type=int,
+        help="Show at most this many projects"
+    )
+    list_projects_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print projects as JSON"
+    )
+    list_projects_parser.add_argument(
+        "--reindex",
+        action="store_true",
+        help="Rebuild the workspace catalog from scratch"
+    )
     
     # status subcommand
     status_parser = subparsers.add_parser(
@@ -1106,6 +1842,121 @@ EXAMPLES:
         Use the exact project directory name.
         """
     )
+    status_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print project status as JSON"
+    )
+    
+    # search subcommand
+    search_parser = subparsers.add_parser(
+        "search",
+        help="Full-text search across all generated project documentation",
+        description="""
+🔎 SEARCH GENERATED DOCUMENTATION
+
+Searches every PRD, SRS, design document and task list under ~/Projects/*/features/
+using a SQLite FTS5 index that is updated incrementally as workflows write documents.
+Results are ranked (title matches weigh more) and shown with highlighted snippets.
+
+QUERY SYNTAX:
+• words                 All words must appear (stemmed: 'payments' matches 'payment')
+• "exact phrase"        Phrase match
+• word OR other         Either word
+• -word                 Exclude documents containing word
+• title:word            Match in the document title only
+• project:NAME          Only documents from one project
+• type:prd              Only one document type (prd, srs, tasks, design-decisions, ...)
+• feature:TEXT          Feature directory name contains TEXT
+• date:2025-06          Feature date prefix; after:/before: take YYYY-MM-DD
+
+EXAMPLES:
+  ./workflow-runner.py search "stripe webhooks"
+  ./workflow-runner.py search '"offline sync" type:design-decisions'
+  ./workflow-runner.py search 'auth OR oauth project:my-awesome-app after:2025-01-01'
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    search_parser.add_argument(
+        "query",
+        help="Search query (see QUERY SYNTAX above)"
+    )
+    search_parser.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        help="Maximum number of results (default: 10)"
+    )
+    search_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print results as JSON"
+    )
+    search_parser.add_argument(
+        "--reindex",
+        action="store_true",
+        help="Rebuild the search index from scratch"
+    )
+    
+    # serve subcommand
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Run a long-lived daemon that executes workflow jobs",
+        description="""
+🛰️ RUN WORKFLOW DAEMON
+
+Starts a local job server that keeps configuration, modules and LLM clients warm.
+create-mvp and add-feature jobs submitted with --daemon run through a bounded
+worker pool in autonomous mode, so each job only pays for LLM time.
+
+ENDPOINTS:
+• POST /jobs        Submit a job ({"job_type": ..., "params": {...}})
+• GET  /jobs        List jobs
+• GET  /jobs/JOB_ID Job status
+• GET  /health      Daemon health and queue depth
+• GET  /metrics     Prometheus metrics for all jobs
+
+EXAMPLES:
+  ./workflow-runner.py serve --workers 4
+  ./workflow-runner.py --daemon add-feature user-auth my-awesome-app
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    serve_parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="Number of jobs executed concurrently (default: 2)"
+    )
+    serve_parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=32,
+        help="Maximum queued plus running jobs before submissions are rejected (default: 32)"
+    )
+    serve_parser.add_argument(
+        "--job-ttl",
+        type=float,
+        default=3600,
+        help="Seconds a finished job stays queryable before it is evicted (default: 3600)"
+    )
+    serve_parser.add_argument(
+        "--max-finished-jobs",
+        type=int,
+        default=200,
+        help="Maximum finished jobs kept for status queries; oldest are evicted first (default: 200)"
+    )
+    
+    # daemon-status subcommand
+    daemon_status_parser = subparsers.add_parser(
+        "daemon-status",
+        help="Show workflow daemon health or a job's status"
+    )
+    daemon_status_parser.add_argument(
+        "job_id",
+        nargs="?",
+        help="Job ID to inspect (omit for daemon health)"
+    )
     
     args = parser.parse_args()
     
@@ -1120,16 +1971,89 @@ EXAMPLES:
     
     # Handle utility commands first (no orchestrator needed)
     if args.command == "list-projects":
-        list_projects()
+        list_projects(status=args.filter_status, name_filter=args.name, sort=args.sort,
+                      descending=args.desc, limit=args.limit, as_json=args.json, reindex=args.reindex)
         return
     
     if args.command == "status":
-        show_project_status(args.project_name)
+        show_project_status(args.project_name, as_json=args.json)
+        return
+    
+    if args.command == "search":
+        try:
+            search_documents(args.query, limit=args.limit, as_json=args.json, reindex=args.reindex)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        return
+    
+    # Read and validate answers before anything is created
+    args.answers_records = None
+    if args.answers:
+        if args.answers == "-" and (args.command != "create-mvp" or args.mode != "autonomous"):
+            print("❌ --answers - reads projects from stdin, leaving no terminal for gates")
+            print("💡 Use it with: --mode autonomous create-mvp")
+            sys.exit(1)
+        try:
+            args.answers_records = load_answers_records(args.answers)
+            if args.answers != "-":
+                from enhanced_interactive_data_collector import missing_required_answers
+                project_name, answers = split_answers_record(args.answers_records[0], args.project_name)
+                missing = missing_required_answers(answers)
+                if missing and (args.daemon or not sys.stdin.isatty()):
+                    raise ValueError(f"missing required fields {', '.join(missing)} and no terminal to ask for them")
+                if args.command == "create-mvp":
+                    args.project_name = project_name
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not load answers from {args.answers}: {e}")
+            sys.exit(1)
+    
+    if args.command == "create-mvp" and args.batch:
+        if args.answers or args.project_name:
+            parser.error("--batch takes projects and answers from the batch file")
+        try:
+            from enhanced_interactive_data_collector import read_answers_stream
+            if args.batch == "-":
+                args.answers_records = read_answers_stream(sys.stdin)
+            else:
+                with open(args.batch, 'r', encoding='utf-8') as f:
+                    args.answers_records = read_answers_stream(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not read batch file {args.batch}: {e}")
+            sys.exit(1)
+    elif args.command == "create-mvp" and not args.project_name and not args.answers:
+        parser.error("create-mvp needs a project name (or --answers/--batch)")
+    
+    # Shared non-blocking logging for everything that executes workflows
+    configure_logging(args.log_dir)
+    
+    if args.metrics_port:
+        metrics.start_metrics_server(args.metrics_port)
+        print(f"📈 Serving metrics on http://127.0.0.1:{args.metrics_port}/metrics")
+    
+    if args.command == "serve":
+        serve_daemon(args)
+        return
+    
+    if args.command == "daemon-status" or args.daemon:
+        try:
+            if args.command == "daemon-status":
+                show_daemon_status(args)
+            else:
+                submit_to_daemon(args)
+        except (ConnectionError, RuntimeError) as e:
+            print(f"❌ {e}")
+            print("💡 Start the daemon with: ./workflow-runner.py serve")
+            sys.exit(1)
         return
     
     try:
         # Initialize orchestrator for workflow commands
         orchestrator = WorkflowOrchestrator(args.config)
+        orchestrator.metrics_file = args.metrics_file
+        orchestrator.trace_enabled = args.trace or args.trace_dir is not None
+        orchestrator.trace_dir = args.trace_dir
+        orchestrator.dashboard = args.dashboard
         
         # Always configure LLM API (no --llm-api flag needed)
         api_key_available = any([
@@ -1168,65 +2092,41 @@ EXAMPLES:
             if api_key_available:
                 print("✅ Using existing API key from environment variables")
         
+        # One unattended MVP per batch/stdin JSONL line
+        if args.command == "create-mvp" and (args.batch or args.answers == "-"):
+            if args.dashboard:
+                print("ℹ️  --dashboard is ignored for batch runs")
+            if args.dry_run:
+                print(f"🧪 DRY RUN - {len(args.answers_records)} batch record(s) read, nothing created")
+                sys.exit(0)
+            sys.exit(0 if run_batch(orchestrator, args.answers_records, args.workers) else 1)
+        
         # Handle create-mvp command
         if args.command == "create-mvp":
             project_name = validate_project_name(args.project_name)
-            project_root = Path.home() / "Projects" / project_name
-            
-            # Check if project already exists
-            if project_root.exists():
-                print(f"❌ Project '{project_name}' already exists at {project_root}")
+            try:
+                context = prepare_mvp_context(project_name, AutomationMode(args.mode))
+            except FileExistsError as e:
+                print(f"❌ {e}")
                 print(f"💡 Use 'add-feature' to add features to existing projects")
                 sys.exit(1)
-            
-            # Create project directory and structure
-            project_root.mkdir(parents=True, exist_ok=True)
-            print(f"🚀 Creating new MVP project: {project_name}")
-            print(f"📁 Project location: {project_root}")
-            
-            # Create standard project structure
-            create_project_structure(project_root, project_name)
-            
-            # Create execution context for MVP initialization  
-            feature_name = f"{project_name}-mvp-initialization"
-            context = ExecutionContext(
-                feature_name=feature_name,
-                mode=AutomationMode(args.mode),
-                project_root=project_root,
-                context_mode="MVP_CREATION"
-            )
+            project_root = context.project_root
             
             print(f"\n🤖 Starting AI workflow for MVP initialization...")
             
         # Handle add-feature command
         elif args.command == "add-feature":
-            feature_name = args.feature_name
             project_name = args.project_name
-            project_root = Path.home() / "Projects" / project_name
-            
-            # Check if project exists
-            if not project_root.exists():
-                print(f"❌ Project '{project_name}' not found in ~/Projects/")
-                print(f"💡 Create it first with: ./workflow-runner.py create-mvp {project_name}")
-                sys.exit(1)
-            
-            # Verify it's an MVP project
-            manifest_path = project_root / "project-manifest.json"
-            if not manifest_path.exists():
-                print(f"❌ '{project_name}' is not an MVP project (no project-manifest.json)")
+            try:
+                context = prepare_feature_context(args.feature_name, project_name, AutomationMode(args.mode))
+            except FileNotFoundError as e:
+                print(f"❌ {e}")
                 print(f"💡 Create it first with: ./workflow-runner.py create-mvp {project_name}")
                 sys.exit(1)
-            
-            print(f"➕ Adding feature '{feature_name}' to project '{project_name}'")
-            
-            # Create execution context for feature addition
-            context = ExecutionContext(
-                feature_name=feature_name,
-                mode=AutomationMode(args.mode),
-                project_root=project_root,
-                context_mode="FEATURE_ADDITION",
-                existing_project=project_name
-            )
+            project_root = context.project_root
+        
+        if args.answers_records:
+            _, context.answers = split_answers_record(args.answers_records[0], project_name)
         
         # Assess risk
         context.risk_score = orchestrator.assess_risk_score(context)
@@ -1246,17 +2146,7 @@ EXAMPLES:
             if success:
                 if args.command == "create-mvp":
                     # Update project status
-                    try:
-                        import json
-                        manifest_path = project_root / "project-manifest.json"
-                        with open(manifest_path, 'r') as f:
-                            manifest = json.load(f)
-                        manifest["status"] = "initialized"
-                        manifest["mvp_context"]["automation_mode"] = args.mode
-                        with open(manifest_path, 'w') as f:
-                            json.dump(manifest, f, indent=2)
-                    except Exception as e:
-                        print(f"⚠️  Could not update project status: {e}")
+                    mark_mvp_initialized(project_root, args.mode)
                     
                     print(f"\n🎉 MVP project '{project_name}' created successfully!")
                     print(f"📁 Project location: {project_root}")
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+
+"""
+🛰️ Workflow Daemon - Long-lived job server for workflow-runner.py
+Keeps configuration, modules and LLM clients warm and runs jobs through a bounded worker pool
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Callable
+from dataclasses import dataclass, field
+from enum import Enum
+
+from workflow_logging import get_logger
+
+DEFAULT_DAEMON_HOST = "127.0.0.1"
+DEFAULT_DAEMON_PORT = 8765
+
+JOB_TYPES = ("create-mvp", "add-feature")
+
+# Finished jobs stay queryable for a while, then are evicted so a long-lived daemon doesn't grow without bound
+DEFAULT_JOB_TTL_SECONDS = 3600
+DEFAULT_MAX_FINISHED_JOBS = 200
+
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+@dataclass
+class WorkflowJob:
+    """A single create-mvp/add-feature request submitted to the daemon"""
+    job_id: str
+    job_type: str
+    params: Dict[str, Any]
+    status: JobStatus = JobStatus.QUEUED
+    submitted_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    duration_seconds: Optional[float] = None
+    result: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    finished_monotonic: Optional[float] = None  # Eviction clock (not part of the API)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON responses"""
+        return {
+            "job_id": self.job_id,
+            "job_type": self.job_type,
+            "params": self.params,
+            "status": self.status.value,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_seconds": self.duration_seconds,
+            "result": self.result,
+            "error": self.error
+        }
+
+class WorkflowJobQueue:
+    """Bounded worker pool that executes workflow jobs with a shared handler"""
+
+    def __init__(self, handler: Callable[[WorkflowJob], Dict[str, Any]],
+                 max_workers: int = 2, max_pending: int = 32,
+                 job_ttl_seconds: float = DEFAULT_JOB_TTL_SECONDS, max_finished_jobs: int = DEFAULT_MAX_FINISHED_JOBS):
+        self.handler = handler
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.job_ttl_seconds = job_ttl_seconds
+        self.max_finished_jobs = max_finished_jobs
+        self.started_at = time.time()
+        self.logger = self._setup_logging()
+        self._jobs: Dict[str, WorkflowJob] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="workflow-job")
+
+    def _setup_logging(self) -> logging.Logger:
+        """Setup logging configuration"""
+        return get_logger('workflow_daemon', logging.INFO)
+
+    def submit(self, job_type: str, params: Dict[str, Any]) -> WorkflowJob:
+        """Queue a new job, rejecting unknown types and overflowing queues"""
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"Unsupported job type: {job_type} (expected one of {', '.join(JOB_TYPES)})")
+
+        with self._lock:
+            self._prune()
+            pending = sum(1 for job in self._jobs.values()
+                          if job.status in (JobStatus.QUEUED, JobStatus.RUNNING))
+            if pending >= self.max_pending:
+                raise RuntimeError(f"Job queue full ({pending} pending jobs)")
+
+            job = WorkflowJob(job_id=uuid.uuid4().hex[:12], job_type=job_type, params=params)
+            self._jobs[job.job_id] = job
+
+        self._executor.submit(self._run_job, job)
+        self.logger.info(f"📥 Queued job {job.job_id}: {job_type} {params}")
+        return job
+
+    def _run_job(self, job: WorkflowJob):
+        """Execute a job on a worker thread and record its outcome"""
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.now().isoformat()
+        start_time = time.time()
+
+        try:
+            job.result = self.handler(job) or {}
+            job.status = JobStatus.SUCCEEDED if job.result.get("success", True) else JobStatus.FAILED
+        except BaseException as e:  # SystemExit/KeyboardInterrupt from workflow code must not kill the worker
+            job.status = JobStatus.FAILED
+            job.error = str(e) or e.__class__.__name__
+            self.logger.error(f"❌ Job {job.job_id} failed: {job.error}")
+        finally:
+            job.duration_seconds = round(time.time() - start_time, 3)
+            job.finished_at = datetime.now().isoformat()
+            job.finished_monotonic = time.monotonic()
+
+        self.logger.info(f"🏁 Job {job.job_id} {job.status.value} in {job.duration_seconds:.1f}s")
+
+    def _prune(self):
+        """Evict finished jobs past their TTL, then the oldest beyond max_finished_jobs (caller holds the lock)"""
+        now = time.monotonic()
+        finished = sorted((job for job in self._jobs.values() if job.finished and job.finished_monotonic is not None),
+                          key=lambda job: job.finished_monotonic)
+        expired = [job for job in finished if now - job.finished_monotonic > self.job_ttl_seconds]
+        kept = len(finished) - len(expired)
+        if kept > self.max_finished_jobs:
+            expired += finished[len(expired):len(expired) + kept - self.max_finished_jobs]
+        for job in expired:
+            del self._jobs[job.job_id]
+
+    def get(self, job_id: str) -> Optional[WorkflowJob]:
+        """Look up a job by ID"""
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[WorkflowJob]:
+        """Return all known jobs, most recent first"""
+        with self._lock:
+            self._prune()
+            return sorted(self._jobs.values(), key=lambda job: job.submitted_at, reverse=True)
+
+    def health(self) -> Dict[str, Any]:
+        """Summarize daemon health and queue depth"""
+        with self._lock:
+            self._prune()
+            counts = {status.value: 0 for status in JobStatus}
+            for job in self._jobs.values():
+                counts[job.status.value] += 1
+
+        return {
+            "status": "ok",
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "jobs": counts
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work and optionally wait for running jobs"""
+        self._executor.shutdown(wait=wait)
+
+class _DaemonRequestHandler:
+    """JSON API: GET /health, GET /jobs, GET /jobs/<id>, POST /jobs (plus Prometheus GET /metrics)
+
+    Mixed into BaseHTTPRequestHandler by serve(), so clients that only need the constants skip importing http.server.
+    """
+
+    job_queue: WorkflowJobQueue = None
+
+    def do_GET(self):
+        path = self.path.rstrip("/")
+        if path == "/metrics":
+            import workflow_metrics
+            body = workflow_metrics.REGISTRY.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", workflow_metrics.CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif path == "/health":
+            self._send_json(200, self.job_queue.health())
+        elif path == "/jobs":
+            self._send_json(200, {"jobs": [job.to_dict() for job in self.job_queue.list_jobs()]})
+        elif path.startswith("/jobs/"):
+            job = self.job_queue.get(path.split("/", 2)[2])
+            if job:
+                self._send_json(200, job.to_dict())
+            else:
+                self._send_json(404, {"error": "Job not found"})
+        else:
+            self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            job = self.job_queue.submit(payload.get("job_type", ""), payload.get("params", {}))
+            self._send_json(202, job.to_dict())
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+        except RuntimeError as e:
+            self._send_json(503, {"error": str(e)})
+
+    def _send_json(self, status_code: int, data: Dict[str, Any]):
+        body = json.dumps(data, indent=2).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.getLogger('workflow_daemon').debug(f"{self.address_string()} - {format % args}")
+
+def serve(job_queue: WorkflowJobQueue, host: str = DEFAULT_DAEMON_HOST, port: int = DEFAULT_DAEMON_PORT):
+    """Serve the job API until interrupted"""
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    handler_class = type("WorkflowDaemonRequestHandler", (_DaemonRequestHandler, BaseHTTPRequestHandler),
+                         {"job_queue": job_queue})
+    server = ThreadingHTTPServer((host, port), handler_class)
+
+    print(f"🛰️  Workflow daemon listening on http://{host}:{port}")
+    print(f"   Workers: {job_queue.max_workers} | Max pending jobs: {job_queue.max_pending}")
+    print(f"   Submit with: ./workflow-runner.py --daemon create-mvp PROJECT_NAME")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Shutting down workflow daemon...")
+    finally:
+        server.server_close()
+        job_queue.shutdown(wait=False)
+
+def _request(method: str, url: str, payload: Optional[Dict[str, Any]] = None, timeout: float = 10.0) -> Dict[str, Any]:
+    """Issue a JSON request to the daemon and decode the response"""
+    import urllib.error
+    import urllib.request
+
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    request = urllib.request.Request(url, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        error = json.loads(e.read() or b"{}").get("error", str(e))
+        raise RuntimeError(f"Daemon rejected request: {error}")
+    except urllib.error.URLError as e:
+        raise ConnectionError(f"Workflow daemon not reachable at {url}: {e.reason}")
+
+def submit_job(job_type: str, params: Dict[str, Any],
+               host: str = DEFAULT_DAEMON_HOST, port: int = DEFAULT_DAEMON_PORT) -> Dict[str, Any]:
+    """Submit a job to a running daemon"""
+    return _request("POST", f"http://{host}:{port}/jobs", {"job_type": job_type, "params": params})
+
+def get_job(job_id: str, host: str = DEFAULT_DAEMON_HOST, port: int = DEFAULT_DAEMON_PORT) -> Dict[str, Any]:
+    """Fetch job status from a running daemon"""
+    return _request("GET", f"http://{host}:{port}/jobs/{job_id}")
+
+def get_health(host: str = DEFAULT_DAEMON_HOST, port: int = DEFAULT_DAEMON_PORT) -> Dict[str, Any]:
+    """Fetch daemon health"""
+    return _request("GET", f"http://{host}:{port}/health")
+
+def wait_for_job(job_id: str, host: str = DEFAULT_DAEMON_HOST, port: int = DEFAULT_DAEMON_PORT,
+                 poll_interval: float = 1.0) -> Dict[str, Any]:
+    """Poll until a job reaches a terminal state"""
+    while True:
+        job = get_job(job_id, host, port)
+        if job["status"] in (JobStatus.SUCCEEDED.value, JobStatus.FAILED.value):
+            return job
+        time.sleep(poll_interval)
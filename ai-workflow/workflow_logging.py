@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+
+"""
+📜 Workflow Logging - Shared non-blocking logging for every workflow component
+One QueueHandler/QueueListener pipeline: plain console output plus rotating JSON-lines files with run/step/project IDs
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Dict, Optional, Any
+
+LOG_DIR_ENV = "AI_WORKFLOW_LOG_DIR"
+DEFAULT_LOG_DIR = Path.home() / ".ai-workflow" / "logs"
+LOG_FILENAME = "ai-workflow.jsonl"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+CONSOLE_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Structured fields attached to every record logged inside log_context()
+CONTEXT_FIELDS = ("run_id", "step", "project", "feature")
+_log_context: contextvars.ContextVar = contextvars.ContextVar("workflow_log_context", default={})
+
+_lock = threading.Lock()
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_log_dir: Optional[Path] = None
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "function": record.funcName,
+            "line": record.lineno,
+            "thread": record.threadName
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+class _ContextQueueHandler(logging.handlers.QueueHandler):
+    """Captures the caller's log context before the record crosses to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        for field, value in _log_context.get().items():
+            if getattr(record, field, None) is None:
+                setattr(record, field, value)
+        return super().prepare(record)
+
+def _build_handlers(log_dir: Optional[Path], max_bytes: int, backup_count: int):
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+    handlers = [console_handler]
+
+    if log_dir is not None:
+        try:
+            log_dir.mkdir(parents=True, exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_dir / LOG_FILENAME, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+            )
+            file_handler.setFormatter(JSONFormatter())
+            handlers.append(file_handler)
+        except OSError as e:
+            console_handler.handle(logging.makeLogRecord({
+                "name": "workflow_logging", "levelno": logging.WARNING, "levelname": "WARNING",
+                "msg": f"⚠️  File logging disabled, cannot write to {log_dir}: {e}"
+            }))
+
+    return handlers
+
+def configure_logging(log_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                      backup_count: int = DEFAULT_BACKUP_COUNT, file_logging: bool = True):
+    """Start (or retarget) the shared logging pipeline; safe to call repeatedly"""
+    global _queue_handler, _listener, _log_dir
+
+    if file_logging:
+        log_dir = Path(log_dir or os.environ.get(LOG_DIR_ENV) or DEFAULT_LOG_DIR).expanduser()
+    else:
+        log_dir = None
+
+    with _lock:
+        if _listener is not None and log_dir == _log_dir:
+            return
+
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+
+        if _queue_handler is None:
+            _queue_handler = _ContextQueueHandler(queue.SimpleQueue())  # Unbounded: emitting never blocks
+
+        _listener = logging.handlers.QueueListener(
+            _queue_handler.queue, *_build_handlers(log_dir, max_bytes, backup_count), respect_handler_level=True
+        )
+        _listener.start()
+        _log_dir = log_dir
+
+def get_logger(name: str, level: int = logging.INFO) -> logging.Logger:
+    """Component logger routed through the shared queue (never gets duplicate handlers)"""
+    if _listener is None:
+        configure_logging()
+
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    with _lock:
+        if _queue_handler not in logger.handlers:
+            logger.addHandler(_queue_handler)
+    logger.propagate = False
+    return logger
+
+def get_log_dir() -> Optional[Path]:
+    """Directory of the JSON log files, if file logging is active"""
+    return _log_dir
+
+@contextmanager
+def log_context(**fields):
+    """Attach run/step/project IDs to every record logged in this block (per thread/task)"""
+    merged = dict(_log_context.get())
+    merged.update({key: value for key, value in fields.items() if value is not None})
+    token = _log_context.set(merged)
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+@contextmanager
+def console_redirected(stream, level: int = logging.WARNING):
+    """Write console records at level or above to stream for this block (file logging is unaffected)"""
+    with _lock:
+        handlers = [handler for handler in (_listener.handlers if _listener else ())
+                    if type(handler) is logging.StreamHandler]
+        previous = [(handler, handler.stream, handler.level) for handler in handlers]
+        for handler in handlers:
+            handler.setStream(stream)
+            handler.setLevel(level)
+    try:
+        yield
+    finally:
+        with _lock:
+            for handler, previous_stream, previous_level in previous:
+                handler.setStream(previous_stream)
+                handler.setLevel(previous_level)
+
+def shutdown_logging():
+    """Flush queued records and stop the listener"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+
+"""
+📈 Workflow Metrics - Prometheus-style counters and histograms for generation throughput and latency
+Dependency-free registry exposed as a textfile at the end of each run or via an optional /metrics endpoint
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import workflow_progress as progress
+
+METRICS_FILE_ENV = "AI_WORKFLOW_METRICS_FILE"
+DEFAULT_METRICS_FILE = Path.home() / ".ai-workflow" / "metrics" / "ai_workflow.prom"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; LLM calls range from sub-second (cache/local) to minutes (long documents)
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+GATE_WAIT_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 900.0, 1800.0, 3600.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set"""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+class Histogram(_Metric):
+    """Bucketed observations with sum and count per label set"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # bucket counts..., +Inf count, sum
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> float:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[-2] if series else 0.0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for index, bound in enumerate(self.buckets):
+                    labels = _format_labels(self.labelnames, key, 'le="%g"' % bound)
+                    lines.append(f"{self.name}_bucket{labels} {series[index]:g}")
+                labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {series[-2]:g}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series[-1]:g}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-2]:g}")
+        return lines
+
+class MetricsRegistry:
+    """Holds every metric and renders the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.setdefault(metric.name, metric)
+            return self._metrics[metric.name]
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Optional[Path] = None) -> Path:
+        """Atomically write the registry for node_exporter's textfile collector"""
+        path = Path(path or os.environ.get(METRICS_FILE_ENV) or DEFAULT_METRICS_FILE).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.parent / f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp_path.write_text(self.render())
+        os.replace(tmp_path, path)
+        return path
+
+REGISTRY = MetricsRegistry()
+
+LLM_REQUESTS = REGISTRY.register(Counter(
+    "ai_workflow_llm_requests_total", "LLM generation requests by outcome",
+    ("provider", "model", "content_type", "outcome")))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "ai_workflow_llm_tokens_total", "Tokens sent (in) and generated (out)",
+    ("provider", "model", "content_type", "direction")))
+LLM_COST = REGISTRY.register(Counter(
+    "ai_workflow_llm_cost_usd_total", "Estimated LLM spend in USD",
+    ("provider", "model", "content_type")))
+LLM_LATENCY = REGISTRY.register(Histogram(
+    "ai_workflow_llm_request_duration_seconds", "End-to-end LLM request latency including retries",
+    ("provider", "model", "content_type")))
+LLM_TTFT = REGISTRY.register(Histogram(
+    "ai_workflow_llm_time_to_first_token_seconds", "Time until the first token arrived (full latency when not streaming)",
+    ("provider", "model", "content_type")))
+LLM_RETRIES = REGISTRY.register(Counter(
+    "ai_workflow_llm_retries_total", "Failed LLM attempts that were retried",
+    ("provider", "model")))
+VALIDATION_FAILURES = REGISTRY.register(Counter(
+    "ai_workflow_validation_failures_total", "Generated documents that failed validation criteria",
+    ("provider", "model", "content_type")))
+SECTION_REPAIRS = REGISTRY.register(Counter(
+    "ai_workflow_section_repairs_total", "Sections regenerated after failing validation, by outcome (repaired/failed)",
+    ("content_type", "outcome")))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "ai_workflow_cache_lookups_total", "Cache lookups by cache and result (hit/miss)",
+    ("cache", "result")))
+GATE_WAIT = REGISTRY.register(Histogram(
+    "ai_workflow_gate_wait_seconds", "Time spent waiting for a human gate decision",
+    ("gate", "decision"), buckets=GATE_WAIT_BUCKETS))
+STEP_DURATION = REGISTRY.register(Histogram(
+    "ai_workflow_step_duration_seconds", "Workflow step duration",
+    ("workflow", "step", "outcome")))
+SPECULATIONS = REGISTRY.register(Counter(
+    "ai_workflow_speculative_generations_total",
+    "Drafts generated while a gate was open, by outcome (committed/discarded/skipped/stale/failed/over_budget)",
+    ("outcome",)))
+SPECULATIVE_WASTE = REGISTRY.register(Counter(
+    "ai_workflow_speculative_wasted_cost_usd_total", "Estimated spend on speculative drafts that were thrown away"))
+AGENT_TASKS = REGISTRY.register(Counter(
+    "ai_workflow_agent_tasks_total", "Tasks run by coordinated worker agents, by outcome (completed/reassigned/failed)",
+    ("agent_type", "outcome")))
+RUNS = REGISTRY.register(Counter(
+    "ai_workflow_runs_total", "Completed workflow runs by outcome",
+    ("workflow", "outcome")))
+
+def record_cache(cache: str, hit: bool):
+    """Count a cache hit or miss"""
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+    progress.emit("cache", cache=cache, hit=hit)
+
+def start_metrics_server(port: int, host: str = "127.0.0.1"):
+    """Serve /metrics from a background thread for long-running batches"""
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler  # Deferred: keeps CLI startup fast
+
+    class MetricsRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = REGISTRY.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
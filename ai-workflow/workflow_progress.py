@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+
+"""
+📟 Workflow Progress - In-process progress events and a live terminal dashboard
+Emitting only appends to a queue (nothing at all without a subscriber); a render thread folds events into the view
+"""
+
+import queue
+import shutil
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+DEFAULT_REFRESH_SECONDS = 0.5
+THROUGHPUT_WINDOW_SECONDS = 30.0
+MAX_INFLIGHT_ROWS = 4
+SPEND_BAR_WIDTH = 20
+
+# Event kinds and their fields:
+#   run_started   feature, steps [{number, name, dependencies}]
+#   step          number, state (running/gate/completed/failed/skipped)
+#   run_finished  success
+#   llm_started   request_id, content_type
+#   llm_retry     content_type
+#   llm_finished  request_id, outcome (success/error), tokens_out, cost_usd, cost_limit_usd
+#   cache         cache, hit
+#   agent_task    task_id, agent_id, state (running/completed/reassigned/failed)
+STEP_ICONS = {
+    "pending": "·",
+    "running": "▶",
+    "gate": "⏸",
+    "completed": "✅",
+    "failed": "❌",
+    "skipped": "⏭"
+}
+
+@dataclass
+class ProgressEvent:
+    kind: str
+    timestamp: float
+    fields: Dict[str, Any]
+
+_subscribers: Tuple[queue.SimpleQueue, ...] = ()
+_subscribers_lock = threading.Lock()
+_active: Optional["Dashboard"] = None
+
+def subscribe() -> queue.SimpleQueue:
+    """Queue receiving every event emitted from now on"""
+    global _subscribers
+    events = queue.SimpleQueue()
+    with _subscribers_lock:
+        _subscribers = _subscribers + (events,)
+    return events
+
+def unsubscribe(events: queue.SimpleQueue):
+    global _subscribers
+    with _subscribers_lock:
+        _subscribers = tuple(subscriber for subscriber in _subscribers if subscriber is not events)
+
+def emit(kind: str, **fields):
+    """Publish an event; never blocks and costs one tuple check when nobody listens"""
+    subscribers = _subscribers  # Replaced, never mutated, so the hot path takes no lock
+    if not subscribers:
+        return
+    event = ProgressEvent(kind, time.time(), fields)
+    for events in subscribers:
+        events.put_nowait(event)
+
+@dataclass
+class StepProgress:
+    number: str
+    name: str
+    dependencies: List[str] = field(default_factory=list)
+    state: str = "pending"
+    started_at: Optional[float] = None
+    duration: float = 0.0
+
+@dataclass
+class ProgressState:
+    """Everything the dashboard shows, rebuilt only from events"""
+    feature: str = ""
+    started_at: float = field(default_factory=time.time)
+    finished: Optional[bool] = None
+    steps: Dict[str, StepProgress] = field(default_factory=dict)
+    inflight: Dict[Any, Tuple[str, float]] = field(default_factory=dict)
+    token_samples: Deque[Tuple[float, int]] = field(default_factory=deque)
+    tokens_out: int = 0
+    requests_done: int = 0
+    requests_failed: int = 0
+    retries: int = 0
+    cost_usd: float = 0.0
+    cost_limit_usd: Optional[float] = None
+    cache_hits: int = 0
+    cache_lookups: int = 0
+    agent_tasks: Dict[str, str] = field(default_factory=dict)
+    reassignments: int = 0
+
+    def apply(self, event: ProgressEvent):
+        data = event.fields
+        if event.kind == "run_started":
+            self.feature = data.get("feature", "")
+            self.started_at = event.timestamp
+            self.steps = {step["number"]: StepProgress(step["number"], step["name"], list(step.get("dependencies", [])))
+                          for step in data.get("steps", [])}
+        elif event.kind == "step":
+            step = self.steps.setdefault(data["number"], StepProgress(data["number"], data["number"]))
+            if data["state"] == "running" and step.started_at is None:
+                step.started_at = event.timestamp
+            elif data["state"] in ("completed", "failed", "skipped") and step.started_at is not None:
+                step.duration = event.timestamp - step.started_at
+            step.state = data["state"]
+        elif event.kind == "run_finished":
+            self.finished = bool(data.get("success"))
+        elif event.kind == "llm_started":
+            self.inflight[data["request_id"]] = (data.get("content_type") or "unknown", event.timestamp)
+        elif event.kind == "llm_retry":
+            self.retries += 1
+        elif event.kind == "llm_finished":
+            self.inflight.pop(data["request_id"], None)
+            if data.get("outcome") == "success":
+                self.requests_done += 1
+            else:
+                self.requests_failed += 1
+            tokens = int(data.get("tokens_out") or 0)
+            self.tokens_out += tokens
+            self.token_samples.append((event.timestamp, tokens))
+            self.cost_usd += float(data.get("cost_usd") or 0.0)
+            if data.get("cost_limit_usd") is not None:
+                self.cost_limit_usd = float(data["cost_limit_usd"])
+        elif event.kind == "cache":
+            self.cache_lookups += 1
+            self.cache_hits += 1 if data.get("hit") else 0
+        elif event.kind == "agent_task":
+            if data["state"] == "reassigned":
+                self.reassignments += 1
+            self.agent_tasks[data["task_id"]] = data["state"]
+
+    def tokens_per_second(self, now: float) -> float:
+        """Output tokens over the last THROUGHPUT_WINDOW_SECONDS (or since the run started)"""
+        while self.token_samples and now - self.token_samples[0][0] > THROUGHPUT_WINDOW_SECONDS:
+            self.token_samples.popleft()
+        window = min(THROUGHPUT_WINDOW_SECONDS, max(now - self.started_at, 1e-6))
+        return sum(tokens for _, tokens in self.token_samples) / window
+
+    def eta_seconds(self, now: float) -> Optional[float]:
+        """Mean duration of finished steps times the steps still to run, less the running step's progress"""
+        durations = [step.duration for step in self.steps.values() if step.state == "completed"]
+        if not durations:
+            return None
+        average = sum(durations) / len(durations)
+        remaining = 0.0
+        for step in self.steps.values():
+            if step.state == "pending":
+                remaining += average
+            elif step.state in ("running", "gate"):
+                remaining += max(average - (now - (step.started_at or now)), 0.0)
+        return remaining
+
+def _clock(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+def render(state: ProgressState, now: float) -> List[str]:
+    """Dashboard lines for the current state"""
+    eta = state.eta_seconds(now)
+    if state.finished is not None:
+        status = "finished" if state.finished else "failed"
+    else:
+        status = f"ETA {_clock(eta)}" if eta is not None else "ETA --:--"
+    lines = [f"📟 {state.feature or 'workflow'} · elapsed {_clock(now - state.started_at)} · {status}"]
+
+    for step in state.steps.values():
+        if step.state in ("running", "gate"):
+            timing = f"{now - (step.started_at or now):6.1f}s"
+        elif step.state in ("completed", "failed", "skipped") and step.started_at is not None:
+            timing = f"{step.duration:6.1f}s"
+        else:
+            timing = " " * 7
+        after = f"  ← {', '.join(step.dependencies)}" if step.dependencies else ""
+        lines.append(f"  {STEP_ICONS.get(step.state, '?')} {step.number} {step.name:<32} {timing}{after}")
+
+    lines.append(f"  LLM    {len(state.inflight)} in flight · {state.requests_done} done · {state.requests_failed} failed"
+                 f" · {state.retries} retries · {state.tokens_per_second(now):.1f} tok/s")
+    for content_type, started in sorted(state.inflight.values(), key=lambda item: item[1])[:MAX_INFLIGHT_ROWS]:
+        lines.append(f"         ↳ {content_type} {now - started:.1f}s")
+
+    if state.cost_limit_usd:
+        share = min(state.cost_usd / state.cost_limit_usd, 1.0)
+        filled = int(round(share * SPEND_BAR_WIDTH))
+        lines.append(f"  Spend  ${state.cost_usd:.4f} / ${state.cost_limit_usd:.2f} "
+                     f"[{'█' * filled}{'░' * (SPEND_BAR_WIDTH - filled)}] {share:.0%}")
+    else:
+        lines.append(f"  Spend  ${state.cost_usd:.4f}")
+
+    hit_rate = f"{state.cache_hits / state.cache_lookups:.0%}" if state.cache_lookups else "--"
+    lines.append(f"  Cache  {hit_rate} hit ({state.cache_hits}/{state.cache_lookups})")
+
+    if state.agent_tasks:
+        counts: Dict[str, int] = {}
+        for task_state in state.agent_tasks.values():
+            counts[task_state] = counts.get(task_state, 0) + 1
+        lines.append(f"  Agents {counts.get('running', 0)} running · {counts.get('completed', 0)} done"
+                     f" · {state.reassignments} reassigned · {counts.get('failed', 0)} failed")
+    return lines
+
+class _PassThrough:
+    """Stands in for stdout/stderr so other output scrolls above the dashboard instead of through it"""
+
+    def __init__(self, dashboard: "Dashboard", stream):
+        self._dashboard = dashboard
+        self._stream = stream
+
+    def write(self, text: str) -> int:
+        self._dashboard._write_through(self._stream, text)
+        return len(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def __getattr__(self, name: str):
+        return getattr(self._stream, name)
+
+class Dashboard:
+    """Live view redrawn in place at the bottom of the terminal"""
+
+    def __init__(self, stream=None, refresh_seconds: float = DEFAULT_REFRESH_SECONDS):
+        self.stream = stream or sys.stdout
+        self.refresh_seconds = refresh_seconds
+        self.state = ProgressState()
+        self._events: Optional[queue.SimpleQueue] = None
+        self._lock = threading.RLock()
+        self._drawn = 0
+        self._paused = 0
+        self._at_line_start = True
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._saved_streams = None
+        self._console = None
+
+    def start(self) -> "Dashboard":
+        global _active
+        from workflow_logging import console_redirected
+
+        # The process has one stdout/stderr, so only one dashboard may own them
+        with _subscribers_lock:
+            if _active is not None:
+                raise RuntimeError("A progress dashboard is already showing")
+            _active = self
+
+        self._events = subscribe()
+        self._saved_streams = (sys.stdout, sys.stderr)
+        sys.stdout = _PassThrough(self, self._saved_streams[0])
+        sys.stderr = _PassThrough(self, self._saved_streams[1])
+        # Info lines are what the dashboard summarizes; warnings and errors still scroll above it
+        self._console = console_redirected(sys.stderr)
+        self._console.__enter__()
+        self._write_raw("\x1b[?25l")
+        self._thread = threading.Thread(target=self._loop, name="progress-dashboard", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        global _active
+        _active = None
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.refresh()  # Leave the final frame on screen
+        with self._lock:
+            self._drawn = 0
+            self._write_raw("\x1b[?25h")
+        self._console.__exit__(None, None, None)
+        sys.stdout, sys.stderr = self._saved_streams
+        unsubscribe(self._events)
+
+    def __enter__(self) -> "Dashboard":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @contextmanager
+    def paused(self):
+        """Take the dashboard off screen while the user is prompted"""
+        with self._lock:
+            self._erase()
+            self._paused += 1
+            self._write_raw("\x1b[?25h")
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._paused -= 1
+                self._at_line_start = True  # The prompt's answer ended with Enter
+                self._write_raw("\x1b[?25l")
+
+    def refresh(self):
+        """Fold pending events into the state and redraw"""
+        while True:
+            try:
+                self.state.apply(self._events.get_nowait())
+            except queue.Empty:
+                break
+        lines = render(self.state, time.time())
+        width = max(shutil.get_terminal_size().columns - 4, 20)
+        with self._lock:
+            if self._paused or not self._at_line_start:
+                return
+            self._erase()
+            # Truncated so every line is exactly one terminal row and the next erase is exact
+            self._write_raw("".join(line[:width] + "\n" for line in lines))
+            self._drawn = len(lines)
+
+    def _loop(self):
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                self.refresh()
+            except Exception:
+                pass  # A broken frame must never take the run down
+
+    def _erase(self):
+        if self._drawn:
+            self._write_raw(f"\x1b[{self._drawn}F\x1b[J")
+            self._drawn = 0
+
+    def _write_raw(self, text: str):
+        self.stream.write(text)
+        self.stream.flush()
+
+    def _write_through(self, stream, text: str):
+        if not text:
+            return
+        with self._lock:
+            self._erase()
+            stream.write(text)
+            stream.flush()
+            self._at_line_start = text.endswith("\n")
+
+@contextmanager
+def live_dashboard(enabled: bool = True, refresh_seconds: float = DEFAULT_REFRESH_SECONDS):
+    """Dashboard for the block when enabled in a single interactive run; yields None otherwise
+
+    It replaces the process-wide sys.stdout/stderr, so it needs a terminal on both stdin and stdout
+    and no other dashboard already showing.
+    """
+    interactive = all(stream is not None and stream.isatty() for stream in (sys.stdin, sys.stdout))
+    if not enabled or not interactive or _active is not None:
+        yield None
+        return
+    with Dashboard(refresh_seconds=refresh_seconds) as dashboard:
+        yield dashboard
+
+@contextmanager
+def paused(when: bool = True):
+    """Pause the active dashboard (if any) around an interactive prompt"""
+    dashboard = _active
+    if not when or dashboard is None:
+        yield
+        return
+    with dashboard.paused():
+        yield
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+
+"""
+🧭 Workflow Tracing - Per-run span traces for finding where a slow run spent its time
+Nested spans (step → parse → prompt build → provider call/attempts → post-process → write) exported as Chrome trace_event and OTLP-JSON
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
+
+TRACE_DIR_ENV = "AI_WORKFLOW_TRACE_DIR"
+DEFAULT_TRACE_DIR = Path.home() / ".ai-workflow" / "traces"
+SERVICE_NAME = "ai-workflow"
+
+# OTLP span kinds / status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# Categories whose spans talk to a remote provider (exported as CLIENT spans)
+CLIENT_CATEGORIES = ("provider_attempt",)
+
+@dataclass
+class Span:
+    """One timed operation inside a run"""
+    name: str
+    category: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    thread_id: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return max(self.end_ns - self.start_ns, 0) / 1e9
+
+    def set(self, **attributes):
+        """Attach attributes discovered while the span is open (tokens, cost, sizes)"""
+        self.attributes.update({key: value for key, value in attributes.items() if value is not None})
+
+class Tracer:
+    """Collects the finished spans of one run"""
+
+    def __init__(self, run_id: str, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.run_id = run_id
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self.root = self._open(name, "run", None, attributes or {})
+
+    def _open(self, name: str, category: str, parent_id: Optional[str], attributes: Dict[str, Any]) -> Span:
+        return Span(name=name, category=category, span_id=os.urandom(8).hex(), parent_id=parent_id,
+                    start_ns=time.time_ns(), thread_id=threading.get_ident(), attributes=dict(attributes))
+
+    def _close(self, span: Span):
+        span.end_ns = time.time_ns()
+        with self._lock:
+            self.spans.append(span)
+
+    def children(self) -> Dict[Optional[str], List[Span]]:
+        tree: Dict[Optional[str], List[Span]] = {}
+        with self._lock:
+            for span in self.spans:
+                tree.setdefault(span.parent_id, []).append(span)
+        return tree
+
+    def write_chrome_trace(self, path: Path) -> Path:
+        """Chrome trace_event JSON (open in Perfetto or chrome://tracing)"""
+        pid = os.getpid()
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_ns)
+        events = [{
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": span.start_ns / 1000,
+            "dur": (span.end_ns - span.start_ns) / 1000,
+            "pid": pid,
+            "tid": span.thread_id,
+            "args": dict(span.attributes, **({"error": span.error} if span.error else {}))
+        } for span in spans]
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"{SERVICE_NAME} {self.run_id}"}})
+        return _write_json(path, {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"run_id": self.run_id}})
+
+    def write_otlp_json(self, path: Path) -> Path:
+        """OTLP/JSON ExportTraceServiceRequest (importable by any OpenTelemetry collector)"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_ns)
+        otlp_spans = []
+        for span in spans:
+            entry = {
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": SPAN_KIND_CLIENT if span.category in CLIENT_CATEGORIES else SPAN_KIND_INTERNAL,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": _otlp_attributes(dict(span.attributes, category=span.category)),
+                "status": {"code": STATUS_ERROR, "message": span.error} if span.error else {"code": STATUS_OK}
+            }
+            if span.parent_id:
+                entry["parentSpanId"] = span.parent_id
+            otlp_spans.append(entry)
+        return _write_json(path, {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME, "run.id": self.run_id})},
+            "scopeSpans": [{"scope": {"name": "workflow_tracing"}, "spans": otlp_spans}]
+        }]})
+
+    def critical_path(self) -> List[Tuple[Span, float]]:
+        """Spans on the critical path with the seconds each contributed exclusively"""
+        tree = self.children()
+        path: List[Tuple[Span, float]] = []
+
+        def walk(span: Span, end_ns: int):
+            # Walk backwards from the span's end, always following the child that finished last
+            cursor = end_ns
+            exclusive = 0
+            for child in sorted(tree.get(span.span_id, []), key=lambda s: s.end_ns, reverse=True):
+                if child.end_ns > cursor or child.start_ns < span.start_ns:
+                    continue
+                exclusive += cursor - child.end_ns
+                walk(child, child.end_ns)
+                cursor = child.start_ns
+            exclusive += max(cursor - span.start_ns, 0)
+            path.append((span, exclusive / 1e9))
+
+        walk(self.root, self.root.end_ns)
+        path.reverse()
+        return path
+
+    def summary(self, top: int = 8) -> str:
+        """Human-readable critical path breakdown by category and by span"""
+        total = self.root.duration or 1e-9
+        path = self.critical_path()
+        by_category: Dict[str, float] = {}
+        for span, seconds in path:
+            by_category[span.category] = by_category.get(span.category, 0.0) + seconds
+
+        lines = [f"🧭 CRITICAL PATH ({self.root.duration:.2f}s total, {len(self.spans)} spans)"]
+        for category, seconds in sorted(by_category.items(), key=lambda item: item[1], reverse=True):
+            if seconds > 0:
+                lines.append(f"  {category:<18} {seconds:8.2f}s  {seconds / total * 100:5.1f}%")
+        lines.append("  Slowest spans on the path:")
+        for span, seconds in sorted(path, key=lambda item: item[1], reverse=True)[:top]:
+            if seconds > 0:
+                step = self._enclosing_step(span)
+                where = f"  [{step.name}]" if step and step is not span else ""
+                lines.append(f"    {seconds:8.2f}s  {span.category}: {span.name}{where}")
+        return "\n".join(lines)
+
+    def _enclosing_step(self, span: Span) -> Optional[Span]:
+        with self._lock:
+            by_id = {candidate.span_id: candidate for candidate in self.spans}
+        while span is not None and span.category != "step":
+            span = by_id.get(span.parent_id)
+        return span
+
+_active_tracer: contextvars.ContextVar = contextvars.ContextVar("workflow_tracer", default=None)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("workflow_span", default=None)
+
+@contextmanager
+def start_trace(run_id: str, name: str = "workflow run", **attributes):
+    """Trace every span opened in this block; yields the Tracer (root span closes on exit)"""
+    tracer = Tracer(run_id, name, attributes)
+    tracer_token = _active_tracer.set(tracer)
+    span_token = _current_span.set(tracer.root)
+    try:
+        yield tracer
+    except BaseException as e:
+        tracer.root.error = str(e) or type(e).__name__
+        raise
+    finally:
+        _current_span.reset(span_token)
+        _active_tracer.reset(tracer_token)
+        tracer._close(tracer.root)
+
+@contextmanager
+def span(name: str, category: str, **attributes):
+    """Open a child span of the current one; a no-op yielding None when no trace is active"""
+    tracer = _active_tracer.get()
+    if tracer is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    current = tracer._open(name, category, parent.span_id if parent else None, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = str(e) or type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        tracer._close(current)
+
+def current_span() -> Optional[Span]:
+    """Innermost open span, if tracing is active"""
+    return _current_span.get() if _active_tracer.get() is not None else None
+
+def export_trace(tracer: Tracer, trace_dir: Optional[Path] = None) -> Tuple[Path, Path]:
+    """Write <run_id>.trace.json (Chrome) and <run_id>.otlp.json next to each other"""
+    trace_dir = Path(trace_dir or os.environ.get(TRACE_DIR_ENV) or DEFAULT_TRACE_DIR).expanduser()
+    chrome_path = tracer.write_chrome_trace(trace_dir / f"{tracer.run_id}.trace.json")
+    otlp_path = tracer.write_otlp_json(trace_dir / f"{tracer.run_id}.otlp.json")
+    return chrome_path, otlp_path
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    converted = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        converted.append({"key": key, "value": typed})
+    return converted
+
+def _write_json(path: Path, payload: Dict[str, Any]) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.parent / f".{path.name}.{os.getpid()}.tmp"
+    tmp_path.write_text(json.dumps(payload))
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+
+"""
+🗃️ Workspace Catalog - SQLite index of projects and feature directories in ~/Projects
+Updated incrementally on manifest/output writes and reconciled cheaply by mtime for out-of-band edits
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+CATALOG_FILENAME = ".workspace-catalog.db"
+PROJECT_MANIFEST = "project-manifest.json"
+
+SORT_COLUMNS = {
+    "name": "name",
+    "created": "created_at",
+    "updated": "updated_at",
+    "features": "features_count",
+    "documents": "documents_count",
+    "status": "status"
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    name TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    is_mvp INTEGER NOT NULL,
+    status TEXT,
+    project_type TEXT,
+    workflow_version TEXT,
+    automation_mode TEXT,
+    created_at TEXT,
+    features_count INTEGER NOT NULL DEFAULT 0,
+    feature_dirs_count INTEGER NOT NULL DEFAULT 0,
+    documents_count INTEGER NOT NULL DEFAULT 0,
+    manifest_json TEXT,
+    manifest_mtime_ns INTEGER,
+    features_mtime_ns INTEGER,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_projects_status ON projects(status);
+CREATE INDEX IF NOT EXISTS idx_projects_created ON projects(created_at);
+
+CREATE TABLE IF NOT EXISTS feature_dirs (
+    project TEXT NOT NULL,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    documents_count INTEGER NOT NULL DEFAULT 0,
+    documents_json TEXT,
+    mtime_ns INTEGER,
+    PRIMARY KEY (project, name)
+);
+"""
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+class WorkspaceCatalog:
+    """SQLite catalog answering list-projects/status without crawling the workspace"""
+
+    def __init__(self, projects_dir: Optional[Path] = None, db_path: Optional[Path] = None):
+        self.projects_dir = Path(projects_dir) if projects_dir else Path.home() / "Projects"
+        self.db_path = Path(db_path) if db_path else self.projects_dir / CATALOG_FILENAME
+        self.logger = logging.getLogger('workspace_catalog')
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), timeout=10.0)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ------------------------------------------------------------------ writes
+
+    def update_project(self, project_root: Path):
+        """Re-index one project from its manifest and feature directories"""
+        project_root = Path(project_root)
+        if not project_root.is_dir():
+            self._delete_project(project_root.name)
+            return
+
+        manifest_path = project_root / PROJECT_MANIFEST
+        manifest = {}
+        if manifest_path.exists():
+            try:
+                with open(manifest_path, 'r') as f:
+                    manifest = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                self.logger.debug(f"Unreadable manifest {manifest_path}: {e}")
+
+        features_dir = project_root / "features"
+        with self.conn:
+            self.conn.execute("DELETE FROM feature_dirs WHERE project = ?", (project_root.name,))
+            if features_dir.is_dir():
+                for feature_dir in features_dir.iterdir():
+                    if feature_dir.is_dir():
+                        self._upsert_feature_dir(project_root.name, feature_dir)
+
+            self.conn.execute("""
+                INSERT OR REPLACE INTO projects (
+                    name, path, is_mvp, status, project_type, workflow_version, automation_mode, created_at,
+                    features_count, feature_dirs_count, documents_count, manifest_json,
+                    manifest_mtime_ns, features_mtime_ns, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0, 0, ?, ?, ?, ?)
+            """, (
+                project_root.name, str(project_root), 1 if manifest_path.exists() else 0,
+                manifest.get("status"), manifest.get("project_type"), manifest.get("workflow_version"),
+                manifest.get("mvp_context", {}).get("automation_mode"), manifest.get("created_at"),
+                len(manifest.get("features", [])), json.dumps(manifest) if manifest else None,
+                _mtime_ns(manifest_path), _mtime_ns(features_dir), time.time()
+            ))
+            self._refresh_totals(project_root.name)
+
+    def update_feature_dir(self, feature_dir: Path):
+        """Re-index a single feature directory after outputs were written"""
+        feature_dir = Path(feature_dir)
+        project_root = feature_dir.parent.parent
+        row = self.conn.execute("SELECT name FROM projects WHERE name = ?", (project_root.name,)).fetchone()
+        if row is None:
+            self.update_project(project_root)
+            return
+
+        with self.conn:
+            self._upsert_feature_dir(project_root.name, feature_dir)
+            self.conn.execute("UPDATE projects SET features_mtime_ns = ?, updated_at = ? WHERE name = ?",
+                              (_mtime_ns(feature_dir.parent), time.time(), project_root.name))
+            self._refresh_totals(project_root.name)
+
+    def _upsert_feature_dir(self, project_name: str, feature_dir: Path):
+        documents = sorted(p.name for p in feature_dir.glob("*.md"))
+        self.conn.execute("""
+            INSERT OR REPLACE INTO feature_dirs (project, name, path, documents_count, documents_json, mtime_ns)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (project_name, feature_dir.name, str(feature_dir), len(documents), json.dumps(documents),
+              _mtime_ns(feature_dir)))
+
+    def _refresh_totals(self, project_name: str):
+        self.conn.execute("""
+            UPDATE projects SET
+                feature_dirs_count = (SELECT COUNT(*) FROM feature_dirs WHERE project = :name),
+                documents_count = (SELECT COALESCE(SUM(documents_count), 0) FROM feature_dirs WHERE project = :name)
+            WHERE name = :name
+        """, {"name": project_name})
+
+    def _delete_project(self, project_name: str):
+        with self.conn:
+            self.conn.execute("DELETE FROM projects WHERE name = ?", (project_name,))
+            self.conn.execute("DELETE FROM feature_dirs WHERE project = ?", (project_name,))
+
+    def rebuild(self):
+        """Drop everything and re-index the whole workspace"""
+        with self.conn:
+            self.conn.execute("DELETE FROM projects")
+            self.conn.execute("DELETE FROM feature_dirs")
+        self.reconcile()
+
+    # --------------------------------------------------------------- reconcile
+
+    def reconcile(self, project_name: Optional[str] = None):
+        """Re-index only projects whose manifest, features/ or feature dirs changed on disk"""
+        if not self.projects_dir.exists():
+            return
+
+        if project_name:
+            project_roots = [self.projects_dir / project_name]
+        else:
+            project_roots = [d for d in self.projects_dir.iterdir() if d.is_dir() and not d.name.startswith('.')]
+
+        known = {
+            row["name"]: row for row in self.conn.execute(
+                "SELECT name, manifest_mtime_ns, features_mtime_ns FROM projects"
+                + (" WHERE name = ?" if project_name else ""),
+                (project_name,) if project_name else ()
+            )
+        }
+
+        for project_root in project_roots:
+            row = known.pop(project_root.name, None)
+            if not project_root.is_dir():
+                continue
+            if (row is None
+                    or row["manifest_mtime_ns"] != _mtime_ns(project_root / PROJECT_MANIFEST)
+                    or row["features_mtime_ns"] != _mtime_ns(project_root / "features")):
+                self.update_project(project_root)
+            else:
+                # Files added inside an existing feature dir only touch that dir's mtime
+                self._reconcile_feature_dirs(project_root)
+
+        # Projects removed out of band
+        for name in known:
+            self._delete_project(name)
+
+    def _reconcile_feature_dirs(self, project_root: Path):
+        """Stat each known feature dir and re-index the ones whose contents changed"""
+        rows = self.conn.execute("SELECT name, path, mtime_ns FROM feature_dirs WHERE project = ?",
+                                 (project_root.name,)).fetchall()
+        changed = [Path(row["path"]) for row in rows if _mtime_ns(Path(row["path"])) != row["mtime_ns"]]
+        if not changed:
+            return
+
+        with self.conn:
+            for feature_dir in changed:
+                if feature_dir.is_dir():
+                    self._upsert_feature_dir(project_root.name, feature_dir)
+                else:
+                    self.conn.execute("DELETE FROM feature_dirs WHERE project = ? AND name = ?",
+                                      (project_root.name, feature_dir.name))
+            self._refresh_totals(project_root.name)
+
+    # ------------------------------------------------------------------- reads
+
+    def list_projects(self, status: Optional[str] = None, name_filter: Optional[str] = None,
+                      sort: str = "name", descending: bool = False, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Query projects with optional status/name filters and sorting"""
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort key: {sort} (expected one of {', '.join(SORT_COLUMNS)})")
+
+        query = "SELECT * FROM projects WHERE 1 = 1"
+        params: List[Any] = []
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        if name_filter:
+            query += " AND name LIKE ?"
+            params.append(f"%{name_filter}%")
+        query += f" ORDER BY {SORT_COLUMNS[sort]} {'DESC' if descending else 'ASC'}, name ASC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        return [self._project_row(row) for row in self.conn.execute(query, params)]
+
+    def get_project(self, project_name: str) -> Optional[Dict[str, Any]]:
+        """Project row plus its manifest and feature directories"""
+        row = self.conn.execute("SELECT * FROM projects WHERE name = ?", (project_name,)).fetchone()
+        if row is None:
+            return None
+
+        project = self._project_row(row)
+        project["manifest"] = json.loads(row["manifest_json"]) if row["manifest_json"] else {}
+        project["feature_dirs"] = [
+            {
+                "name": fd["name"],
+                "path": fd["path"],
+                "documents_count": fd["documents_count"],
+                "documents": json.loads(fd["documents_json"] or "[]")
+            }
+            for fd in self.conn.execute("SELECT * FROM feature_dirs WHERE project = ? ORDER BY name",
+                                        (project_name,))
+        ]
+        return project
+
+    def _project_row(self, row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "name": row["name"],
+            "path": row["path"],
+            "is_mvp": bool(row["is_mvp"]),
+            "status": row["status"],
+            "project_type": row["project_type"],
+            "workflow_version": row["workflow_version"],
+            "automation_mode": row["automation_mode"],
+            "created_at": row["created_at"],
+            "features_count": row["features_count"],
+            "feature_dirs_count": row["feature_dirs_count"],
+            "documents_count": row["documents_count"]
+        }
+
+def notify_project_changed(project_root: Path):
+    """Incrementally update the catalog after a manifest write (never fails the caller)"""
+    catalog = WorkspaceCatalog(Path(project_root).parent)
+    try:
+        catalog.update_project(project_root)
+    except Exception as e:
+        logging.getLogger('workspace_catalog').debug(f"Catalog update skipped for {project_root}: {e}")
+    finally:
+        catalog.close()
+
+def notify_feature_changed(feature_dir: Path):
+    """Incrementally update the catalog after feature outputs were written (never fails the caller)"""
+    catalog = WorkspaceCatalog(Path(feature_dir).parent.parent.parent)
+    try:
+        catalog.update_feature_dir(feature_dir)
+    except Exception as e:
+        logging.getLogger('workspace_catalog').debug(f"Catalog update skipped for {feature_dir}: {e}")
+    finally:
+        catalog.close()